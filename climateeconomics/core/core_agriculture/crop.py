@@ -18,6 +18,7 @@ from copy import deepcopy
 
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 
 from climateeconomics.glossarycore import GlossaryCore
 from energy_models.core.stream_type.carbon_models.carbon_dioxyde import CO2
@@ -133,7 +134,7 @@ class Crop():
         self.crf = None
         self.nb_years_amort_capex = None
         self.production = None
-        self.age_distrib_prod_df = None
+        self.age_distrib_prod = None
         self.calories_per_day_constraint = None
         self.food_waste_percentage_df = None
         self.param = param
@@ -597,77 +598,51 @@ class Crop():
 
         # Finally compute the production by summing all aged production for
         # each year
-
-        age_distrib_prod_sum = self.age_distrib_prod_df.groupby([GlossaryCore.Years], as_index=False).agg(
-            {f'distrib_prod (TWh)': 'sum'}
-        )
         if 'biomass_dry (TWh)' in self.production:
             del self.production['biomass_dry (TWh)']
-
-        self.production = pd.merge(self.production, age_distrib_prod_sum, how='left', on=GlossaryCore.Years).rename(
-            columns={'distrib_prod (TWh)': 'biomass_dry (TWh)'}).fillna(0.0)
+        self.production['biomass_dry (TWh)'] = self.age_distrib_prod.sum(axis=1)
+        self.production = self.production.fillna(0.0)
 
     def compute_aging_distribution_production(self):
         '''
-        Compute the aging distribution production of primary energy for years of study
-        Start with the initial distribution and add a year on the age each year 
+        Compute the aging distribution production of primary energy for years of study, as a vintage matrix with one
+        row for each year and one column for each age below the lifetime
+        Start with the initial distribution and add a year on the age each year
         Add also the yearly production regarding the investment
-        All productions older than the lifetime are removed from the dataframe  
+        All productions older than the lifetime are out of the matrix
         '''
-        # To break the object link with initial distrib
-        aging_distrib_year_df = pd.DataFrame(
-            {'age': self.initial_age_distrib['age'].values})
-        aging_distrib_year_df[f'distrib_prod (TWh)'] = self.initial_age_distrib['distrib'] * \
-                                                       self.initial_production / 100.0
-
+        nb_years = len(self.years)
+        nb_ages = int(np.ceil(self.techno_infos_dict['lifetime']))
+        initial_prod = self.initial_age_distrib['distrib'].values * self.initial_production / 100.0
         production_from_invest = self.compute_prod_from_invest(
-            construction_delay=self.construction_delay)
-
-        # get the whole dataframe for new production with one line for each
-        # year at each age
-        # concatenate tuple to get correct df to mimic the old year loop
-        len_years = len(self.years)
-        range_years = np.arange(
-            self.year_start, self.year_end + len_years)
-
-        year_array = np.concatenate(
-            tuple(range_years[i:i + len_years] for i in range(len_years)))
-        age_array = np.concatenate(tuple(np.ones(
-            len_years) * (len_years - i) for i in range(len_years, 0, -1)))
-        prod_array = production_from_invest['prod_from_invest'].values.tolist(
-        ) * len_years
-
-        new_prod_aged = pd.DataFrame(
-            {GlossaryCore.Years: year_array, 'age': age_array, 'distrib_prod (TWh)': prod_array})
-
-        # get the whole dataframe for old production with one line for each
-        # year at each age
-        year_array = np.array([[year] * len(aging_distrib_year_df)
-                               for year in self.years]).flatten()
-        age_values = aging_distrib_year_df['age'].values
-        age_array = np.concatenate(tuple(
-            age_values + i for i in range(len_years)))
-        prod_array = aging_distrib_year_df[f'distrib_prod (TWh)'].values.tolist(
-        ) * len_years
-
-        old_prod_aged = pd.DataFrame({GlossaryCore.Years: year_array, 'age': age_array,
-                                      f'distrib_prod (TWh)': prod_array})
-
-        # Concat the two created df
-        self.age_distrib_prod_df = pd.concat(
-            [new_prod_aged, old_prod_aged], ignore_index=True)
-
-        self.age_distrib_prod_df = self.age_distrib_prod_df.loc[
-            # Suppress all lines where age is higher than lifetime
-            (self.age_distrib_prod_df['age'] <
-             self.techno_infos_dict['lifetime'])
-            # Suppress all lines where age is higher than lifetime
-            & (self.age_distrib_prod_df[GlossaryCore.Years] < self.year_end + 1)
-            # Fill Nan with zeros and suppress all zeros
-            & (self.age_distrib_prod_df[f'distrib_prod (TWh)'] != 0.0)
-            ]
+            construction_delay=self.construction_delay)['prod_from_invest'].values
+        dtype = np.result_type(initial_prod, production_from_invest)
+
+        initial_ages = self.initial_age_distrib['age'].values.astype(int)
+        in_lifetime = initial_ages < nb_ages
+        initial_prod_by_age = np.zeros(nb_ages, dtype=dtype)
+        np.add.at(initial_prod_by_age, initial_ages[in_lifetime], initial_prod[in_lifetime])
+
+        # production at year i and age a is the production from invest of year i - a, plus the initial production
+        # of age a - i : both are read on sliding windows over the zero padded productions
+        padded_production_from_invest = np.concatenate((np.zeros(nb_ages - 1, dtype=dtype), production_from_invest))
+        padded_initial_prod = np.concatenate((np.zeros(nb_years - 1, dtype=dtype), initial_prod_by_age))
+        age_distrib_prod = sliding_window_view(padded_production_from_invest, nb_ages)[:, ::-1] + \
+            sliding_window_view(padded_initial_prod, nb_ages)[::-1]
         # Fill Nan with zeros
-        self.age_distrib_prod_df.fillna(0.0, inplace=True)
+        self.age_distrib_prod = np.where(np.isnan(age_distrib_prod), 0., age_distrib_prod)
+
+    @property
+    def age_distrib_prod_df(self):
+        '''
+        Aging distribution production with one line for each year and each age with a production, only built when
+        requested
+        '''
+        if self.age_distrib_prod is None:
+            return None
+        year_indexes, ages = np.nonzero(self.age_distrib_prod)
+        return pd.DataFrame({GlossaryCore.Years: self.years[year_indexes], 'age': ages,
+                             'distrib_prod (TWh)': self.age_distrib_prod[year_indexes, ages]})
 
     def compute_prod_from_invest(self, construction_delay):
         '''
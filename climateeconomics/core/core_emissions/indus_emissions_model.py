@@ -32,6 +32,7 @@ class IndusEmissions():
         self.param = param
         self.set_data()
         self.create_dataframe()
+        self.compute_sigma()
 
     def set_data(self):
         self.year_start = self.param[GlossaryCore.YearStart]
@@ -52,16 +53,10 @@ class IndusEmissions():
         '''
         Create the dataframe and fill it with values at year_start
         '''
-        # declare class variable as local variable
-        year_start = self.year_start
-        year_end = self.year_end
-        init_gr_sigma = self.init_gr_sigma
-        init_indus_emissions = self.init_indus_emissions
-        init_cum_indus_emissions = self.init_cum_indus_emissions
-
         years_range = np.arange(
-            year_start, year_end + 1, self.time_step)
+            self.year_start, self.year_end + 1, self.time_step)
         self.years_range = years_range
+        self.nb_years = len(years_range)
         indus_emissions_df = pd.DataFrame(index=years_range, columns=[GlossaryCore.Years,
                                                                       'gr_sigma', 'sigma', 'indus_emissions',
                                                                       'cum_indus_emissions'])
@@ -69,81 +64,52 @@ class IndusEmissions():
         for key in indus_emissions_df.keys():
             indus_emissions_df[key] = 0
         indus_emissions_df[GlossaryCore.Years] = years_range
-        indus_emissions_df.loc[year_start, 'gr_sigma'] = init_gr_sigma
-        indus_emissions_df.loc[year_start,
-                               'indus_emissions'] = init_indus_emissions
-        indus_emissions_df.loc[year_start,
-                               'cum_indus_emissions'] = init_cum_indus_emissions
         self.indus_emissions_df = indus_emissions_df
 
-    def compute_sigma(self, year):
+    def compute_sigma(self):
         '''
-        Compute CO2-equivalent-emissions output ratio at t 
-        using sigma t-1 and growht_rate sigma  t-1
+        Compute CO2-equivalent-emissions output ratio sigma and its growth rate for all years
+        They only depend on parameters : the growth rate declines geometrically
+            gr_sigma(t) = gr_sigma(t-1) * (1 + decline_rate_decarbo) ** time_step
+        and sigma is the cumulative product of its growth factors
+            sigma(t) = sigma(t-1) * exp(gr_sigma(t-1) * time_step)
         '''
+        gr_sigma_factors = np.full(self.nb_years, (1.0 + self.decline_rate_decarbo) ** self.time_step)
+        gr_sigma_factors[0] = self.init_gr_sigma
+        self.gr_sigma = np.cumprod(gr_sigma_factors)
 
-        if year == self.year_start:
-            sigma = self.init_indus_emissions / \
-                self.init_gross_output
-        else:
-            p_gr_sigma = self.indus_emissions_df.at[year -
-                                                    self.time_step, 'gr_sigma']
-            p_sigma = self.indus_emissions_df.at[year -
-                                                 self.time_step, 'sigma']
-            sigma = p_sigma * np.exp(p_gr_sigma * self.time_step)
-        self.indus_emissions_df.loc[year, 'sigma'] = sigma
-        return sigma
-
-    def compute_change_sigma(self, year):
-        """
-        Compute change in sigma growth rate at t 
-        using sigma grouwth rate t-1
-        """
+        sigma_factors = np.empty(self.nb_years)
+        sigma_factors[0] = self.init_indus_emissions / self.init_gross_output
+        sigma_factors[1:] = np.exp(self.gr_sigma[:-1] * self.time_step)
+        self.sigma = np.cumprod(sigma_factors)
 
-        if year == self.year_start:
-            pass
-        else:
-            p_gr_sigma = self.indus_emissions_df.at[year -
-                                                    self.time_step, 'gr_sigma']
-            gr_sigma = p_gr_sigma * \
-                ((1.0 + self.decline_rate_decarbo) ** self.time_step)
-            self.indus_emissions_df.loc[year, 'gr_sigma'] = gr_sigma
-            return gr_sigma
-
-    def compute_indus_emissions(self, year):
+    def compute_indus_emissions_arrays(self, gross_output: np.ndarray) -> dict:
         """
-        Compute industrial emissions at t 
-        using gross output (t)
-        emissions control rate (t)
-        emissions not coming from land change or energy 
+        Compute industrial emissions and cumulative industrial emissions from gross output, years are on the last axis
+        and leading axes are scenarios
+            indus_emissions(t) = sigma(t) * gross_output(t) * (1 - energy_emis_share - land_emis_share)
+            cum_indus_emissions(t) = cum_indus_emissions(t-1) + indus_emissions(t) * time_step / gtco2_to_gtc
         """
-        sigma = self.indus_emissions_df.at[year, 'sigma']
-        gross_output_ter = self.economics_df.at[year, GlossaryCore.GrossOutput]
+        gross_output = np.asarray(gross_output)
+        indus_emissions = self.sigma * gross_output * (1 - self.energy_emis_share - self.land_emis_share)
+
+        cum_indus_emissions = np.empty_like(indus_emissions)
+        cum_indus_emissions[..., 0] = self.init_cum_indus_emissions
+        cum_indus_emissions[..., 1:] = indus_emissions[..., 1:] * float(self.time_step) / self.gtco2_to_gtc
+        cum_indus_emissions = np.cumsum(cum_indus_emissions, axis=-1)
 
-        indus_emissions = sigma * gross_output_ter * \
-            (1 - self.energy_emis_share - self.land_emis_share)
-        self.indus_emissions_df.loc[year, 'indus_emissions'] = indus_emissions
-        return indus_emissions
+        return {'gr_sigma': np.broadcast_to(self.gr_sigma, indus_emissions.shape).copy(),
+                'sigma': np.broadcast_to(self.sigma, indus_emissions.shape).copy(),
+                'indus_emissions': indus_emissions,
+                'cum_indus_emissions': cum_indus_emissions}
 
-    def compute_cum_indus_emissions(self, year):
+    def compute_scenarios(self, gross_output: np.ndarray) -> dict:
         """
-        Compute cumulative industrial emissions at t
-        using emissions indus at t- 1 
-        and cumulative indus emissions at t-1
+        Compute industrial emissions of a batch of gross output trajectories in one call, without dataframes.
+        Gross outputs are arrays of shape (n_scenarios, n_years), outputs are returned with the same shape,
+        indexed by their indus_emissions_df column name
         """
-
-        if year == self.year_start:
-            pass
-        else:
-            p_cum_indus_emissions = self.indus_emissions_df.at[year -
-                                                               self.time_step, 'cum_indus_emissions']
-            indus_emissions = self.indus_emissions_df.at[year,
-                                                         'indus_emissions']
-            cum_indus_emissions = p_cum_indus_emissions + \
-                indus_emissions * float(self.time_step) / self.gtco2_to_gtc
-            self.indus_emissions_df.loc[year,
-                                        'cum_indus_emissions'] = cum_indus_emissions
-            return cum_indus_emissions
+        return self.compute_indus_emissions_arrays(np.atleast_2d(gross_output))
 
     ######### GRADIENTS ########
 
@@ -152,32 +118,19 @@ class IndusEmissions():
         Compute gradient d_indus_emissions/d_gross_output, 
         d_cum_indus_emissions/d_gross_output, 
         d_cum_indus_emissions/d_total_CO2_emitted
+        Cumulative emissions are prefix sums from the second year on: their gradients are lower triangular
         """
-        years = np.arange(self.year_start,
-                          self.year_end + 1, self.time_step)
-        nb_years = len(years)
-
-        # derivative matrix initialization
-        d_indus_emissions_d_gross_output = np.identity(nb_years) * 0
-        d_cum_indus_emissions_d_gross_output = np.identity(nb_years) * 0
-        d_cum_indus_emissions_d_total_CO2_emitted = np.identity(nb_years) * 0
-
-        i = 0
-        line = 0
-        for i in range(nb_years):
-            for line in range(nb_years):
-                if i > 0 and i <= line:  # fill triangular descendant
-                    d_cum_indus_emissions_d_total_CO2_emitted[line, i] = float(
-                        self.time_step) / self.gtco2_to_gtc
-
-                    d_cum_indus_emissions_d_gross_output[line, i] = float(self.time_step) / self.gtco2_to_gtc *\
-                        self.indus_emissions_df.at[years[i], 'sigma'] *\
-                        (1.0 - self.energy_emis_share - self.land_emis_share)
-                if i == line:  # fill diagonal
-                    d_indus_emissions_d_gross_output[line, i] = self.indus_emissions_df.at[years[line], 'sigma'] \
-                        * (1 - self.energy_emis_share - self.land_emis_share)
-
-        return d_indus_emissions_d_gross_output, d_cum_indus_emissions_d_gross_output, d_cum_indus_emissions_d_total_CO2_emitted
+        d_indus_emissions_d_gross_output = self.sigma * (1 - self.energy_emis_share - self.land_emis_share)
+        d_cum_d_indus_emissions = np.full(self.nb_years, float(self.time_step) / self.gtco2_to_gtc)
+        d_cum_d_indus_emissions[0] = 0.
+
+        d_cum_indus_emissions_d_gross_output = np.tril(
+            np.ones((self.nb_years, 1)) * (d_cum_d_indus_emissions * d_indus_emissions_d_gross_output))
+        d_cum_indus_emissions_d_total_CO2_emitted = np.tril(
+            np.ones((self.nb_years, 1)) * d_cum_d_indus_emissions)
+
+        return np.diag(d_indus_emissions_d_gross_output), d_cum_indus_emissions_d_gross_output, \
+            d_cum_indus_emissions_d_total_CO2_emitted
 
     def compute(self, inputs_models):
         """
@@ -185,13 +138,9 @@ class IndusEmissions():
         """
         self.inputs_models = inputs_models
         self.economics_df = self.inputs_models[GlossaryCore.EconomicsDfValue]
-        self.economics_df.index = self.economics_df[GlossaryCore.Years].values
-
-        # Iterate over years
-        for year in self.years_range:
-            self.compute_change_sigma(year)
-            self.compute_sigma(year)
-            self.compute_indus_emissions(year)
-            self.compute_cum_indus_emissions(year)
+
+        indus_emissions = self.compute_indus_emissions_arrays(self.economics_df[GlossaryCore.GrossOutput].values)
+        for column, values in indus_emissions.items():
+            self.indus_emissions_df[column] = values
 
         return self.indus_emissions_df
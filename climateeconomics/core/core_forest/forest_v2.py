@@ -312,87 +312,65 @@ class Forest():
         self.forest_surface_df['reforestation_surface'] = np.cumsum(
             self.forest_surface_df['delta_reforestation_surface'])
 
-        deforested_unmanaged_surface = 0
-        for i in range(0, len(self.years)):
-            # recompute unmanaged forest cumulated each year
-            if i == 0:
-                self.forest_surface_df.loc[i, 'unmanaged_forest'] = self.initial_unmanaged_forest_surface + \
-                                                                    self.forest_surface_df.loc[
-                                                                        i, 'delta_reforestation_surface'] + \
-                                                                    self.forest_surface_df.loc[i,
-                                                                    'delta_deforestation_surface']
-            else:
-                self.forest_surface_df.loc[i, 'unmanaged_forest'] = self.forest_surface_df.loc[
-                                                                        i - 1, 'unmanaged_forest'] + \
-                                                                    self.forest_surface_df.loc[
-                                                                        i, 'delta_reforestation_surface'] + \
-                                                                    self.forest_surface_df.loc[i,
-                                                                    'delta_deforestation_surface']
-            # if unmanaged forest are empty, managed forest are removed
-            if self.forest_surface_df.loc[i, 'unmanaged_forest'] <= 0:
-                # remove managed wood
-                self.managed_wood_df.loc[i,
-                'delta_surface'] += self.forest_surface_df.loc[i, 'unmanaged_forest']
-                # compute reforestation lost capital
-                # in this loop all unmanaged forest + reforested forest has been deforested
-                # if i == 0, lost capital is the initial unmanaged + reforested surface
-                # else it is previous year unmanaged surface + reforested
-                # surface
-                if i == 0:
-                    deforested_unmanaged_surface = self.initial_unmanaged_forest_surface + \
-                                                   self.forest_surface_df.loc[i,
-                                                   'delta_reforestation_surface']
-                else:
-                    deforested_unmanaged_surface = self.forest_surface_df.loc[i - 1,
-                    'unmanaged_forest'] + self.forest_surface_df.loc[i, 'delta_reforestation_surface']
-                self.forest_lost_capital.loc[i,
-                'reforestation'] = deforested_unmanaged_surface * self.cost_per_ha
-
-                # lost capital of managed wood is what is deforested into
-                # managed forest
-                self.forest_lost_capital.loc[i, 'managed_wood'] = -  self.forest_surface_df.loc[i,
-                'unmanaged_forest'] * self.techno_wood_info['managed_wood_price_per_ha']
-                # set unmanaged forest to 0
-                self.forest_surface_df.loc[i, 'unmanaged_forest'] = 0
-            else:
-                # reforestation lost capital equals deforestation
-                self.forest_lost_capital.loc[i, 'reforestation'] = - \
-                                                                       self.forest_surface_df.loc[i,
-                                                                       'delta_deforestation_surface'] * self.cost_per_ha
-            # recompute managed forest cumulated each year
-            if i > 0:
-                self.managed_wood_df.loc[i, 'cumulative_surface'] = self.managed_wood_df.loc[
-                                                                        i - 1, 'cumulative_surface'] + \
-                                                                    self.managed_wood_df.loc[i, 'delta_surface']
-
-            # if managed forest are empty, all is removed
-            if self.managed_wood_df.loc[i, 'cumulative_surface'] <= 0:
-                # the cumulative surface is the excedent surface deforested
-                # leading to lost capital
-                self.forest_lost_capital.loc[i, 'deforestation'] = - \
-                                                                       self.managed_wood_df.loc[
-                                                                           i, 'cumulative_surface'] * \
-                                                                   self.deforest_cost_per_ha
-
-                # lost capital of managed wood is what is left of managed wood
-                # + what have been invested in the i year
-                deforested_managed_surface = self.forest_surface_df.loc[
-                                                 i, 'delta_deforestation_surface'] + deforested_unmanaged_surface - \
-                                             self.managed_wood_df.loc[i, 'cumulative_surface']
-                self.forest_lost_capital.loc[i, 'managed_wood'] = - \
-                                                                      deforested_managed_surface * \
-                                                                  self.techno_wood_info['managed_wood_price_per_ha']
-
-                # delta is all the managed wood available
-                self.managed_wood_df.loc[i, 'delta_surface'] = - \
-                    self.managed_wood_df.loc[i - 1, 'cumulative_surface']
-                self.managed_wood_df.loc[i, 'cumulative_surface'] = 0
-
-                # set a limit to deforestation at the forest that have been reforested because there is no other
-                # real_deforested surface = -delta_reforestation_surface + delta_mw_surface
-                # lost_capital = (delta_deforestation_surface - real_deforested) * deforestation_cost_per_ha
-                self.forest_surface_df.loc[i, 'delta_deforestation_surface'] = - self.forest_surface_df.loc[i,
-                'delta_reforestation_surface'] + self.managed_wood_df.loc[i, 'delta_surface']
+        delta_reforestation_surface = self.forest_surface_df['delta_reforestation_surface'].values
+        delta_deforestation_surface = self.forest_surface_df['delta_deforestation_surface'].values
+        mw_price_per_ha = self.techno_wood_info['managed_wood_price_per_ha']
+
+        # recompute unmanaged forest cumulated each year
+        # if unmanaged forest are empty, managed forest are removed and unmanaged forest is set to 0
+        delta_unmanaged_forest = delta_reforestation_surface + delta_deforestation_surface
+        delta_unmanaged_forest[0] += self.initial_unmanaged_forest_surface
+        unmanaged_forest, self.unmanaged_forest_clamp = self.cumsum_clamped_at_zero(delta_unmanaged_forest)
+        unmanaged_forest_after_clamp = np.where(self.unmanaged_forest_clamp, 0., unmanaged_forest)
+        previous_unmanaged_forest = np.concatenate(([self.initial_unmanaged_forest_surface],
+                                                    unmanaged_forest_after_clamp[:-1]))
+        # in a clamp event all previous unmanaged forest + reforested forest has been deforested
+        # this deforested surface is kept until next clamp event
+        deforested_unmanaged_surface_at_clamp = previous_unmanaged_forest + delta_reforestation_surface
+        last_clamp = np.maximum.accumulate(np.where(self.unmanaged_forest_clamp, np.arange(len(self.years)), -1))
+        deforested_unmanaged_surface = np.where(last_clamp >= 0, deforested_unmanaged_surface_at_clamp[last_clamp], 0.)
+
+        # compute reforestation lost capital, which equals deforestation if there is no clamp event
+        lost_capital_reforestation = np.where(self.unmanaged_forest_clamp,
+                                              deforested_unmanaged_surface_at_clamp * self.cost_per_ha,
+                                              - delta_deforestation_surface * self.cost_per_ha)
+        # lost capital of managed wood is what is deforested into managed forest
+        lost_capital_managed_wood = np.where(self.unmanaged_forest_clamp, - unmanaged_forest * mw_price_per_ha, 0.)
+        # remove managed wood
+        delta_mw_surface = self.managed_wood_df['delta_surface'].values + \
+            np.where(self.unmanaged_forest_clamp, unmanaged_forest, 0.)
+
+        # recompute managed forest cumulated each year
+        # if managed forest are empty, all is removed
+        delta_cumulative_mw_surface = delta_mw_surface.copy()
+        delta_cumulative_mw_surface[0] = self.managed_wood_df['cumulative_surface'].values[0]
+        cumulative_mw_surface, self.managed_wood_clamp = self.cumsum_clamped_at_zero(delta_cumulative_mw_surface)
+        cumulative_mw_surface_after_clamp = np.where(self.managed_wood_clamp, 0., cumulative_mw_surface)
+        previous_cumulative_mw_surface = np.concatenate(([self.managed_wood_initial_surface],
+                                                         cumulative_mw_surface_after_clamp[:-1]))
+
+        # the cumulative surface is the excedent surface deforested leading to lost capital
+        lost_capital_deforestation = np.where(self.managed_wood_clamp,
+                                              - cumulative_mw_surface * self.deforest_cost_per_ha, 0.)
+        # lost capital of managed wood is what is left of managed wood + what have been invested in the year
+        deforested_managed_surface = delta_deforestation_surface + deforested_unmanaged_surface - cumulative_mw_surface
+        lost_capital_managed_wood = np.where(self.managed_wood_clamp, - deforested_managed_surface * mw_price_per_ha,
+                                             lost_capital_managed_wood)
+        # delta is all the managed wood available
+        delta_mw_surface = np.where(self.managed_wood_clamp, - previous_cumulative_mw_surface, delta_mw_surface)
+        # set a limit to deforestation at the forest that have been reforested because there is no other
+        # real_deforested surface = -delta_reforestation_surface + delta_mw_surface
+        delta_deforestation_surface = np.where(self.managed_wood_clamp,
+                                               - delta_reforestation_surface + delta_mw_surface,
+                                               delta_deforestation_surface)
+
+        self.forest_surface_df['unmanaged_forest'] = unmanaged_forest_after_clamp
+        self.forest_surface_df['delta_deforestation_surface'] = delta_deforestation_surface
+        self.managed_wood_df['delta_surface'] = delta_mw_surface
+        self.managed_wood_df['cumulative_surface'] = cumulative_mw_surface_after_clamp
+        self.forest_lost_capital['reforestation'] = lost_capital_reforestation
+        self.forest_lost_capital['managed_wood'] = lost_capital_managed_wood
+        self.forest_lost_capital['deforestation'] = lost_capital_deforestation
 
         self.forest_surface_df['deforestation_surface'] = np.cumsum(
             self.forest_surface_df['delta_deforestation_surface'])
@@ -401,6 +379,18 @@ class Forest():
         self.forest_surface_df['unmanaged_forest'] = compute_func_with_exp_min(
             self.forest_surface_df['unmanaged_forest'].values, 1e-15)
 
+    @staticmethod
+    def cumsum_clamped_at_zero(deltas):
+        """
+        Cumulative sum of deltas set to zero each year it is negative or null, and restarting from there.
+        Return the cumulative sum of each year before being clamped and the mask of clamp events.
+        The clamped sum is the cumulative sum minus its running minimum below zero, which is what the clamps removed.
+        """
+        cumsum = np.cumsum(deltas)
+        removed_by_clamps = np.minimum.accumulate(np.minimum(cumsum, 0.))
+        cumsum_before_clamp = cumsum - np.concatenate(([0.], removed_by_clamps[:-1]))
+        return cumsum_before_clamp, cumsum_before_clamp <= 0.
+
     def compute_deforestation_biomass(self):
         """
         compute biomass produce by deforestation. It is a one time production.
@@ -583,76 +573,44 @@ class Forest():
         compute gradient of managed_wood surface vs managed_wood_investment
         """
         number_of_values = (self.year_end - self.year_start + 1)
-        result = np.identity(number_of_values) * 0.0
         construction_delay = self.techno_wood_info[GlossaryCore.ConstructionDelay]
-        for i in range(construction_delay, number_of_values):
-            result[i, i - construction_delay] = 1 / \
-                                                self.techno_wood_info['managed_wood_price_per_ha']
-        return result
+        return np.eye(number_of_values, k=-construction_delay) / self.techno_wood_info['managed_wood_price_per_ha']
 
     def compute_d_limit_surfaces_d_deforestation_invest(self, d_deforestation_surface_d_invest):
         """
         Compute gradient of delta managed wood surface, delta deforestation surface, unmanaged wood cumulated surface,
         mw lost capital, deforestation lost capital and reforestation lost capital vs deforestation invest
         """
-        number_of_values = (self.year_end - self.year_start + 1)
-
-        d_delta_mw_surface_d_invest = np.zeros(
-            (number_of_values, number_of_values))
-        d_delta_deforestation_surface_d_invest = d_deforestation_surface_d_invest
-        d_cum_umw_surface_d_invest = np.zeros(
-            (number_of_values, number_of_values))
-        d_lc_deforestation_d_invest = np.zeros(
-            (number_of_values, number_of_values))
-        d_lc_reforestation_d_invest = np.zeros(
-            (number_of_values, number_of_values))
-        d_lc_mw_d_invest = np.zeros(
-            (number_of_values, number_of_values))
-
-        for i in range(0, len(self.years)):
-            if i == 0:
-                d_cum_umw_surface_d_invest[i] = d_delta_deforestation_surface_d_invest[i]
-            else:
-                d_cum_umw_surface_d_invest[i] = d_cum_umw_surface_d_invest[i -
-                                                                           1] + d_delta_deforestation_surface_d_invest[
-                                                    i]
-            # if unmanaged forest are empty, managed forest are removed
-            if self.forest_surface_df.loc[i, 'unmanaged_forest'] <= 1e-10:
-                # remove managed wood
-                d_delta_mw_surface_d_invest[i] += d_cum_umw_surface_d_invest[i]
-
-                if i == 0:
-                    d_lc_reforestation_d_invest[i] = np.zeros(number_of_values)
-                else:
-                    d_lc_reforestation_d_invest[i] = d_cum_umw_surface_d_invest[i -
-                                                                                1] * self.cost_per_ha
-
-                d_lc_mw_d_invest[i] = - d_cum_umw_surface_d_invest[i] * \
-                                      self.techno_wood_info['managed_wood_price_per_ha']
-                # set unmanaged forest to 0
-                d_cum_umw_surface_d_invest[i] = np.zeros(number_of_values)
-
-            else:
-                d_lc_reforestation_d_invest[i] = - \
-                                                     d_deforestation_surface_d_invest[i] * self.cost_per_ha
-
-            # if managed forest are empty, all is removed
-            if self.managed_wood_df.loc[i, 'cumulative_surface'] <= 1e-10:
-                sum = self.d_cum(d_delta_mw_surface_d_invest)
-                # delta is all the managed wood available
-                d_lc_deforestation_d_invest[i] = - \
-                                                     sum[i] * self.deforest_cost_per_ha
-                d_lc_mw_d_invest[i] = - (
-                        d_deforestation_surface_d_invest[i] + d_lc_reforestation_d_invest[i] / self.cost_per_ha -
-                        sum[i]) * \
-                                      self.techno_wood_info['managed_wood_price_per_ha']
-
-                #                 d_delta_mw_surface_d_invest[i] = - \
-                #                     compute_dfunc_with_exp_min(
-                #                         sum[i - 1], 1e-15).reshape(number_of_values)
-                d_delta_mw_surface_d_invest[i] = - \
-                    sum[i - 1]
-                d_delta_deforestation_surface_d_invest[i] = d_delta_mw_surface_d_invest[i]
+        unmanaged_forest_clamp = self.unmanaged_forest_clamp[:, np.newaxis]
+        managed_wood_clamp = self.managed_wood_clamp[:, np.newaxis]
+        mw_price_per_ha = self.techno_wood_info['managed_wood_price_per_ha']
+
+        # unmanaged forest cumulates deforestation and is set to 0 at its clamp events
+        d_cum_umw_before_clamp, d_cum_umw_surface_d_invest = self.d_cum_clamped_at_zero(
+            d_deforestation_surface_d_invest, self.unmanaged_forest_clamp)
+        d_previous_cum_umw = self.previous_year(d_cum_umw_surface_d_invest)
+
+        # if unmanaged forest are empty, managed forest are removed
+        d_delta_mw_surface_d_invest = np.where(unmanaged_forest_clamp, d_cum_umw_before_clamp, 0.)
+        d_lc_reforestation_d_invest = np.where(unmanaged_forest_clamp, d_previous_cum_umw * self.cost_per_ha,
+                                               - d_deforestation_surface_d_invest * self.cost_per_ha)
+        d_lc_mw_d_invest = np.where(unmanaged_forest_clamp, - d_cum_umw_before_clamp * mw_price_per_ha, 0.)
+
+        # if managed forest are empty, all is removed
+        d_cum_mw_before_clamp, d_cum_mw = self.d_cum_clamped_at_zero(d_delta_mw_surface_d_invest,
+                                                                     self.managed_wood_clamp)
+        d_lc_deforestation_d_invest = np.where(managed_wood_clamp, - d_cum_mw_before_clamp * self.deforest_cost_per_ha,
+                                               0.)
+        d_lc_mw_d_invest = np.where(managed_wood_clamp,
+                                    - (d_deforestation_surface_d_invest +
+                                       d_lc_reforestation_d_invest / self.cost_per_ha - d_cum_mw_before_clamp) *
+                                    mw_price_per_ha,
+                                    d_lc_mw_d_invest)
+        # delta is all the managed wood available
+        d_delta_mw_surface_d_invest = np.where(managed_wood_clamp, - self.previous_year(d_cum_mw),
+                                               d_delta_mw_surface_d_invest)
+        d_delta_deforestation_surface_d_invest = np.where(managed_wood_clamp, d_delta_mw_surface_d_invest,
+                                                          d_deforestation_surface_d_invest)
 
         return d_cum_umw_surface_d_invest, d_delta_mw_surface_d_invest, d_delta_deforestation_surface_d_invest, d_lc_deforestation_d_invest, d_lc_reforestation_d_invest, d_lc_mw_d_invest
 
@@ -661,63 +619,37 @@ class Forest():
         Compute gradient of delta managed wood surface, delta deforestation surface, unmanaged wood cumulated surface,
         mw lost capital, deforestation lost capital and reforestation lost capital vs reforestation invest
         """
-        number_of_values = (self.year_end - self.year_start + 1)
-
-        d_delta_mw_surface_d_invest = np.zeros(
-            (number_of_values, number_of_values))
-        d_delta_deforestation_surface_d_invest = np.zeros(
-            (number_of_values, number_of_values))
-        d_delta_reforestation_surface_d_invest = d_reforestation_surface_d_invest
-        d_cum_umw_surface_d_invest = np.zeros(
-            (number_of_values, number_of_values))
-        d_lc_deforestation_d_invest = np.zeros(
-            (number_of_values, number_of_values))
-        d_lc_reforestation_d_invest = np.zeros(
-            (number_of_values, number_of_values))
-        d_lc_mw_d_invest = np.zeros(
-            (number_of_values, number_of_values))
-
-        for i in range(0, len(self.years)):
-            if i == 0:
-                d_cum_umw_surface_d_invest[i] = d_delta_reforestation_surface_d_invest[i] + \
-                                                d_delta_deforestation_surface_d_invest[i]
-            else:
-                d_cum_umw_surface_d_invest[i] = d_cum_umw_surface_d_invest[i - 1] + \
-                                                d_delta_reforestation_surface_d_invest[i] + \
-                                                d_delta_deforestation_surface_d_invest[i]
-            # if unmanaged forest are empty, managed forest are removed
-            if self.forest_surface_df.loc[i, 'unmanaged_forest'] <= 1e-10:
-                # remove managed wood
-                d_delta_mw_surface_d_invest[i] += d_cum_umw_surface_d_invest[i]
-
-                if i == 0:
-                    d_lc_reforestation_d_invest[i] = d_reforestation_surface_d_invest[i] * \
-                                                     self.cost_per_ha
-                else:
-                    d_lc_reforestation_d_invest[i] = (
-                                                             d_cum_umw_surface_d_invest[i - 1] +
-                                                             d_reforestation_surface_d_invest[i]) * self.cost_per_ha
-                d_lc_mw_d_invest[i] = -  d_cum_umw_surface_d_invest[i] * \
-                                      self.techno_wood_info['managed_wood_price_per_ha']
-                # set unmanaged forest to 0
-                d_cum_umw_surface_d_invest[i] = np.zeros(number_of_values)
-
-            else:
-                d_lc_reforestation_d_invest[i] = np.zeros(number_of_values)
-            # if managed forest are empty, all is removed
-            if self.managed_wood_df.loc[i, 'cumulative_surface'] <= 1e-10:
-                sum = self.d_cum(d_delta_mw_surface_d_invest)
-                # delta is all the managed wood available
-                d_lc_deforestation_d_invest[i] = - \
-                                                     sum[i] * self.deforest_cost_per_ha
-                d_lc_mw_d_invest[i] = - (d_lc_reforestation_d_invest[i] / self.cost_per_ha -
-                                         sum[i]) * self.techno_wood_info['managed_wood_price_per_ha']
-
-                d_delta_mw_surface_d_invest[i] = - \
-                    sum[i - 1]
-                d_delta_deforestation_surface_d_invest[i] = - \
-                                                                d_reforestation_surface_d_invest[i] + \
-                                                            d_delta_mw_surface_d_invest[i]
+        unmanaged_forest_clamp = self.unmanaged_forest_clamp[:, np.newaxis]
+        managed_wood_clamp = self.managed_wood_clamp[:, np.newaxis]
+        mw_price_per_ha = self.techno_wood_info['managed_wood_price_per_ha']
+
+        # unmanaged forest cumulates reforestation and is set to 0 at its clamp events
+        d_cum_umw_before_clamp, d_cum_umw_surface_d_invest = self.d_cum_clamped_at_zero(
+            d_reforestation_surface_d_invest, self.unmanaged_forest_clamp)
+        d_previous_cum_umw = self.previous_year(d_cum_umw_surface_d_invest)
+
+        # if unmanaged forest are empty, managed forest are removed
+        d_delta_mw_surface_d_invest = np.where(unmanaged_forest_clamp, d_cum_umw_before_clamp, 0.)
+        d_lc_reforestation_d_invest = np.where(unmanaged_forest_clamp,
+                                               (d_previous_cum_umw + d_reforestation_surface_d_invest) *
+                                               self.cost_per_ha, 0.)
+        d_lc_mw_d_invest = np.where(unmanaged_forest_clamp, - d_cum_umw_before_clamp * mw_price_per_ha, 0.)
+
+        # if managed forest are empty, all is removed
+        d_cum_mw_before_clamp, d_cum_mw = self.d_cum_clamped_at_zero(d_delta_mw_surface_d_invest,
+                                                                     self.managed_wood_clamp)
+        d_lc_deforestation_d_invest = np.where(managed_wood_clamp, - d_cum_mw_before_clamp * self.deforest_cost_per_ha,
+                                               0.)
+        d_lc_mw_d_invest = np.where(managed_wood_clamp,
+                                    - (d_lc_reforestation_d_invest / self.cost_per_ha - d_cum_mw_before_clamp) *
+                                    mw_price_per_ha,
+                                    d_lc_mw_d_invest)
+        # delta is all the managed wood available
+        d_delta_mw_surface_d_invest = np.where(managed_wood_clamp, - self.previous_year(d_cum_mw),
+                                               d_delta_mw_surface_d_invest)
+        d_delta_deforestation_surface_d_invest = np.where(managed_wood_clamp,
+                                                          - d_reforestation_surface_d_invest +
+                                                          d_delta_mw_surface_d_invest, 0.)
 
         return d_cum_umw_surface_d_invest, d_delta_mw_surface_d_invest, d_delta_deforestation_surface_d_invest, d_lc_deforestation_d_invest, d_lc_reforestation_d_invest, d_lc_mw_d_invest
 
@@ -727,31 +659,19 @@ class Forest():
         mw lost capital, deforestation lost capital and reforestation lost capital vs mw invest
         """
         number_of_values = (self.year_end - self.year_start + 1)
-
-        d_delta_mw_surface_d_invest = d_mw_surface_d_mw_invest
-        d_delta_deforestation_surface_d_invest = np.zeros(
-            (number_of_values, number_of_values))
-        d_cum_umw_surface_d_invest = np.zeros(
-            (number_of_values, number_of_values))
-        d_lc_deforestation_d_invest = np.zeros(
-            (number_of_values, number_of_values))
-        d_lc_reforestation_d_invest = np.zeros(
-            (number_of_values, number_of_values))
-        d_lc_mw_d_invest = np.zeros(
-            (number_of_values, number_of_values))
-
-        for i in range(0, number_of_values):
-            if self.forest_surface_df.loc[i, 'unmanaged_forest'] <= 1e-10:
-                if self.managed_wood_df.loc[i, 'cumulative_surface'] <= 1e-10:
-                    sum = self.d_cum(d_delta_mw_surface_d_invest)
-                    d_lc_deforestation_d_invest[i] = - \
-                                                         sum[i] * self.deforest_cost_per_ha
-
-                    # delta is all the managed wood available
-                    d_delta_mw_surface_d_invest[i] = - sum[i - 1]
-                    d_delta_deforestation_surface_d_invest[i] = d_delta_mw_surface_d_invest[i]
-                    d_lc_mw_d_invest[i] = sum[i] * \
-                                          self.techno_wood_info['managed_wood_price_per_ha']
+        # managed wood invest only matters when both unmanaged and managed forest are empty
+        clamp = self.unmanaged_forest_clamp & self.managed_wood_clamp
+        d_cum_mw_before_clamp, d_cum_mw = self.d_cum_clamped_at_zero(d_mw_surface_d_mw_invest, clamp)
+        clamp = clamp[:, np.newaxis]
+
+        d_lc_deforestation_d_invest = np.where(clamp, - d_cum_mw_before_clamp * self.deforest_cost_per_ha, 0.)
+        # delta is all the managed wood available
+        d_delta_mw_surface_d_invest = np.where(clamp, - self.previous_year(d_cum_mw), d_mw_surface_d_mw_invest)
+        d_delta_deforestation_surface_d_invest = np.where(clamp, d_delta_mw_surface_d_invest, 0.)
+        d_lc_mw_d_invest = np.where(clamp, d_cum_mw_before_clamp * self.techno_wood_info['managed_wood_price_per_ha'],
+                                    0.)
+        d_cum_umw_surface_d_invest = np.zeros((number_of_values, number_of_values))
+        d_lc_reforestation_d_invest = np.zeros((number_of_values, number_of_values))
 
         return d_cum_umw_surface_d_invest, d_delta_mw_surface_d_invest, d_delta_deforestation_surface_d_invest, d_lc_deforestation_d_invest, d_lc_reforestation_d_invest, d_lc_mw_d_invest
 
@@ -843,10 +763,27 @@ class Forest():
 
         compute the gradient of a cumulative derivative
         """
-        number_of_values = (self.year_end - self.year_start + 1)
-        d_cum = np.identity(number_of_values)
-        for i in range(0, number_of_values):
-            d_cum[i] = derivative[i]
-            if i > 0:
-                d_cum[i] += d_cum[i - 1]
-        return d_cum
+        return np.cumsum(derivative, axis=0)
+
+    @staticmethod
+    def d_cum_clamped_at_zero(derivative, clamp):
+        """
+        compute the gradient of a cumulative sum clamped at zero (see cumsum_clamped_at_zero) from the clamp events
+        mask computed with it. Return the gradients of the cumulative sum before and after the clamp of each year.
+        """
+        d_cum = np.cumsum(derivative, axis=0)
+        # the cumulative sum restarts from the last clamp event before each year
+        last_clamp = np.maximum.accumulate(np.where(clamp, np.arange(len(clamp)), -1))
+        previous_clamp = np.concatenate(([-1], last_clamp[:-1]))
+        d_cum_at_previous_clamp = np.where(previous_clamp[:, np.newaxis] >= 0, d_cum[previous_clamp], 0.)
+        d_cum_before_clamp = d_cum - d_cum_at_previous_clamp
+        return d_cum_before_clamp, np.where(clamp[:, np.newaxis], 0., d_cum_before_clamp)
+
+    @staticmethod
+    def previous_year(derivative):
+        """
+        rows of the gradient shifted by one year, first year being zero
+        """
+        previous = np.zeros_like(derivative)
+        previous[1:] = derivative[:-1]
+        return previous
@@ -14,10 +14,7 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 '''
-from os.path import join, dirname
-
 import numpy as np
-import pandas as pd
 
 from climateeconomics.core.core_resources.models.coal_resource.coal_resource_model import CoalResourceModel
 from climateeconomics.core.core_resources.resource_model.resource_disc import ResourceDiscipline
@@ -55,17 +52,7 @@ class CoalResourceDiscipline(ResourceDiscipline):
     stock_unit = 'Mt'
     price_unit = '$/MCF'
 
-    # Get default data for resource
-    default_resource_data = pd.read_csv(
-        join(dirname(__file__), f'../resources_data/{resource_name}_data.csv'))
-    default_resource_production_data = pd.read_csv(join(
-        dirname(__file__), f'../resources_data/{resource_name}_production_data.csv'))
-    default_resource_price_data = pd.read_csv(
-        join(dirname(__file__), f'../resources_data/{resource_name}_price_data.csv'))
-    default_resource_consumed_data = pd.read_csv(
-        join(dirname(__file__), f'../resources_data/{resource_name}_consumed_data.csv'))
-
-    DESC_IN = {'resource_data': {'type': 'dataframe', 'unit': '[-]', 'default': default_resource_data,
+    DESC_IN = {'resource_data': {'type': 'dataframe', 'unit': '[-]', 'default': None,
                                  'user_level': 2, 'namespace': 'ns_coal_resource',
                                                    'dataframe_descriptor':
                                      {
@@ -79,18 +66,18 @@ class CoalResourceDiscipline(ResourceDiscipline):
                                      }
                                  },
                'resource_production_data': {'type': 'dataframe', 'unit': 'million_barrels', 'optional': True,
-                                            'default': default_resource_production_data, 'user_level': 2, 'namespace': 'ns_coal_resource',
+                                            'default': None, 'user_level': 2, 'namespace': 'ns_coal_resource',
                                             'dataframe_descriptor': {GlossaryCore.Years: ('float', None, False),
                                                                      'sub_bituminous_and_lignite': ('float', None, False),
                                                                      'bituminous_and_anthracite': (
                                                                      'float', None, False),}
                                             },
-               'resource_price_data': {'type': 'dataframe', 'unit': '$/MCF', 'default': default_resource_price_data, 'user_level': 2,
+               'resource_price_data': {'type': 'dataframe', 'unit': '$/MCF', 'default': None, 'user_level': 2,
                                        'dataframe_descriptor': {'resource_type': ('string', None, False),
                                                                 'price': ('float', None, False),
                                                                 'unit': ('string', None, False)},
                                        'namespace': 'ns_coal_resource'},
-               'resource_consumed_data': {'type': 'dataframe', 'unit': '[million_barrels]', 'default': default_resource_consumed_data,
+               'resource_consumed_data': {'type': 'dataframe', 'unit': '[million_barrels]', 'default': None,
                                           'user_level': 2, 'dataframe_descriptor': {GlossaryCore.Years: ('float', None, False),
                                                                                     'sub_bituminous_and_lignite_consumption': ('float', None, False),
                                                                                     'bituminous_and_anthracite_consumption': ('float', None, False)}},
@@ -15,10 +15,7 @@ See the License for the specific language governing permissions and
 limitations under the License.
 '''
 
-from os.path import join, dirname
-
 import numpy as np
-import pandas as pd
 
 from climateeconomics.core.core_resources.models.copper_resource.copper_resource_model import CopperResourceModel
 from climateeconomics.core.core_resources.resource_model.resource_disc import ResourceDiscipline
@@ -58,15 +55,7 @@ class CopperResourceDiscipline(ResourceDiscipline):
     stock_unit = 'Mt'
     price_unit = '$/t'
 
-    #Get default data for resource
-    default_resource_data=pd.read_csv(join(dirname(__file__), f'../resources_data/{resource_name}_data.csv'))
-    default_resource_production_data = pd.read_csv(join(dirname(__file__), f'../resources_data/{resource_name}_production_data.csv'))
-    default_resource_price_data = pd.read_csv(join(dirname(__file__), f'../resources_data/{resource_name}_price_data.csv'))
-    default_resource_consumed_data = pd.read_csv(join(dirname(__file__), f'../resources_data/{resource_name}_consumed_data.csv'))
-
-
-
-    DESC_IN = {'resource_data': {'type': 'dataframe', 'unit': '-', 'default': default_resource_data,
+    DESC_IN = {'resource_data': {'type': 'dataframe', 'unit': '-', 'default': None,
                                  'user_level': 2, 'namespace': 'ns_copper_resource',
                                  'dataframe_descriptor':
                                      {
@@ -80,20 +69,20 @@ class CopperResourceDiscipline(ResourceDiscipline):
                                      }
                                  },
                'resource_production_data': {'type': 'dataframe', 'unit': 'Mt', 'optional': True,
-                                            'default': default_resource_production_data, 'user_level': 2, 'namespace': 'ns_copper_resource',
+                                            'default': None, 'user_level': 2, 'namespace': 'ns_copper_resource',
                                             'dataframe_descriptor':
                                                 {
                                                     GlossaryCore.Years: ('float', None, False),
                                                     'copper': ('float', None, False),
                                                 }
                },
-               'resource_price_data': {'type': 'dataframe', 'unit': '$/t', 'default': default_resource_price_data, 'user_level': 2,
+               'resource_price_data': {'type': 'dataframe', 'unit': '$/t', 'default': None, 'user_level': 2,
                                        'dataframe_descriptor': {'resource_type': ('string', None, False),
                                                                 'price': ('float', None, False),
                                                                 'unit': ('string', None, False)},
                                        'namespace': 'ns_copper_resource'},
                'resource_consumed_data': {'type': 'dataframe', 'unit': 'Mt', 'optional': True,
-                                            'default': default_resource_consumed_data, 'user_level': 2, 'namespace': 'ns_copper_resource',
+                                            'default': None, 'user_level': 2, 'namespace': 'ns_copper_resource',
                                           'dataframe_descriptor':
                                               {
                                                   GlossaryCore.Years: ('float', None, False),
@@ -14,10 +14,7 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 '''
-from os.path import join, dirname
-
 import numpy as np
-import pandas as pd
 
 from climateeconomics.core.core_resources.models.natural_gas_resource.natural_gas_resource_model import \
     NaturalGasResourceModel
@@ -56,17 +53,7 @@ class NaturalGasResourceDiscipline(ResourceDiscipline):
     stock_unit = 'bcm'
     price_unit = '$/MMBTU'
 
-    # Get default data for resource
-    default_resource_data = pd.read_csv(
-        join(dirname(__file__), f'../resources_data/{resource_name}_data.csv'))
-    default_resource_production_data = pd.read_csv(join(
-        dirname(__file__), f'../resources_data/{resource_name}_production_data.csv'))
-    default_resource_price_data = pd.read_csv(
-        join(dirname(__file__), f'../resources_data/{resource_name}_price_data.csv'))
-    default_resource_consumed_data = pd.read_csv(
-        join(dirname(__file__), f'../resources_data/{resource_name}_consumed_data.csv'))
-
-    DESC_IN = {'resource_data': {'type': 'dataframe', 'unit': '-', 'default': default_resource_data,
+    DESC_IN = {'resource_data': {'type': 'dataframe', 'unit': '-', 'default': None,
                                  'user_level': 2, 'namespace': 'ns_natural_gas_resource',
                                  'dataframe_descriptor': {GlossaryCore.Years: ('float', None, False),
                                                           'Region': ('string', None, False),
@@ -78,7 +65,7 @@ class NaturalGasResourceDiscipline(ResourceDiscipline):
                                                           },
                                  },
                'resource_production_data': {'type': 'dataframe', 'unit': 'bcm', 'optional': True,
-                                            'default': default_resource_production_data, 'user_level': 2, 'namespace': 'ns_natural_gas_resource',
+                                            'default': None, 'user_level': 2, 'namespace': 'ns_natural_gas_resource',
                                             'dataframe_descriptor': {GlossaryCore.Years: ('float', None, False),
                                                                      'Conventional': ('float', None, False),
                                                                      'tight': ('float', None, False),
@@ -86,12 +73,12 @@ class NaturalGasResourceDiscipline(ResourceDiscipline):
                                                                      'Coalbed_methane': ('float', None, False),
                                                                      'other': ('float', None, False),}
                                             },
-               'resource_price_data': {'type': 'dataframe', 'unit': '$/MMBTU', 'default': default_resource_price_data, 'user_level': 2,
+               'resource_price_data': {'type': 'dataframe', 'unit': '$/MMBTU', 'default': None, 'user_level': 2,
                                        'dataframe_descriptor': {'resource_type': ('string', None, False),
                                                                 'price': ('float', None, False),
                                                                 'unit': ('string', None, False)},
                                        'namespace': 'ns_natural_gas_resource'},
-               'resource_consumed_data': {'type': 'dataframe', 'unit': 'bcm', 'default': default_resource_consumed_data,
+               'resource_consumed_data': {'type': 'dataframe', 'unit': 'bcm', 'default': None,
                                           'user_level': 2, 'namespace': 'ns_natural_gas_resource',
                                           'dataframe_descriptor': {GlossaryCore.Years: ('float', None, False),
                                                                    'Conventional_consumption': ('float', None, False),
@@ -14,10 +14,7 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 '''
-from os.path import join, dirname
-
 import numpy as np
-import pandas as pd
 
 from climateeconomics.core.core_resources.models.oil_resource.oil_resource_model import OilResourceModel
 from climateeconomics.core.core_resources.resource_model.resource_disc import ResourceDiscipline
@@ -55,17 +52,7 @@ class OilResourceDiscipline(ResourceDiscipline):
     stock_unit = 'Mt'
     price_unit = '$/bbl'
 
-    # Get default data for resource
-    default_resource_data = pd.read_csv(
-        join(dirname(__file__), f'../resources_data/{resource_name}_data.csv'))
-    default_resource_production_data = pd.read_csv(join(
-        dirname(__file__), f'../resources_data/{resource_name}_production_data.csv'))
-    default_resource_price_data = pd.read_csv(
-        join(dirname(__file__), f'../resources_data/{resource_name}_price_data.csv'))
-    default_resource_consumed_data = pd.read_csv(
-        join(dirname(__file__), f'../resources_data/{resource_name}_consumed_data.csv'))
-
-    DESC_IN = {'resource_data': {'type': 'dataframe', 'unit': '[-]', 'default': default_resource_data,
+    DESC_IN = {'resource_data': {'type': 'dataframe', 'unit': '[-]', 'default': None,
                                  'user_level': 2, 'namespace': 'ns_oil_resource',
                                  'dataframe_descriptor':
                                      {
@@ -79,7 +66,7 @@ class OilResourceDiscipline(ResourceDiscipline):
                                      }
                                  },
                'resource_production_data': {'type': 'dataframe', 'unit': 'million_barrels', 'optional': True,
-                                            'default': default_resource_production_data, 'user_level': 2, 'namespace': 'ns_oil_resource',
+                                            'default': None, 'user_level': 2, 'namespace': 'ns_oil_resource',
                                             'dataframe_descriptor': {GlossaryCore.Years: ('float', None, False),
                                                                      'light': ('float', None, True),
                                                                      'medium': ('float', None, True),
@@ -87,12 +74,12 @@ class OilResourceDiscipline(ResourceDiscipline):
                                                                      'unassigned_production': ('float', None, True),
                                                                      }
                                             },
-               'resource_price_data': {'type': 'dataframe', 'unit': 'USD/barrel', 'default': default_resource_price_data, 'user_level': 2,
+               'resource_price_data': {'type': 'dataframe', 'unit': 'USD/barrel', 'default': None, 'user_level': 2,
                                        'dataframe_descriptor': {'resource_type': ('string', None, False),
                                                                 'price': ('float', None, False),
                                                                 'unit': ('string', None, False)},
                                        'namespace': 'ns_oil_resource'},
-               'resource_consumed_data': {'type': 'dataframe', 'unit': '[million_barrels]', 'default': default_resource_consumed_data,
+               'resource_consumed_data': {'type': 'dataframe', 'unit': '[million_barrels]', 'default': None,
                                           'user_level': 2, 'namespace': 'ns_oil_resource',
                                           'dataframe_descriptor': {
                                               GlossaryCore.Years: ('float', None, False),
@@ -14,10 +14,7 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 '''
-from os.path import join, dirname
-
 import numpy as np
-import pandas as pd
 
 from climateeconomics.core.core_resources.models.platinum_resource.platinum_resource_model import PlatinumResourceModel
 from climateeconomics.core.core_resources.resource_model.resource_disc import ResourceDiscipline
@@ -68,17 +65,7 @@ class PlatinumResourceDiscipline(ResourceDiscipline):
     stock_unit = 'Mt'
     price_unit = '$/t'
 
-    # Get default data for resource
-    default_resource_data = pd.read_csv(
-        join(dirname(__file__), f'../resources_data/{resource_name}_data.csv'))
-    default_resource_production_data = pd.read_csv(join(
-        dirname(__file__), f'../resources_data/{resource_name}_production_data.csv'))
-    default_resource_price_data = pd.read_csv(
-        join(dirname(__file__), f'../resources_data/{resource_name}_price_data.csv'))
-    default_resource_consumed_data = pd.read_csv(
-        join(dirname(__file__), f'../resources_data/{resource_name}_consumed_data.csv'))
-
-    DESC_IN = {'resource_data': {'type': 'dataframe', 'unit': '-', 'default': default_resource_data,
+    DESC_IN = {'resource_data': {'type': 'dataframe', 'unit': '-', 'default': None,
                                  'user_level': 2, 'namespace': 'ns_platinum_resource',
                                  'dataframe_descriptor':
                                      {
@@ -92,17 +79,17 @@ class PlatinumResourceDiscipline(ResourceDiscipline):
                                      }
                },
                'resource_production_data': {'type': 'dataframe', 'unit': 'Mt', 'optional': True,
-                                            'default': default_resource_production_data, 'user_level': 2, 'namespace': 'ns_platinum_resource',
+                                            'default': None, 'user_level': 2, 'namespace': 'ns_platinum_resource',
                                             'dataframe_descriptor': {
                                                 GlossaryCore.Years: ('float', None, False),
                                                 'platinum': ('float', None, True),}
                                             },
-               'resource_price_data': {'type': 'dataframe', 'unit': 'USD/t', 'default': default_resource_price_data, 'user_level': 2,
+               'resource_price_data': {'type': 'dataframe', 'unit': 'USD/t', 'default': None, 'user_level': 2,
                                        'dataframe_descriptor': {'resource_type': ('string', None, False),
                                                                 'price': ('float', None, False),
                                                                 'unit': ('string', None, False)},
                                        'namespace': 'ns_platinum_resource'},
-               'resource_consumed_data': {'type': 'dataframe', 'unit': 'Mt', 'default': default_resource_consumed_data,
+               'resource_consumed_data': {'type': 'dataframe', 'unit': 'Mt', 'default': None,
                                           'user_level': 2, 'namespace': 'ns_platinum_resource',
                                           'dataframe_descriptor': {
                                               GlossaryCore.Years: ('float', None, False),
@@ -14,10 +14,7 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 '''
-from os.path import join, dirname
-
 import numpy as np
-import pandas as pd
 
 from climateeconomics.core.core_resources.models.uranium_resource.uranium_resource_model import UraniumResourceModel
 from climateeconomics.core.core_resources.resource_model.resource_disc import ResourceDiscipline
@@ -57,17 +54,7 @@ class UraniumResourceDiscipline(ResourceDiscipline):
     stock_unit = 't'
     price_unit = '$/k'
 
-    # Get default data for resource
-    default_resource_data = pd.read_csv(
-        join(dirname(__file__), f'../resources_data/{resource_name}_data.csv'))
-    default_resource_production_data = pd.read_csv(join(
-        dirname(__file__), f'../resources_data/{resource_name}_production_data.csv'))
-    default_resource_price_data = pd.read_csv(
-        join(dirname(__file__), f'../resources_data/{resource_name}_price_data.csv'))
-    default_resource_consumed_data = pd.read_csv(
-        join(dirname(__file__), f'../resources_data/{resource_name}_consumed_data.csv'))
-
-    DESC_IN = {'resource_data': {'type': 'dataframe', 'unit': '[-]', 'default': default_resource_data,
+    DESC_IN = {'resource_data': {'type': 'dataframe', 'unit': '[-]', 'default': None,
                                  'user_level': 2, 'namespace': 'ns_uranium_resource',
                                  'dataframe_descriptor':
                                      {
@@ -81,7 +68,7 @@ class UraniumResourceDiscipline(ResourceDiscipline):
                                       }
                                  },
                'resource_production_data': {'type': 'dataframe', 'unit': 't', 'optional': True,
-                                            'default': default_resource_production_data, 'user_level': 2, 'namespace': 'ns_uranium_resource',
+                                            'default': None, 'user_level': 2, 'namespace': 'ns_uranium_resource',
                                             'dataframe_descriptor':{
                                                  GlossaryCore.Years: ('float', None, False),
                                                 'uranium_40': ('float', None, True),
@@ -90,7 +77,7 @@ class UraniumResourceDiscipline(ResourceDiscipline):
                                                  'uranium_260': ('float', None, True),
                                                  'uranium_260_consumption': ('float', None, True),
                                               }},
-               'resource_price_data': {'type': 'dataframe', 'unit': '$/kg', 'default': default_resource_price_data, 'user_level': 2,
+               'resource_price_data': {'type': 'dataframe', 'unit': '$/kg', 'default': None, 'user_level': 2,
                                        'dataframe_descriptor': {
                                                  GlossaryCore.Years: ('float', None, False),
                                                  'uranium_40_consumption': ('float', None, True),
@@ -102,7 +89,7 @@ class UraniumResourceDiscipline(ResourceDiscipline):
                                            'unit': ('string', None, True),
                                               },
                                        'namespace': 'ns_uranium_resource'},
-               'resource_consumed_data': {'type': 'dataframe', 'unit': '[t]', 'default': default_resource_consumed_data,
+               'resource_consumed_data': {'type': 'dataframe', 'unit': '[t]', 'default': None,
                                           'user_level': 2, 'namespace': 'ns_uranium_resource',
                                           'dataframe_descriptor':
                                              {
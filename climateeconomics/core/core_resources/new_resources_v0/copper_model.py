@@ -38,7 +38,14 @@ class CopperModel :
     COPPER_PRICE = 'copper_price'
     COPPER_RESERVE = 'copper_reserve'
     PRODUCTION = 'production'
-    
+
+    # below this reserve the extraction is diminished by the extraction cut
+    LOW_RESERVE = 500
+    EXTRACTION_CUT = 0.95
+    # price rises when the demand exceeds the extraction by more than the shortage threshold
+    INITIAL_PRICE = 9780
+    PRICE_RISE = 1.01
+    SHORTAGE_THRESHOLD = 5
 
 
     def __init__(self, param):
@@ -65,22 +72,90 @@ class CopperModel :
     
 
     def compute(self, copper_demand, period_of_exploitation):
-        
-        
-        self.create_dataframe(copper_demand)
-        
-
-        
-        for year in period_of_exploitation :           
 
-            
-            # reserves update
-            self.compute_copper_reserve(year)
-            # stock and production update
-            self.compute_copper_stock_and_production(year)
-            # determines yearly production price
-            self.compute_copper_price(year)
+        self.create_dataframe(copper_demand)
 
+        copper_arrays = self.compute_copper_arrays(
+            self.copper_demand.loc[period_of_exploitation, 'Demand'].values,
+            self.copper_prod.loc[period_of_exploitation, 'Extraction'].values)
+
+        for copper_df, columns in [(self.copper_reserve, ['Reserve']),
+                                   (self.copper_stock, ['Stock']),
+                                   (self.copper_prod, ['Extraction', 'World Production',
+                                                       'Cumulated World Production', 'Ratio']),
+                                   (self.copper_prod_price, ['Price/t', 'Total Price'])]:
+            for column in columns:
+                copper_df.loc[period_of_exploitation, column] = copper_arrays[column]
+
+    def compute_demand_scenarios(self, copper_demands, annual_extraction=None):
+        '''
+        Run the copper model on many demand scenarios at once
+        copper_demands is an array (nb scenarios, nb years) of demands on the period of exploitation, the annual
+        extraction is shared by all scenarios unless an array of the same shape is given
+        Return the dict of arrays (nb scenarios, nb years) of compute_copper_arrays
+        '''
+        copper_demands = np.asarray(copper_demands)
+        if annual_extraction is None:
+            annual_extraction = np.asarray(self.annual_extraction)[:copper_demands.shape[-1]]
+        return self.compute_copper_arrays(copper_demands, annual_extraction)
+
+    def compute_copper_arrays(self, copper_demand, annual_extraction):
+        '''
+        Compute reserve, extraction, stock, production and price over the years, the last axis of the arrays.
+        Any leading axes are independent scenarios computed together : each year the branches (reserve exhausted or
+        low, stock shortage) are masks over the scenarios
+        '''
+        copper_demand = np.asarray(copper_demand)
+        shape = np.broadcast_shapes(copper_demand.shape, np.shape(annual_extraction))
+        dtype = np.result_type(copper_demand, np.asarray(annual_extraction), self.initial_copper_reserve,
+                               self.initial_copper_stock, float)
+        copper_demand = np.broadcast_to(copper_demand, shape)
+        extraction = np.array(np.broadcast_to(annual_extraction, shape), dtype=dtype)
+        reserve = np.zeros(shape, dtype=dtype)
+        stock = np.zeros(shape, dtype=dtype)
+        production = np.zeros(shape, dtype=dtype)
+
+        remaining_copper = np.full(shape[:-1], self.initial_copper_reserve, dtype=dtype)
+        old_stock = np.full(shape[:-1], self.initial_copper_stock, dtype=dtype)
+        for year in range(shape[-1]):
+            # If we want to extract more than what is available, we only extract the available
+            reserve_exhausted = remaining_copper < extraction[..., year]
+            # If the reserves fall too low, we diminish the extraction
+            reserve_low = ~reserve_exhausted & (remaining_copper < self.LOW_RESERVE)
+            extraction[..., year] = np.where(reserve_exhausted, remaining_copper,
+                                             np.where(reserve_low, self.EXTRACTION_CUT * extraction[..., year],
+                                                      extraction[..., year]))
+            reserve[..., year] = np.where(reserve_exhausted, 0., remaining_copper - extraction[..., year])
+            remaining_copper = reserve[..., year]
+
+            # Stock of the previous year plus the extracted minerals, to which we remove the copper demand
+            # If the demand is too much and exceeds the stock, then there is no more stock and the production is the
+            # extracted copper plus what remained of the previous stock, else the demand is satisfied
+            new_stock = old_stock + extraction[..., year] - copper_demand[..., year]
+            stock_shortage = new_stock < 0
+            stock[..., year] = np.where(stock_shortage, 0., new_stock)
+            production[..., year] = np.where(stock_shortage, extraction[..., year] + old_stock,
+                                             copper_demand[..., year])
+            old_stock = stock[..., year]
+
+        demand_not_null = copper_demand != 0
+        ratio = np.minimum(1, np.divide(extraction, copper_demand, out=np.zeros(shape, dtype=dtype),
+                                        where=demand_not_null))
+
+        # when there is too much of a difference between the demand and the effective extraction, the prices rise
+        price_factors = np.where(copper_demand - extraction > self.SHORTAGE_THRESHOLD, self.PRICE_RISE, 1.)
+        price_factors[..., 0] = self.INITIAL_PRICE
+        price = np.cumprod(price_factors, axis=-1)
+
+        return {'Reserve': reserve,
+                'Stock': stock,
+                'Extraction': extraction,
+                'World Production': production,
+                'Cumulated World Production': np.cumsum(production, axis=-1),
+                'Ratio': ratio,
+                'Price/t': price,
+                # conversion Mt
+                'Total Price': production * price * 1000}
 
     #### méthodes statiques
 
@@ -112,89 +187,3 @@ class CopperModel :
         self.copper_prod_price['Total Price'] = np.linspace(0,0,len(years))
         self.copper_stock['Stock'] = np.linspace(0,0,len(years))
         self.copper_prod_price['Price/t'] = np.linspace(0,0,len(years))
-
-  
-    def compute_copper_reserve(self, year):
-        copper_extraction = self.copper_prod.loc[year, 'Extraction']
-
-        if year == self.year_start :
-            remainig_copper = self.initial_copper_reserve 
-       
-        else :
-            remainig_copper = self.copper_reserve.loc[year -1, 'Reserve']
-        
-                          
-        # If we want to extract more than what is available, we only extract the available
-        if remainig_copper < copper_extraction :
-            self.copper_reserve.loc[year, 'Reserve']= 0
-                                    
-            self.copper_prod.loc[year, 'Extraction']= remainig_copper
-            
-          
-        # If the reserves fall too low, we diminish the extraction
-        elif  remainig_copper < 500 :
-            self.copper_prod.loc[year, 'Extraction'] = 0.95 * self.copper_prod.loc[year , 'Extraction']
-            self.copper_reserve.loc[year, 'Reserve'] = remainig_copper - self.copper_prod.loc[year, 'Extraction']
-                                        
-            
-        else :
-            self.copper_reserve.loc[year, 'Reserve'] = remainig_copper - copper_extraction
-        
-        if self.copper_demand.loc[year, 'Demand']  != 0 :
-            ratio = self.copper_prod.loc[year, 'Extraction'] / self.copper_demand.loc[year, 'Demand'] 
-            self.copper_prod.loc[year, 'Ratio'] = min(1, ratio)
-    
-        
-
-    def compute_copper_stock_and_production(self, year) :
-
-        if year == self.year_start :
-            old_stock = self.initial_copper_stock #self.INITIAL_STOCK['default']
-        else :
-            old_stock = self.copper_stock.at[year -1, 'Stock']        
-       
-        
-        extraction = self.copper_prod.at[year, 'Extraction']
-        copper_demand = self.copper_demand.at[year, 'Demand'] 
-
-        # Stock of the previous year plus the extracted minerals, to which we remove the copper demand
-        #If the demand is too much and exceeds the stock, then there is no more stock
-        new_stock = old_stock + extraction - copper_demand
-    
-
-        if new_stock < 0 :
-            self.copper_stock.at[year, 'Stock']= 0
-                                    
-            #If no more Stock, the production is the extracted copper plus what remained of the previous stock (both can be null)
-            self.copper_prod.at[year, 'World Production'] = extraction + old_stock
-        else :
-            self.copper_stock.at[year, 'Stock'] = new_stock
-                                    
-            #if there is still stock, it means the demand was satisfied
-            self.copper_prod.at[year, 'World Production'] = copper_demand
-        
-        if year == self.year_start :
-            self.copper_prod.at[year, 'Cumulated World Production'] = self.copper_prod.at[year, 'World Production']
-        else : 
-            self.copper_prod.at[year, 'Cumulated World Production'] = self.copper_prod.at[year -1, 'Cumulated World Production'] + self.copper_prod.at[year, 'World Production']
-             
-            
-
-
-    
-    def compute_copper_price (self, year) :
-
-        if year ==  self.year_start :
-            self.copper_prod_price.loc[year, 'Price/t'] = 9780 
-
-        else :     
-            # when there is too much of a difference between the demand and the effective extraction, the prices rise
-            if self.copper_demand.loc[year, 'Demand'] - self.copper_prod.loc[year, 'Extraction'] > 5 :
-                self.copper_prod_price.loc[year, 'Price/t'] = self.copper_prod_price.loc[year - 1, 'Price/t'] * 1.01
-            else :
-                self.copper_prod_price.loc[year, 'Price/t'] = self.copper_prod_price.loc[year - 1, 'Price/t']
-        
-       
-        self.copper_prod_price.loc[year, 'Total Price']= self.copper_prod.loc[year, 'World Production'] *  self.copper_prod_price.loc[year, 'Price/t'] *1000 #conversion Mt
-        
-    
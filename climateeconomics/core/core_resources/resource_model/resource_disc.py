@@ -15,10 +15,12 @@ See the License for the specific language governing permissions and
 limitations under the License.
 '''
 import logging
+from os.path import join, dirname
 
 import numpy as np
 
 from climateeconomics.core.core_witness.climateeco_discipline import ClimateEcoDiscipline
+from climateeconomics.database import DataRegistry
 from climateeconomics.glossarycore import GlossaryCore
 from sostrades_core.execution_engine.sos_wrapp import SoSWrapp
 from sostrades_core.tools.post_processing.charts.chart_filter import ChartFilter
@@ -81,7 +83,11 @@ class ResourceDiscipline(SoSWrapp):
         self.resource_model = None
 
     def setup_sos_disciplines(self):
-        pass
+        # default data of the resource are parsed here rather than in the DESC_IN of each resource at import
+        resources_data_dir = join(dirname(dirname(__file__)), 'models', 'resources_data')
+        self.set_dynamic_default_values({
+            f'resource_{data}': DataRegistry.get_dataframe(join(resources_data_dir, f'{self.resource_name}_{data}.csv'))
+            for data in ['data', 'production_data', 'price_data', 'consumed_data']})
 
     def run(self):
         '''Generic run for all resources
@@ -50,6 +50,12 @@ class ResourceModel():
     bcm_to_Mt = 1 / 1.379
     kU_to_Mt = 10 ** -6
 
+    # branch taken by each resource type each year when the demand is allocated
+    NO_ALLOCATION = 0
+    DEMAND_SATISFIED = 1
+    STOCK_EXHAUSTED = 2
+    STOCK_STORED = 3
+
     def __init__(self, name):
         '''
         Constructor
@@ -160,99 +166,92 @@ class ResourceModel():
                 self.resource_production_data, self.production_years, self.production_start, resource_type)
 
     def compute_stock(self):
-        # Initialize stocks df
-        for resource_type in self.sub_resource_list:
-            self.resource_stock[resource_type] = np.insert(
-                np.zeros(len(self.years) - 1), 0, self.stock_start)
-            # Concat what was consumed in the past years and what will be
-            # consumed (needed for recycled materials calculations)
-            self.use_stock[resource_type] = np.insert(np.zeros(len(
-                self.years) - 1), 0, self.resource_consumed_data[f'{resource_type}_consumption'])
-            self.recycled_production[resource_type] = np.insert(np.zeros(len(self.years) - 1), 0,
-                                                                self.resource_consumed_data[f'{resource_type}_consumption'].values[0] * self.recycled_rate)
-
         # Select only the right resource demand and convert the demand unit if
         # needed
-
         self.resource_demand = self.resources_demand[[
             GlossaryCore.Years, self.resource_name]]
 
         self.convert_demand(self.resource_demand)
 
         # Sort the resource type by ascending price
-        ascending_price_resource_list = list(
+        self.ascending_price_resource_list = list(
             self.resource_price_data.sort_values(by=['price'])['resource_type'])
         # If needed, get the global demand from the energy demand
         self.get_global_demand(self.resource_demand)
-        # Turn dataframes into dict of np array for faster computation time
-        resource_demand_dict = self.resource_demand.to_dict()
-        predictable_production_dict = self.predictable_production.to_dict()
-        resource_stock_dict = self.resource_stock.to_dict()
-        use_stock_dict = self.use_stock.to_dict()
-        recycled_production_dict = self.recycled_production.to_dict()
-
-        # compute of stock per year (stock = 0 at year 0, no longer true for
-        # copper)
-    
-        for year_demand in self.years[1:]:
-            total_stock = 0.0
-            demand = resource_demand_dict[self.resource_name][year_demand]
-
-            # we take in priority the less expensive resource
-            for resource_type in ascending_price_resource_list:
-                total_stock = total_stock + \
-                    predictable_production_dict[resource_type][year_demand]
-
-            # chek if the stock is not empty this year:
-            if total_stock > 0:
-                for resource_type in ascending_price_resource_list:
-                    # compute recycled quantity of the different resources
-                    self.compute_recycling(
-                        year_demand, resource_type, recycled_production_dict, use_stock_dict)
-                    # while demand is not satisfied we use extracted and stocked
-                    # resource, if there is resource in excess we stock it
-                    if demand.real > 0:
-                        available_resource = resource_stock_dict[resource_type][year_demand - 1] + \
-                            predictable_production_dict[resource_type][year_demand] + \
-                            recycled_production_dict[resource_type][year_demand] - demand
-                        if available_resource.real >= 0:
-                            resource_stock_dict[resource_type][year_demand] = \
-                                resource_stock_dict[resource_type][year_demand - 1] + \
-                                predictable_production_dict[resource_type][year_demand] + \
-                                recycled_production_dict[resource_type][year_demand] - demand
-                            use_stock_dict[resource_type][year_demand] = demand
-                            demand = 0
-
-                        # if there is not enough resource we use all the
-                        # resource we have and we don't answer all the demand
-                        else:
-                            resource_stock_dict[resource_type][year_demand] = 0
-                            use_stock_dict[resource_type][year_demand] = \
-                                predictable_production_dict[resource_type][year_demand] + \
-                                resource_stock_dict[resource_type][year_demand - 1] + \
-                                recycled_production_dict[resource_type][year_demand]
-                            demand = demand - \
-                                use_stock_dict[resource_type][year_demand]
-
-                    else:
-                        resource_stock_dict[resource_type][year_demand] = \
-                            resource_stock_dict[resource_type][year_demand - 1] + \
-                            predictable_production_dict[resource_type][year_demand] +\
-                                recycled_production_dict[resource_type][year_demand]
-                        use_stock_dict[resource_type][year_demand] = 0
-            # if the stock is empty we just use what we produced this year
-            else:
-                resource_stock_dict[resource_type][year_demand] = 0
-                use_stock_dict[resource_type][year_demand] = 0
-        self.predictable_production = pd.DataFrame.from_dict(
-            predictable_production_dict)
-        self.resource_stock = pd.DataFrame.from_dict(resource_stock_dict)
-        self.use_stock = pd.DataFrame.from_dict(use_stock_dict) 
-        self.use_stock = self.use_stock.loc[self.use_stock[GlossaryCore.Years]>= self.year_start]
-        self.use_stock= self.use_stock.loc[self.use_stock[GlossaryCore.Years]<= self.year_end]
-        
-        self.recycled_production = pd.DataFrame.from_dict(
-            recycled_production_dict)
+
+        self.stock_arrays = self.compute_stock_arrays(
+            self.resource_demand[self.resource_name].values,
+            self.predictable_production.loc[self.years, self.ascending_price_resource_list].values.T,
+            np.array([self.resource_consumed_data[f'{resource_type}_consumption'].values
+                      for resource_type in self.ascending_price_resource_list]))
+
+        # the past years of use_stock are only needed for recycling
+        resource_type_indexes = [self.ascending_price_resource_list.index(resource_type)
+                                 for resource_type in self.sub_resource_list]
+        for name in ['resource_stock', 'use_stock', 'recycled_production']:
+            setattr(self, name, pd.DataFrame(
+                {GlossaryCore.Years: self.years,
+                 **dict(zip(self.sub_resource_list, self.stock_arrays[name][resource_type_indexes]))},
+                index=self.years))
+
+    def compute_stock_arrays(self, demand, production, consumed):
+        """
+        Allocate the demand of each year to the resource types, with arrays of shape (nb resource types, nb years)
+        whose rows follow the ascending price order. The cheapest types are used in priority : they are exhausted
+        (previous stock, production and recycling all used) until one of them satisfies the remaining demand, the
+        more expensive types store their production.
+        The branch taken by each resource type each year is recorded in stock_branches for the gradients.
+        """
+        nb_types, nb_years = production.shape
+        # past years of use_stock are the consumed data, lifespan years before year start and year start
+        nb_past_years = consumed.shape[1] - 1
+        dtype = np.result_type(demand, production, consumed, self.stock_start, self.recycled_rate)
+
+        # the allocation goes year by year, arrays are built year major so that each year is contiguous
+        production = production.T
+        stock = np.zeros((nb_years, nb_types), dtype=dtype)
+        stock[0] = self.stock_start
+        use_stock = np.zeros((nb_past_years + nb_years, nb_types), dtype=dtype)
+        use_stock[:nb_past_years + 1] = consumed.T
+        recycled = np.zeros((nb_years, nb_types), dtype=dtype)
+        recycled[0] = consumed[:, 0] * self.recycled_rate
+        stock_branches = np.full((nb_years, nb_types), self.NO_ALLOCATION)
+        flows = np.zeros(nb_types + 1, dtype=dtype)
+
+        total_production = production.sum(axis=1)
+        for year in range(1, nb_years):
+            # if nothing is produced this year no resource is stocked nor used
+            if not total_production[year] > 0:
+                continue
+            use_year = nb_past_years + year
+            # infrastructures have a certain lifespan, so the recycled materials obtained each year are those used a
+            # lifespan ago, multiplied by a recycle-rate
+            recycled[year] = use_stock[use_year - self.lifespan] * self.recycled_rate
+            available = stock[year - 1] + production[year] + recycled[year]
+            # demand left to each type once the cheaper types are exhausted
+            flows[0] = demand[year]
+            flows[1:] = available
+            remaining_demand = np.subtract.accumulate(flows)[:-1]
+            # types are used while some demand remains, until one of them satisfies it
+            demand_left = remaining_demand.real > 0
+            nb_used = nb_types if demand_left.all() else np.argmin(demand_left)
+            can_satisfy = available.real[:nb_used] - remaining_demand.real[:nb_used] >= 0
+            nb_exhausted = np.argmax(can_satisfy) if can_satisfy.any() else nb_used
+
+            stock[year] = available
+            stock[year, :nb_exhausted] = 0.
+            use_stock[use_year, :nb_exhausted] = available[:nb_exhausted]
+            stock_branches[year] = self.STOCK_STORED
+            stock_branches[year, :nb_exhausted] = self.STOCK_EXHAUSTED
+            if nb_exhausted < nb_used:
+                stock[year, nb_exhausted] = available[nb_exhausted] - remaining_demand[nb_exhausted]
+                use_stock[use_year, nb_exhausted] = remaining_demand[nb_exhausted]
+                stock_branches[year, nb_exhausted] = self.DEMAND_SATISFIED
+
+        return {'resource_stock': stock.T,
+                'use_stock': use_stock[nb_past_years:].T,
+                'recycled_production': recycled.T,
+                'stock_branches': stock_branches.T}
 
     def compute_price(self):
 
@@ -299,219 +298,128 @@ class ResourceModel():
         '''
         pass
 
-    def compute_recycling(self, year_demand, resource_type, recycled_production_dict, use_stock_dict):
-        # infrastructures have a certain lifespan, so the recycled materials
-        # obtained each are those used a lifespan ago, multiplied by a
-        # recycle-rate
-        recycled_production_dict[resource_type][year_demand] = \
-            use_stock_dict[resource_type][year_demand - self.lifespan] * self.recycled_rate
-
     def get_global_demand(self, demand):
         '''
         To be overloaded in specific resource models
         '''
         pass
 
-    def compute_derivative_recycling(self, year_demand, resource_type, grad_use, grad_stock, grad_recycling) :
-        """ 
-        Compute derivative of reclycling regarding demand
-        """
-        # recycling of the current year (year_demand - self.year_start) which depends on the used stock at current_year - lifespan
-        if year_demand - self.lifespan > self.year_start :
-            grad_recycling[resource_type][year_demand - self.year_start] = \
-                grad_use[resource_type][year_demand - self.lifespan - self.year_start] * self.recycled_rate       
-           
-        return grad_recycling
-        
-
     def get_derivative_resource(self):
         """ Compute derivative of stock, used stock and price regarding demand
+        The gradients are assembled year by year from the branches recorded by compute_stock_arrays
         """
-        # # ------------------------------------------------
-        # # gather inputs
         year_start = self.year_start
         year_end = self.year_end
         nb_years = self.year_end - self.year_start + 1
-        ascending_price_resource_list = list(
-            self.resource_price_data.sort_values(by=['price'])['resource_type'])
-        # Turn dataframes into dict of np array for faster computation time
-        resource_demand_dict = self.resource_demand.to_dict()
-        predictable_production_dict = self.predictable_production.to_dict()
-        resource_stock_dict = self.resource_stock.to_dict()
-        # # # resource_price_data_dict = self.resource_price_data.to_dict()
-        # # # total_consumption_dict = self.total_consumption.to_dict()
-        self.use_stock = self.use_stock.loc[self.use_stock[GlossaryCore.Years]>= self.year_start]
-        self.use_stock= self.use_stock.loc[self.use_stock[GlossaryCore.Years]<= self.year_end]
-        use_stock_dict = self.use_stock.to_dict()
-        recycled_production_dict = self.recycled_production.to_dict()
+        ascending_price_resource_list = self.ascending_price_resource_list
+        demand_not_null = self.resource_demand[self.resource_name].values != 0
+        stock = self.stock_arrays['resource_stock'].real
+        stock_positive = stock > 0
+        # a demand satisfied while emptying the stock has the gradient of an exhausted stock
+        stock_branches = np.where((self.stock_arrays['stock_branches'] == self.DEMAND_SATISFIED) & ~stock_positive,
+                                  self.STOCK_EXHAUSTED, self.stock_arrays['stock_branches'])
 
         # # ------------------------------------------------
         # # init gradient dict of matrix transmitted to discipline
         # # dict of matrix, one per resource_type -> ex. for Oil: {'heavy': [...], 'medium': [...]..
-        # # price matrix
         # # resource production is NOT dependent of demand since it is calculated with Hubbert regression
         grad_stock = {}
-        grad_price =  np.identity(nb_years) * 0
+        grad_price = np.zeros((nb_years, nb_years))
         grad_use = {}
+        grad_recycling = {}
+        for resource_type in self.sub_resource_list:
+            grad_stock[resource_type] = np.zeros((nb_years, nb_years))
+            grad_use[resource_type] = np.zeros((nb_years, nb_years))
+            grad_recycling[resource_type] = np.zeros((nb_years, nb_years))
+
         # # ------------------------------------------------
         # # init useful containers for calculation
         # # no_stock_year contains the last year at which there is no stock
         # # year_stock contains years at which we stored resource without demand
         # # grad_demand is used for resource use gradient calculation
-        # # grad_recycling is used for stock and use gradient calculations
-        # # coef_conversion is the demand multiplier for units
         grad_demand = 0
-        no_stock_year = {}
-        year_stock = {}
-        grad_recycling = {}
-    
-        for resource_type in self.sub_resource_list:
-            grad_stock[resource_type] = np.identity(nb_years) * 0
-            grad_use[resource_type] = np.identity(nb_years) * 0
-            grad_recycling[resource_type] = np.identity(nb_years) * 0 
-            no_stock_year[resource_type] = 0
-            year_stock[resource_type] = []
-           
-        # # ------------------------------------------------
-        # # gradient matrix computation
-        for year_demand in range(year_start + 1, year_end + 1):
-            total_stock = 0
-            grad_recycling = self.compute_derivative_recycling(year_demand, resource_type, grad_use, grad_stock, grad_recycling)
-            # # ------------------------------------------------
-            # # dealing with units
-            demand = resource_demand_dict[self.resource_name][year_demand] 
-
-            for resource_type in ascending_price_resource_list:
-                total_stock = total_stock + predictable_production_dict[resource_type][
-                    year_demand]
-
-            # check if the stock is not empty this year
-            if total_stock > 0:
-                for resource_type in ascending_price_resource_list:
-                    if demand > 0:
-                        if resource_stock_dict[resource_type][year_demand - 1] \
-                            + predictable_production_dict[resource_type][
-                                year_demand] \
-                            + recycled_production_dict[resource_type][year_demand] \
-                            - demand >= 0 and resource_stock_dict[resource_type][
-                                year_demand] > 0:
-
-                            # # -----------------------------------------------
-                            # # stock of resource_type and production are sufficient to fulfill demand
-                            # # so we remove demand from stock and resource type use is the demand
-
-                            # stock at year_demand depends on demand at year if stock is not zero, if demand is not zero
-                            # and if the stock was not zero after this year (by recursivity, stock is stock at year n
-                            # minus stock at year n-1 which is stock at year n-2 and so on, so the stock at year n depends
-                            # on all previous year unless the stock is empty at
-                            # a given year).  
-                            # Recycling depends on the use_stock of lifespan ago 
-
-                           
-                            for year in range(year_start + 1, year_demand + 1):
-                                
-                                if resource_stock_dict[resource_type][
-                                    year] > 0 and \
-                                        resource_demand_dict[self.resource_name][year] != 0 and \
-                                        year > no_stock_year[resource_type]:
-                                    
-                                    
-                                    grad_stock[resource_type][
-                                        year_demand - year_start, year - year_start] = - self.conversion_factor 
-                                if self.lifespan != 0 :
-                                    if year_demand - self.lifespan > self.year_start and year <year_demand - self.lifespan:
-                                        grad_stock[resource_type][year_demand - year_start, year - year_start]  = \
-                                            grad_stock[resource_type][year_demand -1 - year_start, year - year_start]            
-
-                                if year_demand == year:
-                                    grad_use[resource_type][
-                                        year_demand - year_start, year - year_start] = self.conversion_factor
-                                # resource use depends on previous year demand if at the year considered demand is not zero
-                                # and if we stored resource type without demand
-                                elif resource_demand_dict[self.resource_name][year] != 0 and year in year_stock[resource_type]:
-                                    grad_use[resource_type][year_demand -
-                                                            year_start, year - year_start] = grad_demand 
-
-                            grad_stock[resource_type][year_demand - year_start] += grad_recycling[resource_type][year_demand - year_start]
-                            demand = 0
-                            grad_demand = 0
-                            year_stock[resource_type] = []
-                        else:
-                            # # -----------------------------------------------
-                            # # stock of resource_type + production + recycling are not sufficient to fulfill demand
-                            # # so we use all the stock we had at previous year, the current year production, and the current year recycled production
-                            # # and remove it from the demand
-                            # # then use the next resource type (by ascending order of price)
-                            # # we store the no_stock_year, last year at which there is no stock
-
-                            no_stock_year[resource_type] = year_demand
-                            grad_use[resource_type][year_demand - year_start] = grad_stock[resource_type][
-                                year_demand - year_start - 1] 
-                            grad_use[resource_type][year_demand - year_start, year_demand - self.lifespan - year_start] += \
-                                grad_recycling[resource_type][year_demand - year_start, year_demand - self.lifespan - year_start]
-                            # grad_use[resource_type][year_demand - year_start] += \
-                            #     grad_recycling[resource_type][year_demand - year_start]
-                            demand = demand - \
-                                use_stock_dict[resource_type][year_demand]
-                            # if no stock at previous year grad_demand = 0
-                            if resource_stock_dict[resource_type][
-                                    year_demand - 1] > 0:
-                                grad_demand = self.conversion_factor
-                    else:
-                        # # ------------------------------------------------
-                        # # demand is zero or has been fulfilled by cheaper resources types
-                        # # stock equal previous year stock + production + recycled production
-                        # # we store all years at which we stored resource without demand
-                        grad_stock[resource_type][year_demand - year_start] = grad_stock[resource_type][
-                            year_demand - year_start - 1] 
-                        grad_stock[resource_type][year_demand - year_start, year_demand -self.lifespan - year_start] += \
-                            grad_recycling[resource_type][year_demand - year_start, year_demand - self.lifespan - year_start]
-                        year_stock[resource_type].append(year_demand)
-        
+        no_stock_year = np.zeros(len(ascending_price_resource_list), dtype=int)
+        year_stock = np.zeros((len(ascending_price_resource_list), nb_years), dtype=bool)
+        year_indexes = np.arange(nb_years)
+        # recycling gradient is computed for the most expensive resource type, recycling of the current year depends
+        # on the used stock a lifespan ago
+        recycled_resource_type = ascending_price_resource_list[-1]
+
+        for year in range(1, nb_years):
+            recycled_year = year - self.lifespan
+            if self.lifespan != 0 and recycled_year > 0:
+                grad_recycling[recycled_resource_type][year] = \
+                    grad_use[recycled_resource_type][recycled_year] * self.recycled_rate
+
+            for i, resource_type in enumerate(ascending_price_resource_list):
+                branch = stock_branches[i, year]
+                if branch == self.DEMAND_SATISFIED:
+                    # # -----------------------------------------------
+                    # # stock of resource_type and production are sufficient to fulfill demand
+                    # # so we remove demand from stock and resource type use is the demand
+                    # # stock at year depends on demand of all previous years unless the stock was empty at a given
+                    # # year, and on the use of resource a lifespan ago through recycling
+                    demand_in_stock = stock_positive[i, 1:year + 1] & demand_not_null[1:year + 1] & \
+                        (year_indexes[1:year + 1] > no_stock_year[i])
+                    grad_stock[resource_type][year, 1:year + 1][demand_in_stock] = - self.conversion_factor
+                    if self.lifespan != 0 and recycled_year > 0:
+                        grad_stock[resource_type][year, 1:recycled_year] = \
+                            grad_stock[resource_type][year - 1, 1:recycled_year]
+                    # resource use depends on previous years demand if we stored resource type without demand
+                    grad_use[resource_type][year, year_stock[i] & demand_not_null] = grad_demand
+                    grad_use[resource_type][year, year] = self.conversion_factor
+                    grad_stock[resource_type][year] += grad_recycling[resource_type][year]
+                    grad_demand = 0
+                    year_stock[i] = False
+                elif branch == self.STOCK_EXHAUSTED:
+                    # # -----------------------------------------------
+                    # # stock of resource_type + production + recycling are not sufficient to fulfill demand
+                    # # so we use all the stock we had at previous year, the current year production, and the
+                    # # current year recycled production
+                    no_stock_year[i] = year
+                    grad_use[resource_type][year] = grad_stock[resource_type][year - 1]
+                    if self.lifespan != 0 and recycled_year > 0:
+                        grad_use[resource_type][year, recycled_year] += \
+                            grad_recycling[resource_type][year, recycled_year]
+                    # if no stock at previous year grad_demand = 0
+                    if stock[i, year - 1] > 0:
+                        grad_demand = self.conversion_factor
+                elif branch == self.STOCK_STORED:
+                    # # ------------------------------------------------
+                    # # demand is zero or has been fulfilled by cheaper resources types
+                    # # stock equal previous year stock + production + recycled production
+                    grad_stock[resource_type][year] = grad_stock[resource_type][year - 1]
+                    if self.lifespan != 0 and recycled_year > 0:
+                        grad_stock[resource_type][year, recycled_year] += \
+                            grad_recycling[resource_type][year, recycled_year]
+                    year_stock[i, year] = True
 
         grad_price = self.get_d_price_d_demand(year_start, year_end, nb_years, grad_use, grad_price)
-        
-        return grad_stock, grad_price, grad_use, grad_recycling
-
 
-    def get_d_price_d_demand (self, year_start, year_end, nb_years, grad_use, grad_price):
+        return grad_stock, grad_price, grad_use, grad_recycling
 
+    def get_d_price_d_demand(self, year_start, year_end, nb_years, grad_use, grad_price):
         ascending_price_resource_list = list(
             self.resource_price_data.sort_values(by=['price'])['resource_type'])
+        resource_type_prices = self.resource_price_data.drop_duplicates('resource_type').set_index(
+            'resource_type')['price']
+        total_consumption = self.total_consumption['production'].values[1:, np.newaxis]
+        consumption_not_null = total_consumption != 0
+        total_consumption = np.where(consumption_not_null, total_consumption, 1.)
 
-        # Turn dataframes into dict of np array for faster computation time
-        resource_price_data_dict = self.resource_price_data.to_dict()
-        total_consumption_dict = self.total_consumption.to_dict()
-        use_stock_dict = self.use_stock.to_dict()
+        # # ------------------------------------------------
+        # # total consumption -> use stock + production
+        grad_total_consumption = sum(grad_use[resource_type][1:, 1:]
+                                     for resource_type in ascending_price_resource_list)
 
         # # ------------------------------------------------
-        # # init useful containers for calculation
-        # # grad_total_consumption is used for price gradient calculation
-        grad_total_consumption = np.identity(nb_years) * 0
-
-        for year_demand in range(year_start + 1, year_end + 1):
-            # # ------------------------------------------------
-            # # total consumption -> use stock + production
-            for resource_type in ascending_price_resource_list:
-                grad_total_consumption[year_demand -
-                                        year_start] += grad_use[resource_type][year_demand - year_start]
-
-            # # ------------------------------------------------
-            # # price is u/v function with u = use and v = total consumption
-            for resource_type in ascending_price_resource_list:
-                for year in range(year_start + 1, year_end + 1):
-                    # # ------------------------------------------------
-                    # # price is u/v function with u = use and v = total consumption
-                    # # price gradient is (u'v - uv') / v^2
-                    if total_consumption_dict['production'][year_demand] != 0:
-                        resource_type_price_idx = list(resource_price_data_dict['resource_type'].keys())[
-                            list(resource_price_data_dict['resource_type'].values()).index(resource_type)]
-                        grad_price[year_demand - year_start, year - year_start] += \
-                            resource_price_data_dict['price'][resource_type_price_idx]\
-                            * (grad_use[resource_type][year_demand - year_start, year - year_start]
-                                * total_consumption_dict['production'][year_demand]
-                                - use_stock_dict[resource_type][year_demand]
-                                * grad_total_consumption[year_demand - year_start, year - year_start])\
-                            / (total_consumption_dict['production'][year_demand]) ** 2
+        # # price is u/v function with u = use and v = total consumption
+        # # price gradient is (u'v - uv') / v^2
+        for resource_type in ascending_price_resource_list:
+            use_stock = self.use_stock[resource_type].values[1:, np.newaxis]
+            grad_price[1:, 1:] += np.where(
+                consumption_not_null,
+                resource_type_prices[resource_type] * (grad_use[resource_type][1:, 1:] * total_consumption
+                                                       - use_stock * grad_total_consumption)
+                / total_consumption ** 2, 0.)
         return grad_price
-        
\ No newline at end of file
@@ -34,6 +34,8 @@ class LaborMarketModel():
     SECTORS_DISC_LIST = [AgricultureDiscipline, ServicesDiscipline, IndustrialDiscipline]
     SECTORS_LIST = [disc.sector_name for disc in SECTORS_DISC_LIST]
     SECTORS_OUT_UNIT = {disc.sector_name: disc.prod_cap_unit for disc in SECTORS_DISC_LIST}
+    # employment rate curves only depend on static parameters, they are computed once per configuration
+    _EMPLOYMENT_RATES = {}
 
     def __init__(self, inputs_dict):
         '''
@@ -41,6 +43,8 @@ class LaborMarketModel():
         '''
         self.labor_market_df = None
         self.employment_df = None
+        self.employment_rate = None
+        self.sector_share_matrix = None
         self.configure_parameters(inputs_dict)
 
     def configure_parameters(self, inputs_dict):
@@ -60,7 +64,8 @@ class LaborMarketModel():
 #         self.unemployment_rate = unemployment_rate['unemployment_rate'].values
 #         self.labor_participation_rate = inputs_dict['labor_participation_rate']
         self.workforce_share_per_sector = inputs_dict['workforce_share_per_sector']
-        
+        self.compute_employment_rate()
+
     def set_coupling_inputs(self, inputs):
         self.working_age_population_df = inputs[GlossaryCore.WorkingAgePopulationDfValue]
         self.working_age_population_df.index = self.working_age_population_df[GlossaryCore.Years].values
@@ -111,75 +116,50 @@ class LaborMarketModel():
         Compute the employment rate. based on prediction from ILO 
         We pyworld3 a recovery from 2020 crisis until 2031 where past level is reached
         For all year not in (2020,2031), value = employment_rate_base_value
+        The curve is cached on the years and employment parameters, and the dataframe is only rebuilt when they change
         """
         year_covid = 2020
         year_end_recovery = 2031
-        #create dataframe 
-        employment_df = pd.DataFrame(index=self.years_range, columns=[GlossaryCore.Years,GlossaryCore.EmploymentRate])
-        employment_df[GlossaryCore.Years] = self.years_range
-        # For all years employment_rate = base value
-        employment_df[GlossaryCore.EmploymentRate] = self.employment_rate_base_value
-        # Compute recovery phase
-        years_recovery = np.arange(year_covid, year_end_recovery + 1)
-        x_recovery = years_recovery + 1 - year_covid
-        employment_rate_recovery = self.employment_a_param * \
-            x_recovery**self.employment_power_param
-        employment_rate_recovery_df = pd.DataFrame(
-            {GlossaryCore.Years: years_recovery, GlossaryCore.EmploymentRate: employment_rate_recovery})
-        employment_rate_recovery_df.index = years_recovery
-        # Then replace values in original dataframe by recoveries values
-        employment_df.update(employment_rate_recovery_df)
-
-        self.employment_df = employment_df
-        return employment_df
-    
+        employment_key = (self.year_start, self.year_end, self.time_step, self.employment_a_param,
+                          self.employment_power_param, self.employment_rate_base_value)
+        if employment_key not in self._EMPLOYMENT_RATES:
+            # For all years employment_rate = base value
+            employment_rate = np.full(self.nb_years, self.employment_rate_base_value, dtype=float)
+            # Compute recovery phase
+            recovery = (self.years_range >= year_covid) & (self.years_range <= year_end_recovery)
+            x_recovery = self.years_range[recovery] + 1 - year_covid
+            employment_rate[recovery] = self.employment_a_param * x_recovery ** self.employment_power_param
+            employment_rate.setflags(write=False)
+            self._EMPLOYMENT_RATES[employment_key] = employment_rate
+
+        if self.employment_rate is not self._EMPLOYMENT_RATES[employment_key]:
+            self.employment_rate = self._EMPLOYMENT_RATES[employment_key]
+            self.employment_df = pd.DataFrame({GlossaryCore.Years: self.years_range.astype(float),
+                                               GlossaryCore.EmploymentRate: self.employment_rate},
+                                              index=self.years_range)
+        return self.employment_df
+
     def compute_workforce_persector(self):
         """ Compute workforce per sector. 
         Inputs: - dataframe of share of workforce per sector per year
                 - working age population (million) per year
                 - dataframe employment rate per year
         output: dataframe with workforce per sector in million per year. 1 column per sector 
+        Shares are stacked in a (n sectors, n years) matrix so that all sectors come from one product
         """
-        workforce_df = self.workforce_share_per_sector.copy(deep=True)
-        #drop years for computation
-        workforce_df = workforce_df.drop(columns = [GlossaryCore.Years])
         working_age_pop = self.working_age_population_df[GlossaryCore.Population1570].values
-        employment_rate = self.employment_df[GlossaryCore.EmploymentRate].values
+        self.sector_share_matrix = self.workforce_share_per_sector[self.SECTORS_LIST].values.T / 100
         #per sector the workforce = share_per_sector * employment_rate *workingagepop
-        workforce_df = workforce_df.apply(lambda x: x/100 * employment_rate * working_age_pop)
-        #workforce total is the sum of all sectors 
-        workforce_df[GlossaryCore.Workforce] = workforce_df.sum(axis = 1)
-        workforce_df.insert(0, GlossaryCore.Years, self.years_range)
+        sectors_workforce = self.sector_share_matrix * self.employment_rate * working_age_pop
+        workforce_df = pd.DataFrame({GlossaryCore.Years: self.years_range,
+                                     **dict(zip(self.SECTORS_LIST, sectors_workforce)),
+                                     #workforce total is the sum of all sectors
+                                     GlossaryCore.Workforce: sectors_workforce.sum(axis=0)},
+                                    index=self.workforce_share_per_sector.index)
         self.workforce_df = workforce_df
-        share = self.workforce_share_per_sector[GlossaryCore.SectorAgriculture].values
-        
-        return workforce_df
-    
-    def compute_workforce_persector_bis(self):
-        """ Compute workforce per sector. 
-        Inputs: - dataframe of share of workforce per sector per year
-                - working age population (million) per year
-                - dataframe employment rate per year
-        output: dataframe with workforce per sector in million per year. 1 column per sector 
-        """
-        workforce_df_dict = {}
-        #drop years for computation
-        working_age_pop = self.working_age_population_df[GlossaryCore.Population1570].values
-        employment_rate = self.employment_df[GlossaryCore.EmploymentRate].values
-        sector_list = self.SECTORS_LIST
-        workforce_share = self.workforce_share_per_sector
-        for sector in sector_list: 
-            share = workforce_share[sector]/100
-            sector_wf = share * employment_rate * working_age_pop
-            workforce_df_dict[sector] = sector_wf
-        workforce_df = pd.DataFrame.from_dict(workforce_df_dict)
-        #workforce total is the sum of all sectors 
-        workforce_df[GlossaryCore.Workforce] = workforce_df.sum(axis = 1)
-        workforce_df.insert(0, GlossaryCore.Years, self.years_range)
-        self.workforce_df = workforce_df
-        
+
         return workforce_df
-            
+
     #RUN
     def compute(self, inputs):
         """
@@ -187,8 +167,7 @@ class LaborMarketModel():
         """
         self.inputs = inputs
         self.set_coupling_inputs(inputs)
-        self.compute_employment_rate()
-        self.compute_workforce_persector_bis()
+        self.compute_workforce_persector()
 
         return self.workforce_df, self.employment_df 
     
@@ -196,17 +175,9 @@ class LaborMarketModel():
     def compute_dworkforcetotal_dworkagepop(self):
         """ Gradient for workforce wrt working age population 
         """
-        nb_years = self.nb_years
-        employment_rate = self.employment_df[GlossaryCore.EmploymentRate].values
-        dworkforce_dworkagepop = np.identity(nb_years) * employment_rate
-
-        return dworkforce_dworkagepop
+        return np.diag(self.employment_rate * self.sector_share_matrix.sum(axis=0))
     
     def compute_dworkforcesector_dworkagepop(self, sector):
         sector_share = self.workforce_share_per_sector[sector].values
-        employment_rate = self.employment_df[GlossaryCore.EmploymentRate].values
         #workforce sector = employmentrate * working age pop * share 
-        dworkforcesector_dworkagepop = np.identity(self.nb_years) * employment_rate * sector_share/100 
-        
-        return dworkforcesector_dworkagepop
-        
+        return np.diag(self.employment_rate * sector_share / 100)
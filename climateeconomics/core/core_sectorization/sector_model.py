@@ -17,7 +17,9 @@ limitations under the License.
 
 import numpy as np
 import pandas as pd
+from scipy.signal import lfilter
 
+from climateeconomics.core.tools.jacobian_tools import impulse_response_matrix, lower_triangular_cumprod
 from climateeconomics.glossarycore import GlossaryCore
 
 
@@ -47,6 +49,8 @@ class SectorModel():
         self.section_gdp_df = None
         self.range_energy_eff_cstrt = None
         self.energy_eff_xzero_constraint =  None
+        self.sector_arrays = None
+
     def configure_parameters(self, inputs_dict, sector_name):
         '''
         Configure with inputs_dict from the discipline
@@ -190,121 +194,6 @@ class SectorModel():
         self.damage_fraction_df = inputs[GlossaryCore.DamageFractionDfValue]
         self.damage_fraction_df.index = self.damage_fraction_df[GlossaryCore.Years].values
 
-    def compute_productivity_growthrate(self):
-        """
-        A_g, Growth rate of total factor productivity.
-        Returns:
-            :returns: A_g(0) * exp(-Δ_a * (t-1))
-        """
-        prod_growth_rate = self.productivity_gr_start * np.exp(
-            - self.decline_rate_tfp * (self.years_range - self.year_start))
-        self.productivity_df[GlossaryCore.ProductivityGrowthRate] = prod_growth_rate
-
-    def compute_productivity(self, year):
-        '''
-        productivity
-        if damage_to_productivity= True add damage to the the productivity
-        if  not: productivity evolves independently from other variables (except productivity growthrate)
-        '''
-        if year == self.year_start:
-            self.productivity_df.loc[year, GlossaryCore.Productivity] = self.productivity_start
-            self.productivity_df.loc[year, GlossaryCore.ProductivityWithDamage] = self.productivity_start
-            self.productivity_df.loc[year, GlossaryCore.ProductivityWithoutDamage] = self.productivity_start
-        else:
-            p_productivity_gr = self.productivity_df.at[year - self.time_step, GlossaryCore.ProductivityGrowthRate]
-
-            p_productivity_w_damage = self.productivity_df.at[year - self.time_step, GlossaryCore.ProductivityWithDamage]
-            damefrac = self.damage_fraction_df.at[year, GlossaryCore.DamageFractionOutput]
-            productivity_w_damage = (1 - self.frac_damage_prod * damefrac) * (p_productivity_w_damage / (1 - p_productivity_gr))
-
-            p_productivity_wo_damage = self.productivity_df.at[year - self.time_step, GlossaryCore.ProductivityWithoutDamage]
-            productivity_wo_damage = p_productivity_wo_damage / (1 - p_productivity_gr)
-
-            self.productivity_df.loc[year, GlossaryCore.ProductivityWithDamage] = productivity_w_damage
-            self.productivity_df.loc[year, GlossaryCore.ProductivityWithoutDamage] = productivity_wo_damage
-            if self.damage_to_productivity:
-                self.productivity_df.loc[year, GlossaryCore.Productivity] = productivity_w_damage
-            else:
-                self.productivity_df.loc[year, GlossaryCore.Productivity] = productivity_wo_damage
-
-    def compute_capital(self, year):
-        """
-        K(t), Capital for time period, trillions $USD
-        Args:
-            :param capital: capital
-            :param depreciation: depreciation rate
-            :param investment: investment
-            K(t) = K(t-1)*(1-depre_rate) + investment(t-1)
-        """
-        if year > self.year_end:
-            pass
-        else: 
-            # Capital
-            investment = self.investment_df.loc[year - self.time_step, GlossaryCore.InvestmentsValue]
-            capital = self.capital_df.at[year - self.time_step, GlossaryCore.Capital]
-            capital_a = capital * (1 - self.depreciation_capital) + investment
-            self.capital_df.loc[year, GlossaryCore.Capital] = capital_a
-                                  
-            return capital_a
-
-    def compute_usable_capital(self, year):
-        """  Usable capital is the part of the capital stock that can be used in the production process. 
-        To be usable the capital needs enough energy.
-        K_u = K*(E/E_max) 
-        E is energy in Twh and K is capital in trill dollars constant 2020
-        Output: usable capital in trill dollars constant 2020
-        """
-        capital = self.capital_df.loc[year, GlossaryCore.Capital]
-
-        usable_capital_unbounded = self.capital_df.loc[year, GlossaryCore.UsableCapitalUnbounded]
-        upper_bound = self.max_capital_utilisation_ratio * capital
-
-        usable_capital = upper_bound if np.real(usable_capital_unbounded) > np.real(
-            upper_bound) else usable_capital_unbounded
-
-        self.capital_df.loc[year, GlossaryCore.UsableCapital] = usable_capital
-
-    def compute_gross_output(self, year):
-        """ Compute the gdp 
-        inputs: usable capital by year in trill $ , working population by year in million of people,
-             productivity by year (no unit), alpha (between 0 and 1) 
-        output: gdp in trillion dollars
-        """
-        alpha = self.output_alpha
-        gamma = self.output_gamma
-        productivity = self.productivity_df.loc[year, GlossaryCore.Productivity]
-        working_pop = self.workforce_df.loc[year, self.sector_name]
-        capital_u = self.capital_df.loc[year, GlossaryCore.UsableCapital]
-        # If gamma == 1/2 use sqrt but same formula
-        if gamma == 1 / 2:
-            output = productivity * \
-                (alpha * np.sqrt(capital_u) + (1 - alpha) * np.sqrt(working_pop))**2
-        else:
-            output = productivity * \
-                (alpha * capital_u**gamma + (1 - alpha)* (working_pop)**gamma)**(1 / gamma)
-        self.production_df.loc[year, GlossaryCore.GrossOutput] = output
-
-        return output
-    
-    def compute_output_net_of_damage(self, year):
-        """
-        Output net of damages, trillions USD
-        """
-        damage_to_productivity = self.damage_to_productivity
-        damefrac = self.damage_fraction_df.at[year, GlossaryCore.DamageFractionOutput]
-        gross_output = self.production_df.at[year,GlossaryCore.GrossOutput]
-
-        if not self.compute_climate_impact_on_gdp:
-            output_net_of_d = gross_output
-        else:
-            if damage_to_productivity:
-                damage = 1 - ((1 - damefrac) / (1 - self.frac_damage_prod * damefrac))
-                output_net_of_d = (1 - damage) * gross_output
-            else:
-                output_net_of_d = gross_output * (1 - damefrac)
-        self.production_df.loc[year, GlossaryCore.OutputNetOfDamage] = output_net_of_d
-        return output_net_of_d
-
     def compute_output_net_of_damage_per_section(self):
         """
         Splitting output net of damages between sections of the sector
@@ -317,23 +206,6 @@ class SectorModel():
 
 
     
-    def compute_output_growth_rate(self, year):
-        """ Compute output growth rate for every year for the year before: 
-        output_growth_rate(t-1) = (output(t) - output(t-1))/output(t-1)
-        for the last year we put the value of the previous year to avoid a 0 
-        """
-        if year == self.year_start: 
-            pass
-        else: 
-            output = self.production_df.at[year - self.time_step,GlossaryCore.OutputNetOfDamage]
-            output_a = self.production_df.at[year, GlossaryCore.OutputNetOfDamage]
-            output = max(1e-6, output)
-            output_growth = ((output_a - output) / output) / self.time_step
-            self.growth_rate_df.loc[year - self.time_step, 'net_output_growth_rate'] = output_growth
-        #For the last year put the vale of the year before 
-        if year == self.year_end: 
-            self.growth_rate_df.loc[year, 'net_output_growth_rate'] = output_growth
-
     # For production fitting optim  only
     def compute_long_term_energy_efficiency(self):
         """ Compute energy efficiency function on a longer time scale to analyse shape
@@ -363,19 +235,6 @@ class SectorModel():
    
         return self.range_energy_eff_cstrt
 
-    def compute_energy_efficiency(self):
-        """compute energy_efficiency"""
-        years = self.capital_df[GlossaryCore.Years].values
-        energy_efficiency = self.energy_eff_cst + self.energy_eff_max / (1 + np.exp(-self.energy_eff_k *
-                                                                                    (years - self.energy_eff_xzero)))
-        self.capital_df[GlossaryCore.EnergyEfficiency] = energy_efficiency
-
-    def compute_unbounded_usable_capital(self):
-        net_energy_production = self.energy_production[GlossaryCore.TotalProductionValue]
-        energy_efficiency = self.capital_df[GlossaryCore.EnergyEfficiency]
-        usable_capital_unbounded = self.capital_utilisation_ratio * net_energy_production * energy_efficiency * 1e-3
-        self.capital_df[GlossaryCore.UsableCapitalUnbounded] = usable_capital_unbounded
-
     def compute_energy_usage(self):
         """Wasted energy is the overshoot of energy production not used by usable capital"""
         capital = self.capital_df[GlossaryCore.Capital]
@@ -447,27 +306,46 @@ class SectorModel():
         self.damage_df[GlossaryCore.EstimatedDamages] = self.damage_df[GlossaryCore.EstimatedDamagesFromClimate] + self.damage_df[GlossaryCore.EstimatedDamagesFromProductivityLoss]
         self.damage_df[GlossaryCore.Damages] = self.damage_df[GlossaryCore.DamagesFromClimate] + self.damage_df[GlossaryCore.DamagesFromProductivityLoss]
 
+    def set_sector_arrays(self, sector_arrays: dict):
+        """
+        Fill the dataframes of the sector with its row of the arrays computed by the sectors engine
+        """
+        self.sector_arrays = sector_arrays
+        for column in [GlossaryCore.ProductivityGrowthRate, GlossaryCore.ProductivityWithDamage,
+                       GlossaryCore.ProductivityWithoutDamage, GlossaryCore.Productivity]:
+            self.productivity_df[column] = sector_arrays[column]
+        for column in [GlossaryCore.Capital, GlossaryCore.EnergyEfficiency, GlossaryCore.UsableCapitalUnbounded,
+                       GlossaryCore.UsableCapital]:
+            self.capital_df[column] = sector_arrays[column]
+        for column in [GlossaryCore.GrossOutput, GlossaryCore.OutputNetOfDamage]:
+            self.production_df[column] = sector_arrays[column]
+        self.growth_rate_df['net_output_growth_rate'] = sector_arrays['net_output_growth_rate']
+
     # RUN
     def compute(self, inputs):
         """
-        Compute all models for year range
+        Compute all models for year range, the sector being a view on a one sector engine
+        """
+        return SectorsEngine([self]).compute_sector_models([inputs])[0]
+
+    def set_inputs(self, inputs) -> dict:
+        """
+        Set the coupling inputs of the sector and return its yearly inputs of the sectors engine
         """
         self.init_dataframes()
         self.inputs = inputs
         self.set_coupling_inputs(inputs)
-        self.compute_productivity_growthrate()
-        self.compute_energy_efficiency()
-        self.compute_unbounded_usable_capital()
-
-        # iterate over years
-        for year in self.years_range:
-            self.compute_productivity(year)
-            self.compute_usable_capital(year)
-            self.compute_gross_output(year)
-            self.compute_output_net_of_damage(year)
-            self.compute_output_growth_rate(year)
-            # capital t+1 :
-            self.compute_capital(year+1)
+        return {'damage_fraction': self.damage_fraction_df[GlossaryCore.DamageFractionOutput].values,
+                'energy_production': inputs[GlossaryCore.EnergyProductionValue][GlossaryCore.TotalProductionValue].values,
+                'investment': self.investment_df[GlossaryCore.InvestmentsValue].values,
+                'workforce': self.workforce_df[self.sector_name].values}
+
+    def compute_from_sector_arrays(self, sector_arrays: dict):
+        """
+        Compute the outputs of the sector from its row of the arrays computed by the sectors engine
+        """
+        self.set_sector_arrays(sector_arrays)
+
         self.production_df = self.production_df.fillna(0.0)
         self.section_gdp_df = self.section_gdp_df.fillna(0.0)
         self.capital_df = self.capital_df.fillna(0.0)
@@ -484,7 +362,7 @@ class SectorModel():
         self.compute_damage_from_climate()
         self.compute_total_damages()
         return self.production_df, self.capital_df, self.productivity_df, self.damage_df, self.growth_rate_df, self.emax_enet_constraint, self.lt_energy_eff, self.range_energy_eff_cstrt, self.section_gdp_df
-    
+
     ### GRADIENTS ###
 
     def _null_derivative(self):
@@ -499,14 +377,11 @@ class SectorModel():
         """ Gradient for output output wrt workforce
         output = productivity * (alpha * capital_u**gamma + (1-alpha)* (working_pop)**gamma)**(1/gamma) 
         """
-        years = self.years_range
-        nb_years = len(years)
         alpha = self.output_alpha
         gamma = self.output_gamma
-        doutput = np.identity(nb_years)
         working_pop = self.workforce_df[self.sector_name].values
-        capital_u = self.capital_df[GlossaryCore.UsableCapital].values
-        productivity = self.productivity_df[GlossaryCore.Productivity].values
+        capital_u = self.sector_arrays[GlossaryCore.UsableCapital]
+        productivity = self.sector_arrays[GlossaryCore.Productivity]
         # output = f(g(x)) with f = productivity*g**(1/gamma) a,d g= alpha * capital_u**gamma + (1-alpha)* (working_pop)**gamma
         # f'(g) = productivity*(1/gamma)*g**(1/gamma -1)
         # g'(workingpop) = (1-alpha)*gamma*workingpop**(gamma-1)
@@ -515,18 +390,14 @@ class SectorModel():
         g = alpha * capital_u**gamma + (1 - alpha) * (working_pop)**gamma
         g_prime = (1 - alpha) * gamma * working_pop**(gamma - 1)
         f_prime = productivity * (1 / gamma) * g * g_prime
-        doutput *= f_prime
-        return doutput
+        return np.diag(f_prime)
 
     def doutput_denergy(self, dcapitalu_denergy):
-        years = self.years_range
-        nb_years = len(years)
         alpha = self.output_alpha
         gamma = self.output_gamma
-        doutput_dcap = np.identity(nb_years)
         working_pop = self.workforce_df[self.sector_name].values
-        capital_u = self.capital_df[GlossaryCore.UsableCapital].values
-        productivity = self.productivity_df[GlossaryCore.Productivity].values
+        capital_u = self.sector_arrays[GlossaryCore.UsableCapital]
+        productivity = self.sector_arrays[GlossaryCore.Productivity]
         # Derivative of output wrt capital
         # output = f(g(x)) with f = productivity*g**(1/gamma) a,d g= alpha * capital_u**gamma + (1-alpha)* (working_pop)**gamma
         # f'(g) = productivity*(1/gamma)*g**(1/gamma -1)
@@ -535,45 +406,38 @@ class SectorModel():
         g = alpha * capital_u**gamma + (1 - alpha) * (working_pop)**gamma
         g_prime = alpha * gamma * capital_u**(gamma - 1)
         f_prime = productivity * (1 / gamma) * g * g_prime
-        doutput_dcap *= f_prime
-        # Then doutput = doutput_d_prod * dproductivity
-        doutput = np.dot(dcapitalu_denergy, doutput_dcap)
-        return doutput
-    
+        # Then doutput = dcapitalu_denergy * doutput_dcap, doutput_dcap being diagonal
+        return dcapitalu_denergy * f_prime
+
     def doutput_ddamage(self, dproductivity):
-        years = self.years_range
-        nb_years = len(years)
         alpha = self.output_alpha
         gamma = self.output_gamma
-        doutput_dprod = np.identity(nb_years)
         working_pop = self.workforce_df[self.sector_name].values
-        capital_u = self.capital_df[GlossaryCore.UsableCapital].values
-        # Derivative of output wrt productivity
-        doutput_dprod *= (alpha * capital_u**gamma + (1 - alpha)
-                          * (working_pop)**gamma)**(1 / gamma)
+        capital_u = self.sector_arrays[GlossaryCore.UsableCapital]
+        # Derivative of output wrt productivity, which is diagonal
+        doutput_dprod = (alpha * capital_u**gamma + (1 - alpha) * (working_pop)**gamma)**(1 / gamma)
         # Then doutput = doutput_d_prod * dproductivity
-        doutput = np.dot(doutput_dprod, dproductivity)
-        return doutput
-        
+        return doutput_dprod[:, np.newaxis] * dproductivity
+
     def dcapital_dinvest(self):
         """ Compute derivative of capital wrt investments. 
+        capital(t) = capital(t-1) * (1 - depreciation) + invest(t-1)
         """
         nb_years = self.nb_years
-        #capital depends on invest from year before. diagonal k-1
-        dcapital = np.eye(nb_years, k=-1)
-        d_Ku_d_invests = self._null_derivative()
+        #capital depends on invest from year before : (1 - depreciation) ** (i - 1 - j) below the diagonal
+        dcapital = np.zeros((nb_years, nb_years))
+        dcapital[1:, :-1] = impulse_response_matrix([1 - self.depreciation_capital], [1.], nb_years - 1)
+        # usable capital is max_capital_utilisation_ratio * capital the years energy is not fully used
         index_zeros = self.productivity_df[GlossaryCore.UnusedEnergy].values > 0.
-        for i in range(0, nb_years-1):
-            for j in range(0, i + 1):
-                dcapital[i + 1, j] += dcapital[i, j] * (1 - self.depreciation_capital)
-                d_Ku_d_invests[i + 1, j] += index_zeros[i+1] * dcapital[i + 1, j] * self.max_capital_utilisation_ratio
+        d_Ku_d_invests = (index_zeros * self.max_capital_utilisation_ratio)[:, np.newaxis] * dcapital
 
         return dcapital, d_Ku_d_invests
 
     def d_enegy_wasted_obj_d_invest(self, d_capital_d_invest):
         index_zeros = self.productivity_df[GlossaryCore.UnusedEnergy].values > 0.
-        energy_efficiency = self.capital_df[GlossaryCore.EnergyEfficiency].values
-        d_Ew_d_invest = - np.diag(index_zeros * self.max_capital_utilisation_ratio * 1e6 / self.capital_utilisation_ratio / energy_efficiency) @ d_capital_d_invest
+        energy_efficiency = self.sector_arrays[GlossaryCore.EnergyEfficiency]
+        d_Ew_d_invest = - (index_zeros * self.max_capital_utilisation_ratio * 1e6 / self.capital_utilisation_ratio /
+                           energy_efficiency)[:, np.newaxis] * d_capital_d_invest
 
         sum_energy_prod = self.energy_production[GlossaryCore.TotalProductionValue].values.sum()
         d_EWO_d_EW = np.ones_like(self.years) / sum_energy_prod
@@ -584,25 +448,21 @@ class SectorModel():
         alpha = self.output_alpha
         gamma = self.output_gamma
         working_pop = self.workforce_df[self.sector_name].values
-        capital_u = self.capital_df[GlossaryCore.UsableCapital].values
-        productivity = self.productivity_df[GlossaryCore.Productivity].values
-        # Derivative of output wrt usable capital
-        doutput_dusable_capital = np.diag(productivity * alpha * capital_u ** (gamma - 1) *
-                                (alpha * capital_u ** gamma + (1 - alpha) * (working_pop) ** gamma) ** (1 / gamma - 1)
-                                )
+        capital_u = self.sector_arrays[GlossaryCore.UsableCapital]
+        productivity = self.sector_arrays[GlossaryCore.Productivity]
+        # Derivative of output wrt usable capital, which is diagonal
+        doutput_dusable_capital = productivity * alpha * capital_u ** (gamma - 1) * \
+            (alpha * capital_u ** gamma + (1 - alpha) * (working_pop) ** gamma) ** (1 / gamma - 1)
         # Then doutput = doutput_d_prod * dproductivity
-        doutput_dinvests = doutput_dusable_capital @ d_usable_capital_d_invest
-        return doutput_dinvests
-    
+        return doutput_dusable_capital[:, np.newaxis] * d_usable_capital_d_invest
+
     def demaxconstraint(self, dcapital):
         """ Compute derivative of e_max and emax constraint using derivative of capital. 
         For all inputs that impacts e_max through capital 
         """
         #e_max = capital*1e3/ (capital_utilisation_ratio * energy_efficiency)
-        energy_efficiency = self.capital_df[GlossaryCore.EnergyEfficiency].values
-        demax = np.identity(self.nb_years)
-        demax *= 1e3 / (self.capital_utilisation_ratio * energy_efficiency)
-        demax = np.dot(demax, dcapital)
+        energy_efficiency = self.sector_arrays[GlossaryCore.EnergyEfficiency]
+        demax = (1e3 / (self.capital_utilisation_ratio * energy_efficiency))[:, np.newaxis] * dcapital
         demaxconstraint_demax = demax * self. max_capital_utilisation_ratio / self.ref_emax_enet_constraint
         return demaxconstraint_demax
     
@@ -632,25 +492,17 @@ class SectorModel():
             output_net_of_d = gross_output * (1 - damefrac)
         """
         frac = self.frac_damage_prod
-        years = self.years_range
-        nb_years = len(years)
-        dnet_output = np.zeros((nb_years, nb_years))
-        if self.compute_climate_impact_on_gdp:
-            for i in range(0, nb_years):
-                output = self.production_df.at[years[i], GlossaryCore.GrossOutput]
-                damefrac = self.damage_fraction_df.at[years[i], GlossaryCore.DamageFractionOutput]
-                for j in range(0, i + 1):
-                    if i == j:
-                        if self.damage_to_productivity:
-                            dnet_output[i, j] = (frac - 1) / ((frac * damefrac - 1)**2) * output + \
-                                (1 - damefrac) / (1 - frac *damefrac) * doutput[i, j]
-                        else:
-                            dnet_output[i, j] = - output + (1 - damefrac) * doutput[i, j]
-                    else:
-                        if self.damage_to_productivity:
-                            dnet_output[i, j] = (1 - damefrac) / (1 - frac * damefrac) * doutput[i, j]
-                        else:
-                            dnet_output[i, j] = (1 - damefrac) * doutput[i, j]
+        nb_years = len(self.years_range)
+        if not self.compute_climate_impact_on_gdp:
+            return np.zeros((nb_years, nb_years))
+        output = self.sector_arrays[GlossaryCore.GrossOutput]
+        damefrac = self.damage_fraction_df[GlossaryCore.DamageFractionOutput].values
+        if self.damage_to_productivity:
+            dnet_output = ((1 - damefrac) / (1 - frac * damefrac))[:, np.newaxis] * np.tril(doutput)
+            dnet_output[np.diag_indices(nb_years)] += (frac - 1) / ((frac * damefrac - 1)**2) * output
+        else:
+            dnet_output = (1 - damefrac)[:, np.newaxis] * np.tril(doutput)
+            dnet_output[np.diag_indices(nb_years)] += - output
         return dnet_output
 
     def d_Y_Ku_Ew_Constraint_d_energy(self):
@@ -662,51 +514,36 @@ class SectorModel():
         - lower bound constraint
         - Energy_wasted
         wrt energy
+        Capital does not depend on energy, so that all the derivatives are diagonal
         """
         alpha = self.output_alpha
         gamma = self.output_gamma
-        productivity = self.productivity_df[GlossaryCore.Productivity].values
+        productivity = self.sector_arrays[GlossaryCore.Productivity]
         working_pop = self.workforce_df[self.sector_name].values
-        usable_capital = self.capital_df[GlossaryCore.UsableCapital].values
+        usable_capital = self.sector_arrays[GlossaryCore.UsableCapital]
 
-        energy_efficiency = self.capital_df[GlossaryCore.EnergyEfficiency].values
+        energy_efficiency = self.sector_arrays[GlossaryCore.EnergyEfficiency]
         d_UKu_d_E = np.diag(self.capital_utilisation_ratio * energy_efficiency)
-        d_Ku_d_E = np.diag(self.capital_utilisation_ratio * energy_efficiency)
 
+        # usable capital is bounded by capital, independent of energy, the years energy is not fully used
         index_zeros = self.productivity_df[GlossaryCore.UnusedEnergy].values > 0.
+        d_Ku_d_E_diagonal = np.where(index_zeros, 0., self.capital_utilisation_ratio * energy_efficiency)
+        d_Ku_d_E = np.diag(d_Ku_d_E_diagonal)
 
-        d_Ku_d_E[index_zeros, index_zeros] = 0.
-
-        damefrac = self.damage_fraction_df[GlossaryCore.DamageFractionOutput].values
-        dQ_dY = 1 - damefrac if not self.damage_to_productivity else (1 - damefrac) / (1 - self.frac_damage_prod * damefrac)
-        d_K_d_E = self._null_derivative()
-        dY_dE = np.diag(
-            productivity * alpha * usable_capital ** (gamma - 1) * np.diag(d_Ku_d_E) *
+        dY_dE_diagonal = productivity * alpha * usable_capital ** (gamma - 1) * d_Ku_d_E_diagonal * \
             (alpha * usable_capital ** gamma + (1 - alpha) * working_pop ** gamma) ** (1. / gamma - 1.)
-        )
-        dY_dE[0, 0] = 0.
-
-        for i in range(1, self.nb_years + 1):
-            for j in range(1, i):
-                dY_dE[i - 1, j] = productivity[i-1] * alpha * usable_capital[i-1] ** (gamma - 1) *\
-                    d_Ku_d_E[i - 1, j] * (alpha * usable_capital[i-1] ** gamma + (1 - alpha) * working_pop[i-1] ** gamma) ** (1. / gamma - 1.)
-                if i < self.nb_years:
-                    d_K_d_E[i, j] = (1 - self.depreciation_capital) * d_K_d_E[i - 1, j]
-                    d_Ku_d_E[i, j] = index_zeros[i] * self.max_capital_utilisation_ratio * d_K_d_E[i, j]
-
+        dY_dE_diagonal[0] = 0.
+        dY_dE = np.diag(dY_dE_diagonal)
 
         # Energy_wasted Ew = E - KNE * k where k = max_capital_utilisation_ratio/capital_utilisation_ratio/energy_efficiency*1.e3
-        # energy_efficiency is function of the years. Eoptimal in TWh
-        k = np.diag(self.max_capital_utilisation_ratio / self.capital_utilisation_ratio / energy_efficiency * 1.e3)
-        d_energy_wasted_d_energy = self._identity_derivative() * 1.e3 - np.matmul(k, d_K_d_E) # Enet converted from PWh to TWh
+        # Enet converted from PWh to TWh
         # Since Ewasted = max(Enet - Eoptimal, 0.), gradient should be 0 when Enet - Eoptimal <=0, ie when Ewasted =0
-        # => put to 0 the lines of the gradient matrix corresponding to the years where Ewasted=0
-        matrix_of_years_E_is_wasted = (self.productivity_df[GlossaryCore.EnergyWasted].values > 0.).astype(int)
-        d_energy_wasted_d_energy = np.transpose(np.multiply(matrix_of_years_E_is_wasted, np.transpose(d_energy_wasted_d_energy)))
-        d_sum_energy_wasted_d_energy_total = np.ones(self.nb_years) @ d_energy_wasted_d_energy
-        d_sum_energy_total_d_energy_total = np.ones(self.nb_years) @ self._identity_derivative()
+        # => only the years where Ewasted > 0 contribute to the sum of energy wasted
+        energy_wasted = self.productivity_df[GlossaryCore.EnergyWasted].values
+        d_sum_energy_wasted_d_energy_total = (energy_wasted > 0.) * 1.e3
+        d_sum_energy_total_d_energy_total = np.ones(self.nb_years)
 
-        sum_ewasted = self.productivity_df[GlossaryCore.EnergyWasted].values.sum()
+        sum_ewasted = energy_wasted.sum()
         sum_etotal = self.energy_production[GlossaryCore.TotalProductionValue].values.sum()
         # sumetotal is supposed > 0 otherwise no energy in the system => cannot work
         grad_energy_wasted_obj = (sum_etotal * d_sum_energy_wasted_d_energy_total - sum_ewasted * d_sum_energy_total_d_energy_total) / \
@@ -716,28 +553,20 @@ class SectorModel():
 
     def d_productivity_w_damage_d_damage_frac_output(self):
         """derivative of productivity with damage wrt damage frac output"""
-        years = np.arange(self.year_start, self.year_end + 1, self.time_step)
-        nb_years = len(years)
-        p_productivity_gr = self.productivity_df[GlossaryCore.ProductivityGrowthRate].values
-        p_productivity = self.productivity_df[GlossaryCore.ProductivityWithDamage].values
-
-        # derivative matrix initialization
-        d_productivity_w_damage_d_damage_frac_output = np.zeros((nb_years, nb_years))
-
-        # first line stays at zero since derivatives of initial values are
-        # zero
-        for i in range(1, nb_years):
-            d_productivity_w_damage_d_damage_frac_output[i, i] = (1 - self.frac_damage_prod * self.damage_fraction_df.at[
-                years[i], GlossaryCore.DamageFractionOutput]) * \
-                                   d_productivity_w_damage_d_damage_frac_output[i - 1, i] / (
-                                               1 - p_productivity_gr[i - 1]) - self.frac_damage_prod * \
-                                   p_productivity[i - 1] / (1 - p_productivity_gr[i - 1])
-            for j in range(1, i):
-                d_productivity_w_damage_d_damage_frac_output[i, j] = (1 - self.frac_damage_prod * self.damage_fraction_df.at[
-                    years[i], GlossaryCore.DamageFractionOutput]) * \
-                                       d_productivity_w_damage_d_damage_frac_output[i - 1, j] / (1 - p_productivity_gr[i - 1])
-
-        return d_productivity_w_damage_d_damage_frac_output
+        nb_years = len(self.years_range)
+        p_productivity_gr = self.sector_arrays[GlossaryCore.ProductivityGrowthRate]
+        p_productivity = self.sector_arrays[GlossaryCore.ProductivityWithDamage]
+        damefrac = self.damage_fraction_df[GlossaryCore.DamageFractionOutput].values
+
+        # productivity_w_damage(t) = (1 - frac * damefrac(t)) * productivity_w_damage(t-1) / (1 - productivity_gr(t-1))
+        # damefrac(t) acts directly on year t, then is propagated by the recurrence factors
+        # first line and column stay at zero since derivatives of initial values are zero
+        factors = np.ones(nb_years)
+        factors[1:] = (1 - self.frac_damage_prod * damefrac[1:]) / (1 - p_productivity_gr[:-1])
+        direct_derivative = np.zeros(nb_years)
+        direct_derivative[1:] = - self.frac_damage_prod * p_productivity[:-1] / (1 - p_productivity_gr[:-1])
+
+        return lower_triangular_cumprod(factors) * direct_derivative
 
     def d_productivity_d_damage_frac_output(self):
         """gradient for productivity for damage_df"""
@@ -776,7 +605,7 @@ class SectorModel():
         damages_from_climate = gross output - net output
         """
         damefrac = self.damage_fraction_df[GlossaryCore.DamageFractionOutput]
-        gross_output = self.production_df[GlossaryCore.GrossOutput].values
+        gross_output = self.sector_arrays[GlossaryCore.GrossOutput]
 
         if self.compute_climate_impact_on_gdp:
             derivative = d_gross_output_d_user_input - d_net_output_d_user_input
@@ -792,18 +621,16 @@ class SectorModel():
         return derivative
 
     def d_damages_from_productivity_loss_d_damage_fraction_output(self, d_gross_output_d_damage_fraction_output):
-        gross_output = self.production_df[GlossaryCore.GrossOutput].values
-        productivity_wo_damage = self.productivity_df[GlossaryCore.ProductivityWithoutDamage].values
-        productivity_w_damage = self.productivity_df[GlossaryCore.ProductivityWithDamage].values
+        gross_output = self.sector_arrays[GlossaryCore.GrossOutput]
+        productivity_wo_damage = self.sector_arrays[GlossaryCore.ProductivityWithoutDamage]
+        productivity_w_damage = self.sector_arrays[GlossaryCore.ProductivityWithDamage]
 
         d_productivity_w_damage_d_damage_frac_output = self.d_productivity_w_damage_d_damage_frac_output()
-        nb_years = len(self.years_range)
         d_damages_from_productivity_loss_d_damage_fraction_output = self._null_derivative()
         d_estimated_damages_from_productivity_loss_d_damage_fraction_output = self._null_derivative()
         if self.damage_to_productivity:
-            for i in range(nb_years):
-                d_estimated_damages_from_productivity_loss_d_damage_fraction_output[i] = d_gross_output_d_damage_fraction_output[i] * (productivity_wo_damage[i]/productivity_w_damage[i] - 1) +\
-                    - gross_output[i] * productivity_wo_damage[i] / productivity_w_damage[i] ** 2 * d_productivity_w_damage_d_damage_frac_output[i]
+            d_estimated_damages_from_productivity_loss_d_damage_fraction_output = d_gross_output_d_damage_fraction_output * (productivity_wo_damage/productivity_w_damage - 1)[:, np.newaxis] +\
+                - (gross_output * productivity_wo_damage / productivity_w_damage ** 2)[:, np.newaxis] * d_productivity_w_damage_d_damage_frac_output
         else:
             d_estimated_damages_from_productivity_loss_d_damage_fraction_output = np.diag((productivity_wo_damage - productivity_w_damage)/productivity_wo_damage) @ d_gross_output_d_damage_fraction_output - np.diag(gross_output / productivity_wo_damage) @ d_productivity_w_damage_d_damage_frac_output
         if self.compute_climate_impact_on_gdp and self.damage_to_productivity:
@@ -812,11 +639,11 @@ class SectorModel():
         return d_damages_from_productivity_loss_d_damage_fraction_output, d_estimated_damages_from_productivity_loss_d_damage_fraction_output
 
     def d_damages_from_productivity_loss_d_user_input(self, d_gross_output_d_user_input):
-        productivity_wo_damage = self.productivity_df[GlossaryCore.ProductivityWithoutDamage].values
-        productivity_w_damage = self.productivity_df[GlossaryCore.ProductivityWithDamage].values
+        productivity_wo_damage = self.sector_arrays[GlossaryCore.ProductivityWithoutDamage]
+        productivity_w_damage = self.sector_arrays[GlossaryCore.ProductivityWithDamage]
 
         d_damages_from_productivity_loss_d_user_input = self._null_derivative()
-        applied_productivity = self.productivity_df[GlossaryCore.Productivity].values
+        applied_productivity = self.sector_arrays[GlossaryCore.Productivity]
         d_estimated_damages_from_prod_loss_d_user_input = np.diag((productivity_wo_damage - productivity_w_damage) / (
                 applied_productivity)) @  d_gross_output_d_user_input
 
@@ -828,4 +655,127 @@ class SectorModel():
     def d_damages_d_user_input(self, d_damages_from_climate_d_user_input, d_damages_from_productivity_loss_d_user_input):
         return d_damages_from_climate_d_user_input + d_damages_from_productivity_loss_d_user_input
     def d_estimated_damages_d_user_input(self, d_estimated_damages_from_climate_d_user_input, d_estimated_damages_from_productivity_loss_d_user_input):
-        return d_estimated_damages_from_climate_d_user_input + d_estimated_damages_from_productivity_loss_d_user_input
\ No newline at end of file
+        return d_estimated_damages_from_climate_d_user_input + d_estimated_damages_from_productivity_loss_d_user_input
+
+
+class SectorsEngine():
+    """
+    Structure of arrays engine of the sector models.
+    The sectors are advanced together : their parameters are stacked in arrays of shape (n_sectors, 1) and their
+    yearly quantities are arrays of shape (n_sectors, n_years), so that adding sectors is done in numpy and not with
+    more python calls. A SectorModel is the view of a one sector engine.
+    """
+
+    PARAMETERS = ['productivity_start', 'capital_start', 'productivity_gr_start', 'decline_rate_tfp',
+                  'depreciation_capital', 'frac_damage_prod', 'damage_to_productivity',
+                  'compute_climate_impact_on_gdp', 'output_alpha', 'output_gamma', 'energy_eff_k', 'energy_eff_cst',
+                  'energy_eff_xzero', 'energy_eff_max', 'capital_utilisation_ratio', 'max_capital_utilisation_ratio',
+                  'scaling_factor_energy_production']
+
+    def __init__(self, sector_models: list):
+        """
+        Stack the parameters of configured sector models, which must share the same years
+        """
+        self.sector_models = sector_models
+        self.sector_names = [sector_model.sector_name for sector_model in sector_models]
+        self.year_start = sector_models[0].year_start
+        self.time_step = sector_models[0].time_step
+        self.years_range = sector_models[0].years_range
+        for sector_model in sector_models[1:]:
+            if not np.array_equal(sector_model.years_range, self.years_range):
+                raise ValueError(f'Sector {sector_model.sector_name} has not the same years as '
+                                 f'sector {self.sector_names[0]}')
+        for parameter in self.PARAMETERS:
+            setattr(self, parameter, np.array([[getattr(sector_model, parameter)] for sector_model in sector_models]))
+
+    def compute_sector_models(self, sectors_inputs: list) -> list:
+        """
+        Compute the sector models of the engine for their coupling inputs, in one engine call for all sectors.
+        Return the outputs of SectorModel.compute of each sector.
+        """
+        engine_inputs = [sector_model.set_inputs(inputs)
+                         for sector_model, inputs in zip(self.sector_models, sectors_inputs)]
+        sectors_arrays = self.compute(**{name: np.array([sector_inputs[name] for sector_inputs in engine_inputs])
+                                         for name in engine_inputs[0]})
+        return [sector_model.compute_from_sector_arrays({column: values[isector]
+                                                         for column, values in sectors_arrays.items()})
+                for isector, sector_model in enumerate(self.sector_models)]
+
+    def compute(self, damage_fraction: np.ndarray, energy_production: np.ndarray, investment: np.ndarray,
+                workforce: np.ndarray) -> dict:
+        """
+        Compute productivity, capital and output of all sectors.
+        Inputs are arrays of shape (n_sectors, n_years), or (n_years,) if shared by all sectors, with the energy
+        production before its scaling. Outputs are arrays of shape (n_sectors, n_years) indexed by their column name
+        in the sector dataframes.
+        """
+        nb_sectors = len(self.sector_names)
+        shape = (nb_sectors, len(self.years_range))
+        damage_fraction, energy_production, investment, workforce = [
+            np.broadcast_to(values, shape) for values in (damage_fraction, energy_production, investment, workforce)]
+        dtype = np.result_type(damage_fraction, energy_production, investment, workforce, np.float64)
+
+        # A_g, Growth rate of total factor productivity : A_g(0) * exp(-Δ_a * (t-1))
+        productivity_gr = self.productivity_gr_start * np.exp(- self.decline_rate_tfp *
+                                                               (self.years_range - self.year_start))
+        energy_efficiency = self.energy_eff_cst + self.energy_eff_max / (1 + np.exp(-self.energy_eff_k *
+                                                                                   (self.years_range - self.energy_eff_xzero)))
+        net_energy_production = energy_production * self.scaling_factor_energy_production
+        usable_capital_unbounded = self.capital_utilisation_ratio * net_energy_production * energy_efficiency * 1e-3
+
+        # productivity P(t) = (1 - frac_damage_prod * damage_fraction(t)) * P(t-1) / (1 - A_g(t-1)) with damage,
+        # P(t) = P(t-1) / (1 - A_g(t-1)) without, as cumulative products of the yearly factors
+        growth_factor = np.ones(shape, dtype=dtype)
+        growth_factor[:, 1:] = 1. / (1 - productivity_gr[:, :-1])
+        damage_factor = np.ones(shape, dtype=dtype)
+        damage_factor[:, 1:] = 1 - self.frac_damage_prod * damage_fraction[:, 1:]
+        productivity_wo_damage = self.productivity_start * np.cumprod(growth_factor, axis=1)
+        productivity_w_damage = self.productivity_start * np.cumprod(damage_factor * growth_factor, axis=1)
+        productivity = np.where(self.damage_to_productivity, productivity_w_damage, productivity_wo_damage)
+
+        # capital K(t) = K(t-1)*(1-depre_rate) + investment(t-1), solved as a causal filter for each depreciation rate
+        shifted_investment = np.zeros(shape, dtype=dtype)
+        shifted_investment[:, 1:] = investment[:, :-1]
+        capital = np.zeros(shape, dtype=dtype)
+        for depreciation in np.unique(self.depreciation_capital):
+            sectors = self.depreciation_capital[:, 0] == depreciation
+            capital[sectors] = lfilter([1.], [1., -(1 - depreciation)], shifted_investment[sectors], axis=-1,
+                                       zi=self.capital_start[sectors])[0]
+
+        # usable capital K_u = K*(E/E_max), bounded by max_capital_utilisation_ratio * K
+        upper_bound = self.max_capital_utilisation_ratio * capital
+        usable_capital = np.where(np.real(usable_capital_unbounded) > np.real(upper_bound),
+                                  upper_bound, usable_capital_unbounded)
+
+        # gross output, sqrt is used if gamma == 1/2 but same formula
+        alpha = self.output_alpha
+        gamma = self.output_gamma
+        gross_output = np.where(
+            gamma == 1 / 2,
+            productivity * (alpha * np.sqrt(usable_capital) + (1 - alpha) * np.sqrt(workforce)) ** 2,
+            productivity * (alpha * usable_capital ** gamma + (1 - alpha) * workforce ** gamma) ** (1 / gamma))
+
+        # output net of damage
+        damage = 1 - ((1 - damage_fraction) / (1 - self.frac_damage_prod * damage_fraction))
+        output_net_of_damage = np.where(self.damage_to_productivity, (1 - damage) * gross_output,
+                                        gross_output * (1 - damage_fraction))
+        output_net_of_damage = np.where(self.compute_climate_impact_on_gdp, output_net_of_damage, gross_output)
+
+        # output growth rate of year t-1 is (output(t) - output(t-1))/output(t-1), last year takes the previous value
+        previous_output = np.where(np.real(output_net_of_damage[:, :-1]) > 1e-6, output_net_of_damage[:, :-1], 1e-6)
+        net_output_growth_rate = np.zeros(shape, dtype=dtype)
+        net_output_growth_rate[:, :-1] = ((output_net_of_damage[:, 1:] - previous_output) / previous_output) / \
+            self.time_step
+        net_output_growth_rate[:, -1] = net_output_growth_rate[:, -2]
+
+        return {GlossaryCore.ProductivityGrowthRate: np.broadcast_to(productivity_gr, shape),
+                GlossaryCore.ProductivityWithDamage: productivity_w_damage,
+                GlossaryCore.ProductivityWithoutDamage: productivity_wo_damage,
+                GlossaryCore.Productivity: productivity,
+                GlossaryCore.Capital: capital,
+                GlossaryCore.EnergyEfficiency: np.broadcast_to(energy_efficiency, shape),
+                GlossaryCore.UsableCapitalUnbounded: usable_capital_unbounded,
+                GlossaryCore.UsableCapital: usable_capital,
+                GlossaryCore.GrossOutput: gross_output,
+                GlossaryCore.OutputNetOfDamage: output_net_of_damage,
+                'net_output_growth_rate': net_output_growth_rate}
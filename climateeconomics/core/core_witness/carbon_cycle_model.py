@@ -178,12 +178,18 @@ class CarbonCycle():
     def compute_d_total_emissions(self):
         """
         Compute d_y / d_total_emissions, with y is a column of carboncycle_detail_df
+
+        The three reservoirs follow the linear recurrence X[i] = B @ X[i-1] + E[i-1] * time_step / gtco2_to_gtc on the
+        atmosphere, with B the 3x3 transfer matrix of the b coefficients and a reservoir gradient set to zero on years
+        where its lower bound is reached. The derivatives wrt emissions of all years are propagated together :
+        the block lower triangular system is solved by forward substitution, one row of years at a time
         """
         time_step = self.time_step
         gtco2_to_gtc = self.gtco2_to_gtc
         lo_mat = self.lo_mat
         years = np.arange(self.year_start,
                           self.year_end + 1, self.time_step)
+        nb_years = len(years)
 
         b_eleven = 1.0 - self.b_twelve
         b_twentyone = self.b_twelve * self.conc_atmo / self.conc_upper_strata
@@ -191,79 +197,54 @@ class CarbonCycle():
         b_thirtytwo = self.b_twentythree * self.conc_upper_strata / self.conc_lower_strata
         b_thirtythree = 1.0 - b_thirtytwo
 
-        d_atmoconc_d_totalemissions = np.zeros((len(years), len(years)))
-        d_swallow_d_totalemissions = np.zeros((len(years), len(years)))
-        d_lower_d_totalemissions = np.zeros((len(years), len(years)))
+        d_atmoconc_d_totalemissions = np.zeros((nb_years, nb_years))
+        d_swallow_d_totalemissions = np.zeros((nb_years, nb_years))
+        d_lower_d_totalemissions = np.zeros((nb_years, nb_years))
 
-        atmo_conc = self.carboncycle_df['atmo_conc'] / \
+        atmo_conc = self.carboncycle_df['atmo_conc'].values / \
             self.scale_factor_carbon_cycle
+        # a reservoir stuck on its lower bound is a constant, its gradient is null
+        atmo_not_bounded = np.real(atmo_conc) > lo_mat
+        shallow_not_bounded = np.real(self.carboncycle_df['shallow_ocean_conc'].values) > self.lo_mu
+        lower_not_bounded = np.real(self.carboncycle_df['lower_ocean_conc'].values) > self.lo_ml
+
         #---- initialisation
-        if atmo_conc.values[1] > lo_mat:
+        if atmo_not_bounded[1]:
             d_atmoconc_d_totalemissions[1, 0] = time_step / gtco2_to_gtc
 
-        if atmo_conc.values[2] > lo_mat:
+        if atmo_not_bounded[2]:
             d_atmoconc_d_totalemissions[2, 1] = time_step / gtco2_to_gtc
 
-        if self.carboncycle_df['shallow_ocean_conc'].values[2] > self.lo_mu:
+        if shallow_not_bounded[2]:
             d_swallow_d_totalemissions[2,
                                        0] = time_step / gtco2_to_gtc * self.b_twelve
             d_atmoconc_d_totalemissions[2,
                                         0] = time_step / gtco2_to_gtc * b_eleven
 
-        for i in range(3, len(years)):
-            for j in range(0, i):
-                # if lower ocean conc is not a constant, grad is not null
-                if np.real(self.carboncycle_df['lower_ocean_conc'].values[i]) > self.lo_ml:
-
-                    d_lower_d_totalemissions[i, j] = d_lower_d_totalemissions[i - 1, j] * b_thirtythree + \
-                        d_swallow_d_totalemissions[i - 
-                                                   1, j] * self.b_twentythree
-
-                # if shallow_ocean_conc is not a constant, grad is not null
-                if np.real(self.carboncycle_df['shallow_ocean_conc'].values[i]) > self.lo_mu:
-                    d_swallow_d_totalemissions[i, j] = d_atmoconc_d_totalemissions[i - 1, j] * self.b_twelve + \
-                        d_swallow_d_totalemissions[i - 1, j] * b_twentytwo + \
-                        d_lower_d_totalemissions[i - 1, j] * b_thirtytwo
-
-                # if atmo_conc is not a constant, grad is not null
-                if np.real(atmo_conc.values[i]) > lo_mat:
-                    if j == i - 1:
-                        d_atmoconc_d_totalemissions[i, j] = d_atmoconc_d_totalemissions[i - 1, j] * b_eleven + \
-                            d_swallow_d_totalemissions[i - 1, j] * \
-                            b_twentyone + time_step / gtco2_to_gtc
-                    else:
-                        d_atmoconc_d_totalemissions[i, j] = d_atmoconc_d_totalemissions[i - 1, j] * b_eleven + \
-                            d_swallow_d_totalemissions[i - 1, j] * b_twentyone
-
-            if np.real(atmo_conc.values[i]) == lo_mat:
-                d_atmoconc_d_totalemissions[i, 0] = 0
+        for i in range(3, nb_years):
+            # emissions of year j < i only act on year i through the reservoirs of year i - 1
+            p_atmo = d_atmoconc_d_totalemissions[i - 1, :i]
+            p_swallow = d_swallow_d_totalemissions[i - 1, :i]
+            p_lower = d_lower_d_totalemissions[i - 1, :i]
+            if lower_not_bounded[i]:
+                d_lower_d_totalemissions[i, :i] = p_lower * b_thirtythree + p_swallow * self.b_twentythree
+            if shallow_not_bounded[i]:
+                d_swallow_d_totalemissions[i, :i] = p_atmo * self.b_twelve + p_swallow * b_twentytwo + \
+                    p_lower * b_thirtytwo
+            if atmo_not_bounded[i]:
+                d_atmoconc_d_totalemissions[i, :i] = p_atmo * b_eleven + p_swallow * b_twentyone
+                d_atmoconc_d_totalemissions[i, i - 1] += time_step / gtco2_to_gtc
 
         #-----------
-        cum_total_emissions = self.CO2_emissions_df['cum_total_emissions']
-        d_atmo1850_dtotalemission = np.zeros((len(years), len(years)))
-
-        for i in range(0, len(years)):
-            for j in range(0, len(years)):
-
-                Cte = (
-                    cum_total_emissions[self.year_start + time_step * j] + .000001)
-                d_atmo1850_dtotalemission[j,
-                                          i] = d_atmoconc_d_totalemissions[j, i] / Cte
+        cum_total_emissions = self.CO2_emissions_df['cum_total_emissions'].values
+        d_atmo1850_dtotalemission = d_atmoconc_d_totalemissions / \
+            (cum_total_emissions[:, np.newaxis] + .000001)
 
         #-----------
-        init_cum_total_emissions = self.CO2_emissions_df.at[self.year_start,
-                                                            'cum_total_emissions']
-
-        d_atmotoday_dtotalemission = np.zeros((len(years), len(years)))
-        for i in range(0, len(years)):
-            for j in range(1, len(years)):
-
-                Cte = (cum_total_emissions[self.year_start + 
-                                           time_step * j] - init_cum_total_emissions)
-                d_atmotoday_dtotalemission[j,
-                                           i] = d_atmoconc_d_totalemissions[j, i] / Cte
-
-                d_atmotoday_dtotalemission[0, j] = 0
+        init_cum_total_emissions = cum_total_emissions[0]
+        d_atmotoday_dtotalemission = np.zeros((nb_years, nb_years))
+        d_atmotoday_dtotalemission[1:] = d_atmoconc_d_totalemissions[1:] / \
+            (cum_total_emissions[1:, np.newaxis] - init_cum_total_emissions)
 
         return d_atmoconc_d_totalemissions * self.scale_factor_carbon_cycle, d_lower_d_totalemissions, d_swallow_d_totalemissions, d_atmo1850_dtotalemission, d_atmotoday_dtotalemission
 
@@ -273,25 +254,19 @@ class CarbonCycle():
                           self.year_end + 1, self.time_step)
 
         init_atmo_conc = self.init_conc_atmo
-        init_cum_total_emissions = self.CO2_emissions_df.at[self.year_start,
-                                                            'cum_total_emissions']
-        cum_total_emissions = self.CO2_emissions_df['cum_total_emissions']
+        cum_total_emissions = self.CO2_emissions_df['cum_total_emissions'].values
+        init_cum_total_emissions = cum_total_emissions[0]
 
-        atmo_conc = self.carboncycle_df['atmo_conc']
+        atmo_conc = self.carboncycle_df['atmo_conc'].values
         d_atmo1850_dcumemission = np.zeros((len(years), len(years)))
-
-        for i in range(1, len(years)):
-            d_atmo1850_dcumemission[i, i] = -(atmo_conc[years[i]] - 588.0) / (
-                cum_total_emissions[years[i]] + .000001) ** 2
+        d_atmo1850_dcumemission[1:, 1:] = np.diag(-(atmo_conc[1:] - 588.0) / (
+            cum_total_emissions[1:] + .000001) ** 2)
 
         #-----------
         d_atmotoday_dcumtotalemission = np.zeros((len(years), len(years)))
-        for i in range(1, len(years)):
-            d_atmotoday_dcumtotalemission[i, i] = -(self.carboncycle_df['atmo_conc'][self.year_start + self.time_step * i] - init_atmo_conc) / (
-                cum_total_emissions[self.year_start + self.time_step * i] - init_cum_total_emissions) ** 2
-
-            d_atmotoday_dcumtotalemission[i, 0] = -\
-                d_atmotoday_dcumtotalemission[i, i]
+        d_atmotoday_dcumtotalemission[1:, 1:] = np.diag(-(atmo_conc[1:] - init_atmo_conc) / (
+            cum_total_emissions[1:] - init_cum_total_emissions) ** 2)
+        d_atmotoday_dcumtotalemission[1:, 0] = -np.diag(d_atmotoday_dcumtotalemission)[1:]
 
         return d_atmo1850_dcumemission, d_atmotoday_dcumtotalemission
 
@@ -14,9 +14,7 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 '''
-import numpy as np
-import pandas as pd
-
+from climateeconomics.core.tools.range_validator import RangeValidator
 from climateeconomics.glossarycore import GlossaryCore
 from sostrades_core.execution_engine.sos_wrapp import SoSWrapp
 
@@ -48,6 +46,9 @@ class ClimateEcoDiscipline(SoSWrapp):
     ASSUMPTIONS_DESC_IN = {
         'var_name': 'assumptions_dict', 'type': 'dict', 'default': assumptions_dict_default , 'visibility': 'Shared', 'namespace': GlossaryCore.NS_WITNESS, 'structuring': True, 'unit': '-'}
 
+    # range validators compiled from DESC_IN and DESC_OUT, per discipline class
+    _RANGE_VALIDATORS = {}
+
     # ontology information
     _ontology_data = {
         'label': 'WITNESS Climate Economics Model',
@@ -96,15 +97,25 @@ class ClimateEcoDiscipline(SoSWrapp):
 
     def get_ranges_input_var(self):
         '''
-        Get available ranges of input data.
+        Get the range validator of input data, compiled once per discipline class.
         '''
-        return self.get_ranges_var(self.DESC_IN)
+        return self.get_range_validator('DESC_IN')
 
     def get_ranges_output_var(self):
         '''
-        Get available ranges of output data.
+        Get the range validator of output data, compiled once per discipline class.
+        '''
+        return self.get_range_validator('DESC_OUT')
+
+    def get_range_validator(self, desc_name):
+        '''
+        Get the RangeValidator of the ranges of self.DESC_IN or self.DESC_OUT (desc_name), cached per discipline
+        class so that descriptors are only walked at the first check.
         '''
-        return self.get_ranges_var(self.DESC_OUT)
+        key = (type(self), desc_name)
+        if key not in self._RANGE_VALIDATORS:
+            self._RANGE_VALIDATORS[key] = RangeValidator(self.get_ranges_var(getattr(self, desc_name)))
+        return self._RANGE_VALIDATORS[key]
 
     def get_ranges_var(self, DESC):
         """
@@ -152,42 +163,13 @@ class ClimateEcoDiscipline(SoSWrapp):
 
         Args:
             data (dict): Dictionary with variable values.
-            ranges (dict): Dictionary with possible value ranges for each variable.
+            ranges (RangeValidator or dict): Compiled validator (see get_ranges_input_var) or dictionary with
+                possible value ranges for each variable.
 
         Raises:
-            ValueError: If a variable is outside the specified range.
+            ValueError: If variables are outside their specified range, listing all the violations.
             TypeError: If the variable type is not supported.
         """
-        # Iterate through each variable in the provided data
-        for key, value in data.items():
-            # Check if the variable has a defined range
-            if key in ranges:
-                variable_range = ranges[key]
-                if variable_range is not None:
-                    # If the variable is a nested dictionary, apply recursion
-                    if isinstance(value, dict) and isinstance(variable_range, dict):
-                        # Recursion for nested dictionaries
-                        self.check_ranges(value, variable_range)
-                    # If the variable is of type float or int, check if it is within the specified range
-                    elif isinstance(value, (float, int)):
-                        if not (variable_range[0] <= value <= variable_range[1]):
-                            raise ValueError(
-                                f"The value of '{key}' ({value}) is outside the specified range {variable_range}")
-                    # If the variable is a DataFrame, check each column's values against the specified range
-                    elif isinstance(value, pd.DataFrame):
-                        # Check for DataFrames
-                        for column in value.columns:
-                            column_range = variable_range.get(column)
-                            if column_range:
-                                # Check if all values of the column are in the specified range
-                                if not value[column].between(column_range[0], column_range[1]).all():
-                                    raise ValueError(
-                                        f"The values in column '{column}' of '{key}' are outside the specified range {column_range}. Values={value[column]}")
-                    # If the variable is a NumPy array or a list, check if all values are within the specified range
-                    elif isinstance(value, (np.ndarray, list)):
-                        # Check for arrays
-                        if not np.all(np.logical_and(variable_range[0] <= value, value <= variable_range[1])):
-                            raise ValueError(f"The values of '{key}' are outside the specified range {variable_range}. Value={value}")
-                    # If the variable type is not supported, raise a TypeError
-                    else:
-                        raise TypeError(f"Unsupported type for variable '{key}'")
+        if not isinstance(ranges, RangeValidator):
+            ranges = RangeValidator(ranges)
+        ranges.validate(data)
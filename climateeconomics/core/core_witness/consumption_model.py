@@ -73,6 +73,7 @@ class ConsumptionModel:
             utility_df[key] = 0
         utility_df[GlossaryCore.Years] = years_range
         self.utility_df = utility_df
+        self.nb_years = len(years_range)
         return utility_df
 
     def set_coupling_inputs(self):
@@ -92,99 +93,60 @@ class ConsumptionModel:
         self.residential_energy = self.inputs[GlossaryCore.ResidentialEnergyProductionDfValue]
         self.residential_energy.index = self.residential_energy[GlossaryCore.Years].values
  
-    def compute_consumption(self, year):
-        """Equation for consumption
-        C, Consumption, trillions $USD
-        Args:
-            output: Utility output at t
-            savings: Savings rate at t
+    def compute_utility_arrays(self, net_output, investment, population, energy_price, residential_energy) -> dict:
+        """
+        Compute consumption, per capita consumption, utility discount rate, period utility and discounted utility
+        for all years in one pass, years are on the last axis
+
+        C, Consumption, trillions $USD, lower bounded by lo_conso
+        c, Per capita consumption, thousands $USD, lower bounded by lo_per_capita_conso
+        rr(t) = 1/((1+prstp)**(tstep*(t.val-1)))
+        period utility = ((c**(1-elasmu)-1)/(1-elasmu)-1) * energy_price_ref/energy_price * residential energy ratio
+        discounted utility = period utility * rr(t) * L(t)
         """
-        net_output = self.economics_df.at[year, GlossaryCore.OutputNetOfDamage]
-        investment = self.investment_df.at[year, GlossaryCore.InvestmentsValue]
         consumption = net_output - investment
         # lower bound for conso
-        self.utility_df.loc[year, GlossaryCore.Consumption] = max(
-            consumption, self.lo_conso)
-        return consumption
-
-    def compute_consumption_pc(self, year):
-        """Equation for consumption per capita
-        c, Per capita consumption, thousands $USD
-        """
-        consumption = self.utility_df.at[year, GlossaryCore.Consumption]
-        population = self.population_df.at[year, GlossaryCore.PopulationValue]
+        consumption = np.where(consumption.real < self.lo_conso, self.lo_conso, consumption)
         consumption_pc = consumption / population * 1000
         # Lower bound for pc conso
-        self.utility_df.loc[year, GlossaryCore.PerCapitaConsumption] = max(
-            consumption_pc, self.lo_per_capita_conso)
-        return consumption_pc
+        consumption_pc = np.where(consumption_pc.real < self.lo_per_capita_conso, self.lo_per_capita_conso,
+                                  consumption_pc)
 
-    def compute__u_discount_rate(self, year):
-        """
-        Compute Average utility social discount rate
-         rr(t) = 1/((1+prstp)**(tstep*(t.val-1)));
-        """
-        t = ((year - self.year_start) / self.time_step) + 1
+        t = ((self.years_range - self.year_start) / self.time_step) + 1
         u_discount_rate = 1 / ((1 + self.init_rate_time_pref)
                                ** (self.time_step * (t - 1)))
-        self.utility_df.loc[year, GlossaryCore.UtilityDiscountRate] = u_discount_rate
-        return u_discount_rate
 
-    def compute_period_utility(self, year):
-        """
-        Compute utility for period t per capita
-         Args:
-            :param consumption_pc: per capita consumption
-                    energy_price: energy price 
-                    energy_price_ref
-             :type float
-
-        ((percapitaconso**(1-elasmu)-1)/(1-elasmu)-1)*\
-        energy_price_ref/energy_price   
-
-        """
-
-        # Compute energy price ratio
-        energy_price = self.energy_mean_price.at[year, GlossaryCore.EnergyPriceValue]
         energy_price_ratio = self.energy_price_ref / energy_price
-        residential_energy = self.residential_energy.at[year, GlossaryCore.TotalProductionValue]
         residential_energy_ratio = residential_energy / self.residential_energy_conso_ref
-        pc_consumption = self.utility_df.at[year, GlossaryCore.PerCapitaConsumption]
-        period_utility = (
-            pc_consumption**(1 - self.conso_elasticity) - 1) / (1 - self.conso_elasticity) - 1
+        period_utility = (consumption_pc ** (1 - self.conso_elasticity) - 1) / (1 - self.conso_elasticity) - 1
         # need a limit for period utility because negative period utility is
         # not coherent and reverse gradient of utility vs energy price
-        if period_utility < self.min_period_utility:
-            period_utility = self.min_period_utility / 10.0 * \
-                (9.0 + np.exp(
-                    period_utility /
-                    self.min_period_utility) * np.exp(-1))
-
+        period_utility = np.where(period_utility.real < self.min_period_utility,
+                                  self.min_period_utility / 10.0 * (9.0 + np.exp(
+                                      period_utility / self.min_period_utility) * np.exp(-1)),
+                                  period_utility)
         adjusted_period_utility = period_utility * energy_price_ratio * residential_energy_ratio
-        self.utility_df.loc[year,
-                            GlossaryCore.PeriodUtilityPerCapita] = adjusted_period_utility
-        return period_utility
+        discounted_utility = adjusted_period_utility * u_discount_rate * population
 
-    def compute_discounted_utility(self, year):
-        """
-        period Utility
-        PERIODU_pc(t) * rr(t) * L(t)
-        """
-        period_utility = self.utility_df.at[year, GlossaryCore.PeriodUtilityPerCapita]
-        u_discount_rate = self.utility_df.at[year, GlossaryCore.UtilityDiscountRate]
-        population = self.population_df.at[year, GlossaryCore.PopulationValue]
-        discounted_utility = period_utility * u_discount_rate * population
-        self.utility_df.loc[year, GlossaryCore.DiscountedUtility] = discounted_utility
-        return discounted_utility
+        return {GlossaryCore.Consumption: consumption,
+                GlossaryCore.PerCapitaConsumption: consumption_pc,
+                GlossaryCore.UtilityDiscountRate: u_discount_rate,
+                GlossaryCore.PeriodUtilityPerCapita: adjusted_period_utility,
+                GlossaryCore.DiscountedUtility: discounted_utility}
 
     def compute_welfare(self):  # rescalenose
         """
         Compute welfare
         tstep * scale1 * sum(t,  CEMUTOTPER(t)) + scale2
+        and the min of discounted utility, both reductions are done once in the same pass over discounted utility
         """
-        sum_u = sum(self.utility_df[GlossaryCore.DiscountedUtility])
-        self.utility_df.loc[self.year_end, GlossaryCore.Welfare] = sum_u
-        return sum_u
+        discounted_utility = self.utility_df[GlossaryCore.DiscountedUtility].values
+        self.welfare = discounted_utility.sum()
+        self.min_utility = discounted_utility[np.argmin(discounted_utility.real)]
+        welfare = np.zeros_like(discounted_utility)
+        welfare[-1] = self.welfare
+        self.utility_df[GlossaryCore.Welfare] = welfare
+        return self.welfare
 
     def compute_welfare_objective(self):
         """
@@ -192,22 +154,20 @@ class ConsumptionModel:
         """
         obj_option = self.obj_option
 
-        n_years = len(self.years_range)
+        n_years = self.nb_years
         if obj_option == 'last_utility':
             init_utility = self.init_period_utility_pc
-            last_utility = self.utility_df.at[self.year_end,
-                                              GlossaryCore.PeriodUtilityPerCapita]
+            last_utility = self.utility_df[GlossaryCore.PeriodUtilityPerCapita].values[-1]
             welfare_objective = np.asarray(
                 [self.alpha * init_utility / last_utility, ])
         elif obj_option == GlossaryCore.Welfare:
             init_discounted_utility = self.init_discounted_utility
-            welfare = self.utility_df[GlossaryCore.Welfare][self.year_end]
+            welfare = self.welfare
             # To avoid pb during convergence
-            if welfare / (init_discounted_utility * n_years) < 0.01:
+            if welfare.real / (init_discounted_utility * n_years) < 0.01:
                 welfare = 0.01 + \
                     np.exp(welfare / (init_discounted_utility *
                                       n_years)) * np.exp(-0.02005033585350133)
-            self.welfare = welfare
             welfare_objective = np.asarray(
                 [self.alpha * self.gamma * init_discounted_utility * n_years / welfare, ])
         else:
@@ -218,14 +178,11 @@ class ConsumptionModel:
         """
         Compute welfare objective as - welfare / init_discounted_utility * n_years
         """
-        n_years = len(self.years_range)
+        n_years = self.nb_years
 
         init_discounted_utility = self.init_discounted_utility
-        welfare = self.utility_df[GlossaryCore.Welfare][self.year_end]
-
-        self.welfare = welfare
         welfare_objective = np.asarray(
-            [ - welfare / (init_discounted_utility * n_years)])
+            [ - self.welfare / (init_discounted_utility * n_years)])
         return welfare_objective
 
     def compute_min_utility_objective(self):
@@ -233,9 +190,9 @@ class ConsumptionModel:
         Objective function: inputs : alpha, gamma and discounted_utility_ref
         """
         init_discounted_utility = self.init_discounted_utility
-        min_utility = min(list(self.utility_df[GlossaryCore.DiscountedUtility].values))
+        min_utility = self.min_utility
         # To avoid pb during convergence
-        if min_utility / init_discounted_utility < 0.01:
+        if min_utility.real / init_discounted_utility < 0.01:
             min_utility = 0.01 + \
                 np.exp(min_utility / init_discounted_utility) * \
                 np.exp(-0.02005033585350133)
@@ -245,11 +202,21 @@ class ConsumptionModel:
 
     ######### GRADIENTS ########
 
-    def compute_gradient(self):
+    def last_year_jacobian(self, values):
+        """
+        Jacobian block of welfare, which is only filled at year end, with values on its last row
+        """
+        values = np.asarray(values)
+        jacobian = np.zeros((self.nb_years, self.nb_years), dtype=values.dtype)
+        jacobian[-1] = values
+        return jacobian
 
-        years = np.arange(self.year_start,
-                          self.year_end + 1, self.time_step)
-        nb_years = len(years)
+    def compute_gradient(self):
+        """
+        Gradients of per capita consumption, period utility, discounted utility and welfare wrt net output,
+        investment and population. Each year only depends on inputs of the same year : blocks are diagonals
+        (welfare : last row), built from vectors
+        """
         population = self.population_df[GlossaryCore.PopulationValue].values
         consumption = self.utility_df[GlossaryCore.Consumption].values
         pc_consumption = self.utility_df[GlossaryCore.PerCapitaConsumption].values
@@ -257,110 +224,65 @@ class ConsumptionModel:
         u_discount_rate = self.utility_df[GlossaryCore.UtilityDiscountRate].values
         period_utility_pc = self.utility_df[GlossaryCore.PeriodUtilityPerCapita].values
         residential_energy = self.residential_energy[GlossaryCore.TotalProductionValue].values
-        # compute gradient
-        d_welfare_d_output_net_of_d = np.zeros((nb_years, nb_years))
-        d_welfare_d_investment = np.zeros((nb_years, nb_years))
-        d_welfare_d_population = np.zeros((nb_years, nb_years))
-
-        d_consumption_d_output_net_of_d = np.identity(nb_years)
-        # find index where lower bound reached
-        theyears = np.where(consumption == self.lo_conso)[0]
-        # Then for these years derivative = 0
-        d_consumption_d_output_net_of_d[theyears] = 0
-
-        d_pc_consumption_d_output_net_of_d = d_consumption_d_output_net_of_d / population * 1000
-        theyears = np.where(pc_consumption == self.lo_per_capita_conso)[0]
-        d_pc_consumption_d_output_net_of_d[theyears] = 0
 
-        #For investment
-        d_consumption_d_invest = - np.identity(nb_years)
-        d_consumption_d_invest[theyears] = 0
-
-        d_pc_consumption_d_investment = d_consumption_d_invest/ population * 1000
-        theyears = np.where(pc_consumption == self.lo_per_capita_conso)[0]
-        d_pc_consumption_d_output_net_of_d[theyears] = 0
-
-        d_pc_consumption_d_population = -1 * consumption / (population * population) * 1000 * np.identity(nb_years)
-        theyears = np.where(pc_consumption == self.lo_per_capita_conso)[0]
-        d_pc_consumption_d_population[theyears] = 0
+        # derivatives are null where lower bounds are reached
+        conso_bounded = consumption == self.lo_conso
+        pc_conso_bounded = pc_consumption == self.lo_per_capita_conso
+        d_consumption_d_output_net_of_d = np.where(conso_bounded, 0., 1.)
+        d_pc_consumption_d_output_net_of_d = np.where(pc_conso_bounded, 0.,
+                                                      d_consumption_d_output_net_of_d / population * 1000)
+        d_pc_consumption_d_investment = - d_pc_consumption_d_output_net_of_d
+        d_pc_consumption_d_population = np.where(pc_conso_bounded, 0.,
+                                                 -1 * consumption / (population * population) * 1000)
 
         period_utility = (pc_consumption**(1 - self.conso_elasticity) - 1) / (1 - self.conso_elasticity) - 1
-        theyears = np.where(period_utility < self.min_period_utility)[0]
-
-        d_period_utility_pc_d_output_net_of_d = d_pc_consumption_d_output_net_of_d * pc_consumption ** (- self.conso_elasticity) * \
+        d_period_utility_d_pc_consumption = pc_consumption ** (- self.conso_elasticity) * \
             self.energy_price_ref / energy_price * residential_energy / self.residential_energy_conso_ref
         #limit min period utility
-        d_period_utility_pc_d_output_net_of_d[theyears] = d_period_utility_pc_d_output_net_of_d[theyears] * self.min_period_utility / 10. * \
-            (np.exp(period_utility / self.min_period_utility) * np.exp(-1)) / self.min_period_utility
+        d_period_utility_d_pc_consumption = np.where(
+            period_utility < self.min_period_utility,
+            d_period_utility_d_pc_consumption * self.min_period_utility / 10. *
+            (np.exp(period_utility / self.min_period_utility) * np.exp(-1)) / self.min_period_utility,
+            d_period_utility_d_pc_consumption)
 
-        d_period_utility_pc_d_investment = d_pc_consumption_d_investment * pc_consumption ** (- self.conso_elasticity) * \
-            self.energy_price_ref / energy_price * residential_energy / self.residential_energy_conso_ref
-        d_period_utility_pc_d_investment[theyears] = d_period_utility_pc_d_investment[theyears] * self.min_period_utility / 10. * \
-            (np.exp(period_utility / self.min_period_utility) * np.exp(-1)) / self.min_period_utility
-
-        d_period_utility_d_population = d_pc_consumption_d_population * pc_consumption ** (- self.conso_elasticity) * \
-            self.energy_price_ref / energy_price * residential_energy / self.residential_energy_conso_ref
-        d_period_utility_d_population[theyears] = d_period_utility_d_population[theyears] * self.min_period_utility / 10. * \
-            (np.exp(period_utility / self.min_period_utility) * np.exp(-1)) / self.min_period_utility
+        d_period_utility_pc_d_output_net_of_d = d_pc_consumption_d_output_net_of_d * d_period_utility_d_pc_consumption
+        d_period_utility_pc_d_investment = d_pc_consumption_d_investment * d_period_utility_d_pc_consumption
+        d_period_utility_d_population = d_pc_consumption_d_population * d_period_utility_d_pc_consumption
 
         d_discounted_utility_d_output_net_of_d = d_period_utility_pc_d_output_net_of_d * u_discount_rate * population
         d_discounted_utility_d_investment = d_period_utility_pc_d_investment * u_discount_rate * population
         d_discounted_utility_d_population = d_period_utility_d_population * u_discount_rate * population + \
-            period_utility_pc  * u_discount_rate * np.identity(nb_years)
-        d_welfare_d_output_net_of_d[nb_years - 1] = d_discounted_utility_d_output_net_of_d.diagonal()
-        d_welfare_d_investment[nb_years - 1] = d_discounted_utility_d_investment.diagonal()
-        d_welfare_d_population[nb_years - 1] = d_discounted_utility_d_population.diagonal()
+            period_utility_pc * u_discount_rate
 
-        return d_pc_consumption_d_output_net_of_d, d_pc_consumption_d_investment, d_pc_consumption_d_population, \
-            d_period_utility_pc_d_output_net_of_d, d_period_utility_pc_d_investment, d_period_utility_d_population, \
-            d_discounted_utility_d_output_net_of_d, d_discounted_utility_d_investment, d_discounted_utility_d_population, \
-            d_welfare_d_output_net_of_d, d_welfare_d_investment, d_welfare_d_population
+        return np.diag(d_pc_consumption_d_output_net_of_d), np.diag(d_pc_consumption_d_investment), \
+            np.diag(d_pc_consumption_d_population), np.diag(d_period_utility_pc_d_output_net_of_d), \
+            np.diag(d_period_utility_pc_d_investment), np.diag(d_period_utility_d_population), \
+            np.diag(d_discounted_utility_d_output_net_of_d), np.diag(d_discounted_utility_d_investment), \
+            np.diag(d_discounted_utility_d_population), self.last_year_jacobian(d_discounted_utility_d_output_net_of_d), \
+            self.last_year_jacobian(d_discounted_utility_d_investment), self.last_year_jacobian(d_discounted_utility_d_population)
 
     def compute_gradient_energy_mean_price(self):
-        years = np.arange(self.year_start,
-                          self.year_end + 1, self.time_step)
-        nb_years = len(years)
-        d_period_utility_d_energy_price = np.zeros((nb_years, nb_years))
-        d_discounted_utility_d_energy_price = np.zeros((nb_years, nb_years))
-        d_welfare_d_energy_price = np.zeros((nb_years, nb_years))
-
         population = self.population_df[GlossaryCore.PopulationValue].values
         u_discount_rate = self.utility_df[GlossaryCore.UtilityDiscountRate].values
         energy_price = self.energy_mean_price[GlossaryCore.EnergyPriceValue].values
 
-        d_period_utility_d_energy_price = - 1.0 * \
-            np.identity(nb_years) * \
-            self.utility_df[GlossaryCore.PeriodUtilityPerCapita].values / energy_price
-
-        d_discounted_utility_d_energy_price = d_period_utility_d_energy_price * \
-            u_discount_rate * population
+        d_period_utility_d_energy_price = - 1.0 * self.utility_df[GlossaryCore.PeriodUtilityPerCapita].values / energy_price
+        d_discounted_utility_d_energy_price = d_period_utility_d_energy_price * u_discount_rate * population
 
-        d_welfare_d_energy_price[nb_years - 1,
-                                 ] = d_discounted_utility_d_energy_price.diagonal()
-
-        return d_period_utility_d_energy_price, d_discounted_utility_d_energy_price, d_welfare_d_energy_price
+        return np.diag(d_period_utility_d_energy_price), np.diag(d_discounted_utility_d_energy_price), \
+            self.last_year_jacobian(d_discounted_utility_d_energy_price)
 
     def compute_gradient_residential_energy(self):
-        years = np.arange(self.year_start,
-                          self.year_end + 1, self.time_step)
-        nb_years = len(years)
-        d_period_utility_d_residential_energy = np.zeros((nb_years, nb_years))
-        d_discounted_utility_d_residential_energy = np.zeros((nb_years, nb_years))
-        d_welfare_d_residential_energy = np.zeros((nb_years, nb_years))
-
         population = self.population_df[GlossaryCore.PopulationValue].values
         u_discount_rate = self.utility_df[GlossaryCore.UtilityDiscountRate].values
         residential_energy = self.residential_energy[GlossaryCore.TotalProductionValue].values
 
-        d_period_utility_d_residential_energy = self.utility_df[GlossaryCore.PeriodUtilityPerCapita].values / residential_energy * np.identity(nb_years)
-
-        d_discounted_utility_d_residential_energy = d_period_utility_d_residential_energy * \
-            u_discount_rate * population
+        d_period_utility_d_residential_energy = self.utility_df[GlossaryCore.PeriodUtilityPerCapita].values / residential_energy
+        d_discounted_utility_d_residential_energy = d_period_utility_d_residential_energy * u_discount_rate * population
 
-        d_welfare_d_residential_energy[nb_years - 1,
-                                 ] = d_discounted_utility_d_residential_energy.diagonal()
-
-        return d_period_utility_d_residential_energy, d_discounted_utility_d_residential_energy, d_welfare_d_residential_energy
+        return np.diag(d_period_utility_d_residential_energy), \
+            np.diag(d_discounted_utility_d_residential_energy), \
+            self.last_year_jacobian(d_discounted_utility_d_residential_energy)
 
     def compute_gradient_objective(self):
         """
@@ -368,35 +290,31 @@ class ConsumptionModel:
         if obj_option = 'welfare :  alpha*init_discounted_utility*n_years/welfare
             if welfare < 1 : : alpha*initdiscounted_utility * n_years/ 
             (0.01+ np.exp(welfare/init_discounted_utility*n_years)*np.exp(-0.02005033585350133)) 
+        Both objectives only depend on year end values : gradients are one-hot vectors on the last year
         """
-        years = self.years_range
         period_utility_pc_0 = self.init_period_utility_pc
-        period_utility_pc_end = self.utility_df.at[self.year_end,
-                                                   GlossaryCore.PeriodUtilityPerCapita]
+        period_utility_pc_end = self.utility_df[GlossaryCore.PeriodUtilityPerCapita].values[-1]
         init_discounted_utility = self.init_discounted_utility
+        n_years = self.nb_years
 
-        n_years = len(years)
-
-        d_obj_d_period_utility_pc = np.zeros(len(years))
-        d_obj_d_welfare = np.zeros(len(years))
+        d_obj_d_period_utility_pc = np.zeros(n_years)
+        d_obj_d_welfare = np.zeros(n_years)
 
         if self.obj_option == 'last_utility':
             d_obj_d_period_utility_pc[-1] = -1.0 * self.alpha * \
                 period_utility_pc_0 / (period_utility_pc_end)**2
 
         elif self.obj_option == GlossaryCore.Welfare:
-            welfare = self.utility_df[GlossaryCore.Welfare][self.year_end]
+            welfare = self.welfare
             if welfare / (init_discounted_utility * n_years) < 0.01:
-                mask = np.append(np.zeros(len(years) - 1), np.array(1))
                 f_prime = (1 / (init_discounted_utility * n_years)) * np.exp(welfare /
                                                                              (init_discounted_utility * n_years)) * np.exp(-0.02005033585350133)
                 f_squared = (0.01 + np.exp(welfare / (init_discounted_utility *
                                                       n_years)) * np.exp(-0.02005033585350133))**2
-                d_obj_d_welfare = mask * self.alpha * self.gamma *\
+                d_obj_d_welfare[-1] = self.alpha * self.gamma *\
                     init_discounted_utility * n_years * (-f_prime / f_squared)
             else:
-                mask = np.append(np.zeros(len(years) - 1), np.array(1))
-                d_obj_d_welfare = -1.0 * mask * self.alpha * self.gamma *\
+                d_obj_d_welfare[-1] = -1.0 * self.alpha * self.gamma *\
                     init_discounted_utility * n_years / welfare**2
 
         else:
@@ -410,32 +328,23 @@ class ConsumptionModel:
         welfare = welfare / init_discounted_utility*n_years
 
         """
-        years = self.years_range
-        init_discounted_utility = self.init_discounted_utility
-
-        n_years = len(years)
-
-        d_obj_d_period_utility_pc = np.zeros(len(years))
-        d_obj_d_welfare = np.zeros(len(years))
-
-        mask = np.append(np.zeros(len(years) - 1), np.array(1))
-        d_obj_d_welfare = -1.0 * mask /  (init_discounted_utility * n_years)
+        d_obj_d_period_utility_pc = np.zeros(self.nb_years)
+        d_obj_d_welfare = np.zeros(self.nb_years)
+        d_obj_d_welfare[-1] = -1.0 / (self.init_discounted_utility * self.nb_years)
 
         return d_obj_d_welfare, d_obj_d_period_utility_pc
 
     def compute_gradient_min_utility_objective(self):
         """
-
+        The min of discounted utility only depends on the years reaching it : its gradient is a one-hot vector
         """
-        years = self.years_range
         init_discounted_utility = self.init_discounted_utility
 
-        d_obj_d_period_utility_pc = np.zeros(len(years))
-        d_obj_d_discounted_utility = np.zeros(len(years))
+        d_obj_d_period_utility_pc = np.zeros(self.nb_years)
 
-        min_utility = min(list(self.utility_df[GlossaryCore.DiscountedUtility].values))
-        d_min_utility_d_discounted_utility = np.asarray([1.0 if (val == min_utility) else 0. for val in list(
-            self.utility_df[GlossaryCore.DiscountedUtility].values)], dtype=float)
+        min_utility = self.min_utility
+        d_min_utility_d_discounted_utility = np.asarray(
+            self.utility_df[GlossaryCore.DiscountedUtility].values == min_utility, dtype=float)
         if min_utility / init_discounted_utility < 0.01:
 
             f_prime = d_min_utility_d_discounted_utility * (1 / init_discounted_utility) * np.exp(min_utility /
@@ -456,12 +365,13 @@ class ConsumptionModel:
         self.inputs = inputs
         self.set_coupling_inputs()
 
-        for year in self.years_range:
-            self.compute_consumption(year)
-            self.compute_consumption_pc(year)
-            self.compute__u_discount_rate(year)
-            self.compute_period_utility(year)
-            self.compute_discounted_utility(year)
+        utility = self.compute_utility_arrays(self.economics_df[GlossaryCore.OutputNetOfDamage].values,
+                                              self.investment_df[GlossaryCore.InvestmentsValue].values,
+                                              self.population_df[GlossaryCore.PopulationValue].values,
+                                              self.energy_mean_price[GlossaryCore.EnergyPriceValue].values,
+                                              self.residential_energy[GlossaryCore.TotalProductionValue].values)
+        for column, values in utility.items():
+            self.utility_df[column] = values
         self.compute_welfare()
 
         return self.utility_df
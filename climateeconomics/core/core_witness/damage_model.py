@@ -17,6 +17,7 @@ limitations under the License.
 import numpy as np
 import pandas as pd
 
+from climateeconomics.core.tools.jacobian_tools import banded_jacobian
 from climateeconomics.glossarycore import GlossaryCore
 
 
@@ -60,6 +61,7 @@ class DamageModel:
         self.temperature_df = None
         self.extra_gigatons_co2eq_since_pre_indus_df = None
         self.total_emissions_ref = self.param['total_emissions_damage_ref']
+        self.co2_damage_price_window = self.param['co2_damage_price_window']
 
         self.damage_fraction_df = pd.DataFrame(index=self.years_range, data={
             GlossaryCore.Years: self.years_range,
@@ -71,16 +73,30 @@ class DamageModel:
         """
         Compute damages fraction of output at t
         using variables at t
+        """
+        temp_atmo = self.temperature_df[GlossaryCore.TempAtmo].values
+        self.damage_fraction_df[GlossaryCore.DamageFractionOutput] = self.compute_damage_fraction_arrays(temp_atmo)
+
+    def compute_damage_fraction_arrays(self, temp_atmo: np.ndarray) -> np.ndarray:
+        """
+        Compute damages fraction of output from the atmosphere temperature, which can have leading scenario axes
         If tipping point = True : Martin Weitzman damage function.
         """
-        temp_atmo = self.temperature_df[GlossaryCore.TempAtmo]
-        temp_atmo = temp_atmo.clip(0.0)
+        temp_atmo = np.where(temp_atmo.real < 0.0, 0.0, temp_atmo)
         if self.tipping_point_model:
             dam = (temp_atmo / self.tp_a1)**self.tp_a2 + (temp_atmo / self.tp_a3)**self.tp_a4
             damage_frac_output = 1 - (1 / (1 + dam))
         else:
             damage_frac_output = self.damag_int * temp_atmo + self.damag_quad * temp_atmo**self.damag_expo
-        self.damage_fraction_df[GlossaryCore.DamageFractionOutput] = damage_frac_output.values
+        return damage_frac_output
+
+    def compute_scenarios(self, temp_atmo: np.ndarray) -> dict:
+        """
+        Compute the damages of a batch of temperature scenarios in one call, without dataframes.
+        Temperatures are arrays of shape (n_scenarios, n_years), damage fractions of output are returned
+        with the same shape, indexed by their damage_fraction_df column name
+        """
+        return {GlossaryCore.DamageFractionOutput: self.compute_damage_fraction_arrays(np.atleast_2d(temp_atmo))}
 
     def compute_CO2_damage_price_dev(self):
         """
@@ -132,23 +148,29 @@ class DamageModel:
 
         return ddamage_frac_output_temp_atmo
 
+    def compute_co2_damage_price_windows(self):
+        """
+        Number of years of damages averaged in the CO2 damage price of each year : the window of
+        co2_damage_price_window years starting at the year, shortened at the end of the scenario.
+        Last year only uses its own damages.
+        """
+        window_lengths = np.minimum(self.co2_damage_price_window, self.year_end - self.years_range)
+        window_lengths = np.minimum(window_lengths, len(self.years_range) - np.arange(len(self.years_range)))
+        return np.maximum(window_lengths, 1)
+
     def d_co2_damage_price_d_damages(self):
         '''
         Compute gradient of constraint wrt temp_atmo and economics
+        Each year depends on the damages of its window of years, the gradient is banded above the diagonal
         '''
-        years = np.arange(self.year_start, self.year_end + 1, self.time_step)
-        nb_years = len(years)
-        d_co2_damage_price_d_damages = np.zeros((nb_years, nb_years))
-
-        for i, year in enumerate(years):
-            if year == self.year_end:
-                d_co2_damage_price_d_damages[i, i] = 1e3 * 1.01 ** i / self.total_emissions_ref
-            else:
-                k = max(year + 25 - self.year_end, 0)
-                for j in range(0, 25 - k):
-                    d_co2_damage_price_d_damages[i, i + j] = 1e3 * 1.01 ** i / (25 - k) / self.total_emissions_ref
+        nb_years = len(self.years_range)
+        window_lengths = self.compute_co2_damage_price_windows()
+        d_mean_d_damages = 1e3 * 1.01 ** np.arange(nb_years) / window_lengths / self.total_emissions_ref
+        offsets = list(range(window_lengths.max()))
+        bands = [np.where(offset < window_lengths[:nb_years - offset], d_mean_d_damages[:nb_years - offset], 0.)
+                 for offset in offsets]
 
-        return d_co2_damage_price_d_damages
+        return banded_jacobian(bands, offsets)
 
     def d_co2_damage_price_dev_d_user_input(self, d_co2_extra_ton_damage_price_d_user_input):
         '''
@@ -187,27 +209,18 @@ class DamageModel:
         """
         Compute CO2 tax - CO2 damage constraint:
                  CO2 tax - fact * CO2_damage_price  > 0
-            with CO2_damage_price[year] = 1e3 * 1.01**(year_start-year) * mean(damage_df[year:year+25] (T$)) / total_emissions_ref (Gt)
+            with CO2_damage_price[year] = 1e3 * 1.01**(year_start-year) * mean(damage_df[year:year+window] (T$)) / total_emissions_ref (Gt)
+        The moving means are differences of the cumulated damages.
         """
-        if 'complex128' in [self.damage_fraction_df[GlossaryCore.DamageFractionOutput].values.dtype]:
-            arr_type = 'complex128'
-        else:
-            arr_type = 'float64'
-
-        co2_damage_price = np.zeros(
-            len(self.damage_fraction_df.index), dtype=arr_type)
-
-        damages = self.damage_df[GlossaryCore.EstimatedDamages].values.tolist()
-
-        for i, year in enumerate(self.damage_fraction_df.index):
-
-            if year == self.year_end:
-                co2_damage_price[i] = 1e3 * 1.01 ** i * \
-                                      damages[i] / self.total_emissions_ref
-            else:
-                k = max(year + 25 - self.year_end, 0)
-                co2_damage_price[i] = 1e3 * 1.01 ** i * \
-                                      np.mean(damages[i:i + 25 - k]) / self.total_emissions_ref
+        damages = self.damage_df[GlossaryCore.EstimatedDamages].values
+        window_lengths = self.compute_co2_damage_price_windows()
+        window_starts = np.arange(len(damages))
+
+        cumulated_damages = np.zeros(len(damages) + 1, dtype=np.result_type(damages, np.float64))
+        cumulated_damages[1:] = np.cumsum(damages)
+        mean_damages = (cumulated_damages[window_starts + window_lengths] - cumulated_damages[window_starts]) / \
+            window_lengths
+        co2_damage_price = 1e3 * 1.01 ** window_starts * mean_damages / self.total_emissions_ref
 
         self.co2_damage_price_df = pd.DataFrame(
             {GlossaryCore.Years: self.years_range,
@@ -18,7 +18,9 @@ from typing import Union
 
 import numpy as np
 import pandas as pd
+from scipy.signal import lfilter
 
+from climateeconomics.core.tools.jacobian_tools import impulse_response_matrix
 from climateeconomics.glossarycore import GlossaryCore
 
 
@@ -109,30 +111,30 @@ class GHGCycle():
         self.ghg_cycle_df[GlossaryCore.CH4Concentration] = self.init_conc_ch4
         self.ghg_cycle_df[GlossaryCore.N2OConcentration] = self.init_conc_n2o
 
-    def compute_co2_atm_conc(self, year, boxes):
+    def compute_co2_boxes(self, co2_emissions: np.ndarray) -> np.ndarray:
         """
-        computes CO2 concentrations in atmosphere in ppm at t following FUND pyworld3
+        computes CO2 concentrations in the five atmosphere boxes in ppm following FUND pyworld3
+        emissions can have leading scenario axes, the boxes are stacked on a first axis
+
+        each box is the linear recurrence b[i] = decay * b[i - 1] + 0.000471 * em_ratio * E[i] started from its
+        initial concentration, solved for all years at once as a causal filter of the emissions
         """
-        emissions = self.ghg_emissions_df.loc[self.ghg_emissions_df[GlossaryCore.Years] == year, GlossaryCore.TotalCO2Emissions].values[0] * 1e3     # in MtCO2
-        boxes_tmp = [decay*box_conc + 0.000471*em_ratio*emissions for (decay, box_conc, em_ratio) in zip(self.decays, boxes, self.em_ratios)]
-        boxes = boxes_tmp
-        for i in [1, 2, 3, 4, 5]:
-            self.ghg_cycle_df.loc[self.ghg_cycle_df[GlossaryCore.Years] == year, f'co2_ppm_b{i}'] = boxes[i-1]
+        emissions = np.array(co2_emissions * 1e3, dtype=np.result_type(co2_emissions, np.float64))  # in MtCO2
+        # first year is from initial data
+        emissions[..., 0] = 0.
+        boxes = np.zeros((len(self.decays),) + emissions.shape, dtype=emissions.dtype)
+        for box, (decay, em_ratio, init_conc) in enumerate(zip(self.decays, self.em_ratios, self.boxes_conc)):
+            boxes[box] = lfilter([0.000471 * em_ratio], [1., -decay], emissions, axis=-1,
+                                 zi=np.full(emissions.shape[:-1] + (1,), init_conc))[0]
 
         return boxes
 
     def compute_dco2_ppm_d_emissions(self):
         """
         computes derivative of co2_ppm with respect to CO2 emissions
+        co2_ppm is the first box, d co2_ppm[i] / d E[j] = 0.000471 * em_ratio * 1e3 * decay ** (i - j) for i >= j
         """
-
-        coeff = 0.000471*self.em_ratios[0] * 1e3
-        decay = self.decays[0]
-        mat = np.diag(coeff*np.ones(len(self.years_range)))
-
-        for i in np.arange(1, len(self.years_range-1)):
-            coeff = coeff*decay
-            mat += np.diag(coeff*np.ones(len(self.years_range)-i), -i)
+        mat = impulse_response_matrix([self.decays[0]], [0.000471 * self.em_ratios[0] * 1e3], len(self.years_range))
 
         # first year is from initial data and is fixed ==> grad is zero
         mat[:, 0] = 0.0
@@ -210,6 +212,34 @@ class GHGCycle():
         self.compute_minimum_ppm_limit_constraint()
         self.compute_extra_CO2_eq_Gt()
 
+    def compute_scenarios(self, co2_emissions: np.ndarray, ch4_emissions: np.ndarray,
+                          n2o_emissions: np.ndarray) -> dict:
+        """
+        Compute the concentrations of a batch of emission scenarios in one call, without dataframes.
+        Emissions are arrays of shape (n_scenarios, n_years) (a single year axis is broadcast to all scenarios),
+        concentrations are returned with the same shape, indexed by their ghg_cycle_df column name
+        """
+        co2_emissions, ch4_emissions, n2o_emissions = np.broadcast_arrays(
+            *[np.atleast_2d(emissions) for emissions in (co2_emissions, ch4_emissions, n2o_emissions)])
+
+        co2_concentrations = self.compute_co2_boxes(co2_emissions)[0]
+        # clip value to 0 if negative
+        co2_concentrations[co2_concentrations.real < 0] = 1e-10
+        ch4_concentrations = self._forecast_concentration(conc_init=self.init_conc_ch4,
+                                                          decay_rate=self.decay_ch4,
+                                                          conc_pre_indus=self.pre_indus_conc_ch4,
+                                                          emissions_to_pp=self.gt_to_pp[GlossaryCore.CH4],
+                                                          emissions=ch4_emissions)
+        n2o_concentrations = self._forecast_concentration(conc_init=self.init_conc_n2o,
+                                                          decay_rate=self.decay_n2o,
+                                                          conc_pre_indus=self.pre_indus_conc_n2o,
+                                                          emissions_to_pp=self.gt_to_pp[GlossaryCore.N2O],
+                                                          emissions=n2o_emissions)
+
+        return {GlossaryCore.CO2Concentration: co2_concentrations,
+                GlossaryCore.CH4Concentration: ch4_concentrations,
+                GlossaryCore.N2OConcentration: n2o_concentrations}
+
     def total_co2_equivalent(self,
                              co2_conc: Union[float, pd.Series],
                              ch4_conc: Union[float, pd.Series],
@@ -283,11 +313,11 @@ class GHGCycle():
         self.global_warming_potential_df = global_warming_potential_df
 
     def compute_concentration_co2(self):
-        conc_boxes = self.boxes_conc
-        for year in self.years_range[1:]:
-            conc_boxes = self.compute_co2_atm_conc(year, conc_boxes)
+        boxes = self.compute_co2_boxes(self.ghg_emissions_df[GlossaryCore.TotalCO2Emissions].values)
+        for i in [1, 2, 3, 4, 5]:
+            self.ghg_cycle_df[f'co2_ppm_b{i}'] = boxes[i-1]
         # clip value to 0 if negative
-        self.ppm_co2_negative_indexes = self.ghg_cycle_df.index[self.ghg_cycle_df['co2_ppm_b1'] < 0].tolist()
+        self.ppm_co2_negative_indexes = self.ghg_cycle_df.index[boxes[0].real < 0].tolist()
         self.ghg_cycle_df.loc[self.ppm_co2_negative_indexes, f'co2_ppm_b1'] = 1e-10
         self.ghg_cycle_df[GlossaryCore.CO2Concentration] = self.ghg_cycle_df[f'co2_ppm_b1']
 
@@ -315,26 +345,29 @@ class GHGCycle():
                                 emissions_to_pp: float, emissions: np.ndarray):
 
         # C(t+1) = C(t) + E(t) * E_to_ppm - decay_rate * (C(t) - Cpreindus)
-        conc = conc_init
-        concentrations = [conc]
-        for year, emission_year in zip(self.years_range, emissions):
-            conc += emission_year * emissions_to_pp - decay_rate * (conc - conc_pre_indus)
-            concentrations.append(conc)
+        # the excess over pre-industrial concentration is a first order recurrence driven by the emissions of the
+        # previous year, solved as a causal filter. emissions can have leading scenario axes, years are on the last one
+        shifted_emissions = np.zeros(emissions.shape, dtype=np.result_type(emissions, np.float64))
+        shifted_emissions[..., 1:] = emissions[..., :-1]
+        excess_conc = lfilter([emissions_to_pp], [1., -(1 - decay_rate)], shifted_emissions, axis=-1,
+                              zi=np.full(emissions.shape[:-1] + (1,), conc_init - conc_pre_indus))[0]
+        concentrations = excess_conc + conc_pre_indus
+        concentrations[..., 0] = conc_init
 
-        return np.array(concentrations[:-1])
+        return concentrations
 
     def d_conc_d_emission(self, decay_rate: float, emissions_to_pp: float):
         """
         C(t+1) = C(t) + E(t) * E_to_ppm - decay_rate * (C(t) - Cpreindus)
         So for derivative :
         d C[j] / d E[i] = d (C[j-1] + E[j-1] * E_to_ppm - decay_rate * C[j-1]) / d E[i]
-		                = (1 - decay_rate) * (d C[j-1] / d E[i]) + E_to_ppm * (j-1 == i)
+                        = (1 - decay_rate) * (d C[j-1] / d E[i]) + E_to_ppm * (j-1 == i)
+        ie d C[j] / d E[i] = E_to_ppm * (1 - decay_rate) ** (j - 1 - i) for j > i : the impulse response of the
+        recurrence, shifted by one year
         """
         n_years = len(self.years_range)
         d_conc_d_emissions = np.zeros((n_years, n_years))
-        for i in range(1, n_years):
-            d_conc_d_emissions[i] = (1 - decay_rate) * d_conc_d_emissions[i - 1]
-            d_conc_d_emissions[i, i-1] += emissions_to_pp
+        d_conc_d_emissions[1:, :-1] = impulse_response_matrix([1 - decay_rate], [emissions_to_pp], n_years - 1)
 
         return d_conc_d_emissions
 
@@ -345,4 +378,3 @@ class GHGCycle():
     def d_conc_n2o_d_emissions(self):
         return self.d_conc_d_emission(decay_rate=self.decay_n2o,
                                       emissions_to_pp=self.gt_to_pp[GlossaryCore.N2O])
-
@@ -17,6 +17,7 @@ limitations under the License.
 import numpy as np
 import pandas as pd
 
+from climateeconomics.core.tools.jacobian_tools import lower_triangular_cumprod
 from climateeconomics.glossarycore import GlossaryCore
 
 
@@ -106,8 +107,12 @@ class MacroEconomics:
         self.dict_sectors_detailed = None
         self.usable_capital_objective = None
         self.usable_capital_objective_ref = None
+        self.economics_arrays = None
+        self.capital_arrays = None
+        self.workforce_arrays = None
+        self.damage_arrays = None
         self.set_data()
-        self.create_dataframe()
+        self.create_arrays()
 
     def set_data(self):
         self.year_start = self.param[GlossaryCore.YearStart]
@@ -167,83 +172,45 @@ class MacroEconomics:
         self.consommation_objective_ref = self.param[GlossaryCore.ConsumptionObjectiveRefValue]
 
 
-    def create_dataframe(self):
-        """Create the dataframe and fill it with values at year_start"""
-        default_index = np.arange(
-            self.year_start, self.year_end + 1, self.time_step)
-        param = self.param
-        economics_df = pd.DataFrame(
-            index=default_index,
-            columns=list(GlossaryCore.EconomicsDetailDf['dataframe_descriptor'].keys()))
-
-        for key in economics_df.keys():
-            economics_df[key] = 0
-        economics_df[GlossaryCore.Years] = self.years_range
-        economics_df.loc[param[GlossaryCore.YearStart],
-                         GlossaryCore.GrossOutput] = self.init_gross_output
-        economics_df.loc[param[GlossaryCore.YearStart],
-                         GlossaryCore.Productivity] = self.productivity_start
-        economics_df.loc[param[GlossaryCore.YearStart],
-                         GlossaryCore.ProductivityWithDamage] = self.productivity_start
-        economics_df.loc[param[GlossaryCore.YearStart],
-                         GlossaryCore.ProductivityWithoutDamage] = self.productivity_start
-        economics_df.loc[param[GlossaryCore.YearStart],
-                         GlossaryCore.ProductivityGrowthRate] = self.productivity_gr_start
-        economics_df.loc[param[GlossaryCore.YearStart],
-                         GlossaryCore.OutputGrowth] = self.init_output_growth
-#         economics_df['saving_rate'] = self.saving_rate
-        self.economics_df = economics_df
-        self.economics_df = self.economics_df.replace(
-            [np.inf, -np.inf], np.nan)
+    def year_index(self, year: int) -> int:
+        """Offset of a year in the state arrays"""
+        return int((year - self.year_start) / self.time_step)
 
-        self.energy_investment_wo_renewable = pd.DataFrame(
-            index=default_index,
-            columns=GlossaryCore.EnergyInvestmentsWoRenewable['dataframe_descriptor'].keys())
-        self.energy_investment_wo_renewable[GlossaryCore.Years] = self.years_range
-
-        energy_investment = pd.DataFrame(
-            index=default_index,
-            columns=GlossaryCore.EnergyInvestments['dataframe_descriptor'].keys())
-
-        for key in energy_investment.keys():
-            energy_investment[key] = 0
-        energy_investment[GlossaryCore.Years] = self.years_range
-        self.energy_investment = energy_investment
-        self.energy_investment = self.energy_investment.replace(
-            [np.inf, -np.inf], np.nan)
-        # workforce_df
-        workforce_df = pd.DataFrame(index=default_index, columns=[GlossaryCore.Years,
-                                                                  GlossaryCore.EmploymentRate,
-                                                                  GlossaryCore.Workforce])
-        for key in workforce_df.keys():
-            workforce_df[key] = 0
-        workforce_df[GlossaryCore.Years] = self.years_range
-        self.workforce_df = workforce_df
-        #capital df
-        self.capital_df = pd.DataFrame(index=default_index,
-                                       columns=[GlossaryCore.Years,
-                                                GlossaryCore.Capital,
-                                                GlossaryCore.NonEnergyCapital,
-                                                GlossaryCore.EnergyEfficiency,
-                                                GlossaryCore.Emax,
-                                                GlossaryCore.UsableCapital,
-                                                GlossaryCore.UsableCapitalUnbounded])
-        for key in self.capital_df.columns:
-            self.capital_df[key] = 0
-        self.capital_df[GlossaryCore.Years] = self.years_range
-        self.capital_df.loc[param[GlossaryCore.YearStart], GlossaryCore.NonEnergyCapital] = self.capital_start_ne
-
-        self.damage_df = pd.DataFrame(index=default_index,
-                                      columns=GlossaryCore.DamageDetailedDf['dataframe_descriptor'].keys())
-        for key in self.damage_df.columns:
-            self.damage_df[key] = 0
-        self.damage_df[GlossaryCore.Years] = self.years_range
-
-        return economics_df.fillna(0.0), energy_investment.fillna(0.0),
+    def create_arrays(self, dtype=float):
+        """
+        Create the state arrays of the model and fill them with values at year_start.
+
+        The state is held in contiguous arrays indexed by year offset (see year_index), one array per column of the
+        output dataframes. Dataframes are only built once in prepare_outputs.
+        dtype is complex when the model is evaluated with complex step.
+        """
+        self.economics_arrays = {key: np.zeros(self.nb_years, dtype=dtype) for key in
+                                 GlossaryCore.EconomicsDetailDf['dataframe_descriptor'].keys() if key != GlossaryCore.Years}
+        self.economics_arrays[GlossaryCore.GrossOutput][0] = self.init_gross_output
+        self.economics_arrays[GlossaryCore.Productivity][0] = self.productivity_start
+        self.economics_arrays[GlossaryCore.ProductivityWithDamage][0] = self.productivity_start
+        self.economics_arrays[GlossaryCore.ProductivityWithoutDamage][0] = self.productivity_start
+        self.economics_arrays[GlossaryCore.ProductivityGrowthRate][0] = self.productivity_gr_start
+        self.economics_arrays[GlossaryCore.OutputGrowth][0] = self.init_output_growth
+
+        self.capital_arrays = {key: np.zeros(self.nb_years, dtype=dtype) for key in
+                               [GlossaryCore.Capital,
+                                GlossaryCore.NonEnergyCapital,
+                                GlossaryCore.EnergyEfficiency,
+                                GlossaryCore.Emax,
+                                GlossaryCore.UsableCapital,
+                                GlossaryCore.UsableCapitalUnbounded]}
+        self.capital_arrays[GlossaryCore.NonEnergyCapital][0] = self.capital_start_ne
+
+        self.workforce_arrays = {key: np.zeros(self.nb_years, dtype=dtype) for key in
+                                 [GlossaryCore.EmploymentRate, GlossaryCore.Workforce]}
+
+        self.damage_arrays = {key: np.zeros(self.nb_years, dtype=dtype) for key in
+                              GlossaryCore.DamageDetailedDf['dataframe_descriptor'].keys() if key != GlossaryCore.Years}
 
     def set_coupling_inputs(self, inputs: dict):
         """
-        Set couplings inputs with right index, scaling... 
+        Set couplings inputs with right index, scaling...
         """
         self.damage_fraction_output_df = inputs[GlossaryCore.DamageFractionDfValue]
         self.damage_fraction_output_df.index = self.damage_fraction_output_df[GlossaryCore.Years].values
@@ -273,41 +240,49 @@ class MacroEconomics:
         self.gdp_percentage_per_section_df = inputs[GlossaryCore.SectionGdpPercentageDfValue]
         if not self.compute_gdp:
             self.gross_output_in = inputs['gross_output_in']
-      
+
+    def get_state_dtype(self):
+        """State arrays are complex if any coupling input is complex (complex step)"""
+        coupling_values = [self.damage_fraction_output_df[GlossaryCore.DamageFractionOutput].values,
+                           self.energy_production[GlossaryCore.TotalProductionValue].values,
+                           self.co2_emissions_Gt[GlossaryCore.TotalCO2Emissions].values,
+                           self.co2_taxes[GlossaryCore.CO2Tax].values,
+                           self.co2_tax_efficiency[GlossaryCore.CO2TaxEfficiencyValue].values,
+                           self.energy_investment_wo_tax.values,
+                           self.share_non_energy_investment.values,
+                           self.energy_capital[GlossaryCore.Capital].values,
+                           self.population_df[GlossaryCore.PopulationValue].values,
+                           self.working_age_population_df[GlossaryCore.Population1570].values]
+        if not self.compute_gdp:
+            coupling_values.append(self.gross_output_in[GlossaryCore.GrossOutput].values)
+        return np.result_type(float, *coupling_values)
+
     def compute_employment_rate(self):
-        """ 
-        Compute the employment rate. based on prediction from ILO 
+        """
+        Compute the employment rate. based on prediction from ILO
         We pyworld3 a recovery from 2020 crisis until 2031 where past level is reached
         For all year not in (2020,2031), value = employment_rate_base_value
         """
         year_covid = 2020
         year_end_recovery = 2031
-        workforce_df = self.workforce_df
         # For all years employment_rate = base value
-        workforce_df[GlossaryCore.EmploymentRate] = self.employment_rate_base_value
-        # Compute recovery phase
-        years_recovery = np.arange(year_covid, year_end_recovery + 1)
-        x_recovery = years_recovery + 1 - year_covid
-        employment_rate_recovery = self.employment_a_param * \
-            x_recovery**self.employment_power_param
-        employment_rate_recovery_df = pd.DataFrame(
-            {GlossaryCore.Years: years_recovery, GlossaryCore.EmploymentRate: employment_rate_recovery})
-        employment_rate_recovery_df.index = years_recovery
-        # Then replace values in original dataframe by recoveries values
-        workforce_df.update(employment_rate_recovery_df)
-
-        self.workforce_df = workforce_df
-        return workforce_df
+        employment_rate = self.workforce_arrays[GlossaryCore.EmploymentRate]
+        employment_rate[:] = self.employment_rate_base_value
+        # Compute recovery phase and replace values in original array by recoveries values
+        recovery = (self.years_range >= year_covid) & (self.years_range <= year_end_recovery)
+        x_recovery = self.years_range[recovery] + 1 - year_covid
+        employment_rate[recovery] = self.employment_a_param * x_recovery ** self.employment_power_param
+        return employment_rate
 
     def compute_workforce(self):
-        """ Compute the workforce based on formula: 
-        workforce = people in working age * employment_rate 
-        inputs : - number of people in working age 
+        """ Compute the workforce based on formula:
+        workforce = people in working age * employment_rate
+        inputs : - number of people in working age
                 - employment rate in %
         Output: number of working people in million of people
         """
-        self.workforce_df[GlossaryCore.Workforce] = self.workforce_df[GlossaryCore.EmploymentRate] * \
-                                                    self.working_age_population_df[GlossaryCore.Population1570]
+        self.workforce_arrays[GlossaryCore.Workforce][:] = self.workforce_arrays[GlossaryCore.EmploymentRate] * \
+            self.working_age_population_df[GlossaryCore.Population1570].values
 
     def compute_productivity_growthrate(self):
         """
@@ -316,7 +291,7 @@ class MacroEconomics:
             :returns: A_g(0) * exp(-Δ_a * (t-1))
         """
         prod_growth_rate = self.productivity_gr_start * np.exp(- self.decline_rate_tfp * (self.years_range - self.year_start))
-        self.economics_df[GlossaryCore.ProductivityGrowthRate] = prod_growth_rate
+        self.economics_arrays[GlossaryCore.ProductivityGrowthRate][:] = prod_growth_rate
 
     def compute_productivity(self, year: int):
         """
@@ -324,59 +299,61 @@ class MacroEconomics:
         if damage_to_productivity= True add damage to the the productivity
         if  not: productivity evolves independently from other variables (except productivity growthrate)
         """
+        t = self.year_index(year)
         damage_to_productivity = self.damage_to_productivity
-        p_productivity_wo_damage = self.economics_df.loc[year - self.time_step, GlossaryCore.ProductivityWithoutDamage]
-        p_productivity_w_damage = self.economics_df.loc[year - self.time_step, GlossaryCore.ProductivityWithDamage]
-        p_productivity_gr = self.economics_df.loc[year - self.time_step, GlossaryCore.ProductivityGrowthRate]
-        damefrac = self.damage_fraction_output_df.loc[year, GlossaryCore.DamageFractionOutput]
+        p_productivity_wo_damage = self.economics_arrays[GlossaryCore.ProductivityWithoutDamage][t - 1]
+        p_productivity_w_damage = self.economics_arrays[GlossaryCore.ProductivityWithDamage][t - 1]
+        p_productivity_gr = self.economics_arrays[GlossaryCore.ProductivityGrowthRate][t - 1]
+        damefrac = self.damage_fraction_output_df[GlossaryCore.DamageFractionOutput].values[t]
         # we divide the productivity growth rate by 5/time_step because of change in time_step (as
         # advised in Traeger, 2013)
         productivity_wo_damage = p_productivity_wo_damage / (1 - p_productivity_gr / (5 / self.time_step))
         productivity_w_damage = p_productivity_w_damage * (1 - self.frac_damage_prod * damefrac) / (1 - p_productivity_gr / (5 / self.time_step))
-        self.economics_df.loc[year, GlossaryCore.ProductivityWithDamage] = productivity_w_damage
-        self.economics_df.loc[year, GlossaryCore.ProductivityWithoutDamage] = productivity_wo_damage
+        self.economics_arrays[GlossaryCore.ProductivityWithDamage][t] = productivity_w_damage
+        self.economics_arrays[GlossaryCore.ProductivityWithoutDamage][t] = productivity_wo_damage
 
         if damage_to_productivity:
-            self.economics_df.loc[year, GlossaryCore.Productivity] = productivity_w_damage
+            self.economics_arrays[GlossaryCore.Productivity][t] = productivity_w_damage
         else:
-            self.economics_df.loc[year, GlossaryCore.Productivity] = productivity_wo_damage
+            self.economics_arrays[GlossaryCore.Productivity][t] = productivity_wo_damage
 
     def compute_capital(self, year: int):
         """
         K(t+1), Capital for next time period, trillions $USD
         """
-        year_start = self.year_start
+        t = self.year_index(year)
         if year > self.year_end:
             pass
-        elif year == self.year_start: 
-            capital = self.capital_start_ne + self.energy_capital.loc[year_start, GlossaryCore.Capital]
-            self.capital_df.loc[year_start, GlossaryCore.Capital] = capital
-        else: 
-            #first compute non energy capital 
-            ne_investment = self.economics_df.loc[year - self.time_step, GlossaryCore.NonEnergyInvestmentsValue]
-            ne_capital = self.capital_df.loc[year - self.time_step, GlossaryCore.NonEnergyCapital]
+        elif year == self.year_start:
+            capital = self.capital_start_ne + self.energy_capital[GlossaryCore.Capital].values[t]
+            self.capital_arrays[GlossaryCore.Capital][t] = capital
+        else:
+            #first compute non energy capital
+            ne_investment = self.economics_arrays[GlossaryCore.NonEnergyInvestmentsValue][t - 1]
+            ne_capital = self.capital_arrays[GlossaryCore.NonEnergyCapital][t - 1]
             capital_a = ne_capital * (1 - self.depreciation_capital) ** self.time_step + \
                 self.time_step * ne_investment
-            #Then total capital = ne_capital + energy_capital 
-            self.capital_df.loc[year, GlossaryCore.NonEnergyCapital] = capital_a
+            #Then total capital = ne_capital + energy_capital
+            self.capital_arrays[GlossaryCore.NonEnergyCapital][t] = capital_a
             # Lower bound for capital
-            tot_capital = capital_a + self.energy_capital.loc[year, GlossaryCore.Capital]
-            self.capital_df.loc[year, GlossaryCore.Capital] = max(tot_capital, self.lo_capital)
-                                  
+            tot_capital = capital_a + self.energy_capital[GlossaryCore.Capital].values[t]
+            self.capital_arrays[GlossaryCore.Capital][t] = max(tot_capital, self.lo_capital)
+
             return capital_a
 
     def compute_energy_usage(self):
         """Wasted energy is the overshoot of energy production not used by usable capital"""
-        non_energy_capital = self.capital_df[GlossaryCore.NonEnergyCapital]
-        net_energy_production = self.energy_production[GlossaryCore.TotalProductionValue]  # PWh
-        energy_efficiency = self.capital_df[GlossaryCore.EnergyEfficiency]
+        non_energy_capital = self.capital_arrays[GlossaryCore.NonEnergyCapital]
+        net_energy_production = self.energy_production[GlossaryCore.TotalProductionValue].values  # PWh
+        energy_efficiency = self.capital_arrays[GlossaryCore.EnergyEfficiency]
         optimal_energy_production = self.max_capital_utilisation_ratio * non_energy_capital / self.capital_utilisation_ratio / energy_efficiency  # Pwh
-        self.economics_df[GlossaryCore.OptimalEnergyProduction] = optimal_energy_production * 1e3
-        self.economics_df[GlossaryCore.UsedEnergy] = np.minimum(net_energy_production, optimal_energy_production) * 1e3
-        self.economics_df[GlossaryCore.UnusedEnergy] = np.maximum(net_energy_production - optimal_energy_production, 0.) * 1e3
+        self.economics_arrays[GlossaryCore.OptimalEnergyProduction][:] = optimal_energy_production * 1e3
+        self.economics_arrays[GlossaryCore.UsedEnergy][:] = np.minimum(net_energy_production, optimal_energy_production) * 1e3
+        self.economics_arrays[GlossaryCore.UnusedEnergy][:] = np.maximum(net_energy_production - optimal_energy_production, 0.) * 1e3
         # Energy_wasted = max((Enet - Eoptimal),0.)
-        self.economics_df[GlossaryCore.EnergyWasted] = (net_energy_production - optimal_energy_production) * 1e3 #TWh
-        self.economics_df.loc[self.economics_df[GlossaryCore.EnergyWasted] < 0., GlossaryCore.EnergyWasted] = 0.
+        energy_wasted = self.economics_arrays[GlossaryCore.EnergyWasted]
+        energy_wasted[:] = (net_energy_production - optimal_energy_production) * 1e3 #TWh
+        energy_wasted[energy_wasted < 0.] = 0.
 
     def compute_energy_wasted_objective(self):
         """Computes normalized energy wasted constraint. Ewasted=max(Enet - Eoptimal, 0)
@@ -384,127 +361,123 @@ class MacroEconomics:
         which can be compared to the negative welfare objective (same order of magnitude)
         """
         # total energy is supposed to be > 0.
-        energy_wasted_objective = self.economics_df[GlossaryCore.EnergyWasted].values.sum() * 1e-3 / \
+        energy_wasted_objective = self.economics_arrays[GlossaryCore.EnergyWasted].sum() * 1e-3 / \
                                   self.energy_production[GlossaryCore.TotalProductionValue].values.sum()  # PWh / PWh
 
         self.energy_wasted_objective = np.array([energy_wasted_objective])
 
     def compute_energy_efficiency(self):
         """compute energy_efficiency"""
-        years = self.capital_df[GlossaryCore.Years].values
+        years = self.years_range
         energy_efficiency = self.energy_eff_cst + self.energy_eff_max / (1 + np.exp(-self.energy_eff_k *
                                                                                     (years - self.energy_eff_xzero)))
-        self.capital_df[GlossaryCore.EnergyEfficiency] = energy_efficiency
+        self.capital_arrays[GlossaryCore.EnergyEfficiency][:] = energy_efficiency
 
     def compute_unbounded_usable_capital(self):
         """compute unbounded usable capital = Energy Production Net * capital utilisation ratio * energy efficiency"""
-        net_energy_production = self.energy_production[GlossaryCore.TotalProductionValue]
-        energy_efficiency = self.capital_df[GlossaryCore.EnergyEfficiency]
+        net_energy_production = self.energy_production[GlossaryCore.TotalProductionValue].values
+        energy_efficiency = self.capital_arrays[GlossaryCore.EnergyEfficiency]
         usable_capital_unbounded = self.capital_utilisation_ratio * net_energy_production * energy_efficiency
-        self.capital_df[GlossaryCore.UsableCapitalUnbounded] = usable_capital_unbounded
+        self.capital_arrays[GlossaryCore.UsableCapitalUnbounded][:] = usable_capital_unbounded
 
     def compute_usable_capital(self, year: int):
-        """  Usable capital is the part of the capital stock that can be used in the production process. 
+        """  Usable capital is the part of the capital stock that can be used in the production process.
         To be usable the capital needs enough energy.
         K_u = min (max capital utilisation ratio * Kne, Unbounded Usable Capital)
         E is energy in Twh and K is capital in trill dollars constant 2020
         Output: usable capital in trill dollars constant 2020
         """
-        ne_capital = self.capital_df.loc[year, GlossaryCore.NonEnergyCapital]
+        t = self.year_index(year)
+        ne_capital = self.capital_arrays[GlossaryCore.NonEnergyCapital][t]
 
-        usable_capital_unbounded = self.capital_df.loc[year, GlossaryCore.UsableCapitalUnbounded]
+        usable_capital_unbounded = self.capital_arrays[GlossaryCore.UsableCapitalUnbounded][t]
         upper_bound = self.max_capital_utilisation_ratio * ne_capital
 
         usable_capital = upper_bound if np.real(usable_capital_unbounded) > np.real(
             upper_bound) else usable_capital_unbounded
 
-        self.capital_df.loc[year, GlossaryCore.UsableCapital] = usable_capital
+        self.capital_arrays[GlossaryCore.UsableCapital][t] = usable_capital
 
     def compute_investment(self, year: int):
         """Compute I(t) (total Investment) and Ine(t) (Investment in non-energy sectors) in trillions $USD """
-        net_output = self.economics_df.loc[year, GlossaryCore.OutputNetOfDamage]
-        self.economics_df.loc[year, GlossaryCore.NonEnergyInvestmentsValue] = self.share_non_energy_investment[year] * net_output
-        self.economics_df.loc[year, GlossaryCore.InvestmentsValue] = self.economics_df.loc[year, GlossaryCore.EnergyInvestmentsValue] + \
-                                                    self.economics_df.loc[year, GlossaryCore.NonEnergyInvestmentsValue]
-
-    def compute_energy_investment(self, year: int):
+        t = self.year_index(year)
+        net_output = self.economics_arrays[GlossaryCore.OutputNetOfDamage][t]
+        non_energy_investment = self.share_non_energy_investment.values[t] * net_output
+        self.economics_arrays[GlossaryCore.NonEnergyInvestmentsValue][t] = non_energy_investment
+        self.economics_arrays[GlossaryCore.InvestmentsValue][t] = self.economics_arrays[GlossaryCore.EnergyInvestmentsValue][t] + \
+                                                                   non_energy_investment
+
+    def compute_energy_investment(self):
         """
         Energy invests  = Energy invest without tax + Added invest in renewables from CO2 tax
+        Energy investments only depend on inputs so all years are computed at once
         """
-        energy_investment_wo_tax = self.energy_investment_wo_tax[year]  # in T$
+        energy_investment_wo_tax = self.energy_investment_wo_tax.values  # in T$
 
         self.co2_emissions_Gt[GlossaryCore.TotalCO2Emissions].clip(lower=0.0, inplace=True)
 
-        self.energy_investment_wo_renewable.loc[year, GlossaryCore.EnergyInvestmentsWoRenewableValue] = energy_investment_wo_tax * 10. # in 100G$
-
-        ren_investments = self.compute_energy_renewable_investment(year, energy_investment_wo_tax)  # T$
+        ren_investments = self.compute_energy_renewable_investment(energy_investment_wo_tax)  # T$
         energy_investment = energy_investment_wo_tax + ren_investments  # in T$
-        self.economics_df.loc[year,
-                              [GlossaryCore.EnergyInvestmentsValue,  # T$
-                               GlossaryCore.EnergyInvestmentsWoTaxValue,  # T$
-                               GlossaryCore.EnergyInvestmentsFromTaxValue]] = \
-            [energy_investment,  # T$
-             energy_investment_wo_tax, # T$
-             ren_investments]  # T$
-        self.energy_investment.loc[year, GlossaryCore.EnergyInvestmentsValue] = energy_investment * 10.  # 100G$
+        self.economics_arrays[GlossaryCore.EnergyInvestmentsValue][:] = energy_investment  # T$
+        self.economics_arrays[GlossaryCore.EnergyInvestmentsWoTaxValue][:] = energy_investment_wo_tax  # T$
+        self.economics_arrays[GlossaryCore.EnergyInvestmentsFromTaxValue][:] = ren_investments  # T$
 
         return energy_investment
 
-    def compute_energy_renewable_investment(self, year: int, energy_investment_wo_tax: float):
+    def compute_energy_renewable_investment(self, energy_investment_wo_tax: np.ndarray):
         """
         computes energy investment for renewable part in T$
-        for a given year: returns net CO2 emissions * CO2 taxes * a efficiency factor
+        for each year: returns net CO2 emissions * CO2 taxes * a efficiency factor
         """
         if not self.invest_co2_tax_in_renawables:
-            return 0.
+            return np.zeros(self.nb_years)
         co2_invest_limit = self.co2_invest_limit
-        emissions = self.co2_emissions_Gt.loc[year, GlossaryCore.TotalCO2Emissions] * 1e9  # t CO2
-        co2_taxes = self.co2_taxes.loc[year, GlossaryCore.CO2Tax]  # $/t
-        co2_tax_eff = self.co2_tax_efficiency.loc[year, GlossaryCore.CO2TaxEfficiencyValue] / 100.  # %
+        emissions = self.co2_emissions_Gt[GlossaryCore.TotalCO2Emissions].values * 1e9  # t CO2
+        co2_taxes = self.co2_taxes[GlossaryCore.CO2Tax].values  # $/t
+        co2_tax_eff = self.co2_tax_efficiency[GlossaryCore.CO2TaxEfficiencyValue].values / 100.  # %
         ren_investments = emissions * co2_taxes * co2_tax_eff / 1e12  # T$
+        ren_investments = ren_investments.astype(np.result_type(ren_investments, energy_investment_wo_tax))
 
         # if emissions is zero the right gradient (positive) is not zero but the left gradient is zero
         # when complex step we add ren_invest with the complex step and it is
         # not good
-        if ren_investments.real == 0.0:
-            ren_investments = 0.0
+        ren_investments[np.real(ren_investments) == 0.0] = 0.0
         # Saturation of renewable invest at n * invest wo tax with n ->
         # co2_invest_limit entry parameter
-        if ren_investments > co2_invest_limit * energy_investment_wo_tax and ren_investments != 0.0:
-            ren_investments = co2_invest_limit * energy_investment_wo_tax / 10.0 * \
-                (9.0 + np.exp(- co2_invest_limit *
-                              energy_investment_wo_tax / ren_investments))
+        saturated = (ren_investments > co2_invest_limit * energy_investment_wo_tax) & (ren_investments != 0.0)
+        ren_investments[saturated] = co2_invest_limit * energy_investment_wo_tax[saturated] / 10.0 * \
+            (9.0 + np.exp(- co2_invest_limit * energy_investment_wo_tax[saturated] / ren_investments[saturated]))
 
         return ren_investments  # T$
 
     def compute_gross_output(self, year: int):
-        """ Compute the gdp 
+        """ Compute the gdp
         inputs: usable capital by year in trill $ , working population by year in million of people,
-             productivity by year (no unit), alpha (between 0 and 1) 
+             productivity by year (no unit), alpha (between 0 and 1)
         output: gdp in trillion dollars
         """
+        t = self.year_index(year)
         alpha = self.output_alpha
         gamma = self.output_gamma
-        productivity = self.economics_df.loc[year, GlossaryCore.Productivity]
+        productivity = self.economics_arrays[GlossaryCore.Productivity][t]
 
-        working_pop = self.workforce_df.loc[year, GlossaryCore.Workforce]
-        capital_u = self.capital_df.loc[year, GlossaryCore.UsableCapital]
+        working_pop = self.workforce_arrays[GlossaryCore.Workforce][t]
+        capital_u = self.capital_arrays[GlossaryCore.UsableCapital][t]
         # If gamma == 1/2 use sqrt but same formula
         if gamma == 1 / 2:
             output = productivity * (alpha * np.sqrt(capital_u) + (1 - alpha) * np.sqrt(working_pop))**2
         else:
             output = productivity * (alpha * capital_u**gamma + (1 - alpha) * working_pop**gamma) ** (1 / gamma)
-        self.economics_df.loc[year, GlossaryCore.GrossOutput] = output
+        self.economics_arrays[GlossaryCore.GrossOutput][t] = output
 
         return output
 
-    def set_gross_output(self): 
+    def set_gross_output(self):
         """
         Set gross output according to input
         """
-        self.economics_df = self.economics_df.drop(GlossaryCore.GrossOutput, axis=1)
-        self.economics_df = self.economics_df.merge(self.gross_output_in[[GlossaryCore.Years, GlossaryCore.GrossOutput]],
-                                                    on=GlossaryCore.Years, how='left').set_index(self.economics_df.index)
+        gross_output_in = self.gross_output_in.set_index(GlossaryCore.Years)[GlossaryCore.GrossOutput]
+        self.economics_arrays[GlossaryCore.GrossOutput][:] = gross_output_in.reindex(self.years_range).values
 
     def get_gdp_percentage_per_section(self):
         '''
@@ -550,7 +523,7 @@ class MacroEconomics:
         # get gdp percentage per section, and compute gdp per section using Net output of damage
         self.get_gdp_percentage_per_section()
         self.section_gdp_df = self.gdp_percentage_per_section_df.copy()
-        self.section_gdp_df[self.section_list] = self.section_gdp_df[self.section_list].multiply(self.economics_df.reset_index(drop=True)[GlossaryCore.OutputNetOfDamage], axis='index') / 100.
+        self.section_gdp_df[self.section_list] = self.section_gdp_df[self.section_list].multiply(pd.Series(self.economics_arrays[GlossaryCore.OutputNetOfDamage]), axis='index') / 100.
 
     def compute_sector_gdp(self):
         """
@@ -574,20 +547,21 @@ class MacroEconomics:
 
     def compute_output_growth(self):
         """
-        Compute the output growth between year t and year t-1 
+        Compute the output growth between year t and year t-1
         Output growth of the WITNESS pyworld3 (computed from gross_output_ter)
         """
-
-        gross_output = self.economics_df[GlossaryCore.GrossOutput]
-
-        self.economics_df[GlossaryCore.OutputGrowth] = (gross_output.diff() / gross_output.shift(1)).fillna(0.) * 100
+        gross_output = self.economics_arrays[GlossaryCore.GrossOutput]
+        output_growth = self.economics_arrays[GlossaryCore.OutputGrowth]
+        output_growth[0] = 0.
+        output_growth[1:] = (gross_output[1:] - gross_output[:-1]) / gross_output[:-1] * 100
 
     def compute_output_net_of_damage(self, year: int):
         """
         Output net of damages, trillions USD
         """
-        damefrac = self.damage_fraction_output_df.loc[year, GlossaryCore.DamageFractionOutput]
-        gross_output = self.economics_df.loc[year, GlossaryCore.GrossOutput]
+        t = self.year_index(year)
+        damefrac = self.damage_fraction_output_df[GlossaryCore.DamageFractionOutput].values[t]
+        gross_output = self.economics_arrays[GlossaryCore.GrossOutput][t]
         if not self.compute_climate_impact_on_gdp:
             output_net_of_d = gross_output
         else:
@@ -597,31 +571,31 @@ class MacroEconomics:
                 output_net_of_d = (1 - damage) * gross_output
             else:
                 output_net_of_d = gross_output * (1 - damefrac)
-        self.economics_df.loc[year, GlossaryCore.OutputNetOfDamage] = output_net_of_d
+        self.economics_arrays[GlossaryCore.OutputNetOfDamage][t] = output_net_of_d
         return output_net_of_d
 
-    def compute_consumption(self, year: int):
+    def compute_consumption(self):
         """Equation for consumption
         C, Consumption, trillions $USD
+        Consumption does not feed back into the capital recurrence so all years are computed at once
         """
-        net_output = self.economics_df.loc[year, GlossaryCore.OutputNetOfDamage]
-        investment = self.economics_df.loc[year, GlossaryCore.InvestmentsValue]
+        net_output = self.economics_arrays[GlossaryCore.OutputNetOfDamage]
+        investment = self.economics_arrays[GlossaryCore.InvestmentsValue]
         consumption = net_output - investment
         # lower bound for conso
-        self.economics_df.loc[year, GlossaryCore.Consumption] = max(
-            consumption, self.lo_conso)
+        self.economics_arrays[GlossaryCore.Consumption][:] = np.where(self.lo_conso > consumption, self.lo_conso, consumption)
         return consumption
 
-    def compute_consumption_pc(self, year: int):
+    def compute_consumption_pc(self):
         """Equation for consumption per capita
         c, Per capita consumption, thousands $USD
         """
-        consumption = self.economics_df.loc[year, GlossaryCore.Consumption]
-        population = self.population_df.loc[year, GlossaryCore.PopulationValue]
+        consumption = self.economics_arrays[GlossaryCore.Consumption]
+        population = self.population_df[GlossaryCore.PopulationValue].values
         consumption_pc = consumption / population * 1000
         # Lower bound for pc conso
-        self.economics_df.loc[year, GlossaryCore.PerCapitaConsumption] = max(
-            consumption_pc, self.lo_per_capita_conso)
+        self.economics_arrays[GlossaryCore.PerCapitaConsumption][:] = np.where(
+            self.lo_per_capita_conso > consumption_pc, self.lo_per_capita_conso, consumption_pc)
         return consumption_pc
 
     def compute_usable_capital_lower_bound_constraint(self):
@@ -629,22 +603,25 @@ class MacroEconomics:
         Lower bound usable capital constraint = capital utilisation ratio * non energy capital - usable capital
         This constraint is only meant to be used when GDP is fixed !
         """
-        ne_capital = self.capital_df[GlossaryCore.NonEnergyCapital].values
-        usable_capital = self.capital_df[GlossaryCore.UsableCapital].values
+        ne_capital = self.capital_arrays[GlossaryCore.NonEnergyCapital]
+        usable_capital = self.capital_arrays[GlossaryCore.UsableCapital]
         self.delta_capital_cons = (usable_capital - self.capital_utilisation_ratio * ne_capital) / self.usable_capital_ref if not self.compute_gdp else np.zeros(self.nb_per)
 
     def compute_usable_capital_objective(self):
         """
         usable capital objective = (capital utilisation ratio * non energy capital - usable capital)**2 / usable_capital_objective
         """
-        ne_capital = self.capital_df[GlossaryCore.NonEnergyCapital].values
-        usable_capital_unbouded = self.capital_df[GlossaryCore.UsableCapitalUnbounded].values
+        ne_capital = self.capital_arrays[GlossaryCore.NonEnergyCapital]
+        usable_capital_unbouded = self.capital_arrays[GlossaryCore.UsableCapitalUnbounded]
         self.usable_cap_sqrt = (usable_capital_unbouded - self.capital_utilisation_ratio * ne_capital)
         self.usable_capital_objective = np.array([np.sum(np.power(self.usable_cap_sqrt,2))/ (self.nb_years * self.usable_capital_objective_ref)])
 
 
     def prepare_outputs(self):
-        """post processing"""
+        """Build the output dataframes from the state arrays and post process them"""
+        default_index = self.years_range
+        self.economics_df = pd.DataFrame({GlossaryCore.Years: self.years_range, **self.economics_arrays},
+                                         index=default_index)
         self.economics_df = self.economics_df.fillna(0.0)
         self.economics_df = self.economics_df.replace(
             [np.inf, -np.inf], np.nan)
@@ -652,10 +629,25 @@ class MacroEconomics:
         self.economics_df = self.economics_df[GlossaryCore.EconomicsDf['dataframe_descriptor'].keys()]
         self.economics_detail_df = self.economics_detail_df[GlossaryCore.EconomicsDetailDf['dataframe_descriptor'].keys()]
 
+        self.energy_investment = pd.DataFrame(
+            {GlossaryCore.Years: self.years_range,
+             GlossaryCore.EnergyInvestmentsValue: self.economics_arrays[GlossaryCore.EnergyInvestmentsValue] * 10.},  # 100G$
+            index=default_index)
         self.energy_investment = self.energy_investment.fillna(0.0)
 
+        self.energy_investment_wo_renewable = pd.DataFrame(
+            {GlossaryCore.Years: self.years_range,
+             GlossaryCore.EnergyInvestmentsWoRenewableValue: self.economics_arrays[GlossaryCore.EnergyInvestmentsWoTaxValue] * 10.},  # 100G$
+            index=default_index)
         self.energy_investment_wo_renewable = self.energy_investment_wo_renewable.fillna(0.)
 
+        self.workforce_df = pd.DataFrame({GlossaryCore.Years: self.years_range, **self.workforce_arrays},
+                                         index=default_index)
+        self.capital_df = pd.DataFrame({GlossaryCore.Years: self.years_range, **self.capital_arrays},
+                                       index=default_index)
+        self.damage_df = pd.DataFrame({GlossaryCore.Years: self.years_range, **self.damage_arrays},
+                                      index=default_index)
+
     def compute_damage_from_productivity_loss(self):
         """
         Compute damages due to loss of productivity.
@@ -664,10 +656,10 @@ class MacroEconomics:
         we compute the damages on GDP from loss of productivity as
         (productivity wo damage - productivity w damage) x (Usable capital + Labor).
         """
-        productivity_w_damage = self.economics_df[GlossaryCore.ProductivityWithDamage]
-        productivity_wo_damage = self.economics_df[GlossaryCore.ProductivityWithoutDamage]
-        applied_productivity = self.economics_df[GlossaryCore.Productivity]
-        gross_output = self.economics_df[GlossaryCore.GrossOutput]
+        productivity_w_damage = self.economics_arrays[GlossaryCore.ProductivityWithDamage]
+        productivity_wo_damage = self.economics_arrays[GlossaryCore.ProductivityWithoutDamage]
+        applied_productivity = self.economics_arrays[GlossaryCore.Productivity]
+        gross_output = self.economics_arrays[GlossaryCore.GrossOutput]
 
         estimated_damage_from_productivity_loss = (productivity_wo_damage - productivity_w_damage) / applied_productivity * gross_output
         if self.damage_to_productivity:
@@ -675,13 +667,13 @@ class MacroEconomics:
         else:
             damage_from_productivity_loss = np.zeros_like(estimated_damage_from_productivity_loss)
 
-        self.damage_df[GlossaryCore.DamagesFromProductivityLoss] = damage_from_productivity_loss
-        self.damage_df[GlossaryCore.EstimatedDamagesFromProductivityLoss] = estimated_damage_from_productivity_loss
+        self.damage_arrays[GlossaryCore.DamagesFromProductivityLoss][:] = damage_from_productivity_loss
+        self.damage_arrays[GlossaryCore.EstimatedDamagesFromProductivityLoss][:] = estimated_damage_from_productivity_loss
 
     def compute_damage_from_climate(self):
-        damefrac = self.damage_fraction_output_df[GlossaryCore.DamageFractionOutput]
-        gross_output = self.economics_df[GlossaryCore.GrossOutput].values
-        net_output = self.economics_df[GlossaryCore.OutputNetOfDamage].values
+        damefrac = self.damage_fraction_output_df[GlossaryCore.DamageFractionOutput].values
+        gross_output = self.economics_arrays[GlossaryCore.GrossOutput]
+        net_output = self.economics_arrays[GlossaryCore.OutputNetOfDamage]
 
         damage_from_climate = np.zeros_like(gross_output)
         if self.compute_climate_impact_on_gdp:
@@ -694,22 +686,21 @@ class MacroEconomics:
             else:
                 estimated_damage_from_climate = gross_output * damefrac
 
-        self.damage_df[GlossaryCore.DamagesFromClimate] = damage_from_climate
-        self.damage_df[GlossaryCore.EstimatedDamagesFromClimate] = estimated_damage_from_climate
+        self.damage_arrays[GlossaryCore.DamagesFromClimate][:] = damage_from_climate
+        self.damage_arrays[GlossaryCore.EstimatedDamagesFromClimate][:] = estimated_damage_from_climate
 
     def compute_total_damages(self):
         """Damages are the sum of damages from climate + damges from loss of productivity"""
 
-        self.damage_df[GlossaryCore.EstimatedDamages] = self.damage_df[GlossaryCore.EstimatedDamagesFromClimate] + self.damage_df[GlossaryCore.EstimatedDamagesFromProductivityLoss]
-        self.damage_df[GlossaryCore.Damages] = self.damage_df[GlossaryCore.DamagesFromClimate] + self.damage_df[GlossaryCore.DamagesFromProductivityLoss]
+        self.damage_arrays[GlossaryCore.EstimatedDamages][:] = self.damage_arrays[GlossaryCore.EstimatedDamagesFromClimate] + self.damage_arrays[GlossaryCore.EstimatedDamagesFromProductivityLoss]
+        self.damage_arrays[GlossaryCore.Damages][:] = self.damage_arrays[GlossaryCore.DamagesFromClimate] + self.damage_arrays[GlossaryCore.DamagesFromProductivityLoss]
 
     def compute(self, inputs: dict):
         """
         Compute all models for year range
         """
-
-        self.create_dataframe()
         self.set_coupling_inputs(inputs)
+        self.create_arrays(dtype=self.get_state_dtype())
         # set gross ouput from input if necessary
         if not self.compute_gdp:
             self.set_gross_output()
@@ -718,19 +709,18 @@ class MacroEconomics:
         self.compute_workforce()
         self.compute_energy_efficiency()
         self.compute_unbounded_usable_capital()
+        self.compute_productivity_growthrate()
+        # Energy investments only depend on inputs
+        self.compute_energy_investment()
 
         year_start = self.year_start
         # YEAR START
         self.compute_capital(year_start)
         self.compute_usable_capital(year_start)
         self.compute_output_net_of_damage(year_start)
-        self.compute_energy_investment(year_start)
         self.compute_investment(year_start)
-        self.compute_consumption(year_start)
-        self.compute_consumption_pc(year_start)
         # for year 0 compute capital +1
         self.compute_capital(year_start + 1)
-        self.compute_productivity_growthrate()
 
         # Then iterate over years from year_start + tstep:
         for year in self.years_range[1:]:
@@ -741,13 +731,12 @@ class MacroEconomics:
             if self.compute_gdp:
                 self.compute_gross_output(year)
             self.compute_output_net_of_damage(year)
-            self.compute_energy_investment(year)
             self.compute_investment(year)
-            self.compute_consumption(year)
-            self.compute_consumption_pc(year)
             # capital t+1 :
             self.compute_capital(year+1)
 
+        self.compute_consumption()
+        self.compute_consumption_pc()
         self.compute_output_growth()
         self.compute_section_gdp()
         self.compute_sector_gdp()
@@ -777,30 +766,86 @@ class MacroEconomics:
         nb_years = len(self.years_range)
         return np.identity(nb_years)
 
+    def _d_net_output_d_gross_output(self):
+        """derivative of net output wrt gross output, as a vector (diagonal of the jacobian)"""
+        damefrac = self.damage_fraction_output_df[GlossaryCore.DamageFractionOutput].values
+        return 1 - damefrac if not self.damage_to_productivity else (1 - damefrac) / (1 - self.frac_damage_prod * damefrac)
+
+    def _d_gross_output_d_usable_capital(self):
+        """derivative of gross output wrt usable capital, as a vector (diagonal of the jacobian)"""
+        if not self.compute_gdp:
+            return np.zeros(self.nb_years)
+        alpha = self.output_alpha
+        gamma = self.output_gamma
+        productivity = self.economics_detail_df[GlossaryCore.Productivity].values
+        working_pop = self.workforce_df[GlossaryCore.Workforce].values
+        usable_capital = self.capital_df[GlossaryCore.UsableCapital].values
+        return productivity * alpha * usable_capital ** (gamma - 1) * \
+            (alpha * usable_capital ** gamma + (1 - alpha) * working_pop ** gamma) ** (1. / gamma - 1.)
+
+    def _propagate_capital_derivatives(self, d_gross_output_direct, d_net_output_direct=None):
+        """
+        Propagate derivatives wrt an input through the capital recurrence, for all years at once.
+
+        Kne(t+1) = (1 - depreciation) Kne(t) + share_ne_invest(t) Q(t), and Q(t) depends on Kne(t) through gross output
+        and usable capital (Ku = max_capital_utilisation_ratio * Kne when energy is not the limiting factor).
+        The derivative of Kne is then the solution of the linear recurrence
+            dKne(t+1) = b(t) dKne(t) + share_ne_invest(t) (dQ/dY(t) dY_direct(t) + dQ_direct(t))
+            b(t) = (1 - depreciation) + share_ne_invest(t) dQ/dY(t) dY/dKu(t) dKu/dKne(t)
+        which is computed with a lower triangular propagator built from cumulative products of b.
+
+        :param d_gross_output_direct: derivative of gross output wrt the input without the capital feedback
+        :param d_net_output_direct: derivative of net output wrt the input at constant gross output (vector, diagonal)
+        :returns: derivatives of non energy capital, of usable capital through capital and of gross output
+        """
+        index_zeros = self.economics_detail_df[GlossaryCore.UnusedEnergy].values > 0.
+        share_ne_invest = self.share_non_energy_investment.values
+        dQ_dY = self._d_net_output_d_gross_output()
+        dY_dKu = self._d_gross_output_d_usable_capital()
+        dKu_dKne = index_zeros * self.max_capital_utilisation_ratio
+
+        factors = (1 - self.depreciation_capital) + share_ne_invest * dQ_dY * dY_dKu * dKu_dKne
+        d_net_output = dQ_dY.reshape(-1, 1) * d_gross_output_direct
+        if d_net_output_direct is not None:
+            d_net_output = d_net_output + np.diag(d_net_output_direct)
+
+        d_Kne = self._null_derivative()
+        d_Kne[1:] = (lower_triangular_cumprod(factors) @ (share_ne_invest.reshape(-1, 1) * d_net_output))[:-1]
+        d_Ku = dKu_dKne.reshape(-1, 1) * d_Kne
+        d_Y = d_gross_output_direct + dY_dKu.reshape(-1, 1) * d_Ku
+        return d_Kne, d_Ku, d_Y
+
+    def _d_energy_wasted_d_ne_capital(self, d_Kne):
+        """
+        Energy_wasted Ew = E - KNE * k where k = max_capital_utilisation_ratio/capital_utilisation_ratio/energy_efficiency * 1e3
+        energy_efficiency is function of the years. Eoptimal in TWh
+        Since Ewasted = max(Enet - Eoptimal, 0.), gradient should be 0 when Enet - Eoptimal <=0, ie when Ewasted =0
+        => the lines of the gradient matrix corresponding to the years where Ewasted=0 are put to 0
+        """
+        energy_efficiency = self.capital_df[GlossaryCore.EnergyEfficiency].values
+        k = self.max_capital_utilisation_ratio / self.capital_utilisation_ratio / energy_efficiency * 1.e3
+        years_E_is_wasted = (self.economics_df[GlossaryCore.EnergyWasted].values > 0.).astype(int)
+        return - (years_E_is_wasted * k).reshape(-1, 1) * d_Kne
+
+    def _d_usable_capital_objective(self, d_Ku_unbounded, d_Kne):
+        """derivative of usable capital objective given the derivatives of unbounded usable capital and non energy capital"""
+        return np.sum(2 * (d_Ku_unbounded - self.capital_utilisation_ratio * d_Kne) *
+                      self.usable_cap_sqrt.reshape(-1, 1) / (self.usable_capital_objective_ref * self.nb_years), axis=0)
+
     def d_productivity_w_damage_d_damage_frac_output(self):
-        """derivative of productivity with damage wrt damage frac output"""
-        nb_years = len(self.years_range)
+        """
+        derivative of productivity with damage wrt damage frac output
 
+        productivity_w_damage(t) = productivity_w_damage(t-1) * (1 - frac_damage_prod * damefrac(t)) / (1 - gr(t-1)/(5/time_step))
+        so for 1 <= j <= t : d productivity_w_damage(t) / d damefrac(j) = - frac_damage_prod * productivity_w_damage(t) / (1 - frac_damage_prod * damefrac(j))
+        first line and column stay at zero since derivatives of initial values are zero
+        """
         d_productivity_w_damage_d_damage_frac_output = self._null_derivative()
-        p_productivity_gr = self.economics_detail_df[GlossaryCore.ProductivityGrowthRate].values
-        p_productivity = self.economics_detail_df[GlossaryCore.ProductivityWithDamage].values
-
-        # first line stays at zero since derivatives of initial values are zero
-        for i in range(1, nb_years):
-            d_productivity_w_damage_d_damage_frac_output[i, i] = (1 - self.frac_damage_prod * self.damage_fraction_output_df.loc[
-                self.years_range[i], GlossaryCore.DamageFractionOutput]) * \
-                                                        d_productivity_w_damage_d_damage_frac_output[i - 1, i] / (
-                                                                    1 - (p_productivity_gr[i - 1] /
-                                                                         (5 / self.time_step))) - \
-                                                        self.frac_damage_prod * \
-                                                        p_productivity[i - 1] / \
-                                                        (1 - (p_productivity_gr[i - 1] / (5 / self.time_step)))
-            for j in range(1, i):
-                d_productivity_w_damage_d_damage_frac_output[i, j] = (1 - self.frac_damage_prod *
-                                                             self.damage_fraction_output_df.loc[self.years_range[
-                                                                                                    i], GlossaryCore.DamageFractionOutput]) * \
-                                                            d_productivity_w_damage_d_damage_frac_output[i - 1, j] / \
-                                                            (1 - (p_productivity_gr[i - 1] / (5 / self.time_step)))
+        productivity_w_damage = self.economics_detail_df[GlossaryCore.ProductivityWithDamage].values
+        damefrac = self.damage_fraction_output_df[GlossaryCore.DamageFractionOutput].values
+
+        d_productivity_w_damage_d_damage_frac_output[1:, 1:] = np.tril(np.outer(
+            productivity_w_damage[1:], - self.frac_damage_prod / (1 - self.frac_damage_prod * damefrac[1:])))
         return d_productivity_w_damage_d_damage_frac_output
 
     def d_productivity_d_damage_frac_output(self):
@@ -821,50 +866,23 @@ class MacroEconomics:
         - Energy_wasted
         wrt energy
         """
-        alpha = self.output_alpha
-        gamma = self.output_gamma
-        productivity = self.economics_detail_df[GlossaryCore.Productivity].values
-        working_pop = self.workforce_df[GlossaryCore.Workforce].values
-        usable_capital = self.capital_df[GlossaryCore.UsableCapital].values
-
         energy_efficiency = self.capital_df[GlossaryCore.EnergyEfficiency].values
-        d_Ku_d_E = np.diag(self.capital_utilisation_ratio * energy_efficiency)
-
         index_zeros = self.economics_detail_df[GlossaryCore.UnusedEnergy].values > 0.
+        # direct dependency of usable capital on energy, when energy is the limiting factor
+        d_Ku_d_E_direct = np.where(index_zeros, 0., self.capital_utilisation_ratio * energy_efficiency)
 
-        d_Ku_d_E[index_zeros, index_zeros] = 0.
-
-        damefrac = self.damage_fraction_output_df[GlossaryCore.DamageFractionOutput].values
-        dQ_dY = 1 - damefrac if not self.damage_to_productivity else (1 - damefrac) / (1 - self.frac_damage_prod * damefrac)
-        d_Kne_dE = self._null_derivative()
-        dY_dE = np.diag(
-            productivity * alpha * usable_capital ** (gamma - 1) * np.diag(d_Ku_d_E) *
-            (alpha * usable_capital ** gamma + (1 - alpha) * working_pop ** gamma) ** (1. / gamma - 1.)
-        ) if self.compute_gdp else self._null_derivative()
-        dY_dE[0, 0] = 0.
-
-        for i in range(1, self.nb_per + 1):
-            for j in range(1, i):
-                dY_dE[i - 1, j] = productivity[i-1] * alpha * usable_capital[i-1] ** (gamma - 1) *\
-                    d_Ku_d_E[i - 1, j] * (alpha * usable_capital[i-1] ** gamma + (1 - alpha) * working_pop[i-1] ** gamma) ** (1. / gamma - 1.) if self.compute_gdp else 0.
-                if i < self.nb_per:
-                    d_Kne_dE[i, j] = (1 - self.depreciation_capital) * d_Kne_dE[i - 1, j] + \
-                                     self.share_non_energy_investment.values[i-1] * dQ_dY[i-1] * dY_dE[i - 1, j]
-                    d_Ku_d_E[i, j] = index_zeros[i] * self.max_capital_utilisation_ratio * d_Kne_dE[i, j]
+        dY_dE_direct = np.diag(self._d_gross_output_d_usable_capital() * d_Ku_d_E_direct)
+        dY_dE_direct[0, 0] = 0.
+        d_Kne_dE, d_Ku_d_Kne_dE, dY_dE = self._propagate_capital_derivatives(dY_dE_direct)
+        d_Ku_d_E = np.diag(d_Ku_d_E_direct) + d_Ku_d_Kne_dE
 
         d_lower_bound_constraint_dE = (d_Ku_d_E - self.capital_utilisation_ratio * d_Kne_dE) / self.usable_capital_ref if not self.compute_gdp else self._null_derivative()
         dKunbouded_d_E = np.diag(self.capital_utilisation_ratio * energy_efficiency)
-        d_Ku_obj_d_E = np.sum(2 * (dKunbouded_d_E - self.capital_utilisation_ratio * d_Kne_dE) *
-                              self.usable_cap_sqrt.reshape(-1, 1) / (self.usable_capital_objective_ref * self.nb_years), axis=0)
+        d_Ku_obj_d_E = self._d_usable_capital_objective(dKunbouded_d_E, d_Kne_dE)
         # TODO use d_Ku_d_E
-        # Energy_wasted Ew = E - KNE * k where k = max_capital_utilisation_ratio/capital_utilisation_ratio/energy_efficiency*1.e3
-        # energy_efficiency is function of the years. Eoptimal in TWh
-        k = np.diag(self.max_capital_utilisation_ratio / self.capital_utilisation_ratio / energy_efficiency * 1.e3)
-        d_Ew_dE = self._identity_derivative() * 1.e3 - np.matmul(k, d_Kne_dE) # Enet converted from PWh to TWh
-        # Since Ewasted = max(Enet - Eoptimal, 0.), gradient should be 0 when Enet - Eoptimal <=0, ie when Ewasted =0
-        # => put to 0 the lines of the gradient matrix corresponding to the years where Ewasted=0
-        matrix_of_years_E_is_wasted = (self.economics_df[GlossaryCore.EnergyWasted].values > 0.).astype(int)
-        d_Ew_dE = np.transpose(np.multiply(matrix_of_years_E_is_wasted, np.transpose(d_Ew_dE)))
+        # Enet converted from PWh to TWh, no gradient for the years where energy is not wasted
+        years_E_is_wasted = (self.economics_df[GlossaryCore.EnergyWasted].values > 0.).astype(int)
+        d_Ew_dE = np.diag(years_E_is_wasted * 1.e3) + self._d_energy_wasted_d_ne_capital(d_Kne_dE)
 
         return dY_dE, d_Ku_d_E, d_lower_bound_constraint_dE, d_Ew_dE, d_Ku_obj_d_E
 
@@ -889,48 +907,18 @@ class MacroEconomics:
         productivity = self.economics_detail_df[GlossaryCore.Productivity].values
         employment_rate = self.workforce_df[GlossaryCore.EmploymentRate].values
 
-        index_zeros = self.economics_detail_df[GlossaryCore.UnusedEnergy].values > 0.
-
-        d_Y_d_wap = np.diag(
+        d_Y_d_wap_direct = np.diag(
             productivity * (1 - alpha) * working_pop ** (gamma - 1) * employment_rate * (
                 alpha * usable_capital ** gamma + (1 - alpha) * working_pop ** gamma
             ) ** (1/gamma - 1)
         ) if self.compute_gdp else self._null_derivative()
-        d_Y_d_wap[0, 0] = 0.
-
-        d_Ku_d_wap = self._null_derivative()
-        d_Kne_d_wap = self._null_derivative()
-
-        damefrac = self.damage_fraction_output_df[GlossaryCore.DamageFractionOutput].values
-        dQ_dY = 1 - damefrac if not self.damage_to_productivity else (1 - damefrac) / (1 - self.frac_damage_prod * damefrac)
-
-        for i in range(1, self.nb_per + 1):
-            for j in range(1, i):
-                a = productivity[i-1]
-                b = alpha  * usable_capital[i-1] ** (gamma - 1) * d_Ku_d_wap[i - 1, j] + (1 - alpha) * working_pop[i - 1] * (gamma - 1) * employment_rate[i - 1] * (i-1 == j)
-                c = (alpha * usable_capital[i-1] ** gamma + (1 - alpha) * working_pop[i-1] ** gamma) ** (1/gamma - 1)
-
-                if i -1 != j and self.compute_gdp:
-                    d_Y_d_wap[i - 1, j] = a * b * c
-
-                if i < self.nb_per:
-                    d_Kne_d_wap[i, j] = (1 - self.depreciation_capital) * d_Kne_d_wap[i - 1, j] +\
-                            self.share_non_energy_investment.values[i - 1] * dQ_dY[i - 1] * d_Y_d_wap[i - 1, j]
-                    d_Ku_d_wap[i, j] = index_zeros[i] * self.max_capital_utilisation_ratio * d_Kne_d_wap[i, j]
+        d_Y_d_wap_direct[0, 0] = 0.
+        d_Kne_d_wap, d_Ku_d_wap, d_Y_d_wap = self._propagate_capital_derivatives(d_Y_d_wap_direct)
 
         d_lower_bound_constraint_d_wap = (d_Ku_d_wap - self.capital_utilisation_ratio * d_Kne_d_wap) / self.usable_capital_ref if not self.compute_gdp else self._null_derivative()
         d_Ku_unbouded_d_wap = self._null_derivative()
-        d_Ku_obj_d_wap = np.sum(2 * (d_Ku_unbouded_d_wap - self.capital_utilisation_ratio * d_Kne_d_wap)
-                                * self.usable_cap_sqrt.reshape(-1, 1)/ (self.usable_capital_objective_ref * self.nb_years), axis=0)
-        # Energy_wasted Ew = E - KNE * k where k = max_capital_utilisation_ratio/capital_utilisation_ratio/energy_efficiency * 1e3
-        # energy_efficiency is function of the years. Eoptimal in TWh
-        energy_efficiency = self.capital_df[GlossaryCore.EnergyEfficiency].values
-        k = np.diag(self.max_capital_utilisation_ratio / self.capital_utilisation_ratio / energy_efficiency * 1.e3)
-        d_Ew_d_wap = - np.matmul(k, d_Kne_d_wap)
-        # Since Ewasted = max(Enet - Eoptimal, 0.), gradient should be 0 when Enet - Eoptimal <=0, ie when Ewasted =0
-        # => put to 0 the lines of the gradient matrix corresponding to the years where Ewasted=0
-        matrix_of_years_E_is_wasted = (self.economics_df[GlossaryCore.EnergyWasted].values > 0.).astype(int)
-        d_Ew_d_wap = np.transpose(np.multiply(matrix_of_years_E_is_wasted, np.transpose(d_Ew_d_wap)))
+        d_Ku_obj_d_wap = self._d_usable_capital_objective(d_Ku_unbouded_d_wap, d_Kne_d_wap)
+        d_Ew_d_wap = self._d_energy_wasted_d_ne_capital(d_Kne_d_wap)
 
         return d_Ku_d_wap, d_Ew_d_wap, d_Y_d_wap, d_lower_bound_constraint_d_wap, d_Ku_obj_d_wap
 
@@ -1124,75 +1112,34 @@ class MacroEconomics:
         gamma = self.output_gamma
         alpha = self.output_alpha
 
-        d_gross_output_d_productivity = np.diag(
-            (alpha * capital_u ** gamma + (1 - alpha) * working_pop ** gamma) ** (1 / gamma))
-
-        d_gross_output_d_productivity[0, 0] = 0  # at year start gross output is an input
-        d_Y_d_dfo = d_gross_output_d_productivity @ d_productivity_d_damage_frac_output if self.compute_gdp else self._null_derivative()
-        productivity = self.economics_detail_df[GlossaryCore.Productivity].values
-
-        ############
-        index_zeros = self.economics_detail_df[GlossaryCore.UnusedEnergy].values > 0.
+        d_gross_output_d_productivity = (alpha * capital_u ** gamma + (1 - alpha) * working_pop ** gamma) ** (1 / gamma)
+        d_gross_output_d_productivity[0] = 0  # at year start gross output is an input
+        d_Y_d_dfo_direct = d_gross_output_d_productivity.reshape(-1, 1) * d_productivity_d_damage_frac_output if self.compute_gdp else self._null_derivative()
 
+        # damage fraction also acts directly on net output
         damefrac = self.damage_fraction_output_df[GlossaryCore.DamageFractionOutput].values
         Y = self.economics_df[GlossaryCore.GrossOutput].values
-        dQ_dY = 1 - damefrac if not self.damage_to_productivity else (1 - damefrac) / (1 - self.frac_damage_prod * damefrac)
-
         d_dQ_dY_d_dfo = damefrac * 0 - 1. if not self.damage_to_productivity else ((self.frac_damage_prod - 1)
                                                                                    / ((1 - self.frac_damage_prod * damefrac) ** 2))
-        d_Kne_d_dfo = self._null_derivative()
-        d_Ku_d_dfo = self._null_derivative()
-        for i in range(1, self.nb_per):
-            for j in range(i):
-                dQ_im1_d_dfo_j = dQ_dY[i - 1] * d_Y_d_dfo[i - 1, j] + Y[i - 1] * d_dQ_dY_d_dfo[i - 1] * (i - 1 == j)
-                d_Kne_d_dfo[i, j] = (1 - self.depreciation_capital) * d_Kne_d_dfo[i - 1, j] + \
-                                    self.share_non_energy_investment.values[i - 1] * dQ_im1_d_dfo_j
-                d_Ku_d_dfo[i, j] = index_zeros[i] * self.max_capital_utilisation_ratio * d_Kne_d_dfo[i, j]
-                d_Y_d_dfo[i, j] += productivity[i] * alpha * d_Ku_d_dfo[i, j] * (
-                        capital_u[i] ** (gamma - 1) * (alpha * capital_u[i] ** gamma + (1-alpha) * working_pop[i] ** gamma) ** (1/gamma - 1)
-                ) if self.compute_gdp else 0.
+        d_Kne_d_dfo, d_Ku_d_dfo, d_Y_d_dfo = self._propagate_capital_derivatives(d_Y_d_dfo_direct, Y * d_dQ_dY_d_dfo)
 
         d_lower_bound_constraint_d_dfo = (d_Ku_d_dfo - self.capital_utilisation_ratio * d_Kne_d_dfo) / self.usable_capital_ref if not self.compute_gdp else self._null_derivative()
         dKunbouded_d_E = self._null_derivative()
-        d_Ku_obj_d_dfo = np.sum(2 * (dKunbouded_d_E - self.capital_utilisation_ratio * d_Kne_d_dfo)
-                                * self.usable_cap_sqrt.reshape(-1, 1) / (self.usable_capital_objective_ref * self.nb_years), axis=0)
-
-        # Energy_wasted Ew = E - KNE * k where k = max_capital_utilisation_ratio/capital_utilisation_ratio/energy_efficiency*1e3
-        # energy_efficiency is function of the years. Eoptimal in TWh
-        energy_efficiency = self.capital_df[GlossaryCore.EnergyEfficiency].values
-        k = np.diag(self.max_capital_utilisation_ratio / self.capital_utilisation_ratio / energy_efficiency * 1.e3)
-        d_Ew_d_dfo = - np.matmul(k, d_Kne_d_dfo)
-        # Since Ewasted = max(Enet - Eoptimal, 0.), gradient should be 0 when Enet - Eoptimal <=0, ie when Ewasted =0
-        # => put to 0 the lines of the gradient matrix corresponding to the years where Ewasted=0
-        matrix_of_years_E_is_wasted = (self.economics_df[GlossaryCore.EnergyWasted].values > 0.).astype(int)
-        d_Ew_d_dfo = np.transpose(np.multiply(matrix_of_years_E_is_wasted, np.transpose(d_Ew_d_dfo)))
-
+        d_Ku_obj_d_dfo = self._d_usable_capital_objective(dKunbouded_d_E, d_Kne_d_dfo)
+        d_Ew_d_dfo = self._d_energy_wasted_d_ne_capital(d_Kne_d_dfo)
 
         return d_Y_d_dfo, d_Ku_d_dfo, d_Ew_d_dfo, d_lower_bound_constraint_d_dfo, d_Ku_obj_d_dfo
 
     def d_net_output_d_damage_frac_output(self, d_gross_output_d_damage_frac_output):
-        """derivative of net output wrt damage frac output #todo: refactor!!!"""
-        nb_years = len(self.years_range)
-        d_net_output_d_damage_frac_output = self._null_derivative()
-        for i in range(nb_years):
-            gross_output = self.economics_detail_df.loc[self.years_range[i], GlossaryCore.GrossOutput]
-            damage_frac_output = self.damage_fraction_output_df.loc[self.years_range[i], GlossaryCore.DamageFractionOutput]
-            for j in range(0, i + 1):
-                if i == j:
-                    if self.damage_to_productivity:
-                        d_net_output_d_damage_frac_output[i, j] = (self.frac_damage_prod - 1) / ((self.frac_damage_prod * damage_frac_output - 1)**2) * gross_output + \
-                                            (1 - damage_frac_output) / (1 - self.frac_damage_prod *
-                                              damage_frac_output) * d_gross_output_d_damage_frac_output[i, j]
-                    else:
-                        d_net_output_d_damage_frac_output[i, j] = - gross_output + \
-                                            (1 - damage_frac_output) * d_gross_output_d_damage_frac_output[i, j]
-                else:
-                    if self.damage_to_productivity:
-                        d_net_output_d_damage_frac_output[i, j] = (
-                            1 - damage_frac_output) / (1 - self.frac_damage_prod * damage_frac_output) * d_gross_output_d_damage_frac_output[i, j]
-                    else:
-                        d_net_output_d_damage_frac_output[i, j] = (
-                            1 - damage_frac_output) * d_gross_output_d_damage_frac_output[i, j]
+        """derivative of net output wrt damage frac output"""
+        gross_output = self.economics_detail_df[GlossaryCore.GrossOutput].values
+        damage_frac_output = self.damage_fraction_output_df[GlossaryCore.DamageFractionOutput].values
+        if self.damage_to_productivity:
+            d_net_output_d_damage_frac_output_direct = (self.frac_damage_prod - 1) / ((self.frac_damage_prod * damage_frac_output - 1)**2) * gross_output
+        else:
+            d_net_output_d_damage_frac_output_direct = - gross_output
+        d_net_output_d_damage_frac_output = np.tril(self._d_net_output_d_gross_output().reshape(-1, 1) * d_gross_output_d_damage_frac_output) + \
+            np.diag(d_net_output_d_damage_frac_output_direct)
         return d_net_output_d_damage_frac_output
 
     def d_investment_d_co2emissions(self):
@@ -1307,15 +1254,12 @@ class MacroEconomics:
         productivity_w_damage = self.economics_detail_df[GlossaryCore.ProductivityWithDamage].values
 
         d_productivity_w_damage_d_damage_frac_output = self.d_productivity_w_damage_d_damage_frac_output()
-        nb_years = len(self.years_range)
         d_damages_from_productivity_loss_d_damage_fraction_output = self._null_derivative()
-        d_estimated_damages_from_productivity_loss_d_damage_fraction_output = self._null_derivative()
         if self.damage_to_productivity:
-            for i in range(nb_years):
-                d_estimated_damages_from_productivity_loss_d_damage_fraction_output[i] = d_gross_output_d_damage_fraction_output[i] * (productivity_wo_damage[i]/productivity_w_damage[i] - 1) +\
-                    - gross_output[i] * productivity_wo_damage[i] / productivity_w_damage[i] ** 2 * d_productivity_w_damage_d_damage_frac_output[i]
+            d_estimated_damages_from_productivity_loss_d_damage_fraction_output = d_gross_output_d_damage_fraction_output * (productivity_wo_damage / productivity_w_damage - 1).reshape(-1, 1) +\
+                - (gross_output * productivity_wo_damage / productivity_w_damage ** 2).reshape(-1, 1) * d_productivity_w_damage_d_damage_frac_output
         else:
-            d_estimated_damages_from_productivity_loss_d_damage_fraction_output = np.diag((productivity_wo_damage - productivity_w_damage)/productivity_wo_damage) @ d_gross_output_d_damage_fraction_output - np.diag(gross_output / productivity_wo_damage) @ d_productivity_w_damage_d_damage_frac_output
+            d_estimated_damages_from_productivity_loss_d_damage_fraction_output = ((productivity_wo_damage - productivity_w_damage) / productivity_wo_damage).reshape(-1, 1) * d_gross_output_d_damage_fraction_output - (gross_output / productivity_wo_damage).reshape(-1, 1) * d_productivity_w_damage_d_damage_frac_output
         if self.compute_climate_impact_on_gdp and self.damage_to_productivity:
             d_damages_from_productivity_loss_d_damage_fraction_output = d_estimated_damages_from_productivity_loss_d_damage_fraction_output
 
@@ -1347,4 +1291,4 @@ class MacroEconomics:
     """-------------------END of Gradient functions-------------------"""
 
     def compute_consumption_objective(self):
-        self.consommation_objective = np.array([self.economics_df[GlossaryCore.Consumption].mean()]) / self.consommation_objective_ref
+        self.consommation_objective = np.array([self.economics_arrays[GlossaryCore.Consumption].mean()]) / self.consommation_objective_ref
@@ -17,7 +17,9 @@ limitations under the License.
 
 import numpy as np
 from pandas.core.frame import DataFrame
+from scipy.signal import lfilter
 
+from climateeconomics.core.tools.jacobian_tools import impulse_response_matrix
 from climateeconomics.glossarycore import GlossaryCore
 
 
@@ -36,6 +38,7 @@ class TempChange(object):
         '''
         self.ghg_cycle_df = None
         self.forcing_df = None
+        self.forcing_components = {}
         self.temperature_objective = None
         self.temperature_end_constraint = None
         self.ppm_to_gtc = 2.13
@@ -81,6 +84,11 @@ class TempChange(object):
         # FUND
         self.climate_sensitivity = 3.0
 
+        if self.temperature_model == 'FAIR':
+            self.transient_climate_response = inputs['transient_climate_response']
+            self.equilibrium_climate_sensitivity = inputs['equilibrium_climate_sensitivity']
+            self.thermal_response_timescales = np.array(inputs['thermal_response_timescales'])
+
 
     def create_dataframe(self):
         '''
@@ -118,7 +126,7 @@ class TempChange(object):
         exog_forcing = np.linspace(
             self.init_forcing_nonco, self.hundred_forcing_nonco, len(self.years_range))
 
-        self.forcing_df['CH4 and N20 forcing'] = exog_forcing
+        self.forcing_components['CH4 and N20 forcing'] = exog_forcing
         return exog_forcing
 
     def compute_exog_forcing_myhre(self, ch4_ppm, n2o_ppm):
@@ -141,7 +149,7 @@ class TempChange(object):
             0.12 * (np.sqrt(n2o_ppm) - np.sqrt(self.n2o_conc_init_ppm)) - MN(self.ch4_conc_init_ppm, n2o_ppm) \
             + 2 * MN(self.ch4_conc_init_ppm, self.n2o_conc_init_ppm)
 
-        self.forcing_df['CH4 and N2O forcing'] = exog_forcing
+        self.forcing_components['CH4 and N2O forcing'] = exog_forcing
         return exog_forcing
 
     def compute_forcing_etminan(self, co2_ppm, ch4_ppm, n2o_ppm):
@@ -157,8 +165,7 @@ class TempChange(object):
 
         # sign values instead of fabs because gradients are not well computed
         # with np.abs
-        sign_values = np.ones(len(co2_ppm))
-        sign_values[co2_ppm.real < self.c0_ppm] = -1
+        sign_values = np.where(co2_ppm.real < self.c0_ppm, -1., 1.)
 
         co2_forcing = (-2.4e-7 * (co2_ppm - self.c0_ppm)**2 + 7.2e-4 * sign_values * (co2_ppm - self.c0_ppm) -
                        2.1e-4 * n2omean + self.forcing_eq_co2 / np.log(2)) * np.log(co2_ppm / self.c0_ppm)
@@ -167,9 +174,9 @@ class TempChange(object):
         n2o_forcing = (-8.0e-6 * co2mean + 4.2e-6 * n2omean - 4.9e-6 * ch4mean + 0.117) * \
             (np.sqrt(n2o_ppm) - np.sqrt(self.n2o_conc_init_ppm))
 
-        self.forcing_df['CO2 forcing'] = co2_forcing
-        self.forcing_df['CH4 forcing'] = ch4_forcing
-        self.forcing_df['N2O forcing'] = n2o_forcing
+        self.forcing_components['CO2 forcing'] = co2_forcing
+        self.forcing_components['CH4 forcing'] = ch4_forcing
+        self.forcing_components['N2O forcing'] = n2o_forcing
 
         return co2_forcing + ch4_forcing + n2o_forcing
 
@@ -203,18 +210,18 @@ class TempChange(object):
 
         alpha_n2o = c1 * np.sqrt(n2o_ppm)
         co2_forcing = (alphap + alpha_n2o) * np.log(co2_ppm / self.c0_ppm)
-        self.forcing_df['CO2 forcing'] = co2_forcing
+        self.forcing_components['CO2 forcing'] = co2_forcing
 
         # CH4
         ch4_forcing = (
             a3 * np.sqrt(ch4_ppm) + b3 * np.sqrt(n2o_ppm) + d3) * (np.sqrt(ch4_ppm) - np.sqrt(self.ch4_conc_init_ppm))
 
-        self.forcing_df['CH4 forcing'] = ch4_forcing
+        self.forcing_components['CH4 forcing'] = ch4_forcing
         # N2O
         n2o_forcing = (a2 * np.sqrt(co2_ppm) + b2 * np.sqrt(n2o_ppm) +
                        c2 * np.sqrt(ch4_ppm) + d2) * (np.sqrt(n2o_ppm) - np.sqrt(self.n2o_conc_init_ppm))
 
-        self.forcing_df['N2O forcing'] = n2o_forcing
+        self.forcing_components['N2O forcing'] = n2o_forcing
 
         return co2_forcing + ch4_forcing + n2o_forcing
 
@@ -223,26 +230,23 @@ class TempChange(object):
             np.log(co2_ppm / (self.c0_ppm))
         return co2_forcing
 
-    def compute_forcing(self):
+    def compute_forcing_arrays(self, co2_ppm, ch4_ppm, n2o_ppm):
         """
-        Compute increase in radiative forcing for t using values at t-1
-        (watts per m2 from 1900)
+        Compute increase in radiative forcing (watts per m2 from 1900) from the concentrations,
+        which can have leading scenario axes. The forcing of each gas is stored in forcing_components
         """
-        co2_ppm = self.ghg_cycle_df[GlossaryCore.CO2Concentration].values
-        ch4_ppm = self.ghg_cycle_df[GlossaryCore.CH4Concentration].values
-        n2o_ppm = self.ghg_cycle_df[GlossaryCore.N2OConcentration].values
-
+        self.forcing_components = {}
         if self.forcing_model == 'DICE':
 
             exog_forcing = self.compute_exog_forcing_dice()
             co2_forcing = self.compute_log_co2_forcing(co2_ppm)
-            self.forcing_df['CO2 forcing'] = co2_forcing
+            self.forcing_components['CO2 forcing'] = co2_forcing
             forcing = co2_forcing + exog_forcing
 
         elif self.forcing_model == 'Myhre':
             exog_forcing = self.compute_exog_forcing_myhre(ch4_ppm, n2o_ppm)
             co2_forcing = self.compute_log_co2_forcing(co2_ppm)
-            self.forcing_df['CO2 forcing'] = co2_forcing
+            self.forcing_components['CO2 forcing'] = co2_forcing
             forcing = co2_forcing + exog_forcing
 
         elif self.forcing_model == 'Etminan':
@@ -253,71 +257,202 @@ class TempChange(object):
 
             forcing = self.compute_forcing_meinshausen(co2_ppm, ch4_ppm, n2o_ppm)
 
+        return forcing
+
+    def compute_forcing(self):
+        """
+        Compute increase in radiative forcing for t using values at t-1
+        (watts per m2 from 1900)
+        """
+        co2_ppm = self.ghg_cycle_df[GlossaryCore.CO2Concentration].values
+        ch4_ppm = self.ghg_cycle_df[GlossaryCore.CH4Concentration].values
+        n2o_ppm = self.ghg_cycle_df[GlossaryCore.N2OConcentration].values
+
+        forcing = self.compute_forcing_arrays(co2_ppm, ch4_ppm, n2o_ppm)
+        for forcing_name, gas_forcing in self.forcing_components.items():
+            self.forcing_df[forcing_name] = gas_forcing
+
         self.temperature_df[GlossaryCore.Forcing] = forcing
 
+    def compute_temperature_arrays(self, forcing: np.ndarray) -> dict:
+        """
+        Compute atmosphere and ocean temperatures and sea level from the radiative forcing,
+        years are on the last axis and leading axes are scenarios.
+        DICE, FUND and FAIR are linear in the forcing : temperatures are sums of first order thermal modes, each one
+        the causal convolution of the forcing with its geometric impulse response, computed for all years at once
+        """
+        dtype = np.result_type(forcing, np.float64)
+        temperatures = {GlossaryCore.TempAtmo: np.zeros(forcing.shape, dtype=dtype),
+                        GlossaryCore.TempOcean: np.zeros(forcing.shape, dtype=dtype),
+                        'sea_level': np.zeros(forcing.shape, dtype=dtype)}
+        temperatures.update(self.compute_thermal_responses(forcing))
+        temp_atmo = temperatures[GlossaryCore.TempAtmo]
+        temp_ocean = temperatures[GlossaryCore.TempOcean]
+        temp_atmo[..., 0] = self.init_temp_atmo
+        temp_ocean[..., 0] = self.init_temp_ocean
+
+        if self.temperature_model == 'DICE':
+            # bounds make DICE non linear, trajectories reaching them are stepped year by year
+            out_of_bounds = np.any((temp_atmo[..., 1:].real > self.up_tatmo) |
+                                   (temp_ocean[..., 1:].real < self.lo_tocean) |
+                                   (temp_ocean[..., 1:].real > self.up_tocean), axis=-1)
+            if np.any(out_of_bounds):
+                temp_atmo[out_of_bounds], temp_ocean[out_of_bounds] = self.compute_bounded_temperatures_dice(
+                    forcing[out_of_bounds])
+
+        elif self.temperature_model == 'FUND':
+            temperatures['sea_level'] = self.compute_sea_level_fund(temp_atmo)
+
+        return temperatures
+
+    def compute_thermal_modes(self):
+        """
+        Decompose the temperature model in independent first order modes
+        mode_k(t) = decays[k] * mode_k(t-1) + gains[k] * forcing(t)
+        Returns the decays, gains and initial values of the modes, and the weights of the modes in each temperature
+        """
+        if self.temperature_model == 'DICE':
+            # (temp_atmo, temp_ocean)(t) = transition @ (temp_atmo, temp_ocean)(t-1) + (c_upper, 0) * forcing(t)
+            c_upper = self.climate_upper / (5.0 / self.time_step)
+            c_transfer_upper = self.transfer_upper / (5.0 / self.time_step)
+            c_transfer_lower = self.transfer_lower / (5.0 / self.time_step)
+            transition = np.array([[1. - c_upper * self.forcing_eq_co2 / self.eq_temp_impact - c_upper * c_transfer_upper,
+                                    c_upper * c_transfer_upper],
+                                   [c_transfer_lower, 1. - c_transfer_lower]])
+            decays, modes = np.linalg.eig(transition)
+            gains = np.linalg.solve(modes, [c_upper, 0.])
+            initial_modes = np.linalg.solve(modes, [self.init_temp_atmo, self.init_temp_ocean])
+            output_weights = {GlossaryCore.TempAtmo: modes[0], GlossaryCore.TempOcean: modes[1]}
+
+        elif self.temperature_model == 'FUND':
+            e_folding_time = self.compute_e_folding_time_fund()
+            decays = np.array([1 - 1 / e_folding_time])
+            gains = np.array([self.climate_sensitivity / (5.35 * np.log(2) * e_folding_time)])
+            initial_modes = np.array([self.init_temp_atmo])
+            output_weights = {GlossaryCore.TempAtmo: np.ones(1)}
+
+        elif self.temperature_model == 'FAIR':
+            decays = np.exp(-self.time_step / self.thermal_response_timescales)
+            equilibrium_responses = self.compute_equilibrium_responses_fair()
+            gains = equilibrium_responses * (1. - decays)
+            # the initial anomaly is shared between the boxes as their equilibrium responses
+            initial_modes = self.init_temp_atmo * equilibrium_responses / equilibrium_responses.sum()
+            output_weights = {GlossaryCore.TempAtmo: np.ones(2)}
+
+        else:
+            raise ValueError(f'Unknown temperature model {self.temperature_model}')
+
+        return decays, gains, initial_modes, output_weights
+
+    def compute_thermal_responses(self, forcing: np.ndarray) -> dict:
+        """
+        Temperatures driven by the forcing, as the sum of the responses of the thermal modes
+        """
+        decays, gains, initial_modes, output_weights = self.compute_thermal_modes()
+        # first year is from initial data
+        forcing = np.array(forcing, dtype=np.result_type(forcing, np.float64))
+        forcing[..., 0] = 0.0
+        modes = [lfilter([gain], [1., -decay], forcing, axis=-1,
+                         zi=np.full(forcing.shape[:-1] + (1,), initial_mode, dtype=forcing.dtype))[0]
+                 for decay, gain, initial_mode in zip(decays, gains, initial_modes)]
+        return {column: sum(weight * mode for weight, mode in zip(weights, modes))
+                for column, weights in output_weights.items()}
+
+    def compute_d_temperatures_d_forcing(self) -> dict:
+        """
+        Jacobian of each temperature wrt forcing : the lower triangular Toeplitz impulse response of the thermal modes
+        """
+        decays, gains, _, output_weights = self.compute_thermal_modes()
+        d_temperatures_d_forcing = {}
+        for column, weights in output_weights.items():
+            d_temp_d_forcing = impulse_response_matrix(decays, weights * gains, len(self.years_range))
+            # first year is from initial data and is fixed ==> grad is zero
+            d_temp_d_forcing[:, 0] = 0.0
+            d_temperatures_d_forcing[column] = d_temp_d_forcing
+        return d_temperatures_d_forcing
+
     ######### DICE ########
-    def compute_temp_atmo(self, year):
+    def compute_temp_atmo(self, p_temp_atmo, p_temp_ocean, forcing):
         """
         Compute temperature of atmosphere (t) using t-1 values
         """
-        p_temp_atmo = self.temperature_df.at[year -
-                                             self.time_step, GlossaryCore.TempAtmo]
-        p_temp_ocean = self.temperature_df.at[year -
-                                              self.time_step, GlossaryCore.TempOcean]
-        forcing = self.temperature_df.at[year, GlossaryCore.Forcing]
         temp_atmo = p_temp_atmo + (self.climate_upper / (5.0 / self.time_step)) * \
             ((forcing - (self.forcing_eq_co2 / self.eq_temp_impact) *
               p_temp_atmo) - ((self.transfer_upper / (5.0 / self.time_step)) * (p_temp_atmo - p_temp_ocean)))
-        # Lower bound
-        self.temperature_df.loc[year, GlossaryCore.TempAtmo] = min(
-            temp_atmo, self.up_tatmo)
-        return temp_atmo
+        # Upper bound
+        return np.where(temp_atmo.real > self.up_tatmo, self.up_tatmo, temp_atmo)
 
-    def compute_temp_ocean(self, year):
+    def compute_temp_ocean(self, p_temp_atmo, p_temp_ocean):
         """
         Compute temperature of lower ocean  at t using t-1 values
         """
-        p_temp_ocean = self.temperature_df.at[year -
-                                              self.time_step, GlossaryCore.TempOcean]
-        p_temp_atmo = self.temperature_df.at[year -
-                                             self.time_step, GlossaryCore.TempAtmo]
         temp_ocean = p_temp_ocean + (self.transfer_lower / (5.0 / self.time_step)) * \
             (p_temp_atmo - p_temp_ocean)
         # Bounds
-        temp_ocean = max(temp_ocean, self.lo_tocean)
-        self.temperature_df.loc[year, GlossaryCore.TempOcean] = min(
-            temp_ocean, self.up_tocean)
-        return temp_ocean
+        temp_ocean = np.where(temp_ocean.real < self.lo_tocean, self.lo_tocean, temp_ocean)
+        return np.where(temp_ocean.real > self.up_tocean, self.up_tocean, temp_ocean)
+
+    def compute_bounded_temperatures_dice(self, forcing):
+        """
+        Step DICE temperatures year by year, for forcing trajectories driving them to their bounds
+        """
+        dtype = np.result_type(forcing, np.float64)
+        temp_atmo = np.zeros(forcing.shape, dtype=dtype)
+        temp_ocean = np.zeros(forcing.shape, dtype=dtype)
+        temp_atmo[..., 0] = self.init_temp_atmo
+        temp_ocean[..., 0] = self.init_temp_ocean
+        for i in range(1, forcing.shape[-1]):
+            temp_atmo[..., i] = self.compute_temp_atmo(temp_atmo[..., i - 1], temp_ocean[..., i - 1], forcing[..., i])
+            temp_ocean[..., i] = self.compute_temp_ocean(temp_atmo[..., i - 1], temp_ocean[..., i - 1])
+        return temp_atmo, temp_ocean
 
     ######### FUND ########
-    def compute_temp_fund(self, year, temperature):
+    def compute_e_folding_time_fund(self):
         """
-        Compute temperature of atmosphere (t) using t-1 values following FUND Model
+        e-folding time of the FUND temperature response, function of the climate sensitivity
         """
         alpha = -42.7
         beta_l = 29.1
         beta_q = 0.001
         cs = self.climate_sensitivity
-        e_folding_time = max(alpha +
-                             beta_l * cs +
-                             beta_q * cs * cs,
-                             1)
-        radiative_forcing = self.temperature_df.loc[self.temperature_df[GlossaryCore.Years] == year, GlossaryCore.Forcing].values[0]
-        temperature = (1-1/e_folding_time)*temperature + cs/(5.35*np.log(2)*e_folding_time)*radiative_forcing
-
-        self.temperature_df.loc[self.temperature_df[GlossaryCore.Years] == year, GlossaryCore.TempAtmo] = temperature
-        return temperature
+        return max(alpha + beta_l * cs + beta_q * cs * cs, 1)
 
-    def compute_sea_level_fund(self, year, sea_level, temperature):
+    def compute_sea_level_fund(self, temperature):
         """
-        Compute seal level (t) using t-1 values following FUND Model
+        Compute seal level following FUND Model, sea_level(t) = (1 - 1/rho) * sea_level(t-1) + gamma * temp(t) / rho
         """
         rho = 500
         gamma = 2
-        seal_level = (1 - 1 / rho) * sea_level + gamma * temperature / rho
+        temperature = np.array(temperature)
+        # first year sea level is zero
+        temperature[..., 0] = 0.0
+        return lfilter([gamma / rho], [1., -(1 - 1 / rho)], temperature, axis=-1)
 
-        self.temperature_df.loc[self.temperature_df[GlossaryCore.Years] == year, 'sea_level'] = seal_level
-        return seal_level
+    ######### FAIR ########
+    def compute_equilibrium_responses_fair(self):
+        """
+        Equilibrium temperature response to a unit forcing of the two FAIR thermal boxes (°C per W/m2),
+        calibrated on the transient climate response and the equilibrium climate sensitivity as in FAIR 1.x
+        Millar et al, 2017, Atmos. Chem. Phys., doi: 10.5194/acp-17-7213-2017
+        """
+        # years to double CO2 concentration with a 1% yearly increase
+        tcr_doubling_time = np.log(2) / np.log(1.01)
+        timescales = self.thermal_response_timescales
+        k = 1. - timescales / tcr_doubling_time * (1. - np.exp(-tcr_doubling_time / timescales))
+        return np.array([self.transient_climate_response - self.equilibrium_climate_sensitivity * k[1],
+                         self.equilibrium_climate_sensitivity * k[0] - self.transient_climate_response]) / \
+            (self.forcing_eq_co2 * (k[0] - k[1]))
+
+    def compute_scenarios(self, co2_ppm: np.ndarray, ch4_ppm: np.ndarray, n2o_ppm: np.ndarray) -> dict:
+        """
+        Compute forcing and temperatures of a batch of concentration scenarios in one call, without dataframes.
+        Concentrations are arrays of shape (n_scenarios, n_years) (a single year axis is broadcast to all scenarios),
+        outputs are returned with the same shape, indexed by their temperature_df column name
+        """
+        co2_ppm, ch4_ppm, n2o_ppm = np.broadcast_arrays(*[np.atleast_2d(conc) for conc in (co2_ppm, ch4_ppm, n2o_ppm)])
+        forcing = self.compute_forcing_arrays(co2_ppm, ch4_ppm, n2o_ppm)
+
+        return {GlossaryCore.Forcing: forcing, **self.compute_temperature_arrays(forcing)}
 
     ######### CONSTRAINT ########
     def compute_temperature_year_end_constraint(self):
@@ -518,60 +653,68 @@ class TempChange(object):
 
         d_tempatmo_d_atmoconc[0, 0] = 0.0
 
-        for i in range(2, nb_years):
-            j = 1
+        # if temp_atmo is saturated at up_tatmo, it won't depend on atmo_conc anymore
+        # so the derivative will be zero
+        # if temp_ocean is saturated it has no effect as it only depends on
+        # temp_atmo
+        saturated_temp_atmo = self.temperature_df[GlossaryCore.TempAtmo].values == self.up_tatmo
 
-            # if temp_atmo is saturated at up_tatmo, it won't depend on atmo_conc anymore
-            # so the derivative will be zero
-            # if temp_ocean is saturated it has no effect as it only depends on
-            # temp_atmo
-            if (self.temperature_df.at[self.years_range[i], GlossaryCore.TempAtmo] == self.up_tatmo):
+        for i in range(2, nb_years):
+            if saturated_temp_atmo[i]:
                 d_tempatmo_d_atmoconc[i, i] = 0
 
-            while j < i:
-                #-------atmo temp derivative------------
-                d_tempatmo_d_atmoconc[i, j] = d_tempatmo_d_atmoconc[i - 1, j] \
-                    - self.climate_upper * self.time_step / 5.0 * self.forcing_eq_co2 / self.eq_temp_impact * d_tempatmo_d_atmoconc[i - 1, j] \
-                    - self.climate_upper * self.time_step / 5.0 * self.transfer_upper * self.time_step / \
-                    5.0 * \
-                    (d_tempatmo_d_atmoconc[i - 1, j] -
-                     d_tempocean_d_atmoconc[i - 1, j])
-                #-------ocean temp derivative-----------
-                # if atmo temp is saturated
-                if (self.temperature_df.at[self.years_range[i], GlossaryCore.TempAtmo] == self.up_tatmo):
-                    d_tempatmo_d_atmoconc[i, j] = 0
-
-                d_tempocean_d_atmoconc[i, j] = d_tempocean_d_atmoconc[i - 1, j] \
-                    + self.transfer_lower * self.time_step / 5.0 * \
-                    (d_tempatmo_d_atmoconc[i - 1, j] -
-                     d_tempocean_d_atmoconc[i - 1, j])
-                j = j + 1
+            #-------atmo temp derivative------------
+            d_tempatmo_d_atmoconc[i, 1:i] = d_tempatmo_d_atmoconc[i - 1, 1:i] \
+                - self.climate_upper * self.time_step / 5.0 * self.forcing_eq_co2 / self.eq_temp_impact * d_tempatmo_d_atmoconc[i - 1, 1:i] \
+                - self.climate_upper * self.time_step / 5.0 * self.transfer_upper * self.time_step / \
+                5.0 * \
+                (d_tempatmo_d_atmoconc[i - 1, 1:i] -
+                 d_tempocean_d_atmoconc[i - 1, 1:i])
+            #-------ocean temp derivative-----------
+            # if atmo temp is saturated
+            if saturated_temp_atmo[i]:
+                d_tempatmo_d_atmoconc[i, 1:i] = 0
+
+            d_tempocean_d_atmoconc[i, 1:i] = d_tempocean_d_atmoconc[i - 1, 1:i] \
+                + self.transfer_lower * self.time_step / 5.0 * \
+                (d_tempatmo_d_atmoconc[i - 1, 1:i] -
+                 d_tempocean_d_atmoconc[i - 1, 1:i])
 
         return d_tempatmo_d_atmoconc, d_tempocean_d_atmoconc
 
-    def compute_d_temp_d_forcing_fund(self):
+    def compute_d_temp_d_forcing(self):
         """
-        computes derivative of FUND temperature function
+        computes derivative of FUND and FAIR temperature wrt forcing, the impulse response of their thermal modes
         """
-        alpha = -42.7
-        beta_l = 29.1
-        beta_q = 0.001
-        e_folding_time = max(alpha +
-                             beta_l * self.climate_sensitivity +
-                             beta_q * self.climate_sensitivity * self.climate_sensitivity,
-                             1)
+        return self.compute_d_temperatures_d_forcing()[GlossaryCore.TempAtmo]
+
+    def compute_d_temp_d_concentrations(self) -> dict:
+        """
+        computes derivatives of FUND and FAIR temperature wrt the concentration of each GHG,
+        forcing of each year only depends on concentrations of the same year
+        """
+        d_temp_d_forcing = self.compute_d_temp_d_forcing()
+        self.compute_d_forcing()
+        d_forcing_datmo_conc = self.d_forcing_datmo_conc_dict
 
-        coeff = self.climate_sensitivity/(5.35*np.log(2)*e_folding_time)
-        decay = (1-1/e_folding_time)
-        mat = np.diag(coeff*np.ones(len(self.years_range)))
+        if self.forcing_model == 'DICE':
+            d_forcing_d_conc = {GlossaryCore.CO2Concentration: d_forcing_datmo_conc['CO2 forcing']}
+
+        elif self.forcing_model == 'Myhre':
+            d_forcing_d_conc = {GlossaryCore.CO2Concentration: d_forcing_datmo_conc['CO2 forcing'],
+                                GlossaryCore.CH4Concentration: d_forcing_datmo_conc['CH4 forcing'],
+                                GlossaryCore.N2OConcentration: d_forcing_datmo_conc['N2O forcing']}
 
-        for i in np.arange(1, len(self.years_range-1)):
-            coeff = coeff*decay
-            mat += np.diag(coeff*np.ones(len(self.years_range)-i), -i)
+        elif self.forcing_model == 'Etminan' or self.forcing_model == 'Meinshausen':
+            d_forcing_d_conc = {
+                GlossaryCore.CO2Concentration: d_forcing_datmo_conc['CO2 forcing CO2 ppm'] +
+                d_forcing_datmo_conc['N2O forcing CO2 ppm'],
+                GlossaryCore.CH4Concentration: d_forcing_datmo_conc['CH4 forcing CH4 ppm'] +
+                d_forcing_datmo_conc['N2O forcing CH4 ppm'],
+                GlossaryCore.N2OConcentration: d_forcing_datmo_conc['CO2 forcing N2O ppm'] +
+                d_forcing_datmo_conc['CH4 forcing N2O ppm'] + d_forcing_datmo_conc['N2O forcing N2O ppm']}
 
-        # first year is from initial data and is fixed ==> grad is zero
-        mat[:, 0] = 0.0
-        return mat
+        return {conc_name: d_temp_d_forcing * d_forcing for conc_name, d_forcing in d_forcing_d_conc.items()}
 
     def compute(self, in_dict) -> DataFrame:
         """
@@ -580,25 +723,9 @@ class TempChange(object):
         self.ghg_cycle_df = in_dict[GlossaryCore.GHGCycleDfValue]
 
         self.compute_forcing()
-        temperature = self.init_temp_atmo
-        sea_level = 0.0
-        self.temperature_df['sea_level'] = sea_level
-
-        if self.temperature_model == 'DICE':
-
-            for year in self.years_range[1:]:
-                self.compute_temp_atmo(year)
-                self.compute_temp_ocean(year)
-
-        elif self.temperature_model == 'FUND':
-
-            for year in self.years_range[1:]:
-                temperature = self.compute_temp_fund(year, temperature)
-                sea_level = self.compute_sea_level_fund(year, sea_level, temperature)
-
-        elif self.temperature_model == 'FAIR':
-
-            raise NotImplementedError("FAIR Not implemented yet")
+        temperatures = self.compute_temperature_arrays(self.temperature_df[GlossaryCore.Forcing].values)
+        for column, values in temperatures.items():
+            self.temperature_df[column] = values
 
         self.compute_temperature_year_end_constraint()
         return self.temperature_df.fillna(0.0)
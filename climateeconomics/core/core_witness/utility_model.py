@@ -24,6 +24,9 @@ class UtilityModel():
     '''
     Used to compute population welfare and utility
     '''
+    # utility discount rates only depend on the years and the rate of time preference, they are computed once per
+    # configuration
+    _DISCOUNT_RATES = {}
 
     def __init__(self, param):
         '''
@@ -35,11 +38,13 @@ class UtilityModel():
         self.set_data()
 
         self.n_years = None
+        self.u_discount_rate = None
 
         self.economics_df = None
         self.energy_mean_price = None
         self.population_df = None
         self.create_dataframe()
+        self.compute_static_factors()
 
     def set_data(self):
         self.year_start = self.param[GlossaryCore.YearStart]
@@ -51,6 +56,7 @@ class UtilityModel():
         self.initial_raw_energy_price = self.param['initial_raw_energy_price']
         self.init_discounted_utility = self.param['init_discounted_utility']
         self.per_capita_consumption_ref = self.param[GlossaryCore.PerCapitaConsumptionUtilityRefName]
+        self.energy_price_ref = self.initial_raw_energy_price
         #self.min_period_utility = 0.01²
 
     def create_dataframe(self):
@@ -73,75 +79,111 @@ class UtilityModel():
         self.utility_df = utility_df
         return utility_df
 
+    def compute_static_factors(self):
+        """
+        Factors that do not depend on coupling variables : utility discount rate and objectives normalizations
+        """
+        discount_rate_key = (self.year_start, self.year_end, self.time_step, self.init_rate_time_pref)
+        if discount_rate_key not in self._DISCOUNT_RATES:
+            t = ((self.years_range - self.year_start) / self.time_step) + 1
+            u_discount_rate = 1 / ((1 + self.init_rate_time_pref)
+                                   ** (self.time_step * (t - 1)))
+            u_discount_rate.setflags(write=False)
+            self._DISCOUNT_RATES[discount_rate_key] = u_discount_rate
+        self.u_discount_rate = self._DISCOUNT_RATES[discount_rate_key]
+        self.welfare_normalization = self.n_years * self.init_discounted_utility
+        self.pc_consumption_utility_normalization = self.n_years * self.per_capita_consumption_ref
+
     def compute_utility_discount_rate(self):
         """
         Compute Average utility social discount rate
          rr(t) = 1/((1+prstp)**(tstep*(t.val-1)));
+        cached on the years and the rate of time preference
         """
-        t = ((self.years_range - self.year_start) / self.time_step) + 1
-        u_discount_rate = 1 / ((1 + self.init_rate_time_pref)
-                               ** (self.time_step * (t - 1)))
-        self.utility_df[GlossaryCore.UtilityDiscountRate] = u_discount_rate
-        return u_discount_rate
+        return self.u_discount_rate
 
-    def compute_energy_price_ratio(self):
+    def compute_energy_price_ratio(self, energy_price):
         """energy price ratio is energy_price_ref/energy_price"""
-        energy_price = self.energy_mean_price[GlossaryCore.EnergyPriceValue].values
         energy_price_ratio = self.energy_price_ref / energy_price
-        self.utility_df[GlossaryCore.EnergyPriceRatio] = energy_price_ratio
+        return energy_price_ratio
 
-    def compute_per_capita_consumption_utility(self):
+    def compute_per_capita_consumption_utility(self, pc_consumption):
         """Per capita consumption utilty is ((percapitaconso**(1-elasmu)-1)/(1-elasmu)-1)"""
-        pc_consumption = self.economics_df[GlossaryCore.PerCapitaConsumption].values
         consumption_utility = (pc_consumption ** (1 - self.conso_elasticity) - 1) / (1 - self.conso_elasticity) - 1
-        self.utility_df[GlossaryCore.PerCapitaConsumptionUtility] = consumption_utility
+        return consumption_utility
 
-    def compute_utility(self):
+    def compute_utility(self, consumption_utility, energy_price_ratio):
         """
         Utility = Energy price ratio * PerCapitaUtilityOfConsumption
         """
-        energy_price_ratio = self.utility_df[GlossaryCore.EnergyPriceRatio].values
-        consumption_utility = self.utility_df[GlossaryCore.PerCapitaConsumptionUtility].values
         adjusted_period_utility = consumption_utility * energy_price_ratio
-        self.utility_df[GlossaryCore.PeriodUtilityPerCapita] = adjusted_period_utility
+        return adjusted_period_utility
 
-    def compute_discounted_utility(self):
+    def compute_discounted_utility(self, utility, u_discount_rate, population):
         """
         period Utility
         PERIODU_pc(t) * rr(t) * L(t)
         """
-        utility = self.utility_df[GlossaryCore.PeriodUtilityPerCapita].values
-        u_discount_rate = self.utility_df[GlossaryCore.UtilityDiscountRate].values
-        population = self.population_df[GlossaryCore.PopulationValue].values
         discounted_utility = utility * u_discount_rate * population
-        self.utility_df[GlossaryCore.DiscountedUtility] = discounted_utility
         return discounted_utility
 
-    def compute_normalized_welfare(self):  # rescalenose
-        """Normalized Welfare = sum of discounted utility / n_years / init discounted utility"""
-
-        self.normalized_welfare = np.asarray([self.utility_df[GlossaryCore.DiscountedUtility].sum()]) / self.n_years / self.init_discounted_utility
-
-    def compute_negative_welfare_objective(self):
+    def compute_utility_arrays(self, pc_consumption, energy_price, population) -> dict:
         """
-        Compute negative welfare objective as - welfare / init_discounted_utility * n_years
+        Compute the utility_df columns from per capita consumption, energy price and population arrays,
+        years are on the last axis and leading axes are scenarios
         """
-        self.negative_welfare_objective = -1.*  self.normalized_welfare
-
-    def compute_inverse_welfare_objective(self):
-        self.inverse_welfare_objective = 1. / self.normalized_welfare
-
-    def compute_negative_last_year_utility_objective(self):
-        """objective for utility at last year"""
-        last_year_discounted_utility = self.utility_df[GlossaryCore.DiscountedUtility][self.year_end]
-        self.last_year_utility_objective = np.asarray([- last_year_discounted_utility / self.init_discounted_utility])
-
-    def compute_per_capita_consumption_utility_objective(self):
+        u_discount_rate = self.compute_utility_discount_rate()
+        energy_price_ratio = self.compute_energy_price_ratio(energy_price)
+        consumption_utility = self.compute_per_capita_consumption_utility(pc_consumption)
+        utility = self.compute_utility(consumption_utility, energy_price_ratio)
+        discounted_utility = self.compute_discounted_utility(utility, u_discount_rate, population)
+
+        return {GlossaryCore.UtilityDiscountRate: u_discount_rate * np.ones(np.shape(utility)),
+                GlossaryCore.PeriodUtilityPerCapita: utility,
+                GlossaryCore.DiscountedUtility: discounted_utility,
+                GlossaryCore.EnergyPriceRatio: energy_price_ratio,
+                GlossaryCore.PerCapitaConsumptionUtility: consumption_utility}
+
+    def compute_objectives(self, discounted_utility, consumption_utility) -> dict:
+        """
+        Compute all welfare objectives in one pass over the years (last axis) of the discounted utility and
+        per capita consumption utility, objectives have the shape of the leading axes, indexed by their output name
         """
-        Objective for capita consumption (without energy price effect)
+        discounted_utility_sum, consumption_utility_sum = np.stack((discounted_utility, consumption_utility)).sum(axis=-1)
+        normalized_welfare = discounted_utility_sum / self.welfare_normalization
+        return {GlossaryCore.NormalizedWelfare: normalized_welfare,
+                GlossaryCore.NegativeWelfareObjective: -1. * normalized_welfare,
+                GlossaryCore.WelfareObjective: 1. / normalized_welfare,
+                GlossaryCore.LastYearDiscountedUtilityObjective: - discounted_utility[..., -1] / self.init_discounted_utility,
+                GlossaryCore.PerCapitaConsumptionUtilityObjectiveName: -1.0 * consumption_utility_sum / self.pc_consumption_utility_normalization}
+
+    def evaluate_objectives(self, pc_consumption, population, energy_price) -> dict:
         """
-        self.per_capita_consumption_objective = -1.0 * (np.asarray([self.utility_df[GlossaryCore.PerCapitaConsumptionUtility].sum()])
-                                                 / (self.n_years * self.per_capita_consumption_ref))
+        Evaluate the welfare objectives only, without utility dataframe, for instance in optimizer line searches where
+        evaluations differ by per capita consumption only.
+        Inputs are arrays of shape (n_years,) or (n_scenarios, n_years), objectives are returned with shape (1,) or
+        (n_scenarios,) like in the discipline outputs, indexed by their output name
+        """
+        pc_consumption, population, energy_price = np.broadcast_arrays(
+            *[np.atleast_2d(values) for values in (pc_consumption, population, energy_price)])
+        consumption_utility = self.compute_per_capita_consumption_utility(pc_consumption)
+        utility = self.compute_utility(consumption_utility, self.compute_energy_price_ratio(energy_price))
+        discounted_utility = self.compute_discounted_utility(utility, self.u_discount_rate, population)
+        return self.compute_objectives(discounted_utility, consumption_utility)
+
+    def compute_scenarios(self, pc_consumption: np.ndarray, energy_price: np.ndarray, population: np.ndarray) -> dict:
+        """
+        Compute utility and welfare objectives of a batch of scenarios in one call, without dataframes.
+        Inputs are arrays of shape (n_scenarios, n_years) (a single year axis is broadcast to all scenarios),
+        utility columns are returned with the same shape and objectives with shape (n_scenarios,),
+        indexed by their output name
+        """
+        pc_consumption, energy_price, population = np.broadcast_arrays(
+            *[np.atleast_2d(values) for values in (pc_consumption, energy_price, population)])
+        outputs = self.compute_utility_arrays(pc_consumption, energy_price, population)
+        outputs.update(self.compute_objectives(outputs[GlossaryCore.DiscountedUtility],
+                                               outputs[GlossaryCore.PerCapitaConsumptionUtility]))
+        return outputs
 
     ######### GRADIENTS ########
 
@@ -220,19 +262,20 @@ class UtilityModel():
         """compute"""
         self.economics_df = economics_df
         self.energy_mean_price = energy_mean_price
-        self.energy_price_ref = self.initial_raw_energy_price
         self.population_df = population_df
 
-        self.compute_utility_discount_rate()
-        self.compute_energy_price_ratio()
-        self.compute_per_capita_consumption_utility()
-        self.compute_utility()
-        self.compute_discounted_utility()
-        self.compute_normalized_welfare()
-        self.compute_negative_welfare_objective()
-        self.compute_inverse_welfare_objective()
-        self.compute_negative_last_year_utility_objective()
-        self.compute_per_capita_consumption_utility_objective()
+        utility = self.compute_utility_arrays(self.economics_df[GlossaryCore.PerCapitaConsumption].values,
+                                              self.energy_mean_price[GlossaryCore.EnergyPriceValue].values,
+                                              self.population_df[GlossaryCore.PopulationValue].values)
+        for column, values in utility.items():
+            self.utility_df[column] = values
+        objectives = {name: np.asarray([objective]) for name, objective in self.compute_objectives(
+            utility[GlossaryCore.DiscountedUtility], utility[GlossaryCore.PerCapitaConsumptionUtility]).items()}
+        self.normalized_welfare = objectives[GlossaryCore.NormalizedWelfare]
+        self.negative_welfare_objective = objectives[GlossaryCore.NegativeWelfareObjective]
+        self.inverse_welfare_objective = objectives[GlossaryCore.WelfareObjective]
+        self.last_year_utility_objective = objectives[GlossaryCore.LastYearDiscountedUtilityObjective]
+        self.per_capita_consumption_objective = objectives[GlossaryCore.PerCapitaConsumptionUtilityObjectiveName]
 
         return self.utility_df
 
@@ -15,66 +15,106 @@ See the License for the specific language governing permissions and
 limitations under the License.
 '''
 
+import hashlib
+import json
+import os
+
 import numpy as np
-import pandas as pd
 
 from climateeconomics.glossarycore import GlossaryCore
 
+# Hubbert fits only depend on the past production data, the regression start and the resource type, they are kept
+# in memory for the whole process and optionally stored on disk by set_hubbert_fit_cache_dir
+_HUBBERT_FITS = {}
+_HUBBERT_FIT_CACHE_DIR = None
 
-def compute_Hubbert_regression(past_production, production_years, regression_start, resource_type):
-    
+
+def set_hubbert_fit_cache_dir(cache_dir):
     '''
-    Compute Hubbert Regression Curve from past production
+    Store the Hubbert fits as json files in cache_dir so that they are reused from one process to another,
+    None to keep them in memory only
+    '''
+    global _HUBBERT_FIT_CACHE_DIR
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+    _HUBBERT_FIT_CACHE_DIR = cache_dir
+
+
+def clear_hubbert_fits():
+    '''
+    Clear the Hubbert fits kept in memory
+    '''
+    _HUBBERT_FITS.clear()
+
+
+def get_hubbert_fit_key(past_production_years, past_production, regression_start, resource_type):
+    '''
+    Hash of the inputs of a Hubbert fit
+    '''
+    hash_key = hashlib.sha1()
+    hash_key.update(np.ascontiguousarray(past_production_years, dtype=np.float64).tobytes())
+    hash_key.update(np.ascontiguousarray(past_production, dtype=np.float64).tobytes())
+    hash_key.update(f'{regression_start}_{resource_type}'.encode())
+    return hash_key.hexdigest()
+
+
+def compute_Hubbert_fit(past_production, regression_start, resource_type):
     '''
-    # initialization
-    past_production_years=past_production[GlossaryCore.Years]
-    cumulative_production = pd.DataFrame(
-        {GlossaryCore.Years: past_production_years, f'{resource_type}': np.zeros(len(past_production_years))})
-    ratio_P_by_Q = pd.DataFrame({GlossaryCore.Years: past_production_years, f'{resource_type}': np.zeros(len(past_production_years))})
-    
+    Fit the Hubbert curve parameters on past production : Q_inf the ultimately recoverable resource, w the
+    imaginary frequency and tho the year of resource peak
+    Fits are memoized on the content of the past production data
+    '''
+    past_production_years = past_production[GlossaryCore.Years].values
+    production = past_production[resource_type].values
+    key = get_hubbert_fit_key(past_production_years, production, regression_start, resource_type)
+    if key in _HUBBERT_FITS:
+        return _HUBBERT_FITS[key]
+
+    cache_file = None
+    if _HUBBERT_FIT_CACHE_DIR is not None:
+        cache_file = os.path.join(_HUBBERT_FIT_CACHE_DIR, f'hubbert_fit_{key}.json')
+        if os.path.isfile(cache_file):
+            with open(cache_file, 'r') as f:
+                fit = json.load(f)
+            _HUBBERT_FITS[key] = (fit['Q_inf'], fit['w'], fit['tho'])
+            return _HUBBERT_FITS[key]
+
     # Cf documentation for the hubbert curve computing
-    Q = 0  # Q is the cumulative production at one precise year
-
-    # compute cumulative production, the production, and the ratio
-    # dataframe for each year
-    for i_year, pp_year in enumerate(past_production_years):
-        P = past_production.loc[i_year, resource_type]
-        cumulative_production.loc[i_year,
-                                       resource_type] = Q + P
-        Q = cumulative_production.loc[i_year, resource_type]
-        ratio_P_by_Q.loc[i_year, resource_type] = P / Q
-    
-    # keep only the part you want to make a regression on
-    cumulative_sample = cumulative_production.loc[
-        cumulative_production[GlossaryCore.Years] >= regression_start]
-    
+    # Q is the cumulative production at each year, and P/Q the ratio of production by cumulative production
+    cumulative_production = np.cumsum(production)
+    ratio_P_by_Q = production / cumulative_production
 
-    ratio_sample = ratio_P_by_Q.loc[ratio_P_by_Q[GlossaryCore.Years] >= regression_start]
+    # keep only the part you want to make a regression on
+    regression_sample = past_production_years >= regression_start
+    cumulative_sample = cumulative_production[regression_sample]
+    years_sample = past_production_years[regression_sample]
 
-    fit = np.polyfit(
-        cumulative_sample[resource_type], ratio_sample[resource_type], 1)
+    fit = np.polyfit(cumulative_sample, ratio_P_by_Q[regression_sample], 1)
 
     w = fit[1]  # imaginary frequency
-    
 
     # sum of the available and recoverable reserve (predict by Hubbert
     # pyworld3 from the start of the exploitation to the end)
     Q_inf = -1 * (w / fit[0])
 
+    # compute of all the possible values of Tho (year of resource peak) according to Q and P and
+    # take the mean values
+    tho = np.mean(np.log((Q_inf / cumulative_sample - 1) * np.exp(years_sample * w)) * (1 / w))
 
-    tho = 0  # year of resource peak
+    _HUBBERT_FITS[key] = (float(Q_inf), float(w), float(tho))
+    if cache_file is not None:
+        with open(cache_file, 'w') as f:
+            json.dump(dict(zip(['Q_inf', 'w', 'tho'], _HUBBERT_FITS[key])), f)
+    return _HUBBERT_FITS[key]
 
-    # compute of all the possible values of Tho according to Q and P and
-    # take the mean values
-    for ind in cumulative_sample.index:
-        tho = tho + np.log((Q_inf / cumulative_sample.loc[ind, resource_type] - 1) * np.exp(
-            cumulative_sample.loc[ind, GlossaryCore.Years] * w)) * (1 / w)
-    tho = tho / len(cumulative_sample.index)
+
+def compute_Hubbert_regression(past_production, production_years, regression_start, resource_type):
+    '''
+    Compute Hubbert Regression Curve from past production
+    '''
+    Q_inf, w, tho = compute_Hubbert_fit(past_production, regression_start, resource_type)
 
     # compute hubbert curve values
-    predictable_production = []
-    for year in production_years:
-        predictable_production += [Q_inf * w * (
-                (1 / (np.exp((-(w / 2)) * (tho - year)) + np.exp((w / 2) * (tho - year)))) ** 2),]
-    
-    return predictable_production
\ No newline at end of file
+    production_years = np.asarray(production_years)
+    return Q_inf * w * ((1 / (np.exp((-(w / 2)) * (tho - production_years)) +
+                              np.exp((w / 2) * (tho - production_years)))) ** 2)
@@ -0,0 +1,71 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import numpy as np
+from scipy.linalg import toeplitz
+
+
+def lower_triangular_cumprod(factors: np.ndarray) -> np.ndarray:
+    """
+    Lower triangular matrix T with T[i, j] = factors[j + 1] * ... * factors[i] for i >= j
+    (ones on the diagonal, zeros above).
+
+    T solves the first order linear recurrence x[i] = factors[i] * x[i - 1] + u[i] (with x[-1] = 0) : x = T @ u.
+    u can be a matrix, each column being then propagated independently, which gives the jacobian of a
+    recurrence wrt its inputs year by year.
+    """
+    factors = np.asarray(factors)
+    nb_years = len(factors)
+    cumprod = np.cumprod(factors)
+    if np.all(cumprod != 0.) and np.all(np.isfinite(cumprod)):
+        return np.tril(cumprod[:, np.newaxis] / cumprod[np.newaxis, :])
+
+    # a null factor (or an overflow) breaks the ratio of cumulative products: propagate row by row
+    propagator = np.zeros((nb_years, nb_years), dtype=factors.dtype)
+    propagator[0, 0] = 1.
+    for i in range(1, nb_years):
+        propagator[i, :i] = factors[i] * propagator[i - 1, :i]
+        propagator[i, i] = 1.
+    return propagator
+
+
+def impulse_response_matrix(decays, gains, nb_years: int) -> np.ndarray:
+    """
+    Lower triangular Toeplitz matrix T with T[i, j] = sum_k gains[k] * decays[k] ** (i - j) for i >= j.
+
+    T is the impulse response of a sum of independent first order linear modes
+    x_k[i] = decays[k] * x_k[i - 1] + gains[k] * u[i] (with x_k[-1] = 0) : sum_k x_k = T @ u.
+    As the modes are linear, T is both the convolution solving them for all years at once and their jacobian wrt u.
+    """
+    decays = np.asarray(decays)
+    gains = np.asarray(gains)
+    lags = np.arange(nb_years)
+    response = gains @ (decays[:, np.newaxis] ** lags)
+    return toeplitz(response, np.zeros(nb_years, dtype=response.dtype))
+
+
+def banded_jacobian(bands, offsets) -> np.ndarray:
+    """
+    Jacobian block with bands on the given diagonals (0 main diagonal, negative offsets below it),
+    for outputs depending on inputs of a fixed window of years.
+    Band k has nb_years - abs(offsets[k]) values.
+    """
+    offsets = list(offsets)
+    nb_years = len(bands[offsets.index(0)]) if 0 in offsets else len(bands[0]) + abs(offsets[0])
+    dtype = np.result_type(*[np.asarray(band) for band in bands])
+    jacobian = np.zeros((nb_years, nb_years), dtype=dtype)
+    for band, offset in zip(bands, offsets):
+        jacobian += np.diag(band, offset)
+    return jacobian
@@ -0,0 +1,112 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import numpy as np
+import pandas as pd
+
+
+class RangeValidator:
+    """
+    Range checks of a set of variables, compiled once from the ranges given by ClimateEcoDiscipline.get_ranges_var.
+
+    Float and int (or complex step) variables, arrays and lists are checked against their [lower, upper] range.
+    Each dataframe is checked in a single vectorized comparison of its ranged columns against the stacked lower and
+    upper bounds.
+    All the violations are gathered before raising, instead of stopping at the first one.
+    """
+
+    def __init__(self, ranges: dict):
+        # var_name -> (lower, upper)
+        self.scalar_ranges = {}
+        # var_name -> (ranged columns, lower bounds, upper bounds)
+        self.dataframe_ranges = {}
+        # var_name -> RangeValidator, for dict values described column by column
+        self.nested_validators = {}
+        for var_name, variable_range in ranges.items():
+            if isinstance(variable_range, dict):
+                columns_ranges = {column: column_range for column, column_range in variable_range.items()
+                                  if column_range}
+                self.dataframe_ranges[var_name] = (
+                    pd.Index(list(columns_ranges)),
+                    np.array([column_range[0] for column_range in columns_ranges.values()], dtype=float),
+                    np.array([column_range[1] for column_range in columns_ranges.values()], dtype=float))
+                self.nested_validators[var_name] = RangeValidator(columns_ranges)
+            elif variable_range is not None:
+                self.scalar_ranges[var_name] = variable_range
+
+    def get_violations(self, data: dict) -> list:
+        """
+        Messages describing every value of data outside its range.
+
+        Raises:
+            TypeError: If the type of a ranged variable is not supported.
+        """
+        violations = []
+        for var_name, value in data.items():
+            if var_name in self.dataframe_ranges:
+                if isinstance(value, pd.DataFrame):
+                    violations.extend(self.get_dataframe_violations(var_name, value))
+                elif isinstance(value, dict):
+                    violations.extend(self.nested_validators[var_name].get_violations(value))
+                else:
+                    raise TypeError(f"Unsupported type for variable '{var_name}'")
+            elif var_name in self.scalar_ranges:
+                lower, upper = self.scalar_ranges[var_name]
+                if isinstance(value, (float, int, complex)):
+                    if not lower <= np.real(value) <= upper:
+                        violations.append(
+                            f"The value of '{var_name}' ({value}) is outside the specified range {[lower, upper]}")
+                elif isinstance(value, (np.ndarray, list)):
+                    values = np.real(np.asarray(value))
+                    outside = ~((values >= lower) & (values <= upper))
+                    if np.any(outside):
+                        violations.append(f"The values of '{var_name}' are outside the specified range "
+                                          f"{[lower, upper]}. Values={values[outside]}")
+                else:
+                    raise TypeError(f"Unsupported type for variable '{var_name}'")
+        return violations
+
+    def get_dataframe_violations(self, var_name: str, dataframe: pd.DataFrame) -> list:
+        """
+        Messages describing the columns of dataframe having values outside their range, with the rows concerned.
+        """
+        columns, lower, upper = self.dataframe_ranges[var_name]
+        column_indices = dataframe.columns.get_indexer(columns)
+        present = column_indices >= 0
+        if not np.any(present):
+            return []
+        values = np.real(dataframe.iloc[:, column_indices[present]].to_numpy())
+        # NaN values are outside any range
+        outside = ~((values >= lower[present]) & (values <= upper[present]))
+        violations = []
+        for j in np.flatnonzero(outside.any(axis=0)):
+            rows = np.flatnonzero(outside[:, j])
+            column_range = [lower[present][j], upper[present][j]]
+            violations.append(f"The values in column '{columns[present][j]}' of '{var_name}' are outside the "
+                              f"specified range {column_range} at rows {list(dataframe.index[rows])}. "
+                              f"Values={values[rows, j]}")
+        return violations
+
+    def validate(self, data: dict):
+        """
+        Check the ranges of data.
+
+        Raises:
+            ValueError: If some values are outside their range, listing all of them.
+            TypeError: If the type of a ranged variable is not supported.
+        """
+        violations = self.get_violations(data)
+        if violations:
+            raise ValueError(f"{len(violations)} range violation(s):\n" + "\n".join(violations))
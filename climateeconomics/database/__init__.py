@@ -13,4 +13,5 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 '''
+from climateeconomics.database.data_registry import DataRegistry
 from climateeconomics.database.database_witness_core import DatabaseWitnessCore
\ No newline at end of file
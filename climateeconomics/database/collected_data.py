@@ -16,7 +16,7 @@ limitations under the License.
 from datetime import date
 from os.path import isfile
 
-import pandas as pd
+from climateeconomics.database.data_registry import DataRegistry
 
 
 class ColectedData:
@@ -60,8 +60,9 @@ class HeavyCollectedData(ColectedData):
     Class meant to store collected data that are heavy in terms of memory usage and loading time, like dataframe.
 
     The getter for the value has been overload to only read csv at this moment, and to avoid reading all csv when
-    importing the Database. Also, once the getter has been called, the loaded value is cached to avoid
-    new reading of a csv next time getter is called.
+    importing the Database. Also, once the getter has been called, the loaded value is cached in the DataRegistry
+    to avoid new reading of a csv next time getter is called, by this data or by any discipline using the same file.
+    Each call of the getter returns a new copy of the cached dataframe.
     """
 
     def __init__(
@@ -74,15 +75,11 @@ class HeavyCollectedData(ColectedData):
         last_update_date: date,
     ):
         super().__init__(value, unit, description, link, source, last_update_date)
-        self.__cached_value = None
 
     @property
     def value(self):
         """getter of the value"""
-        if self.__cached_value is not None:
-            return self.__cached_value
-        self.__cached_value = pd.read_csv(self.__value)
-        return self.__cached_value
+        return DataRegistry.get_dataframe(self.__value)
 
     @value.setter
     def value(self, val: str):
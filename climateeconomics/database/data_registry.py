@@ -0,0 +1,236 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import hashlib
+import json
+import os
+import tempfile
+import time
+from os.path import abspath, expanduser, isfile, join
+
+import numpy as np
+import pandas as pd
+
+# directory of the binary cache of the parsed csv files, can be changed with this environment variable
+DATA_CACHE_DIR_ENV_VAR = 'CLIMATEECONOMICS_DATA_CACHE_DIR'
+# default directory of the binary cache, in the cache directory of the user
+DEFAULT_DATA_CACHE_DIR = join(os.environ.get('XDG_CACHE_HOME') or join(expanduser('~'), '.cache'),
+                              'climateeconomics_data_cache')
+# first bytes of the binary cache files, to be changed with the binary format
+BINARY_CACHE_MAGIC = b'CEDATA1\n'
+
+
+def write_binary_dataframe(dataframe: pd.DataFrame, path: str) -> bool:
+    """
+    Write dataframe in path in a columnar binary format: a json header followed by one raw buffer per block of
+    columns of the same dtype (no pickle).
+
+    Numeric and boolean blocks are stored as raw numpy buffers, text blocks as one utf-8 buffer of NUL separated
+    values with a mask of their missing values. Returns False without writing anything if a column or the index
+    cannot be stored this way.
+    """
+    if not all(isinstance(column, str) for column in dataframe.columns):
+        return False
+    index = dataframe.index
+    default_index = isinstance(index, pd.RangeIndex) and index.start == 0 and index.step == 1
+    if not default_index and (isinstance(index, pd.MultiIndex) or not isinstance(index.name, (str, type(None)))):
+        return False
+
+    # blocks of columns of the same dtype, the index being a block of its own
+    blocks_columns = {}
+    for column in dataframe.columns:
+        blocks_columns.setdefault(dataframe[column].dtype, []).append(column)
+    blocks = [(columns, dataframe[columns].to_numpy()) for columns in blocks_columns.values()]
+    if not default_index:
+        blocks.append((None, index.to_numpy()[:, np.newaxis]))
+
+    header = {'columns': list(dataframe.columns), 'index_name': None if default_index else index.name, 'blocks': []}
+    buffers = []
+    offset = 0
+    for columns, values in blocks:
+        block = {'columns': columns, 'shape': values.shape}
+        if values.dtype.kind in 'biuf':
+            block['dtype'] = values.dtype.str
+            block_buffers = [np.ascontiguousarray(values).tobytes()]
+        elif values.dtype == object:
+            missing = pd.isna(values)
+            texts = values[~missing]
+            if not all(isinstance(text, str) and '\0' not in text for text in texts):
+                return False
+            block['dtype'] = 'text'
+            block_buffers = [np.ascontiguousarray(missing).tobytes(), '\0'.join(texts).encode('utf-8')]
+        else:
+            return False
+        block['nbytes'] = [len(block_buffer) for block_buffer in block_buffers]
+        block['offset'] = offset
+        offset += sum(block['nbytes'])
+        buffers.extend(block_buffers)
+        header['blocks'].append(block)
+
+    encoded_header = json.dumps(header).encode('utf-8')
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), delete=False) as tmp_file:
+        try:
+            tmp_file.write(BINARY_CACHE_MAGIC)
+            tmp_file.write(len(encoded_header).to_bytes(8, 'little'))
+            tmp_file.write(encoded_header)
+            for block_buffer in buffers:
+                tmp_file.write(block_buffer)
+        except BaseException:
+            tmp_file.close()
+            os.unlink(tmp_file.name)
+            raise
+    # the cache file appears complete or not at all, for the other processes reading the cache
+    os.replace(tmp_file.name, path)
+    return True
+
+
+def read_binary_dataframe(path: str) -> pd.DataFrame:
+    """
+    Read a dataframe written by write_binary_dataframe
+    """
+    with open(path, 'rb') as binary_file:
+        if binary_file.read(len(BINARY_CACHE_MAGIC)) != BINARY_CACHE_MAGIC:
+            raise ValueError(f'{path} is not a binary dataframe')
+        header = json.loads(binary_file.read(int.from_bytes(binary_file.read(8), 'little')))
+        # writable buffer, so that the dataframe does not need a copy of it
+        data = bytearray(binary_file.read())
+
+    frames = []
+    index = None
+    for block in header['blocks']:
+        offset = block['offset']
+        shape = tuple(block['shape'])
+        if block['dtype'] == 'text':
+            missing_nbytes, texts_nbytes = block['nbytes']
+            missing = np.frombuffer(data, dtype=bool, count=missing_nbytes, offset=offset).reshape(shape)
+            values = np.full(shape, np.nan, dtype=object)
+            if texts_nbytes:
+                texts = data[offset + missing_nbytes:offset + missing_nbytes + texts_nbytes].decode('utf-8')
+                values[~missing] = texts.split('\0')
+            elif not missing.all():
+                values[~missing] = ''
+        else:
+            values = np.frombuffer(data, dtype=np.dtype(block['dtype']), count=int(np.prod(shape)),
+                                   offset=offset).reshape(shape)
+        if block['columns'] is None:
+            index = pd.Index(values[:, 0], name=header['index_name'])
+        else:
+            frames.append(pd.DataFrame(values, columns=block['columns'], copy=False))
+
+    if not frames:
+        return pd.DataFrame(columns=header['columns'], index=index)
+    dataframe = frames[0] if len(frames) == 1 else pd.concat(frames, axis=1)
+    if list(dataframe.columns) != header['columns']:
+        dataframe = dataframe[header['columns']]
+    if index is not None:
+        dataframe.index = index
+    return dataframe
+
+
+class DataRegistry:
+    """
+    Process wide registry of the csv data files of climateeconomics.
+
+    Each file is parsed at its first access only, and every discipline, model or HeavyCollectedData asking for it
+    then gets its own copy of the parsed dataframe, so that inplace modifications do not leak to the others.
+
+    Parsed files are also kept in a binary columnar cache on disk, keyed on the path, modification time and size
+    of the csv file and on the read_csv options, so that the next processes skip the csv parsing. The cache
+    directory is private to the user: it is not used if it belongs to another user or is open to group or others.
+    """
+
+    # (absolute path, read_csv options) -> parsed dataframe
+    _dataframes = {}
+    # (absolute path, read_csv options) -> loading time in seconds, to track the cold start cost
+    _parsing_times = {}
+    # None deactivates the binary cache
+    binary_cache_dir = os.environ.get(DATA_CACHE_DIR_ENV_VAR, DEFAULT_DATA_CACHE_DIR)
+
+    @classmethod
+    def get_dataframe(cls, path: str, **read_csv_kwargs) -> pd.DataFrame:
+        """
+        Get a copy of the dataframe of the csv file path, parsed with pandas.read_csv(path, **read_csv_kwargs) at
+        first access
+        """
+        key = (abspath(path), tuple(sorted(read_csv_kwargs.items())))
+        if key not in cls._dataframes:
+            start = time.perf_counter()
+            cls._dataframes[key] = cls.load_dataframe(path, read_csv_kwargs)
+            cls._parsing_times[key] = time.perf_counter() - start
+        return cls._dataframes[key].copy()
+
+    @classmethod
+    def get_binary_cache_path(cls, path: str, read_csv_kwargs: dict):
+        """
+        Path of the binary cache of the csv file path read with read_csv_kwargs, None if the cache is deactivated
+        """
+        if cls.binary_cache_dir is None or not cls.check_binary_cache_dir():
+            return None
+        stat = os.stat(path)
+        cache_key = repr((BINARY_CACHE_MAGIC, pd.__version__, abspath(path), stat.st_mtime_ns, stat.st_size,
+                          sorted(read_csv_kwargs.items())))
+        return join(cls.binary_cache_dir, f'{hashlib.sha1(cache_key.encode()).hexdigest()}.bin')
+
+    @classmethod
+    def check_binary_cache_dir(cls) -> bool:
+        """
+        Create the binary cache directory if needed, readable and writable by the user only, and check that it is
+        safe to load files from it: owned by the user and closed to group and others
+        """
+        try:
+            os.makedirs(cls.binary_cache_dir, mode=0o700, exist_ok=True)
+            stat = os.stat(cls.binary_cache_dir)
+        except OSError:
+            # read only file system
+            return False
+        if hasattr(os, 'getuid') and stat.st_uid != os.getuid():
+            return False
+        return not stat.st_mode & 0o077
+
+    @classmethod
+    def load_dataframe(cls, path: str, read_csv_kwargs: dict) -> pd.DataFrame:
+        """
+        Load the csv file path from its binary cache if it is up to date, else parse it and update the cache
+        """
+        cache_path = cls.get_binary_cache_path(path, read_csv_kwargs)
+        if cache_path is not None and isfile(cache_path):
+            try:
+                return read_binary_dataframe(cache_path)
+            except (OSError, ValueError, KeyError):
+                # corrupted cache file, rewritten below
+                pass
+        dataframe = pd.read_csv(path, **read_csv_kwargs)
+        if cache_path is not None:
+            try:
+                write_binary_dataframe(dataframe, cache_path)
+            except OSError:
+                # read only or full file system: the csv is parsed again by the next processes
+                pass
+        return dataframe
+
+    @classmethod
+    def get_parsing_times(cls) -> dict:
+        """
+        Loading time in seconds of each file loaded so far, by absolute path
+        """
+        return {path: parsing_time for (path, _), parsing_time in cls._parsing_times.items()}
+
+    @classmethod
+    def clear(cls):
+        """
+        Forget all the parsed dataframes, for instance after a data file has been updated
+        """
+        cls._dataframes.clear()
+        cls._parsing_times.clear()
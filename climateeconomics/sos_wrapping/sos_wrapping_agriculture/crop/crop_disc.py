@@ -23,7 +23,7 @@ import pandas as pd
 
 from climateeconomics.core.core_agriculture.crop import Crop
 from climateeconomics.core.core_witness.climateeco_discipline import ClimateEcoDiscipline
-from climateeconomics.database import DatabaseWitnessCore
+from climateeconomics.database import DatabaseWitnessCore, DataRegistry
 from climateeconomics.glossarycore import GlossaryCore
 from energy_models.core.stream_type.energy_models.biomass_dry import BiomassDry
 from sostrades_core.tools.post_processing.charts.chart_filter import ChartFilter
@@ -312,9 +312,6 @@ class CropDiscipline(ClimateEcoDiscipline):
                                                          3.3, 3.38, 3.45, 3.53, 3.61, 3.69, 3.77, 3.85, 3.92]})
 
 
-
-    crop_investment_default = pd.read_csv(join(dirname(__file__), 'data/crop_investment.csv'), index_col=0)
-
     DESC_IN = {
         GlossaryCore.YearStart: ClimateEcoDiscipline.YEAR_START_DESC_IN,
         GlossaryCore.YearEnd: GlossaryCore.get_dynamic_variable(GlossaryCore.YearEndVar),
@@ -403,7 +400,7 @@ class CropDiscipline(ClimateEcoDiscipline):
                             'dataframe_descriptor': {GlossaryCore.Years: ('int', [1900, GlossaryCore.YearEndDefault], False),
                                                      GlossaryCore.InvestmentsValue: ('float', None, True)},
                             'dataframe_edition_locked': False, 'visibility': 'Shared', 'namespace': 'ns_crop',
-                            'default': crop_investment_default},
+                            'default': None},
         'scaling_factor_crop_investment': {'type': 'float', 'default': 1e3, 'unit': '-', 'user_level': 2},
         'scaling_factor_techno_consumption': {'type': 'float', 'default': 1e3, 'unit': '-',
                                               'visibility': ClimateEcoDiscipline.SHARED_VISIBILITY,
@@ -507,6 +504,8 @@ class CropDiscipline(ClimateEcoDiscipline):
         self.crop_model = None
 
     def setup_sos_disciplines(self):  # type: (...) -> None
+        self.set_dynamic_default_values({'crop_investment': DataRegistry.get_dataframe(
+            join(dirname(__file__), 'data/crop_investment.csv'), index_col=0)})
 
         if "red_meat_calories_per_day" in self.get_data_in():
             red_meat_calories_per_day = self.get_sosdisc_inputs("red_meat_calories_per_day")
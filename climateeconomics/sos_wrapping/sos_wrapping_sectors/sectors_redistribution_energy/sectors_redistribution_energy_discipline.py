@@ -75,13 +75,14 @@ class SectorsRedistributionEnergyDiscipline(SoSWrapp):
         self.add_inputs(dynamic_inputs)
         self.add_outputs(dynamic_outputs)
 
+    def init_execution(self):
+        self.model = SectorRedistributionEnergyModel()
+
     def run(self):
         """run method"""
         inputs = self.get_sosdisc_inputs()
 
-        model = SectorRedistributionEnergyModel()
-
-        sectors_energy, all_sectors_energy_df, residential_energy_df = model.compute(inputs)
+        sectors_energy, all_sectors_energy_df, residential_energy_df = self.model.compute(inputs)
 
         sector_list = inputs[GlossaryCore.SectorListValue]
 
@@ -97,69 +98,42 @@ class SectorsRedistributionEnergyDiscipline(SoSWrapp):
 
     def compute_sos_jacobian(self):
         """compute gradients"""
-        inputs = self.get_sosdisc_inputs()
-        sectors_list = inputs[GlossaryCore.SectorListValue]
-        deduced_sector = inputs[GlossaryCore.MissingSectorNameValue]
-
-        computed_sectors = list(filter(lambda x: x != deduced_sector, sectors_list))
-
-        total_energy_production = inputs[GlossaryCore.EnergyProductionValue][GlossaryCore.TotalProductionValue].values
-
-        sum_share_other_sectors = []
-        for sector in computed_sectors:
-            sector_share_energy = inputs[f'{sector}.{GlossaryCore.ShareSectorEnergyDfValue}'][GlossaryCore.ShareSectorEnergy].values
-
-            sum_share_other_sectors.append(sector_share_energy)
+        model = self.model
+        deduced_sector = model.deduced_sector
+        d_energy_d_total_energy_production = model.d_energy_d_total_energy_production()
+        d_energy_d_share = np.diag(model.d_energy_d_share())
+
+        # categories in the order of the model, "other" category has no output of its own
+        shares = [f'{sector}.{GlossaryCore.ShareSectorEnergyDfValue}' for sector in model.computed_sectors]
+        shares += [GlossaryCore.ShareResidentialEnergyDfValue, GlossaryCore.ShareOtherEnergyDfValue]
+        energy_outputs = [f'{sector}.{GlossaryCore.EnergyProductionValue}' for sector in model.computed_sectors]
+        energy_outputs += [GlossaryCore.ResidentialEnergyProductionDfValue]
+
+        for icategory, energy_output in enumerate(energy_outputs):
             self.set_partial_derivative_for_other_types(
-                (f'{sector}.{GlossaryCore.EnergyProductionValue}', GlossaryCore.TotalProductionValue),
+                (energy_output, GlossaryCore.TotalProductionValue),
                 (GlossaryCore.EnergyProductionValue, GlossaryCore.TotalProductionValue),
-                np.diag(sector_share_energy / 100.)
+                np.diag(d_energy_d_total_energy_production[icategory])
             )
 
             self.set_partial_derivative_for_other_types(
-                (f'{sector}.{GlossaryCore.EnergyProductionValue}', GlossaryCore.TotalProductionValue),
-                (f'{sector}.{GlossaryCore.ShareSectorEnergyDfValue}', GlossaryCore.ShareSectorEnergy),
-                np.diag(total_energy_production / 100.)
+                (energy_output, GlossaryCore.TotalProductionValue),
+                (shares[icategory], GlossaryCore.ShareSectorEnergy),
+                d_energy_d_share
             )
 
-            self.set_partial_derivative_for_other_types(
-                (f'{deduced_sector}.{GlossaryCore.EnergyProductionValue}', GlossaryCore.TotalProductionValue),
-                (f'{sector}.{GlossaryCore.ShareSectorEnergyDfValue}', GlossaryCore.ShareSectorEnergy),
-                np.diag(-total_energy_production / 100.)
-            )
-        #For residential
-        res_share_energy = inputs[f'{GlossaryCore.ShareResidentialEnergyDfValue}'][GlossaryCore.ShareSectorEnergy].values
-        self.set_partial_derivative_for_other_types(
-            (f'{GlossaryCore.ResidentialEnergyProductionDfValue}', GlossaryCore.TotalProductionValue),
-            (GlossaryCore.EnergyProductionValue, GlossaryCore.TotalProductionValue),
-            np.diag(res_share_energy / 100.)
-        )
-
-        self.set_partial_derivative_for_other_types(
-            (f'{GlossaryCore.ResidentialEnergyProductionDfValue}', GlossaryCore.TotalProductionValue),
-            (f'{GlossaryCore.ShareResidentialEnergyDfValue}', GlossaryCore.ShareSectorEnergy),
-            np.diag(total_energy_production / 100.)
-        )
-
-        self.set_partial_derivative_for_other_types(
-            (f'{deduced_sector}.{GlossaryCore.EnergyProductionValue}', GlossaryCore.TotalProductionValue),
-            (f'{GlossaryCore.ShareResidentialEnergyDfValue}', GlossaryCore.ShareSectorEnergy),
-            np.diag(-total_energy_production / 100.)
-        )
-        sum_share_other_sectors.append(res_share_energy)
-
         #Deduced sector
-        other_share_energy = inputs[f'{GlossaryCore.ShareOtherEnergyDfValue}'][
-            GlossaryCore.ShareSectorEnergy].values
-        sum_share_other_sectors.append(other_share_energy)
-        sum_share_other_sectors = np.sum(sum_share_other_sectors, axis=0)
-
         self.set_partial_derivative_for_other_types(
             (f'{deduced_sector}.{GlossaryCore.EnergyProductionValue}', GlossaryCore.TotalProductionValue),
             (GlossaryCore.EnergyProductionValue, GlossaryCore.TotalProductionValue),
-            np.diag(1 - sum_share_other_sectors / 100.)
+            np.diag(d_energy_d_total_energy_production[-1])
         )
-
+        for share in shares:
+            self.set_partial_derivative_for_other_types(
+                (f'{deduced_sector}.{GlossaryCore.EnergyProductionValue}', GlossaryCore.TotalProductionValue),
+                (share, GlossaryCore.ShareSectorEnergy),
+                - d_energy_d_share
+            )
 
     def get_chart_filter_list(self):
         chart_filters = []
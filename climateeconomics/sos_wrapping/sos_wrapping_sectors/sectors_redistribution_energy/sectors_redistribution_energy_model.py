@@ -13,6 +13,7 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 '''
+import numpy as np
 import pandas as pd
 
 from climateeconomics.glossarycore import GlossaryCore
@@ -25,56 +26,62 @@ class SectorRedistributionEnergyModel:
         self.sectors = list()
         self.deduced_sector = ''
         self.missing_sector_share = None
+        self.computed_sectors = list()
+        self.categories = list()
+        self.total_energy_production = None
+        self.share_matrix = None
 
     def compute_energy_redistribution(self) -> tuple[dict, pd.DataFrame, pd.DataFrame]:
         """
         Distribute total energy production between sectors using sector list and share per sector input
         In addition to sectors list energy is distributed for residential and "other" category
+
+        Shares of the computed sectors, residential and other categories are stacked in a (n categories, n years)
+        matrix so that the energy of every category comes from one product, the deduced sector getting the leftover
         """
         total_energy_production: pd.DataFrame = self.inputs[GlossaryCore.EnergyProductionValue]
-        total_energy_production_values = total_energy_production[GlossaryCore.TotalProductionValue].values
-        all_sectors_energy_df = {GlossaryCore.Years: total_energy_production[GlossaryCore.Years]}
-        sectors_energy = {}
-        computed_sectors = list(filter(lambda x: x != self.deduced_sector, self.sectors))
-        for sector in computed_sectors:
-            sector_energy_values = self.inputs[f'{sector}.{GlossaryCore.ShareSectorEnergyDfValue}'][
-                                           GlossaryCore.ShareSectorEnergy].values / 100. * total_energy_production_values
-            sector_energy_df = pd.DataFrame(
-                {GlossaryCore.Years: total_energy_production[GlossaryCore.Years].values,
-                 GlossaryCore.TotalProductionValue: sector_energy_values}
-            )
-            sectors_energy[sector] = sector_energy_df
-            all_sectors_energy_df[sector] = sector_energy_values
-
-        #Residential energy
-        residential_energy_values = self.inputs[GlossaryCore.ShareResidentialEnergyDfValue][
-                                                GlossaryCore.ShareSectorEnergy].values/100 * total_energy_production_values
-
-        residential_energy_df = pd.DataFrame(
-                {GlossaryCore.Years: total_energy_production[GlossaryCore.Years].values,
-                 GlossaryCore.TotalProductionValue: residential_energy_values}
-            )
-        all_sectors_energy_df[GlossaryCore.ResidentialCategory] = residential_energy_values
-
-        #Other category
-        other_energy_values = self.inputs[GlossaryCore.ShareOtherEnergyDfValue][
-                                                GlossaryCore.ShareSectorEnergy].values/100 * total_energy_production_values
-        all_sectors_energy_df[GlossaryCore.OtherEnergyCategory] = other_energy_values
-
-        all_sectors_energy_df = pd.DataFrame(all_sectors_energy_df)
+        years = total_energy_production[GlossaryCore.Years].values
+        self.total_energy_production = total_energy_production[GlossaryCore.TotalProductionValue].values
+        self.computed_sectors = list(filter(lambda x: x != self.deduced_sector, self.sectors))
+        self.categories = self.computed_sectors + [GlossaryCore.ResidentialCategory, GlossaryCore.OtherEnergyCategory]
+
+        share_dfs = [self.inputs[f'{sector}.{GlossaryCore.ShareSectorEnergyDfValue}'] for sector in self.computed_sectors]
+        share_dfs += [self.inputs[GlossaryCore.ShareResidentialEnergyDfValue],
+                      self.inputs[GlossaryCore.ShareOtherEnergyDfValue]]
+        self.share_matrix = np.array([share_df[GlossaryCore.ShareSectorEnergy].values for share_df in share_dfs]) / 100.
+        categories_energy = self.share_matrix * self.total_energy_production
 
         #Compute leftover energy for last sector
-        missing_sector_energy = total_energy_production_values -\
-                                all_sectors_energy_df.loc[:,all_sectors_energy_df.columns != GlossaryCore.Years].sum(axis=1).values
+        missing_sector_energy = self.total_energy_production - categories_energy.sum(axis=0)
+
+        all_sectors_energy_df = pd.DataFrame({GlossaryCore.Years: years,
+                                              **dict(zip(self.categories, categories_energy)),
+                                              self.deduced_sector: missing_sector_energy})
 
-        all_sectors_energy_df[self.deduced_sector] = missing_sector_energy
-        sectors_energy[self.deduced_sector] = pd.DataFrame(
-                {GlossaryCore.Years: total_energy_production[GlossaryCore.Years].values,
-                 GlossaryCore.TotalProductionValue: missing_sector_energy}
-            )
+        sectors_energy = {sector: pd.DataFrame({GlossaryCore.Years: years,
+                                                GlossaryCore.TotalProductionValue: sector_energy_values})
+                          for sector, sector_energy_values in zip(self.computed_sectors + [self.deduced_sector],
+                                                                  list(categories_energy[:-2]) + [missing_sector_energy])}
+
+        residential_energy_df = pd.DataFrame({GlossaryCore.Years: years,
+                                              GlossaryCore.TotalProductionValue: categories_energy[-2]})
 
         return sectors_energy, all_sectors_energy_df, residential_energy_df
 
+    def d_energy_d_total_energy_production(self) -> np.ndarray:
+        """
+        Diagonals of the jacobians of the energy of the categories then of the deduced sector wrt total energy
+        production, one row per output
+        """
+        return np.vstack((self.share_matrix, 1. - self.share_matrix.sum(axis=0)))
+
+    def d_energy_d_share(self) -> np.ndarray:
+        """
+        Diagonal of the jacobian of the energy of each category wrt its own share, the other shares having no impact.
+        The jacobian of the deduced sector, which gets the leftover, wrt each share is its opposite.
+        """
+        return self.total_energy_production / 100.
+
     def compute(self, inputs: dict):
         self.inputs = inputs
         self.sectors = inputs[GlossaryCore.SectorListValue]
@@ -63,13 +63,14 @@ class SectorsRedistributionInvestsDiscipline(SoSWrapp):
         self.add_inputs(dynamic_inputs)
         self.add_outputs(dynamic_outputs)
 
+    def init_execution(self):
+        self.model = SectorRedistributionInvestsModel()
+
     def run(self):
         """run method"""
         inputs = self.get_sosdisc_inputs()
 
-        model = SectorRedistributionInvestsModel()
-
-        sectors_invests, all_sectors_invests_df = model.compute(inputs)
+        sectors_invests, all_sectors_invests_df = self.model.compute(inputs)
 
         sector_list = inputs[GlossaryCore.SectorListValue]
 
@@ -84,23 +85,21 @@ class SectorsRedistributionInvestsDiscipline(SoSWrapp):
 
     def compute_sos_jacobian(self):
         """compute gradients"""
-        inputs = self.get_sosdisc_inputs()
-
-        sectors_list = inputs[GlossaryCore.SectorListValue]
-        net_output = inputs[GlossaryCore.EconomicsDfValue][GlossaryCore.OutputNetOfDamage].values
+        model = self.model
+        d_invests_d_net_output = model.d_invests_d_net_output()
+        d_invests_d_share = np.diag(model.d_invests_d_share())
 
-        for sector in sectors_list:
-            sector_share_invests = inputs[f'{sector}.{GlossaryCore.ShareSectorInvestmentDfValue}'][GlossaryCore.ShareInvestment].values
+        for isector, sector in enumerate(model.sectors):
             self.set_partial_derivative_for_other_types(
                 (f'{sector}.{GlossaryCore.InvestmentDfValue}', GlossaryCore.InvestmentsValue),
                 (GlossaryCore.EconomicsDfValue, GlossaryCore.OutputNetOfDamage),
-                np.diag(sector_share_invests/ 100.)
+                np.diag(d_invests_d_net_output[isector])
             )
 
             self.set_partial_derivative_for_other_types(
                 (f'{sector}.{GlossaryCore.InvestmentDfValue}', GlossaryCore.InvestmentsValue),
                 (f'{sector}.{GlossaryCore.ShareSectorInvestmentDfValue}', GlossaryCore.ShareInvestment),
-                np.diag(net_output) / 100.
+                d_invests_d_share
             )
 
     def get_chart_filter_list(self):
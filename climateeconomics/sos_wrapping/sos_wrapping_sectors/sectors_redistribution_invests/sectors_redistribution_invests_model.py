@@ -13,6 +13,7 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 '''
+import numpy as np
 import pandas as pd
 
 from climateeconomics.glossarycore import GlossaryCore
@@ -23,31 +24,44 @@ class SectorRedistributionInvestsModel:
     def __init__(self):
         self.inputs = dict()
         self.sectors = list()
+        self.net_output = None
+        self.share_matrix = None
 
     def compute_invest_redistribution(self) -> tuple[dict, pd.DataFrame]:
-        """distrubute total energy production between sectors"""
-        economics_df: pd.DataFrame = self.inputs[GlossaryCore.EconomicsDfValue]
-        net_output = economics_df[GlossaryCore.OutputNetOfDamage].values
+        """
+        distrubute net output between sectors investments
 
-        sectors_invests = {}
-        all_sectors_invests_df = {GlossaryCore.Years: economics_df[GlossaryCore.Years].values}
-        for sector in self.sectors:
-            sector_invests_values = self.inputs[f'{sector}.{GlossaryCore.ShareSectorInvestmentDfValue}'][
-                                       GlossaryCore.ShareInvestment].values / 100. * net_output
-            sector_invests_df = pd.DataFrame(
-                {GlossaryCore.Years: economics_df[GlossaryCore.Years].values,
-                 GlossaryCore.InvestmentsValue: sector_invests_values}
-            )
+        Shares of the sectors are stacked in a (n sectors, n years) matrix so that all investments come from one product
+        """
+        economics_df: pd.DataFrame = self.inputs[GlossaryCore.EconomicsDfValue]
+        years = economics_df[GlossaryCore.Years].values
+        self.net_output = economics_df[GlossaryCore.OutputNetOfDamage].values
 
-            all_sectors_invests_df[sector] = sector_invests_values
+        self.share_matrix = np.array([self.inputs[f'{sector}.{GlossaryCore.ShareSectorInvestmentDfValue}'][
+                                          GlossaryCore.ShareInvestment].values for sector in self.sectors]) / 100.
+        sectors_invests_values = self.share_matrix * self.net_output
 
-            sectors_invests[sector] = sector_invests_df
+        sectors_invests = {sector: pd.DataFrame({GlossaryCore.Years: years,
+                                                 GlossaryCore.InvestmentsValue: sector_invests_values})
+                           for sector, sector_invests_values in zip(self.sectors, sectors_invests_values)}
 
-        all_sectors_invests_df = pd.DataFrame(all_sectors_invests_df)
-        all_sectors_invests_df[GlossaryCore.InvestmentsValue] = all_sectors_invests_df[self.sectors].sum(axis=1)
+        all_sectors_invests_df = pd.DataFrame({GlossaryCore.Years: years,
+                                               **dict(zip(self.sectors, sectors_invests_values)),
+                                               GlossaryCore.InvestmentsValue: sectors_invests_values.sum(axis=0)})
 
         return sectors_invests, all_sectors_invests_df
 
+    def d_invests_d_net_output(self) -> np.ndarray:
+        """Diagonals of the jacobians of the investments of the sectors wrt net output, one row per sector"""
+        return self.share_matrix
+
+    def d_invests_d_share(self) -> np.ndarray:
+        """
+        Diagonal of the jacobian of the investments of each sector wrt its own share, the other shares having no
+        impact
+        """
+        return self.net_output / 100.
+
     def compute(self, inputs: dict):
         self.inputs = inputs
         self.sectors = inputs[GlossaryCore.SectorListValue]
@@ -221,27 +221,27 @@ class ConsumptionDiscipline(ClimateEcoDiscipline):
 
         if obj_option == 'last_utility':
             self.set_partial_derivative_for_other_types(
-                (GlossaryCore.WelfareObjective,), (GlossaryCore.EconomicsDfValue, GlossaryCore.OutputNetOfDamage), d_obj_d_period_utility_pc.dot(d_period_utility_pc_d_output_net_of_d))
+                (GlossaryCore.WelfareObjective,), (GlossaryCore.EconomicsDfValue, GlossaryCore.OutputNetOfDamage), d_obj_d_period_utility_pc @ d_period_utility_pc_d_output_net_of_d)
             self.set_partial_derivative_for_other_types(
-                (GlossaryCore.WelfareObjective,), (GlossaryCore.InvestmentDfValue, GlossaryCore.InvestmentsValue), d_obj_d_period_utility_pc.dot(d_period_utility_pc_d_investment))
+                (GlossaryCore.WelfareObjective,), (GlossaryCore.InvestmentDfValue, GlossaryCore.InvestmentsValue), d_obj_d_period_utility_pc @ d_period_utility_pc_d_investment)
             self.set_partial_derivative_for_other_types(
-                (GlossaryCore.WelfareObjective,), (GlossaryCore.EnergyMeanPriceValue, GlossaryCore.EnergyPriceValue), d_obj_d_period_utility_pc.dot(d_period_utility_d_energy_price))
+                (GlossaryCore.WelfareObjective,), (GlossaryCore.EnergyMeanPriceValue, GlossaryCore.EnergyPriceValue), d_obj_d_period_utility_pc @ d_period_utility_d_energy_price)
             self.set_partial_derivative_for_other_types(
-                (GlossaryCore.WelfareObjective,), (GlossaryCore.ResidentialEnergyProductionDfValue, GlossaryCore.TotalProductionValue), d_obj_d_period_utility_pc.dot(d_period_utility_d_residential_energy))
+                (GlossaryCore.WelfareObjective,), (GlossaryCore.ResidentialEnergyProductionDfValue, GlossaryCore.TotalProductionValue), d_obj_d_period_utility_pc @ d_period_utility_d_residential_energy)
             self.set_partial_derivative_for_other_types(
-                (GlossaryCore.WelfareObjective,), (GlossaryCore.PopulationDfValue, GlossaryCore.PopulationValue),  d_obj_d_period_utility_pc.dot(d_period_utility_d_population))
+                (GlossaryCore.WelfareObjective,), (GlossaryCore.PopulationDfValue, GlossaryCore.PopulationValue),  d_obj_d_period_utility_pc @ d_period_utility_d_population)
 
         elif obj_option == GlossaryCore.Welfare:
             self.set_partial_derivative_for_other_types(
-                (GlossaryCore.WelfareObjective,), (GlossaryCore.EconomicsDfValue, GlossaryCore.OutputNetOfDamage), np.dot(d_obj_d_welfare, d_welfare_d_output_net_of_d))
+                (GlossaryCore.WelfareObjective,), (GlossaryCore.EconomicsDfValue, GlossaryCore.OutputNetOfDamage), d_obj_d_welfare @ d_welfare_d_output_net_of_d)
             self.set_partial_derivative_for_other_types(
-                (GlossaryCore.WelfareObjective,), (GlossaryCore.InvestmentDfValue, GlossaryCore.InvestmentsValue), np.dot(d_obj_d_welfare, d_welfare_d_investment))
+                (GlossaryCore.WelfareObjective,), (GlossaryCore.InvestmentDfValue, GlossaryCore.InvestmentsValue), d_obj_d_welfare @ d_welfare_d_investment)
             self.set_partial_derivative_for_other_types(
-                (GlossaryCore.WelfareObjective,), (GlossaryCore.EnergyMeanPriceValue, GlossaryCore.EnergyPriceValue), np.dot(d_obj_d_welfare, d_welfare_d_energy_price))
+                (GlossaryCore.WelfareObjective,), (GlossaryCore.EnergyMeanPriceValue, GlossaryCore.EnergyPriceValue), d_obj_d_welfare @ d_welfare_d_energy_price)
             self.set_partial_derivative_for_other_types(
-                (GlossaryCore.WelfareObjective,), (GlossaryCore.ResidentialEnergyProductionDfValue, GlossaryCore.TotalProductionValue), np.dot(d_obj_d_welfare, d_welfare_d_residential_energy))
+                (GlossaryCore.WelfareObjective,), (GlossaryCore.ResidentialEnergyProductionDfValue, GlossaryCore.TotalProductionValue), d_obj_d_welfare @ d_welfare_d_residential_energy)
             self.set_partial_derivative_for_other_types(
-                (GlossaryCore.WelfareObjective,), (GlossaryCore.PopulationDfValue, GlossaryCore.PopulationValue),  np.dot(d_obj_d_welfare, d_welfare_d_population))
+                (GlossaryCore.WelfareObjective,), (GlossaryCore.PopulationDfValue, GlossaryCore.PopulationValue),  d_obj_d_welfare @ d_welfare_d_population)
 
         else:
             pass
@@ -250,32 +250,32 @@ class ConsumptionDiscipline(ClimateEcoDiscipline):
 
         self.set_partial_derivative_for_other_types(
             (GlossaryCore.NegativeWelfareObjective,), (GlossaryCore.EconomicsDfValue, GlossaryCore.OutputNetOfDamage),
-            np.dot(d_neg_obj_d_welfare, d_welfare_d_output_net_of_d))
+            d_neg_obj_d_welfare @ d_welfare_d_output_net_of_d)
         self.set_partial_derivative_for_other_types(
             (GlossaryCore.NegativeWelfareObjective,), (GlossaryCore.InvestmentDfValue, GlossaryCore.InvestmentsValue),
-            np.dot(d_neg_obj_d_welfare, d_welfare_d_investment))
+            d_neg_obj_d_welfare @ d_welfare_d_investment)
         self.set_partial_derivative_for_other_types(
             (GlossaryCore.NegativeWelfareObjective,), (GlossaryCore.EnergyMeanPriceValue, GlossaryCore.EnergyPriceValue),
-            np.dot(d_neg_obj_d_welfare, d_welfare_d_energy_price))
+            d_neg_obj_d_welfare @ d_welfare_d_energy_price)
         self.set_partial_derivative_for_other_types(
             (GlossaryCore.NegativeWelfareObjective,), (GlossaryCore.ResidentialEnergyProductionDfValue, GlossaryCore.TotalProductionValue),
-            np.dot(d_neg_obj_d_welfare, d_welfare_d_residential_energy))
+            d_neg_obj_d_welfare @ d_welfare_d_residential_energy)
         self.set_partial_derivative_for_other_types(
-            (GlossaryCore.NegativeWelfareObjective,), (GlossaryCore.PopulationDfValue, GlossaryCore.PopulationValue), np.dot(d_neg_obj_d_welfare, d_welfare_d_population))
+            (GlossaryCore.NegativeWelfareObjective,), (GlossaryCore.PopulationDfValue, GlossaryCore.PopulationValue), d_neg_obj_d_welfare @ d_welfare_d_population)
 
 
         d_obj_d_discounted_utility, d_obj_d_period_utility_pc = self.conso_m.compute_gradient_min_utility_objective()
 
         self.set_partial_derivative_for_other_types(
-            ('min_utility_objective',), (GlossaryCore.EconomicsDfValue, GlossaryCore.OutputNetOfDamage), np.dot(d_obj_d_discounted_utility, d_discounted_utility_d_output_net_of_d))
+            ('min_utility_objective',), (GlossaryCore.EconomicsDfValue, GlossaryCore.OutputNetOfDamage), d_obj_d_discounted_utility @ d_discounted_utility_d_output_net_of_d)
         self.set_partial_derivative_for_other_types(
-            ('min_utility_objective',), (GlossaryCore.InvestmentDfValue, GlossaryCore.InvestmentsValue), np.dot(d_obj_d_discounted_utility, d_discounted_utility_d_investment))
+            ('min_utility_objective',), (GlossaryCore.InvestmentDfValue, GlossaryCore.InvestmentsValue), d_obj_d_discounted_utility @ d_discounted_utility_d_investment)
         self.set_partial_derivative_for_other_types(
-            ('min_utility_objective',), (GlossaryCore.EnergyMeanPriceValue, GlossaryCore.EnergyPriceValue), np.dot(d_obj_d_discounted_utility, d_discounted_utility_d_energy_price))
+            ('min_utility_objective',), (GlossaryCore.EnergyMeanPriceValue, GlossaryCore.EnergyPriceValue), d_obj_d_discounted_utility @ d_discounted_utility_d_energy_price)
         self.set_partial_derivative_for_other_types(
-            ('min_utility_objective',), (GlossaryCore.ResidentialEnergyProductionDfValue, GlossaryCore.TotalProductionValue), np.dot(d_obj_d_discounted_utility, d_discounted_utility_d_residential_energy))
+            ('min_utility_objective',), (GlossaryCore.ResidentialEnergyProductionDfValue, GlossaryCore.TotalProductionValue), d_obj_d_discounted_utility @ d_discounted_utility_d_residential_energy)
         self.set_partial_derivative_for_other_types(
-            ('min_utility_objective',), (GlossaryCore.PopulationDfValue, GlossaryCore.PopulationValue),  np.dot(d_obj_d_discounted_utility, d_discounted_utility_d_population))
+            ('min_utility_objective',), (GlossaryCore.PopulationDfValue, GlossaryCore.PopulationValue),  d_obj_d_discounted_utility @ d_discounted_utility_d_population)
     
     
     def get_chart_filter_list(self):
@@ -65,6 +65,7 @@ class DamageDiscipline(ClimateEcoDiscipline):
                                        'visibility': ClimateEcoDiscipline.SHARED_VISIBILITY,
                                        'namespace': GlossaryCore.NS_REFERENCE, 'user_level': 2},
         'co2_damage_price_dev_formula': {'type': 'bool', 'default': False, 'visibility': 'Shared', 'namespace': GlossaryCore.NS_WITNESS},
+        'co2_damage_price_window': {'type': 'int', 'range': [1, 1000], 'default': 25, 'unit': 'years', 'user_level': 3},
         GlossaryCore.FractionDamageToProductivityValue: {'type': 'float', 'default': 0.30, 'unit': '-', 'visibility': 'Shared', 'namespace': GlossaryCore.NS_WITNESS, 'user_level': 2},
         GlossaryCore.DamageDfValue: GlossaryCore.DamageDf,
         GlossaryCore.TemperatureDfValue: GlossaryCore.TemperatureDf,
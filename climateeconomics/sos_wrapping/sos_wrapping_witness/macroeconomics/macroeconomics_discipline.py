@@ -26,6 +26,7 @@ import plotly.graph_objects as go
 from climateeconomics.charts_tools import graph_gross_and_net_output
 from climateeconomics.core.core_witness.climateeco_discipline import ClimateEcoDiscipline
 from climateeconomics.core.core_witness.macroeconomics_model_v1 import MacroEconomics
+from climateeconomics.database import DataRegistry
 from climateeconomics.glossarycore import GlossaryCore
 from sostrades_core.execution_engine.sos_wrapp import SoSWrapp
 from sostrades_core.tools.post_processing.charts.chart_filter import ChartFilter
@@ -212,7 +213,7 @@ class MacroeconomicsDiscipline(ClimateEcoDiscipline):
         gross_output_ssp3_file = join(global_data_dir, 'economics_df_ssp3.csv')
         gross_output_df = None
         if isfile(gross_output_ssp3_file):
-            gross_output_df = pd.read_csv(gross_output_ssp3_file)[[GlossaryCore.Years,GlossaryCore.GrossOutput]]
+            gross_output_df = DataRegistry.get_dataframe(gross_output_ssp3_file)[[GlossaryCore.Years,GlossaryCore.GrossOutput]]
 
             if gross_output_df.iloc[0][GlossaryCore.Years] > year_start:
                 gross_output_df = gross_output_df.append([{GlossaryCore.Years:year,GlossaryCore.GrossOutput:gross_output_df.iloc[0][GlossaryCore.GrossOutput]} for year in np.arange(year_start,gross_output_df.iloc[0][GlossaryCore.Years])], ignore_index=True)
@@ -25,6 +25,7 @@ import pandas as pd
 import sostrades_core.tools.post_processing.post_processing_tools as ppt
 from climateeconomics.core.core_witness.climateeco_discipline import ClimateEcoDiscipline
 from climateeconomics.core.core_witness.population_model import Population
+from climateeconomics.database import DataRegistry
 from climateeconomics.glossarycore import GlossaryCore
 from sostrades_core.tools.post_processing.charts.chart_filter import ChartFilter
 from sostrades_core.tools.post_processing.charts.two_axes_instanciated_chart import InstanciatedSeries, \
@@ -49,25 +50,11 @@ class PopulationDiscipline(ClimateEcoDiscipline):
     }
     years = np.arange(GlossaryCore.YearStartDefault, GlossaryCore.YearEndDefault + 1)
     global_data_dir = join(Path(__file__).parents[3], 'data')
-    pop_init_df = pd.read_csv(
-        join(global_data_dir, 'population_by_age_2020.csv'))
-    default_death_rate_params_df = pd.read_csv(
-        join(global_data_dir, 'death_rate_params_v2.csv'))
-    # Provided by WHO. (2014). Quantitative risk assessment of the effects of climate
-    # change on selected causes of death, 2030s and 2050s. Geneva:
-    # World Health Organization.
-    default_climate_mortality_param_df = pd.read_csv(
-        join(global_data_dir, 'climate_additional_deaths_V2.csv'))
-    # ADD DICTIONARY OF VALUES FOR DEATH RATE
-
-    desc_in_default_diet_mortality_param = GlossaryCore.DietMortalityParamDf
-    desc_in_default_diet_mortality_param['default'] = pd.read_csv(join(global_data_dir, 'diet_mortality_param.csv'))
-
     DESC_IN = {
         GlossaryCore.YearStart: ClimateEcoDiscipline.YEAR_START_DESC_IN,
         GlossaryCore.YearEnd: GlossaryCore.YearEndVar,
         GlossaryCore.TimeStep: ClimateEcoDiscipline.TIMESTEP_DESC_IN,
-        'population_start': {'type': 'dataframe', 'default': pop_init_df, 'unit': 'millions of people',
+        'population_start': {'type': 'dataframe', 'default': None, 'unit': 'millions of people',
                              'dataframe_descriptor': {GlossaryCore.Years: ('float', None, False),
                                                       'age': ('string', None, False),
                                                       GlossaryCore.PopulationValue: ('float', None, False),}
@@ -91,14 +78,14 @@ class PopulationDiscipline(ClimateEcoDiscipline):
                                                   GlossaryCore.OutputGrowth: ('float', None, False), }
                          },
         GlossaryCore.TemperatureDfValue: GlossaryCore.TemperatureDf,
-        'climate_mortality_param_df': {'type': 'dataframe', 'default': default_climate_mortality_param_df, 'user_level': 3, 'unit': '-',
+        'climate_mortality_param_df': {'type': 'dataframe', 'default': None, 'user_level': 3, 'unit': '-',
                                        'dataframe_descriptor': {GlossaryCore.Years: ('float', None, False),
                                                                 'param': ('string', None, False),
                                                                 'beta': ('float', None, False),}
                                        },
         'calibration_temperature_increase': {'type': 'float', 'default': 2.5, 'user_level': 3 , 'unit': '°C'},
         'theta': {'type': 'float', 'default': 2, 'user_level': 3, 'unit': '-'},
-        'death_rate_param': {'type': 'dataframe', 'default': default_death_rate_params_df, 'user_level': 3, 'unit': '-',
+        'death_rate_param': {'type': 'dataframe', 'default': None, 'user_level': 3, 'unit': '-',
                              'dataframe_descriptor': {GlossaryCore.Years: ('float', None, False),
                                                       'param': ('string', None, False),
                                                       'death_rate_upper': ('float', None, False),
@@ -127,7 +114,7 @@ class PopulationDiscipline(ClimateEcoDiscipline):
         'share_know_birthrate': {'type': 'float', 'default': 7.89207064e-01, 'user_level': 3, 'unit': '-'},
         ClimateEcoDiscipline.ASSUMPTIONS_DESC_IN['var_name']: ClimateEcoDiscipline.ASSUMPTIONS_DESC_IN,
         GlossaryCore.CaloriesPerCapitaValue: GlossaryCore.CaloriesPerCapita,
-        GlossaryCore.DietMortalityParamDf['var_name']: desc_in_default_diet_mortality_param,
+        GlossaryCore.DietMortalityParamDf['var_name']: {**GlossaryCore.DietMortalityParamDf, 'default': None},
         'theta_diet': {'type': 'float', 'default': 5.0, 'user_level': 3, 'unit': '-'},
         'kcal_pc_ref': {'type': 'float', 'default': 2000.0, 'user_level': 3, 'unit': 'kcal'},
         GlossaryCore.CheckRangeBeforeRunBoolName: GlossaryCore.CheckRangeBeforeRunBool,
@@ -153,6 +140,18 @@ class PopulationDiscipline(ClimateEcoDiscipline):
         self.model = Population(in_dict)
 
     def setup_sos_disciplines(self):  # type: (...) -> None
+        # default parameters are parsed at setup rather than at import of the discipline
+        self.set_dynamic_default_values({
+            'population_start': DataRegistry.get_dataframe(join(self.global_data_dir, 'population_by_age_2020.csv')),
+            'death_rate_param': DataRegistry.get_dataframe(join(self.global_data_dir, 'death_rate_params_v2.csv')),
+            # Provided by WHO. (2014). Quantitative risk assessment of the effects of climate
+            # change on selected causes of death, 2030s and 2050s. Geneva:
+            # World Health Organization.
+            'climate_mortality_param_df': DataRegistry.get_dataframe(
+                join(self.global_data_dir, 'climate_additional_deaths_V2.csv')),
+            GlossaryCore.DietMortalityParamDf['var_name']: DataRegistry.get_dataframe(
+                join(self.global_data_dir, 'diet_mortality_param.csv')),
+        })
         if GlossaryCore.YearStart in self.get_data_in():
             year_start, year_end = self.get_sosdisc_inputs(
                 [GlossaryCore.YearStart, GlossaryCore.YearEnd])
@@ -19,6 +19,7 @@ import numpy as np
 import pandas as pd
 from scipy.interpolate import interp1d
 
+from climateeconomics.database import DataRegistry
 from climateeconomics.glossarycore import GlossaryCore
 from sostrades_core.tools.post_processing.charts.chart_filter import ChartFilter
 from sostrades_core.tools.post_processing.charts.two_axes_instanciated_chart import InstanciatedSeries, \
@@ -228,20 +229,30 @@ WITNESS_BRUT_ENERGY_TOTAL_MINUS = [
 ]
 CHART_LIST = list(CHARTS_DATA.keys()) 
 
+# (file name, unit conversion factor, region) -> ssp dataframe, reshaped once per process
+_SSP_DATA = {}
+
 def get_ssp_data(data_name, data_dict, region='World'):
     """
     Get ssp dataframes for each variable.
+
+    Dataframes are reshaped at their first request only, each chart getting its own copy.
     """
+    ssp_data_key = (data_dict[data_name][FILE_NAME], data_dict[data_name][UNIT_CONV_FACTOR], region)
+    if ssp_data_key in _SSP_DATA:
+        return _SSP_DATA[ssp_data_key].copy()
     data_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'data')
-    var_df = pd.read_csv(os.path.join(data_dir, data_dict[data_name][FILE_NAME]), sep=CSV_SEP, decimal=CSV_DEC)
-    var_df = var_df[var_df[REGION] == region]
+    var_df = DataRegistry.get_dataframe(os.path.join(data_dir, data_dict[data_name][FILE_NAME]), sep=CSV_SEP,
+                                        decimal=CSV_DEC)
+    var_df = var_df[var_df[REGION] == region].copy()
     var_df[SCENARIO] = [f"{_sc.split('-Baseline')[0]} ({_model})" for _sc, _model in var_df[[SCENARIO, MODEL]].values.tolist()]
     var_df = var_df[[SCENARIO] + CSV_YRS].set_index(SCENARIO, drop=True).transpose().reset_index().rename(columns={'index': YEARS})
     var_df[YEARS] = pd.to_numeric(var_df[YEARS])
     var_df.loc[:, var_df.columns != YEARS] *= data_dict[data_name][UNIT_CONV_FACTOR]
     var_df = var_df.reindex(columns=[YEARS] + sorted(set(var_df.columns) - {YEARS}))  # sort the scenarios by name for clarity
     var_df.columns.name = None
-    return var_df
+    _SSP_DATA[ssp_data_key] = var_df
+    return var_df.copy()
 
 def post_processing_filters(execution_engine, namespace):
 
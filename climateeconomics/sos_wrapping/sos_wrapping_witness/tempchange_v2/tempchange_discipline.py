@@ -137,6 +137,14 @@ class TempChangeDiscipline(ClimateEcoDiscipline):
                     'type': 'float', 'default': 722., 'unit': 'ppm', 'user_level': 2}
                 dynamic_inputs['pre_indus_n2o_concentration_ppm'] = {
                     'type': 'float', 'default': 273., 'unit': 'ppm', 'user_level': 2}
+                # FAIR 1.x default thermal response
+                dynamic_inputs['transient_climate_response'] = {
+                    'type': 'float', 'default': 1.6, 'unit': '°C', 'user_level': 3}
+                dynamic_inputs['equilibrium_climate_sensitivity'] = {
+                    'type': 'float', 'default': 2.75, 'unit': '°C', 'user_level': 3}
+                dynamic_inputs['thermal_response_timescales'] = {
+                    'type': 'list', 'subtype_descriptor': {'list': 'float'}, 'default': [239.0, 4.1],
+                    'unit': GlossaryCore.Years, 'user_level': 3}
         # var_names = ['forcing_model','init_forcing_nonco','hundred_forcing_nonco','pre_indus_ch4_concentration_ppm','pre_indus_n2o_concentration_ppm']
         # for var_name in var_names:
         #     if var_name in self.get_data_in():
@@ -178,10 +186,7 @@ class TempChangeDiscipline(ClimateEcoDiscipline):
         """
         temperature_model = self.get_sosdisc_inputs('temperature_model')
         forcing_model = self.get_sosdisc_inputs('forcing_model')
-        year_start = self.get_sosdisc_inputs(GlossaryCore.YearStart)
-        year_end = self.get_sosdisc_inputs(GlossaryCore.YearEnd)
         temperature_constraint_ref = self.get_sosdisc_inputs('temperature_end_constraint_ref')
-        identity = np.identity(year_end - year_start + 1)
 
         # forcing_detail
         self.model.compute_d_forcing()
@@ -190,41 +195,41 @@ class TempChangeDiscipline(ClimateEcoDiscipline):
         if forcing_model == 'DICE':
             self.set_partial_derivative_for_other_types(
                 ('forcing_detail_df', 'CO2 forcing'), (GlossaryCore.GHGCycleDfValue, GlossaryCore.CO2Concentration),
-                identity * d_forcing_datmo_conc['CO2 forcing'], )
+                np.diag(d_forcing_datmo_conc['CO2 forcing']), )
 
         elif forcing_model == 'Myhre':
             self.set_partial_derivative_for_other_types(
                 ('forcing_detail_df', 'CO2 forcing'), (GlossaryCore.GHGCycleDfValue, GlossaryCore.CO2Concentration),
-                identity * d_forcing_datmo_conc['CO2 forcing'], )
+                np.diag(d_forcing_datmo_conc['CO2 forcing']), )
             self.set_partial_derivative_for_other_types(
                 ('forcing_detail_df', 'CH4 and N2O forcing'), (GlossaryCore.GHGCycleDfValue, GlossaryCore.CH4Concentration),
-                identity * d_forcing_datmo_conc['CH4 forcing'], )
+                np.diag(d_forcing_datmo_conc['CH4 forcing']), )
             self.set_partial_derivative_for_other_types(
                 ('forcing_detail_df', 'CH4 and N2O forcing'), (GlossaryCore.GHGCycleDfValue, GlossaryCore.N2OConcentration),
-                identity * d_forcing_datmo_conc['N2O forcing'], )
+                np.diag(d_forcing_datmo_conc['N2O forcing']), )
 
         elif forcing_model == 'Etminan' or forcing_model == 'Meinshausen':
             self.set_partial_derivative_for_other_types(
                 ('forcing_detail_df', 'CO2 forcing'), (GlossaryCore.GHGCycleDfValue, GlossaryCore.CO2Concentration),
-                identity * d_forcing_datmo_conc['CO2 forcing CO2 ppm'], )
+                np.diag(d_forcing_datmo_conc['CO2 forcing CO2 ppm']), )
             self.set_partial_derivative_for_other_types(
                 ('forcing_detail_df', 'CO2 forcing'), (GlossaryCore.GHGCycleDfValue, GlossaryCore.N2OConcentration),
-                identity * d_forcing_datmo_conc['CO2 forcing N2O ppm'], )
+                np.diag(d_forcing_datmo_conc['CO2 forcing N2O ppm']), )
             self.set_partial_derivative_for_other_types(
                 ('forcing_detail_df', 'CH4 forcing'), (GlossaryCore.GHGCycleDfValue, GlossaryCore.CH4Concentration),
-                identity * d_forcing_datmo_conc['CH4 forcing CH4 ppm'], )
+                np.diag(d_forcing_datmo_conc['CH4 forcing CH4 ppm']), )
             self.set_partial_derivative_for_other_types(
                 ('forcing_detail_df', 'CH4 forcing'), (GlossaryCore.GHGCycleDfValue, GlossaryCore.N2OConcentration),
-                identity * d_forcing_datmo_conc['CH4 forcing N2O ppm'], )
+                np.diag(d_forcing_datmo_conc['CH4 forcing N2O ppm']), )
             self.set_partial_derivative_for_other_types(
                 ('forcing_detail_df', 'N2O forcing'), (GlossaryCore.GHGCycleDfValue, GlossaryCore.CO2Concentration),
-                identity * d_forcing_datmo_conc['N2O forcing CO2 ppm'], )
+                np.diag(d_forcing_datmo_conc['N2O forcing CO2 ppm']), )
             self.set_partial_derivative_for_other_types(
                 ('forcing_detail_df', 'N2O forcing'), (GlossaryCore.GHGCycleDfValue, GlossaryCore.CH4Concentration),
-                identity * d_forcing_datmo_conc['N2O forcing CH4 ppm'], )
+                np.diag(d_forcing_datmo_conc['N2O forcing CH4 ppm']), )
             self.set_partial_derivative_for_other_types(
                 ('forcing_detail_df', 'N2O forcing'), (GlossaryCore.GHGCycleDfValue, GlossaryCore.N2OConcentration),
-                identity * d_forcing_datmo_conc['N2O forcing N2O ppm'], )
+                np.diag(d_forcing_datmo_conc['N2O forcing N2O ppm']), )
 
         if temperature_model == 'DICE':
             d_tempatmo_d_atmoconc, _ = self.model.compute_d_temp_atmo()
@@ -239,53 +244,19 @@ class TempChangeDiscipline(ClimateEcoDiscipline):
                 ('temperature_constraint',), (GlossaryCore.GHGCycleDfValue, GlossaryCore.CO2Concentration),
                 -d_tempatmo_d_atmoconc[-1] / temperature_constraint_ref, )
 
-        elif temperature_model == 'FUND':
+        elif temperature_model == 'FUND' or temperature_model == 'FAIR':
 
-            # temperature_df
-            d_temp_d_forcing_fund = self.model.compute_d_temp_d_forcing_fund()
-
-            if forcing_model == 'Myhre':
-                d_temp_d_co2_ppm = np.matmul(d_temp_d_forcing_fund, identity * d_forcing_datmo_conc['CO2 forcing'])
-                d_temp_d_ch4_ppm = np.matmul(d_temp_d_forcing_fund, identity * d_forcing_datmo_conc['CH4 forcing'])
-                d_temp_d_n2o_ppm = np.matmul(d_temp_d_forcing_fund, identity * d_forcing_datmo_conc['N2O forcing'])
-
-            elif forcing_model == 'Etminan' or forcing_model == 'Meinshausen':
+            d_temp_d_concentrations = self.model.compute_d_temp_d_concentrations()
+            for concentration_name, d_temp_d_concentration in d_temp_d_concentrations.items():
+                # temperature_df
+                self.set_partial_derivative_for_other_types(
+                    (GlossaryCore.TemperatureDfValue, GlossaryCore.TempAtmo),
+                    (GlossaryCore.GHGCycleDfValue, concentration_name), d_temp_d_concentration, )
 
-                d_temp_d_co2_ppm = np.matmul(d_temp_d_forcing_fund, identity * (
-                            d_forcing_datmo_conc['CO2 forcing CO2 ppm'] + d_forcing_datmo_conc['N2O forcing CO2 ppm']))
-                d_temp_d_ch4_ppm = np.matmul(d_temp_d_forcing_fund, identity * (
-                            d_forcing_datmo_conc['CH4 forcing CH4 ppm'] + d_forcing_datmo_conc['N2O forcing CH4 ppm']))
-                d_temp_d_n2o_ppm = np.matmul(d_temp_d_forcing_fund, identity * (
-                            d_forcing_datmo_conc['CO2 forcing N2O ppm'] + d_forcing_datmo_conc['CH4 forcing N2O ppm'] +
-                            d_forcing_datmo_conc['N2O forcing N2O ppm']))
-
-            self.set_partial_derivative_for_other_types(
-                (GlossaryCore.TemperatureDfValue, GlossaryCore.TempAtmo), (GlossaryCore.GHGCycleDfValue, GlossaryCore.CO2Concentration), d_temp_d_co2_ppm, )
-            self.set_partial_derivative_for_other_types(
-                (GlossaryCore.TemperatureDfValue, GlossaryCore.TempAtmo), (GlossaryCore.GHGCycleDfValue, GlossaryCore.CH4Concentration), d_temp_d_ch4_ppm, )
-            self.set_partial_derivative_for_other_types(
-                (GlossaryCore.TemperatureDfValue, GlossaryCore.TempAtmo), (GlossaryCore.GHGCycleDfValue, GlossaryCore.N2OConcentration), d_temp_d_n2o_ppm, )
-
-            # temperature_constraint
-            self.set_partial_derivative_for_other_types(
-                ('temperature_constraint',), (GlossaryCore.GHGCycleDfValue, GlossaryCore.CO2Concentration),
-                -d_temp_d_co2_ppm[-1] / temperature_constraint_ref, )
-            self.set_partial_derivative_for_other_types(
-                ('temperature_constraint',), (GlossaryCore.GHGCycleDfValue, GlossaryCore.CH4Concentration),
-                -d_temp_d_ch4_ppm[-1] / temperature_constraint_ref, )
-            self.set_partial_derivative_for_other_types(
-                ('temperature_constraint',), (GlossaryCore.GHGCycleDfValue, GlossaryCore.N2OConcentration),
-                -d_temp_d_n2o_ppm[-1] / temperature_constraint_ref, )
-
-        elif temperature_model == 'FAIR':
-            # temperature df
-
-            # temperature_constraint
-            d_tempatmo_d_atmoconc, _ = self.model.compute_d_temp_atmo()
-            d_tempatmoobj_d_temp_atmo = self.model.compute_d_temp_atmo_objective()
-            self.set_partial_derivative_for_other_types(
-                ('temperature_constraint',), (GlossaryCore.GHGCycleDfValue, GlossaryCore.CO2Concentration),
-                -d_tempatmo_d_atmoconc[-1] / temperature_constraint_ref, )
+                # temperature_constraint
+                self.set_partial_derivative_for_other_types(
+                    ('temperature_constraint',), (GlossaryCore.GHGCycleDfValue, concentration_name),
+                    -d_temp_d_concentration[-1] / temperature_constraint_ref, )
 
     def get_chart_filter_list(self):
 
@@ -336,13 +307,10 @@ def temperature_evolution(model, temperature_df, instanciated_charts):
         legend = {GlossaryCore.TempAtmo: 'Atmosphere',
                       GlossaryCore.TempOcean: 'Ocean'}
 
-    elif model == 'FUND':
+    elif model == 'FUND' or model == 'FAIR':
         to_plot = [GlossaryCore.TempAtmo]
         legend = {GlossaryCore.TempAtmo: 'Atmosphere'}
 
-    elif model == 'FAIR':
-        raise NotImplementedError('Model not implemented yet')
-
     years = list(temperature_df.index)
 
     year_start = years[0]
@@ -0,0 +1,104 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from climateeconomics.core.core_witness.carbon_cycle_model import CarbonCycle
+from climateeconomics.glossarycore import GlossaryCore
+
+
+class CarbonCycleModelTest(unittest.TestCase):
+    """
+    Check the gradients of the carbon cycle reservoirs wrt emissions against the powers of the transfer matrix
+    and against finite differences
+    """
+
+    def setUp(self):
+        self.years = np.arange(GlossaryCore.YearStartDefault, GlossaryCore.YearEndDefault + 1)
+        self.inputs = {
+            GlossaryCore.YearStart: GlossaryCore.YearStartDefault,
+            GlossaryCore.YearEnd: GlossaryCore.YearEndDefault,
+            GlossaryCore.TimeStep: 1,
+            'conc_lower_strata': 1720,
+            'conc_upper_strata': 360,
+            'conc_atmo': 588,
+            'init_conc_atmo': 878.412,
+            'init_upper_strata': 460,
+            'init_lower_strata': 1740,
+            'b_twelve': 0.12,
+            'b_twentythree': 0.007,
+            'lo_mat': 10,
+            'lo_mu': 100,
+            'lo_ml': 1000,
+            'ppm_ref': 280,
+            'rockstrom_constraint_ref': 490,
+            'alpha': 0.5,
+            'beta': 0.5,
+            'scale_factor_atmo_conc': 0.01,
+            'minimum_ppm_limit': 250,
+            'minimum_ppm_constraint_ref': 10,
+            GlossaryCore.CO2EmissionsDfValue: pd.DataFrame(
+                {GlossaryCore.Years: self.years,
+                 'total_emissions': np.linspace(35., -20., len(self.years)),
+                 'cum_total_emissions': np.linspace(513., 680., len(self.years))}),
+        }
+
+    def test_01_transfer_matrix_powers(self):
+        model = CarbonCycle(self.inputs)
+        model.compute(self.inputs)
+        d_atmo, d_lower, d_shallow = model.compute_d_total_emissions()[:3]
+        d_atmo = d_atmo / model.scale_factor_carbon_cycle
+
+        # no reservoir reaches its lower bound : the response to emissions of year j is B ** (i - j - 1) on the
+        # atmosphere reservoir
+        transfer_matrix = np.array([[model.b_eleven, model.b_twentyone, 0.],
+                                    [model.b_twelve, model.b_twentytwo, model.b_thirtytwo],
+                                    [0., model.b_twentythree, model.b_thirtythree]])
+        emission_response = np.array([1., 0., 0.]) * model.time_step / model.gtco2_to_gtc
+        for year_emission in [1, 10, 40]:
+            for year in range(year_emission + 1, len(self.years)):
+                response = np.linalg.matrix_power(transfer_matrix, year - year_emission - 1) @ emission_response
+                np.testing.assert_allclose([d_atmo[year, year_emission], d_shallow[year, year_emission],
+                                            d_lower[year, year_emission]], response, rtol=1e-10, atol=1e-16)
+        # emissions only act on the following years
+        np.testing.assert_array_equal(np.triu(d_atmo), 0.)
+
+    def test_02_finite_differences_with_bounds(self):
+        # strongly negative emissions drive the reservoirs to their lower bounds
+        inputs = dict(self.inputs)
+        emissions_df = inputs[GlossaryCore.CO2EmissionsDfValue].copy()
+        emissions_df['total_emissions'] = np.linspace(-200., -1000., len(self.years))
+        inputs.update({GlossaryCore.CO2EmissionsDfValue: emissions_df, 'lo_mat': 500., 'lo_ml': 1745.})
+        model = CarbonCycle(inputs)
+        atmo_conc = model.compute(inputs)[0]['atmo_conc'].values
+        d_atmo = model.compute_d_total_emissions()[0]
+        self.assertTrue(np.any(np.all(d_atmo == 0., axis=1)[1:]))
+
+        step = 1e-4
+        for year_emission in [0, 5, 30]:
+            perturbed_inputs = dict(inputs)
+            perturbed_emissions_df = emissions_df.copy()
+            perturbed_emissions_df.loc[year_emission, 'total_emissions'] += step
+            perturbed_inputs[GlossaryCore.CO2EmissionsDfValue] = perturbed_emissions_df
+            perturbed_atmo_conc = CarbonCycle(perturbed_inputs).compute(perturbed_inputs)[0]['atmo_conc'].values
+            np.testing.assert_allclose(d_atmo[:, year_emission], (perturbed_atmo_conc - atmo_conc) / step,
+                                       rtol=1e-6, atol=1e-8)
+
+
+if '__main__' == __name__:
+    unittest.main()
@@ -0,0 +1,254 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from climateeconomics.core.core_witness.damage_model import DamageModel
+from climateeconomics.core.core_witness.ghg_cycle_model import GHGCycle
+from climateeconomics.core.core_witness.tempchange_model_v2 import TempChange
+from climateeconomics.core.core_witness.utility_model import UtilityModel
+from climateeconomics.database import DatabaseWitnessCore
+from climateeconomics.glossarycore import GlossaryCore
+
+
+class ClimateModelsScenariosTest(unittest.TestCase):
+    """
+    Check that the scenario axis of GHGCycle, TempChange v2, DamageModel and UtilityModel gives the same results
+    as one dataframe compute per scenario
+    """
+
+    def setUp(self):
+        self.years = np.arange(GlossaryCore.YearStartDefault, GlossaryCore.YearEndDefault + 1)
+        self.nb_years = len(self.years)
+        self.years_inputs = {GlossaryCore.YearStart: GlossaryCore.YearStartDefault,
+                             GlossaryCore.YearEnd: GlossaryCore.YearEndDefault,
+                             GlossaryCore.TimeStep: 1}
+        # from net zero pathways to strongly increasing emissions
+        self.scales = np.array([[0.2], [0.5], [1.], [2.], [4.]])
+        self.co2_emissions = self.scales * np.linspace(35., 20., self.nb_years)
+        self.ch4_emissions = self.scales * np.linspace(0.35, 0.2, self.nb_years)
+        self.n2o_emissions = self.scales * np.linspace(0.009, 0.005, self.nb_years)
+
+        self.ghg_cycle_inputs = {
+            **self.years_inputs,
+            'co2_emissions_fractions': [0.13, 0.20, 0.32, 0.25, 0.10],
+            'co2_boxes_decays': [1.0, 0.9972489701005488, 0.9865773841008381, 0.942873143854875, 0.6065306597126334],
+            'co2_boxes_init_conc': np.array([296.002949511, 5.52417779186, 6.65150094285, 2.39635475726,
+                                             0.17501699667]) * 412.4 / 296.002949511,
+            'co2_pre_indus_conc': DatabaseWitnessCore.CO2PreIndustrialConcentration.value,
+            'ch4_decay_rate': 1 / 12,
+            'ch4_pre_indus_conc': DatabaseWitnessCore.CH4PreIndustrialConcentration.value,
+            'ch4_init_conc': DatabaseWitnessCore.CH4YearStartConcentration.value,
+            'n2o_decay_rate': 1 / 114,
+            'n2o_pre_indus_conc': DatabaseWitnessCore.N2OPreIndustrialConcentration.value,
+            'n2o_init_conc': DatabaseWitnessCore.N2OYearStartConcentration.value,
+            'rockstrom_constraint_ref': 490,
+            'minimum_ppm_limit': 250,
+            'minimum_ppm_constraint_ref': 10,
+            'GHG_global_warming_potential20': {GlossaryCore.CO2: 1.0, GlossaryCore.CH4: 85., GlossaryCore.N2O: 265.},
+            'GHG_global_warming_potential100': {GlossaryCore.CO2: 1.0, GlossaryCore.CH4: 28., GlossaryCore.N2O: 265.},
+        }
+        self.temperature_inputs = {
+            **self.years_inputs,
+            'init_temp_ocean': 0.02794825,
+            'init_temp_atmo': DatabaseWitnessCore.TemperatureAnomalyPreIndustrialYearStart.value,
+            'eq_temp_impact': 3.1,
+            'climate_upper': 0.1005,
+            'transfer_upper': 0.088,
+            'transfer_lower': 0.025,
+            'forcing_eq_co2': 3.74,
+            'pre_indus_co2_concentration_ppm': DatabaseWitnessCore.CO2PreIndustrialConcentration.value,
+            'lo_tocean': -1.0,
+            'up_tatmo': 12.0,
+            'up_tocean': 20.0,
+            'alpha': 0.5,
+            'beta': 0.5,
+            'temperature_obj_option': TempChange.INTEGRAL_OBJECTIVE,
+            'temperature_change_ref': 0.2,
+            'temperature_end_constraint_limit': 1.5,
+            'temperature_end_constraint_ref': 3.,
+            'init_forcing_nonco': 0.83,
+            'hundred_forcing_nonco': 1.1422,
+            'pre_indus_ch4_concentration_ppm': 790.,
+            'pre_indus_n2o_concentration_ppm': 285.,
+            GlossaryCore.GHGCycleDfValue: None,
+        }
+
+    def compute_ghg_cycle_dfs(self):
+        ghg_cycle_dfs = []
+        for co2_emissions, ch4_emissions, n2o_emissions in zip(self.co2_emissions, self.ch4_emissions,
+                                                               self.n2o_emissions):
+            model = GHGCycle(self.ghg_cycle_inputs)
+            model.compute({GlossaryCore.GHGEmissionsDfValue: pd.DataFrame(
+                {GlossaryCore.Years: self.years,
+                 GlossaryCore.TotalCO2Emissions: co2_emissions,
+                 GlossaryCore.TotalCH4Emissions: ch4_emissions,
+                 GlossaryCore.TotalN2OEmissions: n2o_emissions})})
+            ghg_cycle_dfs.append(model.ghg_cycle_df)
+        return ghg_cycle_dfs
+
+    def test_01_ghg_cycle_scenarios(self):
+        ghg_cycle_dfs = self.compute_ghg_cycle_dfs()
+        concentrations = GHGCycle(self.ghg_cycle_inputs).compute_scenarios(self.co2_emissions, self.ch4_emissions,
+                                                                           self.n2o_emissions)
+        for column, values in concentrations.items():
+            self.assertEqual(values.shape, (len(self.scales), self.nb_years))
+            for iscenario, ghg_cycle_df in enumerate(ghg_cycle_dfs):
+                np.testing.assert_allclose(values[iscenario], ghg_cycle_df[column].values, rtol=1e-12)
+
+        # emissions of a single pathway are broadcast to all scenarios
+        concentrations = GHGCycle(self.ghg_cycle_inputs).compute_scenarios(self.co2_emissions, self.ch4_emissions[2],
+                                                                           self.n2o_emissions[2])
+        np.testing.assert_allclose(concentrations[GlossaryCore.CH4Concentration][0],
+                                   ghg_cycle_dfs[2][GlossaryCore.CH4Concentration].values, rtol=1e-12)
+
+    def test_02_temperature_scenarios(self):
+        ghg_cycle_dfs = self.compute_ghg_cycle_dfs()
+        concentrations = [np.array([ghg_cycle_df[column].values for ghg_cycle_df in ghg_cycle_dfs])
+                          for column in [GlossaryCore.CO2Concentration, GlossaryCore.CH4Concentration,
+                                         GlossaryCore.N2OConcentration]]
+
+        for temperature_model, forcing_model in [('FUND', 'Meinshausen'), ('FUND', 'Myhre'), ('FUND', 'Etminan'),
+                                                 ('DICE', 'DICE'), ('DICE', 'Meinshausen')]:
+            inputs = {**self.temperature_inputs, 'temperature_model': temperature_model,
+                      'forcing_model': forcing_model}
+            outputs = TempChange(inputs).compute_scenarios(*concentrations)
+            for iscenario, ghg_cycle_df in enumerate(ghg_cycle_dfs):
+                inputs[GlossaryCore.GHGCycleDfValue] = ghg_cycle_df
+                temperature_df = TempChange(inputs).compute(inputs)
+                for column in [GlossaryCore.Forcing, GlossaryCore.TempAtmo, GlossaryCore.TempOcean]:
+                    np.testing.assert_allclose(outputs[column][iscenario], temperature_df[column].values, rtol=1e-12,
+                                               err_msg=f'{temperature_model} {forcing_model} {column}')
+
+    def test_03_damage_scenarios(self):
+        temp_atmo = self.scales * np.linspace(1.3, 4., self.nb_years)
+        for tipping_point in [True, False]:
+            inputs = {**self.years_inputs,
+                      'init_damag_int': 0.0, 'damag_int': 0.0, 'damag_quad': 0.0022, 'damag_expo': 2.0,
+                      'tipping_point': tipping_point, 'tp_a1': 20.46, 'tp_a2': 2, 'tp_a3': 6.081, 'tp_a4': 6.754,
+                      GlossaryCore.FractionDamageToProductivityValue: 0.3,
+                      'damage_constraint_factor': np.ones(self.nb_years),
+                      GlossaryCore.CO2DamagePriceInitValue: 25., 'total_emissions_damage_ref': 140.,
+                      'co2_damage_price_window': 25}
+            damage_fraction = DamageModel(inputs).compute_scenarios(temp_atmo)[GlossaryCore.DamageFractionOutput]
+            self.assertEqual(damage_fraction.shape, temp_atmo.shape)
+            for iscenario in range(len(self.scales)):
+                model = DamageModel(inputs)
+                model.temperature_df = pd.DataFrame({GlossaryCore.Years: self.years,
+                                                     GlossaryCore.TempAtmo: temp_atmo[iscenario]})
+                model.compute_damage_fraction_of_gdp()
+                np.testing.assert_allclose(damage_fraction[iscenario],
+                                           model.damage_fraction_df[GlossaryCore.DamageFractionOutput].values,
+                                           rtol=1e-12)
+
+    def test_04_utility_scenarios(self):
+        inputs = {**self.years_inputs, 'conso_elasticity': 1.45, 'init_rate_time_pref': 0.015,
+                  'initial_raw_energy_price': 110., 'init_discounted_utility': 3400.,
+                  GlossaryCore.PerCapitaConsumptionUtilityRefName: 1.}
+        pc_consumption = self.scales * np.linspace(12., 20., self.nb_years)
+        energy_price = np.linspace(110., 90., self.nb_years)
+        population = np.linspace(7800., 9500., self.nb_years)
+        outputs = UtilityModel(inputs).compute_scenarios(pc_consumption, energy_price, population)
+
+        for iscenario in range(len(self.scales)):
+            model = UtilityModel(inputs)
+            utility_df = model.compute(
+                pd.DataFrame({GlossaryCore.Years: self.years,
+                              GlossaryCore.PerCapitaConsumption: pc_consumption[iscenario]}, index=self.years),
+                pd.DataFrame({GlossaryCore.Years: self.years, GlossaryCore.EnergyPriceValue: energy_price},
+                             index=self.years),
+                pd.DataFrame({GlossaryCore.Years: self.years, GlossaryCore.PopulationValue: population},
+                             index=self.years))
+            for column in utility_df.columns[1:]:
+                np.testing.assert_allclose(outputs[column][iscenario], utility_df[column].values, rtol=1e-12)
+            for objective_name, objective in [(GlossaryCore.NormalizedWelfare, model.normalized_welfare),
+                                              (GlossaryCore.NegativeWelfareObjective, model.negative_welfare_objective),
+                                              (GlossaryCore.WelfareObjective, model.inverse_welfare_objective),
+                                              (GlossaryCore.LastYearDiscountedUtilityObjective,
+                                               model.last_year_utility_objective),
+                                              (GlossaryCore.PerCapitaConsumptionUtilityObjectiveName,
+                                               model.per_capita_consumption_objective)]:
+                np.testing.assert_allclose(outputs[objective_name][iscenario], objective[0], rtol=1e-12)
+
+    def test_05_ghg_cycle_long_horizon_gradients(self):
+        # 500 years horizon, emissions become negative so that the clip of co2 concentration is used
+        year_end = GlossaryCore.YearStartDefault + 499
+        years = np.arange(GlossaryCore.YearStartDefault, year_end + 1)
+        inputs = {**self.ghg_cycle_inputs, GlossaryCore.YearEnd: year_end}
+        emissions_df = pd.DataFrame({GlossaryCore.Years: years,
+                                     GlossaryCore.TotalCO2Emissions: np.linspace(35., -120., len(years)),
+                                     GlossaryCore.TotalCH4Emissions: np.linspace(0.35, 0.1, len(years)),
+                                     GlossaryCore.TotalN2OEmissions: np.linspace(0.009, 0.004, len(years))})
+        model = GHGCycle(inputs)
+        model.compute({GlossaryCore.GHGEmissionsDfValue: emissions_df})
+        self.assertTrue(len(model.ppm_co2_negative_indexes) > 0)
+        gradients = {(GlossaryCore.TotalCO2Emissions, GlossaryCore.CO2Concentration):
+                         model.compute_dco2_ppm_d_emissions(),
+                     (GlossaryCore.TotalCH4Emissions, GlossaryCore.CH4Concentration): model.d_conc_ch4_d_emissions(),
+                     (GlossaryCore.TotalN2OEmissions, GlossaryCore.N2OConcentration): model.d_conc_n2o_d_emissions()}
+
+        step = 1e-30
+        for (emissions_column, concentration_column), gradient in gradients.items():
+            for iyear in [0, 1, 100, len(years) - 1]:
+                complex_emissions_df = emissions_df.copy()
+                complex_emissions_df[emissions_column] = complex_emissions_df[emissions_column].astype(complex)
+                complex_emissions_df.loc[iyear, emissions_column] += step * 1j
+                complex_model = GHGCycle(inputs)
+                complex_model.compute({GlossaryCore.GHGEmissionsDfValue: complex_emissions_df})
+                np.testing.assert_allclose(gradient[:, iyear],
+                                           np.imag(complex_model.ghg_cycle_df[concentration_column].values) / step,
+                                           rtol=1e-10, atol=1e-14)
+
+    def test_06_utility_objectives_evaluation(self):
+        inputs = {**self.years_inputs, 'conso_elasticity': 1.45, 'init_rate_time_pref': 0.015,
+                  'initial_raw_energy_price': 110., 'init_discounted_utility': 3400.,
+                  GlossaryCore.PerCapitaConsumptionUtilityRefName: 1.}
+        pc_consumption = self.scales * np.linspace(12., 20., self.nb_years)
+        energy_price = np.linspace(110., 90., self.nb_years)
+        population = np.linspace(7800., 9500., self.nb_years)
+        model = UtilityModel(inputs)
+        # the discount rates are computed once for a given configuration
+        self.assertIs(UtilityModel(inputs).compute_utility_discount_rate(), model.compute_utility_discount_rate())
+
+        outputs = model.compute_scenarios(pc_consumption, energy_price, population)
+        objectives = model.evaluate_objectives(pc_consumption, population, energy_price)
+        self.assertSetEqual(set(objectives), {GlossaryCore.NormalizedWelfare, GlossaryCore.NegativeWelfareObjective,
+                                              GlossaryCore.WelfareObjective,
+                                              GlossaryCore.LastYearDiscountedUtilityObjective,
+                                              GlossaryCore.PerCapitaConsumptionUtilityObjectiveName})
+        for objective_name, objective in objectives.items():
+            np.testing.assert_allclose(objective, outputs[objective_name], rtol=1e-14)
+
+        # a single trajectory gives objectives shaped like the discipline outputs
+        model.compute(pd.DataFrame({GlossaryCore.Years: self.years, GlossaryCore.PerCapitaConsumption: pc_consumption[0]},
+                                   index=self.years),
+                      pd.DataFrame({GlossaryCore.Years: self.years, GlossaryCore.EnergyPriceValue: energy_price},
+                                   index=self.years),
+                      pd.DataFrame({GlossaryCore.Years: self.years, GlossaryCore.PopulationValue: population},
+                                   index=self.years))
+        objectives = model.evaluate_objectives(pc_consumption[0], population, energy_price)
+        for objective_name, objective in [(GlossaryCore.NormalizedWelfare, model.normalized_welfare),
+                                          (GlossaryCore.WelfareObjective, model.inverse_welfare_objective),
+                                          (GlossaryCore.PerCapitaConsumptionUtilityObjectiveName,
+                                           model.per_capita_consumption_objective)]:
+            self.assertTupleEqual(objectives[objective_name].shape, (1,))
+            np.testing.assert_allclose(objectives[objective_name], objective, rtol=1e-14)
+
+
+if '__main__' == __name__:
+    unittest.main()
@@ -0,0 +1,146 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from climateeconomics.core.core_witness.consumption_model import ConsumptionModel
+from climateeconomics.glossarycore import GlossaryCore
+
+
+class ConsumptionModelTest(unittest.TestCase):
+    """
+    Check the array implementation of the consumption model against its definition year by year, its welfare and
+    min utility reductions, and its gradients against complex step, with lower bounds of consumption and period
+    utility reached on some years
+    """
+
+    def setUp(self):
+        self.years = np.arange(GlossaryCore.YearStartDefault, GlossaryCore.YearEndDefault + 1)
+        self.nb_years = len(self.years)
+        self.param = {GlossaryCore.YearStart: GlossaryCore.YearStartDefault,
+                      GlossaryCore.YearEnd: GlossaryCore.YearEndDefault,
+                      GlossaryCore.TimeStep: 1,
+                      'alpha': 0.5,
+                      'gamma': 0.5,
+                      'welfare_obj_option': GlossaryCore.Welfare,
+                      'conso_elasticity': 1.45,
+                      'init_rate_time_pref': 0.015,
+                      'initial_raw_energy_price': 110.,
+                      'init_discounted_utility': 3400.,
+                      'init_period_utility_pc': 0.5,
+                      'discounted_utility_ref': 1700.,
+                      'lo_conso': 2.0,
+                      'lo_per_capita_conso': 0.01,
+                      'residential_energy_conso_ref': 24.3816}
+        net_output = np.linspace(130., 250., self.nb_years) + 3. * np.sin(np.arange(self.nb_years))
+        investment = 0.25 * net_output
+        # consumption lower bound on some years, period utility lower bound on others
+        net_output[10:20], investment[10:20] = 1., 0.5
+        net_output[30:35], investment[30:35] = 3., 0.2
+        self.coupling_arrays = {
+            (GlossaryCore.EconomicsDfValue, GlossaryCore.OutputNetOfDamage): net_output,
+            (GlossaryCore.InvestmentDfValue, GlossaryCore.InvestmentsValue): investment,
+            (GlossaryCore.PopulationDfValue, GlossaryCore.PopulationValue): np.linspace(7800., 9500., self.nb_years),
+            (GlossaryCore.EnergyMeanPriceValue, GlossaryCore.EnergyPriceValue): np.linspace(110., 90., self.nb_years),
+            (GlossaryCore.ResidentialEnergyProductionDfValue, GlossaryCore.TotalProductionValue):
+                np.linspace(20., 30., self.nb_years)}
+
+    def get_inputs(self, coupling_arrays):
+        return {input_name: pd.DataFrame({GlossaryCore.Years: self.years, column: values})
+                for (input_name, column), values in coupling_arrays.items()}
+
+    def test_01_utility(self):
+        model = ConsumptionModel(self.param)
+        utility_df = model.compute(self.get_inputs(self.coupling_arrays))
+        net_output, investment, population, energy_price, residential_energy = self.coupling_arrays.values()
+
+        for iyear in range(self.nb_years):
+            consumption = max(net_output[iyear] - investment[iyear], self.param['lo_conso'])
+            pc_consumption = max(consumption / population[iyear] * 1000, self.param['lo_per_capita_conso'])
+            period_utility = (pc_consumption ** (1 - 1.45) - 1) / (1 - 1.45) - 1
+            if period_utility < 0.01:
+                period_utility = 0.01 / 10.0 * (9.0 + np.exp(period_utility / 0.01) * np.exp(-1))
+            period_utility = period_utility * 110. / energy_price[iyear] * residential_energy[iyear] / 24.3816
+            discounted_utility = period_utility / 1.015 ** iyear * population[iyear]
+            self.assertAlmostEqual(utility_df[GlossaryCore.Consumption].values[iyear], consumption, delta=1e-12)
+            self.assertAlmostEqual(utility_df[GlossaryCore.PerCapitaConsumption].values[iyear], pc_consumption,
+                                   delta=1e-12)
+            self.assertAlmostEqual(utility_df[GlossaryCore.PeriodUtilityPerCapita].values[iyear], period_utility,
+                                   delta=1e-12)
+            self.assertAlmostEqual(utility_df[GlossaryCore.DiscountedUtility].values[iyear], discounted_utility,
+                                   delta=1e-9)
+
+        discounted_utility = utility_df[GlossaryCore.DiscountedUtility].values
+        np.testing.assert_array_equal(utility_df[GlossaryCore.Welfare].values[:-1], 0.)
+        self.assertAlmostEqual(utility_df[GlossaryCore.Welfare].values[-1], discounted_utility.sum(), delta=1e-9)
+        self.assertEqual(model.min_utility, discounted_utility.min())
+        np.testing.assert_allclose(model.compute_negative_welfare_objective(),
+                                   [- discounted_utility.sum() / (3400. * self.nb_years)], rtol=1e-12)
+
+    def test_02_gradients_complex_step(self):
+        step = 1e-30
+        for welfare_obj_option in ['last_utility', GlossaryCore.Welfare]:
+            param = {**self.param, 'welfare_obj_option': welfare_obj_option}
+            model = ConsumptionModel(param)
+            model.compute(self.get_inputs(self.coupling_arrays))
+            d_pc_consumption_d_output, d_pc_consumption_d_investment, d_pc_consumption_d_population, \
+                d_period_utility_d_output, d_period_utility_d_investment, d_period_utility_d_population, \
+                d_discounted_utility_d_output, d_discounted_utility_d_investment, d_discounted_utility_d_population, \
+                d_welfare_d_output, d_welfare_d_investment, d_welfare_d_population = model.compute_gradient()
+            d_period_utility_d_energy_price, d_discounted_utility_d_energy_price, d_welfare_d_energy_price = \
+                model.compute_gradient_energy_mean_price()
+            d_period_utility_d_residential_energy, d_discounted_utility_d_residential_energy, \
+                d_welfare_d_residential_energy = model.compute_gradient_residential_energy()
+            d_obj_d_welfare, d_obj_d_period_utility_pc = model.compute_gradient_objective()
+            d_min_obj_d_discounted_utility, _ = model.compute_gradient_min_utility_objective()
+            gradients = [
+                (d_pc_consumption_d_output, d_period_utility_d_output, d_discounted_utility_d_output, d_welfare_d_output),
+                (d_pc_consumption_d_investment, d_period_utility_d_investment, d_discounted_utility_d_investment,
+                 d_welfare_d_investment),
+                (d_pc_consumption_d_population, d_period_utility_d_population, d_discounted_utility_d_population,
+                 d_welfare_d_population),
+                (None, d_period_utility_d_energy_price, d_discounted_utility_d_energy_price, d_welfare_d_energy_price),
+                (None, d_period_utility_d_residential_energy, d_discounted_utility_d_residential_energy,
+                 d_welfare_d_residential_energy)]
+            for (input_name, column), input_gradients in zip(self.coupling_arrays, gradients):
+                d_period_utility, d_discounted_utility, d_welfare = input_gradients[1:]
+                d_welfare_objective = d_obj_d_period_utility_pc @ d_period_utility + d_obj_d_welfare @ d_welfare
+                d_min_utility_objective = d_min_obj_d_discounted_utility @ d_discounted_utility
+                for iyear in [0, 12, 32, self.nb_years - 1]:
+                    coupling_arrays = dict(self.coupling_arrays)
+                    coupling_arrays[(input_name, column)] = coupling_arrays[(input_name, column)].astype(complex)
+                    coupling_arrays[(input_name, column)][iyear] += step * 1j
+                    complex_model = ConsumptionModel(param)
+                    utility_df = complex_model.compute(self.get_inputs(coupling_arrays))
+                    outputs = [GlossaryCore.PerCapitaConsumption, GlossaryCore.PeriodUtilityPerCapita,
+                               GlossaryCore.DiscountedUtility, GlossaryCore.Welfare]
+                    for output, gradient in zip(outputs, input_gradients):
+                        if gradient is not None:
+                            np.testing.assert_allclose(gradient[:, iyear],
+                                                       np.imag(utility_df[output].values) / step,
+                                                       rtol=1e-10, atol=1e-14, err_msg=f'{output} wrt {column}')
+                    np.testing.assert_allclose(d_welfare_objective[iyear],
+                                               np.imag(complex_model.compute_welfare_objective()[0]) / step,
+                                               rtol=1e-10, atol=1e-20, err_msg=f'welfare objective wrt {column}')
+                    np.testing.assert_allclose(d_min_utility_objective[iyear],
+                                               np.imag(complex_model.compute_min_utility_objective()[0]) / step,
+                                               rtol=1e-10, atol=1e-20, err_msg=f'min utility objective wrt {column}')
+
+
+if '__main__' == __name__:
+    unittest.main()
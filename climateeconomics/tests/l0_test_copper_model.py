@@ -0,0 +1,100 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from climateeconomics.core.core_resources.new_resources_v0.copper_model import CopperModel
+from climateeconomics.glossarycore import GlossaryCore
+
+
+class CopperModelTest(unittest.TestCase):
+    """
+    Check the copper model arrays against its year by year definition, and the batch mode over demand scenarios
+    """
+
+    def setUp(self):
+        self.years = np.arange(GlossaryCore.YearStartDefault, GlossaryCore.YearEndDefault + 1)
+        self.nb_years = len(self.years)
+        # extraction grows faster than the demand and empties the reserves, which goes through the low reserve level
+        self.param = {GlossaryCore.YearStart: GlossaryCore.YearStartDefault,
+                      GlossaryCore.YearEnd: GlossaryCore.YearEndDefault,
+                      'annual_extraction': list(26. * 1.06 ** np.arange(self.nb_years)),
+                      'initial_copper_reserve': 3500.,
+                      'initial_copper_stock': 100.,
+                      'copper_demand': None}
+        self.demand = 30. * 1.04 ** np.arange(self.nb_years) + 5. * np.sin(np.arange(self.nb_years))
+
+    def compute_year_by_year(self, demand):
+        extraction = list(self.param['annual_extraction'])
+        reserve, stock, production, ratio, price = [], [], [], [], []
+        remaining_copper = self.param['initial_copper_reserve']
+        old_stock = self.param['initial_copper_stock']
+        for year in range(self.nb_years):
+            if remaining_copper < extraction[year]:
+                extraction[year] = remaining_copper
+                remaining_copper = 0.
+            else:
+                if remaining_copper < CopperModel.LOW_RESERVE:
+                    extraction[year] *= CopperModel.EXTRACTION_CUT
+                remaining_copper -= extraction[year]
+            reserve.append(remaining_copper)
+            ratio.append(min(1., extraction[year] / demand[year]) if demand[year] != 0 else 0.)
+            new_stock = old_stock + extraction[year] - demand[year]
+            production.append(extraction[year] + old_stock if new_stock < 0 else demand[year])
+            old_stock = max(new_stock, 0.)
+            stock.append(old_stock)
+            if year == 0:
+                price.append(CopperModel.INITIAL_PRICE)
+            elif demand[year] - extraction[year] > CopperModel.SHORTAGE_THRESHOLD:
+                price.append(price[-1] * CopperModel.PRICE_RISE)
+            else:
+                price.append(price[-1])
+        return {'Reserve': reserve, 'Stock': stock, 'Extraction': extraction, 'World Production': production,
+                'Ratio': ratio, 'Price/t': price}
+
+    def test_01_compute(self):
+        model = CopperModel(self.param)
+        model.compute(pd.DataFrame({'Year': self.years, 'Demand': self.demand, 'unit': 'million_tonnes'}), self.years)
+        # every branch is used
+        self.assertTrue(np.any(model.copper_reserve['Reserve'].values == 0.))
+        self.assertTrue(np.any(model.copper_stock['Stock'].values == 0.))
+        self.assertTrue(np.any(model.copper_stock['Stock'].values > 0.))
+
+        reference = self.compute_year_by_year(self.demand)
+        model_dfs = {'Reserve': model.copper_reserve, 'Stock': model.copper_stock, 'Extraction': model.copper_prod,
+                     'World Production': model.copper_prod, 'Ratio': model.copper_prod,
+                     'Price/t': model.copper_prod_price}
+        for column, model_df in model_dfs.items():
+            np.testing.assert_allclose(model_df[column].values, reference[column], rtol=1e-12, err_msg=column)
+        np.testing.assert_allclose(model.copper_prod['Cumulated World Production'].values,
+                                   np.cumsum(reference['World Production']), rtol=1e-12)
+        np.testing.assert_allclose(model.copper_prod_price['Total Price'].values,
+                                   np.array(reference['World Production']) * reference['Price/t'] * 1000, rtol=1e-12)
+
+    def test_02_demand_scenarios(self):
+        model = CopperModel(self.param)
+        demand_scenarios = np.array([self.demand * scale for scale in [0., 0.5, 1., 2., 4.]])
+        scenarios_arrays = model.compute_demand_scenarios(demand_scenarios)
+        for scenario, demand in enumerate(demand_scenarios):
+            reference = self.compute_year_by_year(demand)
+            for column, values in reference.items():
+                np.testing.assert_allclose(scenarios_arrays[column][scenario], values, rtol=1e-12, err_msg=column)
+
+
+if '__main__' == __name__:
+    unittest.main()
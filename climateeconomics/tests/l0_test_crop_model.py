@@ -0,0 +1,86 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from climateeconomics.core.core_agriculture.crop import Crop
+from climateeconomics.glossarycore import GlossaryCore
+
+
+class CropModelTest(unittest.TestCase):
+    """
+    Check the vintage matrix of Crop production against the aging of productions year by year
+    """
+
+    def setUp(self):
+        self.years = np.arange(GlossaryCore.YearStartDefault, GlossaryCore.YearEndDefault + 1)
+        self.nb_years = len(self.years)
+        self.lifetime = 50
+        self.construction_delay = 3
+        initial_ages = np.arange(1, self.lifetime)
+        param = {GlossaryCore.YearStart: GlossaryCore.YearStartDefault,
+                 GlossaryCore.YearEnd: GlossaryCore.YearEndDefault,
+                 GlossaryCore.TimeStep: 1,
+                 'techno_infos_dict': {'lifetime': self.lifetime,
+                                       GlossaryCore.ConstructionDelay: self.construction_delay},
+                 'initial_age_distrib': pd.DataFrame({'age': initial_ages,
+                                                      'distrib': initial_ages / initial_ages.sum() * 100.}),
+                 'initial_production': 60.}
+        for key in [Crop.DIET_DF, Crop.KG_TO_KCAL_DICT, Crop.KG_TO_M2_DICT, 'param_a', 'param_b', 'crop_investment',
+                    'transport_cost', 'transport_margin', 'data_fuel_dict', 'scaling_factor_crop_investment',
+                    'scaling_factor_techno_consumption', 'scaling_factor_techno_production', 'margin']:
+            param[key] = None
+        self.crop = Crop(param)
+        self.crop.cost_details = pd.DataFrame(
+            {GlossaryCore.Years: self.years,
+             GlossaryCore.InvestmentsValue: 1e3 * (1. + 0.3 * np.sin(np.arange(self.nb_years) / 5.)),
+             'Capex ($/MWh)': np.linspace(40., 55., self.nb_years)})
+
+    def test_01_vintage_matrix(self):
+        crop = self.crop
+        crop.compute_primary_energy_production()
+        self.assertEqual(crop.age_distrib_prod.shape, (self.nb_years, self.lifetime))
+
+        # productions get one year older each year and are removed once they reach the lifetime
+        initial_prod = crop.initial_age_distrib['distrib'].values * crop.initial_production / 100.
+        invest = crop.cost_details[GlossaryCore.InvestmentsValue].values
+        capex = crop.cost_details['Capex ($/MWh)'].values
+        production = np.zeros(self.nb_years)
+        for iyear in range(self.nb_years):
+            for age, prod in zip(crop.initial_age_distrib['age'].values + iyear, initial_prod):
+                if age < self.lifetime:
+                    production[iyear] += prod
+            for invest_year in range(max(0, iyear - self.lifetime + 1 - self.construction_delay),
+                                     iyear - self.construction_delay + 1):
+                production[iyear] += invest[invest_year] / capex[invest_year]
+        np.testing.assert_allclose(crop.production['biomass_dry (TWh)'].values, production, rtol=1e-12)
+
+    def test_02_long_format(self):
+        crop = self.crop
+        self.assertIsNone(crop.age_distrib_prod_df)
+        crop.compute_primary_energy_production()
+        age_distrib_prod_df = crop.age_distrib_prod_df
+        self.assertTrue(np.all(age_distrib_prod_df['age'] < self.lifetime))
+        self.assertTrue(np.all(age_distrib_prod_df['distrib_prod (TWh)'] != 0.))
+        production = age_distrib_prod_df.groupby(GlossaryCore.Years)['distrib_prod (TWh)'].sum()
+        np.testing.assert_allclose(production.loc[self.years].values, crop.production['biomass_dry (TWh)'].values,
+                                   rtol=1e-12)
+
+
+if '__main__' == __name__:
+    unittest.main()
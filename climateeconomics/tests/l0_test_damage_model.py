@@ -0,0 +1,74 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from climateeconomics.core.core_witness.damage_model import DamageModel
+from climateeconomics.glossarycore import GlossaryCore
+
+
+class DamageModelTest(unittest.TestCase):
+    """
+    Check the moving window CO2 damage price of the damage model and its banded gradient
+    """
+
+    def setUp(self):
+        self.years = np.arange(GlossaryCore.YearStartDefault, GlossaryCore.YearEndDefault + 1)
+        self.nb_years = len(self.years)
+        self.inputs = {GlossaryCore.YearStart: GlossaryCore.YearStartDefault,
+                       GlossaryCore.YearEnd: GlossaryCore.YearEndDefault,
+                       GlossaryCore.TimeStep: 1,
+                       'init_damag_int': 0.0, 'damag_int': 0.0, 'damag_quad': 0.0022, 'damag_expo': 2.0,
+                       'tipping_point': True, 'tp_a1': 20.46, 'tp_a2': 2, 'tp_a3': 6.081, 'tp_a4': 6.754,
+                       GlossaryCore.FractionDamageToProductivityValue: 0.3,
+                       'damage_constraint_factor': np.ones(self.nb_years),
+                       GlossaryCore.CO2DamagePriceInitValue: 25., 'total_emissions_damage_ref': 140.,
+                       'co2_damage_price_window': 25}
+        self.damages = np.linspace(2., 10., self.nb_years) + np.sin(np.arange(self.nb_years))
+
+    def compute_co2_damage_price(self, inputs, damages):
+        model = DamageModel(inputs)
+        model.damage_df = pd.DataFrame({GlossaryCore.Years: self.years, GlossaryCore.EstimatedDamages: damages})
+        model.compute_CO2_damage_price()
+        return model, model.co2_damage_price_df[GlossaryCore.CO2DamagePrice].values
+
+    def test_01_moving_window(self):
+        for window in [0, 1, 10, 25, 200]:
+            inputs = {**self.inputs, 'co2_damage_price_window': window}
+            co2_damage_price = self.compute_co2_damage_price(inputs, self.damages)[1]
+            for i, year in enumerate(self.years):
+                window_length = max(min(window, GlossaryCore.YearEndDefault - year), 1)
+                self.assertAlmostEqual(co2_damage_price[i], 1e3 * 1.01 ** i * np.mean(self.damages[i:i + window_length])
+                                       / inputs['total_emissions_damage_ref'], delta=1e-10)
+
+    def test_02_gradient_complex_step(self):
+        step = 1e-30
+        for window in [0, 1, 10, 25]:
+            inputs = {**self.inputs, 'co2_damage_price_window': window}
+            model = self.compute_co2_damage_price(inputs, self.damages)[0]
+            d_co2_damage_price_d_damages = model.d_co2_damage_price_d_damages()
+            for iyear in [0, 1, 40, self.nb_years - 2, self.nb_years - 1]:
+                damages = self.damages.astype(complex)
+                damages[iyear] += step * 1j
+                co2_damage_price = self.compute_co2_damage_price(inputs, damages)[1]
+                np.testing.assert_allclose(d_co2_damage_price_d_damages[:, iyear], np.imag(co2_damage_price) / step,
+                                           rtol=1e-10, atol=1e-12)
+
+
+if '__main__' == __name__:
+    unittest.main()
@@ -0,0 +1,147 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import glob
+import os
+import shutil
+import tempfile
+import unittest
+from os.path import join, dirname
+
+import pandas as pd
+
+from climateeconomics.database import DatabaseWitnessCore, DataRegistry
+from climateeconomics.database.data_registry import write_binary_dataframe, read_binary_dataframe
+
+
+class DataRegistryTestCase(unittest.TestCase):
+    """
+    Check that the data registry parses each csv file once and hands out copies of it, including to
+    HeavyCollectedData, and that its binary cache gives back the parsed dataframes
+    """
+
+    def setUp(self):
+        self.data_dir = join(dirname(dirname(__file__)), 'data')
+        DataRegistry.clear()
+        self.binary_cache_dir = DataRegistry.binary_cache_dir
+        self.tmp_dir = tempfile.mkdtemp()
+        DataRegistry.binary_cache_dir = join(self.tmp_dir, 'cache')
+
+    def tearDown(self):
+        DataRegistry.clear()
+        DataRegistry.binary_cache_dir = self.binary_cache_dir
+        shutil.rmtree(self.tmp_dir)
+
+    def test_01_shared_dataframes(self):
+        path = join(self.data_dir, 'population_by_age_2020.csv')
+        self.assertEqual(DataRegistry.get_parsing_times(), {})
+        population_df = DataRegistry.get_dataframe(path)
+        pd.testing.assert_frame_equal(population_df, pd.read_csv(path))
+        # the same path, even written differently, is parsed once
+        pd.testing.assert_frame_equal(
+            DataRegistry.get_dataframe(join(self.data_dir, '..', 'data', 'population_by_age_2020.csv')), population_df)
+        self.assertEqual(list(DataRegistry.get_parsing_times()), [path])
+
+        # each caller gets its own copy, inplace modifications do not leak to the next ones
+        population_df.iloc[0, 1] = -1
+        population_df['new_column'] = 0.
+        pd.testing.assert_frame_equal(DataRegistry.get_dataframe(path), pd.read_csv(path))
+
+        # other read_csv options are another entry
+        population_by_age_df = DataRegistry.get_dataframe(path, index_col=0)
+        pd.testing.assert_frame_equal(population_by_age_df, pd.read_csv(path, index_col=0))
+
+        DataRegistry.clear()
+        self.assertEqual(DataRegistry.get_parsing_times(), {})
+
+    def test_02_heavy_collected_data(self):
+        # heavy collected data are parsed at first access, and share the dataframe of their file
+        self.assertEqual(DataRegistry.get_parsing_times(), {})
+        world_population_df = DatabaseWitnessCore.WorldPopulationForecast.value
+        pd.testing.assert_frame_equal(DatabaseWitnessCore.WorldPopulationForecast.value, world_population_df)
+        pd.testing.assert_frame_equal(DataRegistry.get_dataframe(join(self.data_dir, 'population_df.csv')),
+                                      world_population_df)
+        self.assertEqual(len(DataRegistry.get_parsing_times()), 1)
+
+        world_population_df.iloc[:, 1] = 0.
+        self.assertFalse((DatabaseWitnessCore.WorldPopulationForecast.value.iloc[:, 1] == 0.).all())
+
+    def test_03_binary_dataframes(self):
+        package_dir = dirname(dirname(__file__))
+        csv_files = glob.glob(join(self.data_dir, '*.csv')) + \
+            glob.glob(join(package_dir, 'core', 'core_resources', 'models', 'resources_data', '*.csv'))
+        ssp_files = glob.glob(join(package_dir, 'sos_wrapping', 'sos_wrapping_witness', 'post_proc_ssp_comparison',
+                                   'data', '*.csv'))
+        binary_path = join(self.tmp_dir, 'dataframe.bin')
+        for csv_file, read_csv_kwargs in [(csv_file, {}) for csv_file in csv_files] + \
+                                         [(csv_file, {'index_col': 0}) for csv_file in csv_files] + \
+                                         [(csv_file, {'sep': ';', 'decimal': ','}) for csv_file in ssp_files]:
+            try:
+                dataframe = pd.read_csv(csv_file, **read_csv_kwargs)
+            except (ValueError, pd.errors.ParserError):
+                # not a csv file readable with these options
+                continue
+            self.assertTrue(write_binary_dataframe(dataframe, binary_path), csv_file)
+            pd.testing.assert_frame_equal(read_binary_dataframe(binary_path), dataframe, obj=csv_file)
+
+    def test_04_binary_cache(self):
+        path = join(self.tmp_dir, 'data.csv')
+        pd.DataFrame({'years': [2020, 2021], 'value': [1., None], 'label': ['a', None]}).to_csv(path, index=False)
+        dataframe = DataRegistry.get_dataframe(path)
+        self.assertEqual(len(os.listdir(DataRegistry.binary_cache_dir)), 1)
+
+        # a new process loads the binary cache instead of the csv file
+        DataRegistry.clear()
+        cache_path = DataRegistry.get_binary_cache_path(path, {})
+        self.assertTrue(os.path.isfile(cache_path))
+        pd.testing.assert_frame_equal(DataRegistry.get_dataframe(path), dataframe)
+
+        # an updated csv file does not use the cache of its previous version
+        pd.DataFrame({'years': [2020, 2021, 2022], 'value': [1., 2., 3.]}).to_csv(path, index=False)
+        os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 10 ** 9))
+        DataRegistry.clear()
+        self.assertNotEqual(DataRegistry.get_binary_cache_path(path, {}), cache_path)
+        pd.testing.assert_frame_equal(DataRegistry.get_dataframe(path), pd.read_csv(path))
+
+        # a corrupted cache file is rewritten
+        cache_path = DataRegistry.get_binary_cache_path(path, {})
+        with open(cache_path, 'wb') as cache_file:
+            cache_file.write(b'corrupted')
+        DataRegistry.clear()
+        pd.testing.assert_frame_equal(DataRegistry.get_dataframe(path), pd.read_csv(path))
+        pd.testing.assert_frame_equal(read_binary_dataframe(cache_path), pd.read_csv(path))
+
+        # and the cache can be deactivated
+        DataRegistry.clear()
+        DataRegistry.binary_cache_dir = None
+        self.assertIsNone(DataRegistry.get_binary_cache_path(path, {}))
+        pd.testing.assert_frame_equal(DataRegistry.get_dataframe(path), pd.read_csv(path))
+
+    def test_05_private_binary_cache_dir(self):
+        path = join(self.tmp_dir, 'data.csv')
+        pd.DataFrame({'years': [2020, 2021], 'value': [1., 2.]}).to_csv(path, index=False)
+        # the cache directory is created for the user only
+        self.assertIsNotNone(DataRegistry.get_binary_cache_path(path, {}))
+        self.assertEqual(os.stat(DataRegistry.binary_cache_dir).st_mode & 0o077, 0)
+
+        # a cache directory other users can write in is not used
+        os.chmod(DataRegistry.binary_cache_dir, 0o777)
+        self.assertIsNone(DataRegistry.get_binary_cache_path(path, {}))
+        pd.testing.assert_frame_equal(DataRegistry.get_dataframe(path), pd.read_csv(path))
+        self.assertEqual(os.listdir(DataRegistry.binary_cache_dir), [])
+
+
+if '__main__' == __name__:
+    unittest.main()
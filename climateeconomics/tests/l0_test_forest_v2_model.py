@@ -0,0 +1,201 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from climateeconomics.core.core_forest.forest_v2 import Forest
+from climateeconomics.glossarycore import GlossaryCore
+
+
+class ForestV2ModelTest(unittest.TestCase):
+    """
+    Check the cumulative sums clamped at zero used for unmanaged forest and managed wood surfaces, and the surfaces
+    and lost capitals of the forest model, against their year by year definition and their gradients
+    """
+
+    def setUp(self):
+        # oscillating deltas so that the surface is emptied and refilled several times
+        nb_years = 81
+        self.deltas = 0.3 * np.sin(np.arange(nb_years) / 3.) - 0.05
+        self.deltas[0] += 0.5
+
+        # deforestation emptying unmanaged forest then managed wood several times, reforestation refilling them
+        self.years = np.arange(GlossaryCore.YearStartDefault, GlossaryCore.YearEndDefault + 1)
+        self.forest_investment = 20. + 10. * np.cos(np.arange(len(self.years)) / 4.)
+        self.deforestation_investment = 400. * (1. + np.sin(np.arange(len(self.years)) / 6.))
+        self.mw_investment = np.linspace(10., 20., len(self.years))
+        construction_delay = 3
+        self.param = {
+            GlossaryCore.YearStart: self.years[0],
+            GlossaryCore.YearEnd: self.years[-1],
+            GlossaryCore.TimeStep: 1,
+            Forest.CO2_PER_HA: 4000,
+            Forest.INITIAL_CO2_EMISSIONS: -7.6,
+            Forest.REFORESTATION_COST_PER_HA: 13800,
+            Forest.DEFORESTATION_COST_PER_HA: 8000,
+            Forest.WOOD_TECHNO_DICT: {'managed_wood_price_per_ha': 3500.,
+                                      'residues_density_percentage': 0.35,
+                                      'wood_percentage_for_energy': 0.48,
+                                      'actual_yield': 0.4,
+                                      'managed_yield': 5.,
+                                      'wood_density': 600.,
+                                      'residues_density': 200.,
+                                      GlossaryCore.ConstructionDelay: construction_delay},
+            Forest.MW_INITIAL_SURFACE: 1.25 * 0.92,
+            Forest.MW_INVEST_BEFORE_YEAR_START: pd.DataFrame(
+                {'past_years': np.arange(-construction_delay, 0),
+                 GlossaryCore.InvestmentsValue: [1.135081] * construction_delay}),
+            Forest.TRANSPORT_COST: None,
+            Forest.MARGIN: None,
+            Forest.UNMANAGED_FOREST: 4 - 1.25 - 4 * 0.21,
+            Forest.PROTECTED_FOREST: 4 * 0.21,
+            'scaling_factor_techno_consumption': 1e3,
+            'scaling_factor_techno_production': 1e3,
+        }
+
+    def compute_surfaces(self, forest_investment, deforestation_investment, mw_investment):
+        """
+        Forest model with its surfaces and lost capitals computed for these investments
+        """
+        param = {**self.param,
+                 Forest.REFORESTATION_INVESTMENT: pd.DataFrame({GlossaryCore.Years: self.years,
+                                                                'forest_investment': forest_investment}),
+                 Forest.DEFORESTATION_INVESTMENT: pd.DataFrame({GlossaryCore.Years: self.years,
+                                                                GlossaryCore.InvestmentsValue: deforestation_investment}),
+                 Forest.MW_INVESTMENT: pd.DataFrame({GlossaryCore.Years: self.years,
+                                                     GlossaryCore.InvestmentsValue: mw_investment})}
+        model = Forest(param)
+        # initialization done by compute before the surfaces
+        model.forest_surface_df['unmanaged_forest'] = model.initial_unmanaged_forest_surface
+        for lost_capital in ['reforestation', 'managed_wood', 'deforestation']:
+            model.forest_lost_capital[lost_capital] = 0.
+        model.compute_managed_wood_surface()
+        model.compute_reforestation_deforestation_surface()
+        return model
+
+    def get_outputs(self, model):
+        return {'unmanaged_forest': model.forest_surface_df['unmanaged_forest'].values,
+                'delta_mw_surface': model.managed_wood_df['delta_surface'].values,
+                'delta_deforestation_surface': model.forest_surface_df['delta_deforestation_surface'].values,
+                'lost_capital_deforestation': model.forest_lost_capital['deforestation'].values,
+                'lost_capital_reforestation': model.forest_lost_capital['reforestation'].values,
+                'lost_capital_managed_wood': model.forest_lost_capital['managed_wood'].values}
+
+    def test_01_cumsum_clamped_at_zero(self):
+        cumsum_before_clamp, clamp = Forest.cumsum_clamped_at_zero(self.deltas)
+
+        surface = 0.
+        for i, delta in enumerate(self.deltas):
+            surface += delta
+            self.assertAlmostEqual(cumsum_before_clamp[i], surface, delta=1e-12)
+            self.assertEqual(clamp[i], surface <= 0.)
+            if surface <= 0.:
+                surface = 0.
+        self.assertTrue(1 < clamp.sum() < len(self.deltas) - 1)
+
+    def test_02_d_cum_clamped_at_zero(self):
+        cumsum_before_clamp, clamp = Forest.cumsum_clamped_at_zero(self.deltas)
+        d_cum_before_clamp, d_cum_after_clamp = Forest.d_cum_clamped_at_zero(np.identity(len(self.deltas)), clamp)
+
+        step = 1e-8
+        for iyear in range(len(self.deltas)):
+            deltas = self.deltas.copy()
+            deltas[iyear] += step
+            perturbed_cumsum_before_clamp, perturbed_clamp = Forest.cumsum_clamped_at_zero(deltas)
+            np.testing.assert_array_equal(perturbed_clamp, clamp)
+            np.testing.assert_allclose(d_cum_before_clamp[:, iyear],
+                                       (perturbed_cumsum_before_clamp - cumsum_before_clamp) / step, atol=1e-6)
+            np.testing.assert_allclose(d_cum_after_clamp[:, iyear],
+                                       (np.where(clamp, 0., perturbed_cumsum_before_clamp) -
+                                        np.where(clamp, 0., cumsum_before_clamp)) / step, atol=1e-6)
+
+    def test_03_surfaces_and_lost_capitals(self):
+        model = self.compute_surfaces(self.forest_investment, self.deforestation_investment, self.mw_investment)
+        outputs = self.get_outputs(model)
+        self.assertTrue(1 < model.unmanaged_forest_clamp.sum() < len(self.years) - 1)
+        self.assertTrue(1 < model.managed_wood_clamp.sum() < len(self.years) - 1)
+
+        # year by year definition
+        cost_per_ha = self.param[Forest.REFORESTATION_COST_PER_HA]
+        deforest_cost_per_ha = self.param[Forest.DEFORESTATION_COST_PER_HA]
+        mw_price_per_ha = self.param[Forest.WOOD_TECHNO_DICT]['managed_wood_price_per_ha']
+        delta_reforestation = self.forest_investment / cost_per_ha
+        delta_mw = model.mw_from_invests['mw_surface'].values
+        unmanaged_forest = self.param[Forest.UNMANAGED_FOREST]
+        cumulative_mw = self.param[Forest.MW_INITIAL_SURFACE] + delta_mw[0]
+        deforested_unmanaged_surface = 0.
+        for i in range(len(self.years)):
+            delta_deforestation = - self.deforestation_investment[i] / deforest_cost_per_ha
+            delta_mw_surface = delta_mw[i]
+            lost_capital_deforestation = 0.
+            lost_capital_managed_wood = 0.
+            previous_unmanaged_forest = unmanaged_forest
+            unmanaged_forest += delta_reforestation[i] + delta_deforestation
+            if unmanaged_forest <= 0.:
+                delta_mw_surface += unmanaged_forest
+                deforested_unmanaged_surface = previous_unmanaged_forest + delta_reforestation[i]
+                lost_capital_reforestation = deforested_unmanaged_surface * cost_per_ha
+                lost_capital_managed_wood = - unmanaged_forest * mw_price_per_ha
+                unmanaged_forest = 0.
+            else:
+                lost_capital_reforestation = - delta_deforestation * cost_per_ha
+            previous_cumulative_mw = cumulative_mw
+            if i > 0:
+                cumulative_mw += delta_mw_surface
+            if cumulative_mw <= 0.:
+                lost_capital_deforestation = - cumulative_mw * deforest_cost_per_ha
+                lost_capital_managed_wood = - (delta_deforestation + deforested_unmanaged_surface - cumulative_mw) * \
+                    mw_price_per_ha
+                delta_mw_surface = - previous_cumulative_mw
+                cumulative_mw = 0.
+                delta_deforestation = - delta_reforestation[i] + delta_mw_surface
+            for name, value in [('unmanaged_forest', max(unmanaged_forest, 1e-15)),
+                                ('delta_mw_surface', delta_mw_surface),
+                                ('delta_deforestation_surface', delta_deforestation),
+                                ('lost_capital_deforestation', lost_capital_deforestation),
+                                ('lost_capital_reforestation', lost_capital_reforestation),
+                                ('lost_capital_managed_wood', lost_capital_managed_wood)]:
+                self.assertAlmostEqual(outputs[name][i], value, delta=1e-10 * max(1., abs(value)),
+                                       msg=f'{name} year {self.years[i]}')
+
+    def test_04_surfaces_and_lost_capitals_gradients(self):
+        step = 1e-30
+        model = self.compute_surfaces(self.forest_investment, self.deforestation_investment, self.mw_investment)
+        gradients = {
+            'deforestation': model.compute_d_limit_surfaces_d_deforestation_invest(
+                model.compute_d_deforestation_surface_d_invest()),
+            'reforestation': model.compute_d_limit_surfaces_d_reforestation_invest(
+                model.compute_d_reforestation_surface_d_invest()),
+            'managed_wood': model.compute_d_limit_surfaces_d_mw_invest(model.compute_d_mw_surface_d_invest()),
+        }
+        for input_name, input_gradients in gradients.items():
+            for iyear in range(len(self.years) - 1):
+                investments = {'reforestation': self.forest_investment.astype(complex),
+                               'deforestation': self.deforestation_investment.astype(complex),
+                               'managed_wood': self.mw_investment.astype(complex)}
+                investments[input_name][iyear] += step * 1j
+                complex_outputs = self.get_outputs(self.compute_surfaces(
+                    investments['reforestation'], investments['deforestation'], investments['managed_wood']))
+                for (output_name, complex_output), gradient in zip(complex_outputs.items(), input_gradients):
+                    np.testing.assert_allclose(gradient[:, iyear], np.imag(complex_output) / step, rtol=1e-10,
+                                               atol=1e-10 * np.abs(gradient).max(),
+                                               err_msg=f'{output_name} wrt {input_name} invest year {iyear}')
+
+
+if '__main__' == __name__:
+    unittest.main()
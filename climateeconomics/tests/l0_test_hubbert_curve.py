@@ -0,0 +1,94 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import os
+import tempfile
+import unittest
+from os.path import join, dirname
+
+import numpy as np
+import pandas as pd
+
+from climateeconomics.core.tools import Hubbert_Curve
+from climateeconomics.core.tools.Hubbert_Curve import compute_Hubbert_fit, compute_Hubbert_regression, \
+    clear_hubbert_fits, set_hubbert_fit_cache_dir
+from climateeconomics.glossarycore import GlossaryCore
+
+
+class HubbertCurveTest(unittest.TestCase):
+    """
+    Check the Hubbert fit against its year by year definition, and its memoization in memory and on disk
+    """
+
+    def setUp(self):
+        data_dir = join(dirname(dirname(__file__)), 'core', 'core_resources', 'models', 'resources_data')
+        self.past_production = pd.read_csv(join(data_dir, 'coal_resource_production_data.csv'))
+        self.resource_type = 'sub_bituminous_and_lignite'
+        self.regression_start = 1990
+        self.production_years = np.arange(1990, GlossaryCore.YearEndDefault + 1)
+        clear_hubbert_fits()
+
+    def tearDown(self):
+        set_hubbert_fit_cache_dir(None)
+        clear_hubbert_fits()
+
+    def test_01_fit(self):
+        years = self.past_production[GlossaryCore.Years].values
+        production = self.past_production[self.resource_type].values
+        cumulative_production = []
+        ratio_P_by_Q = []
+        Q = 0.
+        for P in production:
+            Q = Q + P
+            cumulative_production.append(Q)
+            ratio_P_by_Q.append(P / Q)
+        sample = years >= self.regression_start
+        slope, w = np.polyfit(np.array(cumulative_production)[sample], np.array(ratio_P_by_Q)[sample], 1)
+        Q_inf = - w / slope
+        tho = np.mean([np.log((Q_inf / Q - 1) * np.exp(year * w)) / w
+                       for Q, year in zip(np.array(cumulative_production)[sample], years[sample])])
+        np.testing.assert_allclose(compute_Hubbert_fit(self.past_production, self.regression_start, self.resource_type),
+                                   [Q_inf, w, tho], rtol=1e-12)
+
+        predictable_production = compute_Hubbert_regression(self.past_production, self.production_years,
+                                                            self.regression_start, self.resource_type)
+        for year, production in zip(self.production_years, predictable_production):
+            self.assertAlmostEqual(production, Q_inf * w / (np.exp(-w / 2 * (tho - year)) +
+                                                            np.exp(w / 2 * (tho - year))) ** 2,
+                                   delta=1e-10 * production)
+
+    def test_02_memoization(self):
+        fit = compute_Hubbert_fit(self.past_production, self.regression_start, self.resource_type)
+        self.assertIs(compute_Hubbert_fit(self.past_production.copy(), self.regression_start, self.resource_type), fit)
+        # another regression start or other past production data give another fit
+        self.assertNotEqual(compute_Hubbert_fit(self.past_production, 2000, self.resource_type), fit)
+        past_production = self.past_production.copy()
+        past_production.loc[past_production.index[-1], self.resource_type] *= 1.1
+        self.assertNotEqual(compute_Hubbert_fit(past_production, self.regression_start, self.resource_type), fit)
+        self.assertEqual(len(Hubbert_Curve._HUBBERT_FITS), 3)
+
+    def test_03_disk_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            set_hubbert_fit_cache_dir(cache_dir)
+            fit = compute_Hubbert_fit(self.past_production, self.regression_start, self.resource_type)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            # a new process finds the fit on disk
+            clear_hubbert_fits()
+            self.assertEqual(compute_Hubbert_fit(self.past_production, self.regression_start, self.resource_type), fit)
+            set_hubbert_fit_cache_dir(None)
+
+
+if '__main__' == __name__:
+    unittest.main()
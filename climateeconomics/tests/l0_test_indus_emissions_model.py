@@ -0,0 +1,96 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from climateeconomics.core.core_emissions.indus_emissions_model import IndusEmissions
+from climateeconomics.glossarycore import GlossaryCore
+
+
+class IndusEmissionsModelTest(unittest.TestCase):
+    """
+    Check the cumulative products and sums of the industrial emissions model against its year by year recurrence,
+    its batch of gross output scenarios and its lower triangular gradients against complex step
+    """
+
+    def setUp(self):
+        self.years = np.arange(GlossaryCore.YearStartDefault, GlossaryCore.YearEndDefault + 1)
+        self.nb_years = len(self.years)
+        self.param = {GlossaryCore.YearStart: GlossaryCore.YearStartDefault,
+                      GlossaryCore.YearEnd: GlossaryCore.YearEndDefault,
+                      GlossaryCore.TimeStep: 1,
+                      'init_gr_sigma': -0.0152,
+                      'decline_rate_decarbo': -0.001,
+                      'init_indus_emissions': 34.,
+                      GlossaryCore.InitialGrossOutput['var_name']: 130.187,
+                      'init_cum_indus_emissions': 577.31,
+                      'energy_emis_share': 0.9037,
+                      'land_emis_share': 0.0636}
+        self.gross_output = np.linspace(121., 191., self.nb_years) + 5. * np.sin(np.arange(self.nb_years))
+
+    def compute(self, gross_output):
+        return IndusEmissions(self.param).compute(
+            {GlossaryCore.EconomicsDfValue: pd.DataFrame({GlossaryCore.Years: self.years,
+                                                          GlossaryCore.GrossOutput: gross_output})})
+
+    def test_01_recurrence(self):
+        indus_emissions_df = self.compute(self.gross_output)
+        emissions_share = 1 - self.param['energy_emis_share'] - self.param['land_emis_share']
+
+        gr_sigma = self.param['init_gr_sigma']
+        sigma = self.param['init_indus_emissions'] / self.param[GlossaryCore.InitialGrossOutput['var_name']]
+        cum_indus_emissions = self.param['init_cum_indus_emissions']
+        for iyear in range(self.nb_years):
+            if iyear > 0:
+                sigma = sigma * np.exp(gr_sigma)
+                gr_sigma = gr_sigma * (1. + self.param['decline_rate_decarbo'])
+                cum_indus_emissions += sigma * self.gross_output[iyear] * emissions_share * 12 / 44
+            self.assertAlmostEqual(indus_emissions_df['gr_sigma'].values[iyear], gr_sigma, delta=1e-15)
+            self.assertAlmostEqual(indus_emissions_df['sigma'].values[iyear], sigma, delta=1e-15)
+            self.assertAlmostEqual(indus_emissions_df['indus_emissions'].values[iyear],
+                                   sigma * self.gross_output[iyear] * emissions_share, delta=1e-12)
+            self.assertAlmostEqual(indus_emissions_df['cum_indus_emissions'].values[iyear], cum_indus_emissions,
+                                   delta=1e-10)
+
+    def test_02_gross_output_scenarios(self):
+        gross_output = np.array([[0.8], [1.], [1.3]]) * self.gross_output
+        outputs = IndusEmissions(self.param).compute_scenarios(gross_output)
+        for iscenario in range(len(gross_output)):
+            indus_emissions_df = self.compute(gross_output[iscenario])
+            for column, values in outputs.items():
+                self.assertTupleEqual(values.shape, gross_output.shape)
+                np.testing.assert_allclose(values[iscenario], indus_emissions_df[column].values, rtol=1e-14)
+
+    def test_03_gradients_complex_step(self):
+        step = 1e-30
+        model = IndusEmissions(self.param)
+        model.compute({GlossaryCore.EconomicsDfValue: pd.DataFrame({GlossaryCore.Years: self.years,
+                                                                    GlossaryCore.GrossOutput: self.gross_output})})
+        d_indus_emissions_d_gross_output, d_cum_indus_emissions_d_gross_output, _ = model.compute_d_indus_emissions()
+        for iyear in [0, 1, 40, self.nb_years - 1]:
+            gross_output = self.gross_output.astype(complex)
+            gross_output[iyear] += step * 1j
+            indus_emissions_df = self.compute(gross_output)
+            np.testing.assert_allclose(d_indus_emissions_d_gross_output[:, iyear],
+                                       np.imag(indus_emissions_df['indus_emissions'].values) / step, rtol=1e-12)
+            np.testing.assert_allclose(d_cum_indus_emissions_d_gross_output[:, iyear],
+                                       np.imag(indus_emissions_df['cum_indus_emissions'].values) / step, rtol=1e-12)
+
+
+if '__main__' == __name__:
+    unittest.main()
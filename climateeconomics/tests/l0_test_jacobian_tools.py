@@ -0,0 +1,70 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+
+from climateeconomics.core.tools.jacobian_tools import lower_triangular_cumprod, banded_jacobian, \
+    impulse_response_matrix
+
+
+class JacobianToolsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.nb_years = 81
+        self.values = np.linspace(0.5, 2., self.nb_years)
+
+    def test_01_lower_triangular_cumprod(self):
+        factors = np.linspace(0.9, 1.1, self.nb_years)
+        inputs = np.linspace(1., 3., self.nb_years)
+        recurrence = np.zeros(self.nb_years)
+        recurrence[0] = inputs[0]
+        for i in range(1, self.nb_years):
+            recurrence[i] = factors[i] * recurrence[i - 1] + inputs[i]
+        np.testing.assert_allclose(lower_triangular_cumprod(factors) @ inputs, recurrence, rtol=1e-12)
+
+        # a null factor cuts the propagation
+        factors[40] = 0.
+        recurrence[40:] = 0.
+        recurrence[40] = inputs[40]
+        for i in range(41, self.nb_years):
+            recurrence[i] = factors[i] * recurrence[i - 1] + inputs[i]
+        np.testing.assert_allclose(lower_triangular_cumprod(factors) @ inputs, recurrence, rtol=1e-12)
+
+    def test_02_banded_jacobian(self):
+        banded = banded_jacobian([self.values, - self.values[1:]], [0, -1])
+        np.testing.assert_array_equal(banded, np.diag(self.values) - np.diag(self.values[1:], -1))
+        # a band below the diagonal only gives the size of the block
+        np.testing.assert_array_equal(banded_jacobian([self.values[2:]], [-2]), np.diag(self.values[2:], -2))
+
+        # complex step derivatives keep their dtype
+        self.assertEqual(banded_jacobian([self.values * (1. + 1.e-30j)], [0]).dtype, np.complex128)
+
+    def test_03_impulse_response_matrix(self):
+        decays = np.array([0.99, 0.6])
+        gains = np.array([0.2, 1.5])
+        inputs = np.linspace(1., 3., self.nb_years)
+        modes = np.zeros(2)
+        recurrence = np.zeros(self.nb_years)
+        for i in range(self.nb_years):
+            modes = decays * modes + gains * inputs[i]
+            recurrence[i] = modes.sum()
+        np.testing.assert_allclose(impulse_response_matrix(decays, gains, self.nb_years) @ inputs, recurrence,
+                                   rtol=1e-12)
+
+
+if '__main__' == __name__:
+    unittest.main()
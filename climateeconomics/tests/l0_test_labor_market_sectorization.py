@@ -25,6 +25,7 @@ import unittest
 from pandas import DataFrame
 import numpy as np
 from sostrades_core.execution_engine.execution_engine import ExecutionEngine
+from climateeconomics.core.core_sectorization.labor_market_sectorisation import LaborMarketModel
 
 
 class LaborMarketTestCase(unittest.TestCase):
@@ -130,3 +131,53 @@ class LaborMarketTestCase(unittest.TestCase):
 #         for graph in graph_list:
 #             graph.to_plotly().show()
             
+
+    def test_labormarket_model_broadcast_and_gradients(self):
+        '''
+        Check the model alone : cached employment rate, workforce per sector and diagonal gradients wrt working age
+        population against complex step
+        '''
+        inputs_dict = {GlossaryCore.YearStart: self.year_start,
+                       GlossaryCore.YearEnd: self.year_end,
+                       GlossaryCore.TimeStep: 1,
+                       'employment_a_param': 0.6335,
+                       'employment_power_param': 0.0156,
+                       'employment_rate_base_value': 0.659,
+                       'workforce_share_per_sector': self.workforce_share,
+                       GlossaryCore.WorkingAgePopulationDfValue: self.working_age_pop_df}
+        model = LaborMarketModel(inputs_dict)
+        workforce_df, employment_df = model.compute(inputs_dict)
+
+        # recovery from 2020 to 2031 then base value, computed once for both models
+        employment_rate = employment_df[GlossaryCore.EmploymentRate].values
+        recovery = (self.years >= 2020) & (self.years <= 2031)
+        np.testing.assert_allclose(employment_rate[recovery], 0.6335 * (self.years[recovery] - 2019) ** 0.0156,
+                                   rtol=1e-14)
+        np.testing.assert_array_equal(employment_rate[~recovery], 0.659)
+        self.assertIs(LaborMarketModel(inputs_dict).employment_rate, model.employment_rate)
+
+        working_age_pop = self.working_age_pop_df[GlossaryCore.Population1570].values
+        for sector in LaborMarketModel.SECTORS_LIST:
+            np.testing.assert_allclose(workforce_df[sector].values,
+                                       self.workforce_share[sector].values / 100 * employment_rate * working_age_pop,
+                                       rtol=1e-14)
+        np.testing.assert_allclose(workforce_df[GlossaryCore.Workforce].values,
+                                   workforce_df[LaborMarketModel.SECTORS_LIST].sum(axis=1).values, rtol=1e-14)
+
+        step = 1e-30
+        complex_inputs = dict(inputs_dict)
+        complex_inputs[GlossaryCore.WorkingAgePopulationDfValue] = pd.DataFrame(
+            {GlossaryCore.Years: self.years, GlossaryCore.Population1570: working_age_pop + step * 1j})
+        complex_workforce_df = LaborMarketModel(complex_inputs).compute(complex_inputs)[0]
+        gradients = {sector: model.compute_dworkforcesector_dworkagepop(sector)
+                     for sector in LaborMarketModel.SECTORS_LIST}
+        gradients[GlossaryCore.Workforce] = model.compute_dworkforcetotal_dworkagepop()
+        for column, gradient in gradients.items():
+            # each year only depends on the working age population of the same year
+            np.testing.assert_array_equal(gradient.nonzero()[0], gradient.nonzero()[1])
+            np.testing.assert_allclose(gradient.diagonal(), np.imag(complex_workforce_df[column].values) / step,
+                                       rtol=1e-12)
+
+
+if '__main__' == __name__:
+    unittest.main()
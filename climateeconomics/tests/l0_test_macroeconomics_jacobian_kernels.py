@@ -0,0 +1,220 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+from os.path import join, dirname
+
+import numpy as np
+import pandas as pd
+
+from climateeconomics.core.core_witness.macroeconomics_model_v1 import MacroEconomics
+from climateeconomics.glossarycore import GlossaryCore
+
+
+def loop_d_productivity_w_damage_d_damage_frac_output(model):
+    """Reference year by year implementation"""
+    nb_years = len(model.years_range)
+    d_productivity = np.zeros((nb_years, nb_years))
+    p_productivity_gr = model.economics_detail_df[GlossaryCore.ProductivityGrowthRate].values
+    p_productivity = model.economics_detail_df[GlossaryCore.ProductivityWithDamage].values
+    damefrac = model.damage_fraction_output_df[GlossaryCore.DamageFractionOutput].values
+    for i in range(1, nb_years):
+        growth = 1 - (p_productivity_gr[i - 1] / (5 / model.time_step))
+        d_productivity[i, i] = (1 - model.frac_damage_prod * damefrac[i]) * d_productivity[i - 1, i] / growth - \
+            model.frac_damage_prod * p_productivity[i - 1] / growth
+        for j in range(1, i):
+            d_productivity[i, j] = (1 - model.frac_damage_prod * damefrac[i]) * d_productivity[i - 1, j] / growth
+    return d_productivity
+
+
+def loop_d_capital(model, d_Y, d_Ku, d_Q_direct=None, first_column=1):
+    """Reference year by year propagation through the capital recurrence"""
+    alpha = model.output_alpha
+    gamma = model.output_gamma
+    productivity = model.economics_detail_df[GlossaryCore.Productivity].values
+    working_pop = model.workforce_df[GlossaryCore.Workforce].values
+    usable_capital = model.capital_df[GlossaryCore.UsableCapital].values
+    index_zeros = model.economics_detail_df[GlossaryCore.UnusedEnergy].values > 0.
+    damefrac = model.damage_fraction_output_df[GlossaryCore.DamageFractionOutput].values
+    dQ_dY = 1 - damefrac if not model.damage_to_productivity else (1 - damefrac) / (1 - model.frac_damage_prod * damefrac)
+    nb_years = model.nb_years
+    d_Kne = np.zeros((nb_years, nb_years))
+    for i in range(1, nb_years):
+        for j in range(first_column, i):
+            d_Q = dQ_dY[i - 1] * d_Y[i - 1, j]
+            if d_Q_direct is not None and i - 1 == j:
+                d_Q += d_Q_direct[j]
+            d_Kne[i, j] = (1 - model.depreciation_capital) * d_Kne[i - 1, j] + \
+                model.share_non_energy_investment.values[i - 1] * d_Q
+            d_Ku[i, j] = index_zeros[i] * model.max_capital_utilisation_ratio * d_Kne[i, j]
+            if model.compute_gdp:
+                d_Y[i, j] += productivity[i] * alpha * usable_capital[i] ** (gamma - 1) * d_Ku[i, j] * \
+                    (alpha * usable_capital[i] ** gamma + (1 - alpha) * working_pop[i] ** gamma) ** (1. / gamma - 1.)
+    return d_Kne, d_Ku, d_Y
+
+
+class MacroeconomicsJacobianKernelsTest(unittest.TestCase):
+    """
+    Compare the closed form jacobians of MacroEconomics with a year by year implementation of the recurrences
+    """
+
+    def setUp(self):
+        self.years = np.arange(GlossaryCore.YearStartDefault, GlossaryCore.YearEndDefault + 1)
+        nb_years = len(self.years)
+        global_data_dir = join(dirname(dirname(__file__)), 'data')
+        weighted_average_percentage_per_sector_df = pd.read_csv(
+            join(global_data_dir, 'weighted_average_percentage_per_sector.csv'))
+        section_gdp_df = pd.DataFrame({GlossaryCore.Years: self.years,
+                                       **dict(zip(weighted_average_percentage_per_sector_df.columns[1:],
+                                                  weighted_average_percentage_per_sector_df.values[0, 1:]))})
+        self.param = {
+            GlossaryCore.YearStart: GlossaryCore.YearStartDefault,
+            GlossaryCore.YearEnd: GlossaryCore.YearEndDefault,
+            GlossaryCore.TimeStep: 1,
+            'productivity_start': 0.27357,
+            GlossaryCore.InitialGrossOutput['var_name']: GlossaryCore.InitialGrossOutput['default'],
+            'capital_start_non_energy': 360.5487346,
+            'productivity_gr_start': 0.004781,
+            'decline_rate_tfp': 0.02387787,
+            'capital_utilisation_ratio': 0.8,
+            'max_capital_utilisation_ratio': 0.95,
+            'energy_eff_k': 0.05085,
+            'energy_eff_cst': 0.9835,
+            'energy_eff_xzero': 2012.8327,
+            'energy_eff_max': 3.5165,
+            'output_alpha': 0.86537,
+            'output_gamma': 0.5,
+            'depreciation_capital': 0.07,
+            'init_rate_time_pref': 0.015,
+            'conso_elasticity': 1.45,
+            'lo_capital': 1.0,
+            'lo_conso': 2.0,
+            'lo_per_capita_conso': 0.01,
+            'hi_per_capita_conso': 70,
+            'init_output_growth': -0.046154,
+            'co2_invest_limit': 2.0,
+            'employment_a_param': 0.6335,
+            'employment_power_param': 0.0156,
+            'employment_rate_base_value': 0.659,
+            'usable_capital_ref': 0.3,
+            GlossaryCore.SectorListValue: GlossaryCore.SectorsPossibleValues,
+            GlossaryCore.SectionListValue: GlossaryCore.SectionsPossibleValues,
+            GlossaryCore.DamageToProductivity: True,
+            GlossaryCore.FractionDamageToProductivityValue: 0.3,
+            GlossaryCore.UsableCapitalObjectiveRefName: GlossaryCore.UsableCapitalObjectiveRef['default'],
+            GlossaryCore.ConsumptionObjectiveRefValue: GlossaryCore.ConsumptionObjectiveRef['default'],
+            GlossaryCore.CO2TaxEfficiencyValue: pd.DataFrame({GlossaryCore.Years: self.years,
+                                                              GlossaryCore.CO2TaxEfficiencyValue: 40.0}),
+            GlossaryCore.EnergyInvestmentsWoTaxValue: pd.DataFrame(
+                {GlossaryCore.Years: self.years, GlossaryCore.EnergyInvestmentsWoTaxValue: 3.5}),
+            GlossaryCore.ShareNonEnergyInvestmentsValue: pd.DataFrame(
+                {GlossaryCore.Years: self.years, GlossaryCore.ShareNonEnergyInvestmentsValue: 27. - 2.6}),
+            # energy production crosses the optimal energy production so that both usable capital branches are used
+            GlossaryCore.EnergyProductionValue: pd.DataFrame(
+                {GlossaryCore.Years: self.years, GlossaryCore.TotalProductionValue: np.linspace(43, 300, nb_years)}),
+            GlossaryCore.DamageFractionDfValue: pd.DataFrame(
+                {GlossaryCore.Years: self.years, GlossaryCore.DamageFractionOutput: np.linspace(0.01, 0.05, nb_years),
+                 GlossaryCore.BaseCarbonPrice: np.zeros(nb_years)}),
+            GlossaryCore.CO2TaxesValue: pd.DataFrame({GlossaryCore.Years: self.years, GlossaryCore.CO2Tax: 50.0}),
+            GlossaryCore.CO2EmissionsGtValue: pd.DataFrame(
+                {GlossaryCore.Years: self.years, GlossaryCore.TotalCO2Emissions: np.linspace(1035, 0, nb_years)}),
+            GlossaryCore.EnergyCapitalDfValue: pd.DataFrame(
+                {GlossaryCore.Years: self.years, GlossaryCore.Capital: 16.09 * 1.02 ** np.arange(nb_years)}),
+            GlossaryCore.PopulationDfValue: pd.DataFrame(
+                {GlossaryCore.Years: self.years, GlossaryCore.PopulationValue: np.linspace(7886, 9550, nb_years)}),
+            GlossaryCore.WorkingAgePopulationDfValue: pd.DataFrame(
+                {GlossaryCore.Years: self.years, GlossaryCore.Population1570: np.linspace(5490, 6061, nb_years)}),
+            GlossaryCore.SectionGdpPercentageDfValue: section_gdp_df,
+            'assumptions_dict': {'compute_gdp': True,
+                                 'compute_climate_impact_on_gdp': True,
+                                 'activate_climate_effect_population': True,
+                                 'invest_co2_tax_in_renewables': True},
+        }
+
+    def compute_model(self, damage_to_productivity=True):
+        param = dict(self.param)
+        param[GlossaryCore.DamageToProductivity] = damage_to_productivity
+        model = MacroEconomics(param)
+        model.compute(param)
+        return model
+
+    def test_01_d_productivity_w_damage_d_damage_frac_output(self):
+        model = self.compute_model()
+        np.testing.assert_allclose(model.d_productivity_w_damage_d_damage_frac_output(),
+                                   loop_d_productivity_w_damage_d_damage_frac_output(model), rtol=1e-12, atol=1e-15)
+
+    def test_02_d_Y_Ku_Ew_Constraint_d_energy(self):
+        for damage_to_productivity in [True, False]:
+            model = self.compute_model(damage_to_productivity)
+            energy_efficiency = model.capital_df[GlossaryCore.EnergyEfficiency].values
+            index_zeros = model.economics_detail_df[GlossaryCore.UnusedEnergy].values > 0.
+            self.assertTrue(index_zeros.any() and not index_zeros.all())
+            d_Ku_d_E = np.diag(np.where(index_zeros, 0., model.capital_utilisation_ratio * energy_efficiency))
+            productivity = model.economics_detail_df[GlossaryCore.Productivity].values
+            working_pop = model.workforce_df[GlossaryCore.Workforce].values
+            usable_capital = model.capital_df[GlossaryCore.UsableCapital].values
+            alpha = model.output_alpha
+            gamma = model.output_gamma
+            d_Y_d_E = np.diag(productivity * alpha * usable_capital ** (gamma - 1) * np.diag(d_Ku_d_E) *
+                              (alpha * usable_capital ** gamma + (1 - alpha) * working_pop ** gamma) ** (1. / gamma - 1.))
+            d_Y_d_E[0, 0] = 0.
+            d_Kne_ref, d_Ku_ref, d_Y_ref = loop_d_capital(model, d_Y_d_E, d_Ku_d_E)
+
+            d_Y, d_Ku, _, d_Ew, _ = model.d_Y_Ku_Ew_Constraint_d_energy()
+            np.testing.assert_allclose(d_Y, d_Y_ref, rtol=1e-12, atol=1e-15)
+            np.testing.assert_allclose(d_Ku, d_Ku_ref, rtol=1e-12, atol=1e-15)
+
+    def test_03_d_gross_output_d_working_pop(self):
+        model = self.compute_model()
+        alpha = model.output_alpha
+        gamma = model.output_gamma
+        productivity = model.economics_detail_df[GlossaryCore.Productivity].values
+        working_pop = model.workforce_df[GlossaryCore.Workforce].values
+        usable_capital = model.capital_df[GlossaryCore.UsableCapital].values
+        employment_rate = model.workforce_df[GlossaryCore.EmploymentRate].values
+        d_Y_d_wap = np.diag(productivity * (1 - alpha) * working_pop ** (gamma - 1) * employment_rate * (
+            alpha * usable_capital ** gamma + (1 - alpha) * working_pop ** gamma) ** (1 / gamma - 1))
+        d_Y_d_wap[0, 0] = 0.
+        d_Kne_ref, d_Ku_ref, d_Y_ref = loop_d_capital(model, d_Y_d_wap, np.zeros_like(d_Y_d_wap))
+
+        d_Ku, _, d_Y, _, _ = model.d_gross_output_d_working_pop()
+        np.testing.assert_allclose(d_Y, d_Y_ref, rtol=1e-12, atol=1e-15)
+        np.testing.assert_allclose(d_Ku, d_Ku_ref, rtol=1e-12, atol=1e-15)
+
+    def test_04_d_gross_output_d_damage_frac_output(self):
+        for damage_to_productivity in [True, False]:
+            model = self.compute_model(damage_to_productivity)
+            capital_u = model.capital_df[GlossaryCore.UsableCapital].values
+            working_pop = model.workforce_df[GlossaryCore.Workforce].values
+            d_Y_d_productivity = (model.output_alpha * capital_u ** model.output_gamma + (1 - model.output_alpha) *
+                                  working_pop ** model.output_gamma) ** (1 / model.output_gamma)
+            d_Y_d_productivity[0] = 0.
+            d_productivity = loop_d_productivity_w_damage_d_damage_frac_output(model) if damage_to_productivity \
+                else np.zeros((model.nb_years, model.nb_years))
+            damefrac = model.damage_fraction_output_df[GlossaryCore.DamageFractionOutput].values
+            gross_output = model.economics_df[GlossaryCore.GrossOutput].values
+            d_dQ_dY_d_dfo = damefrac * 0 - 1. if not damage_to_productivity else \
+                (model.frac_damage_prod - 1) / ((1 - model.frac_damage_prod * damefrac) ** 2)
+            d_Kne_ref, d_Ku_ref, d_Y_ref = loop_d_capital(model, np.diag(d_Y_d_productivity) @ d_productivity,
+                                                          np.zeros_like(d_productivity),
+                                                          d_Q_direct=gross_output * d_dQ_dY_d_dfo, first_column=0)
+
+            d_Y, d_Ku, _, _, _ = model.d_gross_output_d_damage_frac_output()
+            np.testing.assert_allclose(d_Y, d_Y_ref, rtol=1e-12, atol=1e-15)
+            np.testing.assert_allclose(d_Ku, d_Ku_ref, rtol=1e-12, atol=1e-15)
+
+
+if '__main__' == __name__:
+    unittest.main()
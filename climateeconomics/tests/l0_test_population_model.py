@@ -0,0 +1,150 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+from os.path import join, dirname
+
+import numpy as np
+import pandas as pd
+
+from climateeconomics.core.core_witness.population_model import Population
+from climateeconomics.glossarycore import GlossaryCore
+
+
+class PopulationModelTest(unittest.TestCase):
+    """
+    Check the cohort engine of the Population model against its year by year definition, and its gradients
+    against complex step
+    """
+
+    def setUp(self):
+        self.years = np.arange(GlossaryCore.YearStartDefault, GlossaryCore.YearEndDefault + 1)
+        nb_years = len(self.years)
+        global_data_dir = join(dirname(dirname(__file__)), 'data')
+        self.inputs = {
+            GlossaryCore.YearStart: GlossaryCore.YearStartDefault,
+            GlossaryCore.YearEnd: GlossaryCore.YearEndDefault,
+            GlossaryCore.TimeStep: 1,
+            'population_start': pd.read_csv(join(global_data_dir, 'population_by_age_2020.csv')),
+            'birth_rate_upper': 1.12545946e-01,
+            'birth_rate_lower': 2.02192894e-02,
+            'birth_rate_delta': 6.19058508e-04,
+            'birth_rate_phi': 4.03360000e+03,
+            'birth_rate_nu': 1.75808789e-01,
+            'climate_mortality_param_df': pd.read_csv(join(global_data_dir, 'climate_additional_deaths_V2.csv')),
+            'calibration_temperature_increase': 2.5,
+            'theta': 2,
+            'death_rate_param': pd.read_csv(join(global_data_dir, 'death_rate_params_v2.csv')),
+            'lower_knowledge': 10,
+            'upper_knowledge': 100,
+            'delta_knowledge': 0.0293357,
+            'phi_knowledge': 149.7919,
+            'nu_knowledge': 1.144062855,
+            'constant_birthrate_know': 1.99999838e-02,
+            'alpha_birthrate_know': 1.02007061e-01,
+            'beta_birthrate_know': 8.01923418e-01,
+            'share_know_birthrate': 7.89207064e-01,
+            'diet_mortality_param_df': pd.read_csv(join(global_data_dir, 'diet_mortality_param.csv')),
+            'theta_diet': 5.0,
+            'kcal_pc_ref': 2000.0,
+            'assumptions_dict': {'compute_gdp': True,
+                                 'compute_climate_impact_on_gdp': True,
+                                 'activate_climate_effect_population': True,
+                                 'invest_co2_tax_in_renewables': True},
+            GlossaryCore.EconomicsDfValue: pd.DataFrame(
+                {GlossaryCore.Years: self.years, GlossaryCore.OutputNetOfDamage: 130.187 * 1.02 ** np.arange(nb_years)}),
+            GlossaryCore.TemperatureDfValue: pd.DataFrame(
+                {GlossaryCore.Years: self.years, GlossaryCore.TempAtmo: 0.85 * 1.01 ** np.arange(nb_years)}),
+            # calories cross the reference so that undernutrition and overnutrition are both used
+            GlossaryCore.CaloriesPerCapitaValue: pd.DataFrame(
+                {GlossaryCore.Years: self.years, 'kcal_pc': np.linspace(1800., 3200., nb_years)}),
+        }
+
+    def test_01_cohorts(self):
+        model = Population(self.inputs)
+        population_df, birth_rate_df, death_rate_dict, birth_df, death_dict, life_expectancy_df, \
+            working_age_population_df = model.compute(self.inputs)
+
+        population = population_df[model.full_age_list].values
+        total_deaths = death_dict['total'][list(range(len(model.full_age_list)))].values
+        surviving_population = population - total_deaths
+        # people of each age get one year older, new born are age 0 and the 100+ stay 100+
+        np.testing.assert_allclose(population[1:, 1:-1], surviving_population[:-1, :-2], rtol=1e-12)
+        np.testing.assert_allclose(population[1:, -1], surviving_population[:-1, -2] + surviving_population[:-1, -1],
+                                   rtol=1e-12)
+        np.testing.assert_allclose(population[1:, 0], birth_df['number_of_birth'].values[:-1], rtol=1e-12)
+        np.testing.assert_allclose(population_df['total'].values, population.sum(axis=1), rtol=1e-12)
+        np.testing.assert_allclose(working_age_population_df[GlossaryCore.Population1570].values,
+                                   population[:, 15:71].sum(axis=1), rtol=1e-12)
+
+        # death number of each effect is the population of each age times the death rate of its age range
+        for effect, death_rate_df in death_rate_dict.items():
+            death_rate = death_rate_df.values
+            full_death_rate = np.concatenate((np.repeat(death_rate[:, :-1], 5, axis=1), death_rate[:, -1:]), axis=1)
+            np.testing.assert_allclose(death_dict[effect][list(range(len(model.full_age_list)))].values,
+                                       population * full_death_rate, rtol=1e-12)
+
+    def test_02_life_expectancy(self):
+        model = Population(self.inputs)
+        _, _, death_rate_dict, _, _, life_expectancy_df, _ = model.compute(self.inputs)
+
+        for iyear, year in enumerate(self.years):
+            death_rate = death_rate_dict['total'].loc[year].values
+            full_death_rate = list(np.repeat(death_rate[:-1], 5)) + [death_rate[-1]]
+            surviving_pop = [1.]
+            for age in range(len(full_death_rate) - 1):
+                surviving_pop.append(surviving_pop[-1] * (1 - full_death_rate[age]))
+            self.assertAlmostEqual(life_expectancy_df['life_expectancy'].values[iyear], np.sum(surviving_pop),
+                                   delta=1e-10)
+
+    def test_03_complex_step(self):
+        model = Population(self.inputs)
+        population_df = model.compute(self.inputs)[0]
+
+        inputs = dict(self.inputs)
+        economics_df = inputs[GlossaryCore.EconomicsDfValue].copy()
+        economics_df[GlossaryCore.OutputNetOfDamage] = economics_df[GlossaryCore.OutputNetOfDamage] + 1e-30j
+        inputs[GlossaryCore.EconomicsDfValue] = economics_df
+        population_df_complex = Population(inputs).compute(inputs)[0]
+
+        np.testing.assert_allclose(np.real(population_df_complex['total'].values), population_df['total'].values,
+                                   rtol=1e-12)
+        self.assertTrue(np.all(np.imag(population_df_complex['total'].values[1:]) != 0.))
+
+    def test_04_gradients_complex_step(self):
+        model = Population(self.inputs)
+        model.compute(self.inputs)
+        gradients = {(GlossaryCore.EconomicsDfValue, GlossaryCore.OutputNetOfDamage): model.compute_d_pop_d_output(),
+                     (GlossaryCore.TemperatureDfValue, GlossaryCore.TempAtmo): model.compute_d_pop_d_temp(),
+                     (GlossaryCore.CaloriesPerCapitaValue, 'kcal_pc'): model.compute_d_pop_d_kcal_pc()}
+
+        step = 1e-30
+        for (input_name, column), (d_pop_tot, d_working_pop) in gradients.items():
+            for iyear in [0, 1, 40, len(self.years) - 2]:
+                inputs = dict(self.inputs)
+                input_df = inputs[input_name].copy()
+                input_df[column] = input_df[column].astype(complex)
+                input_df.loc[input_df.index[iyear], column] += step * 1j
+                inputs[input_name] = input_df
+                population_df, _, _, _, _, _, working_age_population_df = Population(inputs).compute(inputs)
+                np.testing.assert_allclose(d_pop_tot[:, iyear], np.imag(population_df['total'].values) / step,
+                                           rtol=1e-8, atol=1e-8 * np.abs(d_pop_tot).max())
+                np.testing.assert_allclose(d_working_pop[:, iyear],
+                                           np.imag(working_age_population_df[GlossaryCore.Population1570].values) / step,
+                                           rtol=1e-8, atol=1e-8 * np.abs(d_working_pop).max())
+
+
+if '__main__' == __name__:
+    unittest.main()
@@ -0,0 +1,88 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from climateeconomics.core.tools.range_validator import RangeValidator
+from climateeconomics.glossarycore import GlossaryCore
+
+
+class RangeValidatorTestCase(unittest.TestCase):
+    """
+    Check that the compiled range validator accepts values inside their ranges and reports all the violations at once
+    """
+
+    def setUp(self):
+        self.years = np.arange(GlossaryCore.YearStartDefault, GlossaryCore.YearEndDefault + 1)
+        self.ranges = {GlossaryCore.YearStart: [1950, 2040],
+                       'alpha': [0., 1.],
+                       'share': [0., 100.],
+                       GlossaryCore.EconomicsDfValue: {GlossaryCore.Years: [1900, 2100],
+                                                       GlossaryCore.GrossOutput: [0., 1e30],
+                                                       GlossaryCore.OutputNetOfDamage: [0., 1e30]}}
+        self.economics_df = pd.DataFrame({GlossaryCore.Years: self.years,
+                                          GlossaryCore.GrossOutput: np.linspace(130., 250., len(self.years)),
+                                          GlossaryCore.OutputNetOfDamage: np.linspace(120., 240., len(self.years)),
+                                          'unranged_column': - np.ones(len(self.years))})
+        self.data = {GlossaryCore.YearStart: GlossaryCore.YearStartDefault,
+                     'alpha': 0.5,
+                     'share': np.full(len(self.years), 50.),
+                     'unranged': -1.,
+                     GlossaryCore.EconomicsDfValue: self.economics_df}
+
+    def test_01_valid_data(self):
+        validator = RangeValidator(self.ranges)
+        self.assertEqual(validator.get_violations(self.data), [])
+        validator.validate(self.data)
+
+        # complex step values are checked on their real part, and missing ranged columns are skipped
+        complex_data = {**self.data,
+                        'alpha': 0.5 + 1e-30j,
+                        GlossaryCore.EconomicsDfValue: self.economics_df[[GlossaryCore.Years, GlossaryCore.GrossOutput]]
+                        .astype({GlossaryCore.GrossOutput: complex})}
+        validator.validate(complex_data)
+
+    def test_02_all_violations(self):
+        economics_df = self.economics_df.copy()
+        economics_df.loc[3, GlossaryCore.GrossOutput] = -1.
+        economics_df.loc[5, GlossaryCore.OutputNetOfDamage] = np.nan
+        economics_df.loc[6, GlossaryCore.OutputNetOfDamage] = -2.
+        share = np.full(len(self.years), 50.)
+        share[0] = 101.
+        data = {**self.data, 'alpha': 1.5, 'share': share, GlossaryCore.EconomicsDfValue: economics_df}
+
+        violations = RangeValidator(self.ranges).get_violations(data)
+        self.assertEqual(len(violations), 4)
+        self.assertIn("'alpha'", violations[0])
+        self.assertIn("'share'", violations[1])
+        self.assertIn(f"column '{GlossaryCore.GrossOutput}'", violations[2])
+        self.assertIn("at rows [3]", violations[2])
+        self.assertIn(f"column '{GlossaryCore.OutputNetOfDamage}'", violations[3])
+        self.assertIn("at rows [5, 6]", violations[3])
+
+        with self.assertRaises(ValueError) as context:
+            RangeValidator(self.ranges).validate(data)
+        self.assertIn('4 range violation(s)', str(context.exception))
+
+    def test_03_unsupported_type(self):
+        with self.assertRaises(TypeError):
+            RangeValidator(self.ranges).validate({**self.data, 'alpha': 'half'})
+
+
+if '__main__' == __name__:
+    unittest.main()
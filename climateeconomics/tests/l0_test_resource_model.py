@@ -0,0 +1,145 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+from os.path import join, dirname
+
+import numpy as np
+import pandas as pd
+
+from climateeconomics.core.core_resources.resource_model.resource_model import ResourceModel
+from climateeconomics.glossarycore import GlossaryCore
+
+
+class ResourceModelTest(unittest.TestCase):
+    """
+    Check the merit order allocation of the demand to the resource types against its year by year definition
+    """
+
+    def setUp(self):
+        self.resource_name = 'oil_resource'
+        self.years = np.arange(GlossaryCore.YearStartDefault, GlossaryCore.YearEndDefault + 1)
+        self.nb_years = len(self.years)
+        self.lifespan = 3
+        self.recycled_rate = 0.5
+        data_dir = join(dirname(dirname(__file__)), 'core', 'core_resources', 'models', 'resources_data')
+        demand = pd.read_csv(join(dirname(__file__), 'data', 'all_demand_from_energy_mix.csv'))
+        # demand goes above and below the production, and is null for some years
+        demand = demand[self.resource_name].values[0] * (1.2 + np.sin(np.arange(self.nb_years) / 4.))
+        demand[20:25] = 0.
+        consumed_data = pd.read_csv(join(data_dir, f'{self.resource_name}_consumed_data.csv'))
+        self.inputs = {
+            GlossaryCore.YearStart: GlossaryCore.YearStartDefault,
+            GlossaryCore.YearEnd: GlossaryCore.YearEndDefault,
+            'production_start': 1990,
+            'stock_start': 500.,
+            'resources_demand': pd.DataFrame({GlossaryCore.Years: self.years, self.resource_name: demand}),
+            'resource_consumed_data': pd.concat([consumed_data.iloc[:1]] * (self.lifespan + 1), ignore_index=True),
+            'lifespan': self.lifespan,
+            'recycled_rate': self.recycled_rate,
+            'resource_data': pd.read_csv(join(data_dir, f'{self.resource_name}_data.csv')),
+            'resource_production_data': pd.read_csv(join(data_dir, f'{self.resource_name}_production_data.csv')),
+            'resource_price_data': pd.read_csv(join(data_dir, f'{self.resource_name}_price_data.csv')),
+        }
+        self.model = ResourceModel(self.resource_name)
+        self.model.configure_parameters(self.inputs)
+        self.model.configure_parameters_update(self.inputs)
+        self.model.compute()
+
+    def test_01_allocation(self):
+        model = self.model
+        resource_types = model.ascending_price_resource_list
+        demand = self.inputs['resources_demand'][self.resource_name].values
+        production = {resource_type: model.predictable_production.loc[self.years, resource_type].values
+                      for resource_type in resource_types}
+        consumed = self.inputs['resource_consumed_data']
+        stock = {resource_type: np.zeros(self.nb_years) for resource_type in resource_types}
+        use = {resource_type: np.zeros(self.nb_years) for resource_type in resource_types}
+        recycled = {resource_type: np.zeros(self.nb_years) for resource_type in resource_types}
+        for resource_type in resource_types:
+            stock[resource_type][0] = self.inputs['stock_start']
+            use[resource_type][0] = consumed[f'{resource_type}_consumption'].values[-1]
+            recycled[resource_type][0] = consumed[f'{resource_type}_consumption'].values[0] * self.recycled_rate
+
+        for year in range(1, self.nb_years):
+            remaining_demand = demand[year]
+            for resource_type in resource_types:
+                if year >= self.lifespan:
+                    past_use = use[resource_type][year - self.lifespan]
+                else:
+                    past_use = consumed[f'{resource_type}_consumption'].values[year]
+                recycled[resource_type][year] = past_use * self.recycled_rate
+                available = stock[resource_type][year - 1] + production[resource_type][year] + \
+                    recycled[resource_type][year]
+                if remaining_demand > 0 and available >= remaining_demand:
+                    stock[resource_type][year] = available - remaining_demand
+                    use[resource_type][year] = remaining_demand
+                    remaining_demand = 0.
+                elif remaining_demand > 0:
+                    use[resource_type][year] = available
+                    remaining_demand -= available
+                else:
+                    stock[resource_type][year] = available
+
+        for resource_type in resource_types:
+            for model_df, reference in [(model.resource_stock, stock), (model.use_stock, use),
+                                        (model.recycled_production, recycled)]:
+                np.testing.assert_allclose(model_df[resource_type].values, reference[resource_type], rtol=1e-12,
+                                           atol=1e-10, err_msg=resource_type)
+
+    def test_02_branches(self):
+        model = self.model
+        stock_branches = model.stock_arrays['stock_branches']
+        stock = model.stock_arrays['resource_stock']
+        use = model.stock_arrays['use_stock']
+        demand = self.inputs['resources_demand'][self.resource_name].values
+
+        # all the branches are used, each type takes one branch each year after year start
+        for branch in [ResourceModel.DEMAND_SATISFIED, ResourceModel.STOCK_EXHAUSTED, ResourceModel.STOCK_STORED]:
+            self.assertTrue(np.any(stock_branches == branch))
+        self.assertTrue(np.all(stock_branches[:, 0] == ResourceModel.NO_ALLOCATION))
+        self.assertTrue(np.all(stock_branches[:, 1:] != ResourceModel.NO_ALLOCATION))
+        # demand is satisfied by one type at most, after the cheaper types have been exhausted
+        satisfied = stock_branches == ResourceModel.DEMAND_SATISFIED
+        self.assertTrue(np.all(satisfied.sum(axis=0) <= 1))
+        for year in np.nonzero(satisfied.any(axis=0))[0]:
+            first_satisfied = np.argmax(satisfied[:, year])
+            self.assertTrue(np.all(stock_branches[:first_satisfied, year] == ResourceModel.STOCK_EXHAUSTED))
+            self.assertTrue(np.all(stock_branches[first_satisfied + 1:, year] == ResourceModel.STOCK_STORED))
+            self.assertAlmostEqual(use[:, year].sum(), demand[year], delta=1e-10 * demand[year])
+
+        np.testing.assert_array_equal(stock[stock_branches == ResourceModel.STOCK_EXHAUSTED], 0.)
+        np.testing.assert_array_equal(use[stock_branches == ResourceModel.STOCK_STORED], 0.)
+        self.assertTrue(np.all(stock_branches[:, demand == 0.][:, 1:] == ResourceModel.STOCK_STORED))
+
+    def test_03_gradients(self):
+        grad_stock, grad_price, grad_use, grad_recycling = self.model.get_derivative_resource()
+        self.assertEqual(grad_price.shape, (self.nb_years, self.nb_years))
+        for gradients in [grad_stock, grad_use, grad_recycling]:
+            self.assertEqual(set(gradients), set(self.model.sub_resource_list))
+        # the most expensive type recycles what it used a lifespan ago
+        recycled_resource_type = self.model.ascending_price_resource_list[-1]
+        np.testing.assert_allclose(grad_recycling[recycled_resource_type][self.lifespan + 1:],
+                                   grad_use[recycled_resource_type][1:-self.lifespan] * self.recycled_rate)
+        # use of the satisfying type follows the demand of the year
+        satisfied = (self.model.stock_arrays['stock_branches'] == ResourceModel.DEMAND_SATISFIED) & \
+            (self.model.stock_arrays['resource_stock'] > 0)
+        for i, resource_type in enumerate(self.model.ascending_price_resource_list):
+            for year in np.nonzero(satisfied[i])[0]:
+                self.assertEqual(grad_use[resource_type][year, year], self.model.conversion_factor)
+
+
+if '__main__' == __name__:
+    unittest.main()
@@ -0,0 +1,248 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+from os.path import join, dirname
+
+import numpy as np
+import pandas as pd
+
+from climateeconomics.core.core_sectorization.sector_model import SectorModel, SectorsEngine
+from climateeconomics.glossarycore import GlossaryCore
+
+
+class SectorModelTest(unittest.TestCase):
+    """
+    Check the sectors engine advancing several sectors at once against a year by year recurrence, and the gradients
+    of the sector model against complex step
+    """
+
+    def setUp(self):
+        self.years = np.arange(GlossaryCore.YearStartDefault, GlossaryCore.YearEndDefault + 1)
+        self.nb_years = len(self.years)
+        section_gdp = pd.read_csv(join(dirname(dirname(__file__)), 'data', 'weighted_average_percentage_per_sector.csv'))
+        self.section_gdp_df = pd.DataFrame({GlossaryCore.Years: self.years,
+                                            **dict(zip(section_gdp.columns[1:], section_gdp.values[0, 1:]))})
+        self.parameters = {
+            'prod_function_fitting': False,
+            GlossaryCore.YearStart: GlossaryCore.YearStartDefault,
+            GlossaryCore.YearEnd: GlossaryCore.YearEndDefault,
+            GlossaryCore.TimeStep: 1,
+            GlossaryCore.SectionGdpPercentageDfValue: self.section_gdp_df,
+            'productivity_start': 1.31162,
+            'capital_start': 6.92448579,
+            'productivity_gr_start': 0.0027844,
+            'decline_rate_tfp': 0.098585,
+            'depreciation_capital': 0.058,
+            GlossaryCore.FractionDamageToProductivityValue: 0.3,
+            GlossaryCore.DamageToProductivity: True,
+            'init_output_growth': -0.046154,
+            'output_alpha': 0.99,
+            'output_gamma': 0.5,
+            'energy_eff_k': 0.1,
+            'energy_eff_cst': 0.490463,
+            'energy_eff_xzero': 1993,
+            'energy_eff_max': 2.35832,
+            'capital_utilisation_ratio': 0.8,
+            'max_capital_utilisation_ratio': 0.95,
+            'scaling_factor_energy_production': 1e3,
+            'ref_emax_enet_constraint': 60e3,
+            'assumptions_dict': {'compute_gdp': True,
+                                 'compute_climate_impact_on_gdp': True,
+                                 'activate_climate_effect_population': True,
+                                 'invest_co2_tax_in_renewables': True},
+        }
+        # sectors with different parameters, so that usable capital bound, gamma, depreciation and damage options are
+        # all used
+        self.sectors_parameters = {
+            GlossaryCore.SectorIndustry: {},
+            GlossaryCore.SectorServices: {'output_gamma': 0.6, 'capital_start': 500., 'depreciation_capital': 0.07},
+            GlossaryCore.SectorAgriculture: {GlossaryCore.DamageToProductivity: False, 'energy_eff_max': 0.5},
+            'NoClimateImpact': {'assumptions_dict': {**self.parameters['assumptions_dict'],
+                                                     'compute_climate_impact_on_gdp': False}},
+        }
+
+    def get_coupling_inputs(self, isector):
+        return {
+            GlossaryCore.SectionGdpPercentageDfValue: self.section_gdp_df,
+            GlossaryCore.DamageFractionDfValue: pd.DataFrame(
+                {GlossaryCore.Years: self.years,
+                 GlossaryCore.DamageFractionOutput: np.linspace(0.02, 0.05 + 0.01 * isector, self.nb_years)}),
+            GlossaryCore.EnergyProductionValue: pd.DataFrame(
+                {GlossaryCore.Years: self.years,
+                 GlossaryCore.TotalProductionValue: (1 + isector) * (np.linspace(43, 76, self.nb_years) +
+                                                                     3 * np.sin(np.arange(self.nb_years)))}),
+            GlossaryCore.InvestmentDfValue: pd.DataFrame(
+                {GlossaryCore.Years: self.years, GlossaryCore.InvestmentsValue: 2.5 * 1.02 ** np.arange(self.nb_years)}),
+            GlossaryCore.WorkforceDfValue: pd.DataFrame(
+                {GlossaryCore.Years: self.years,
+                 **{sector: (1 + 0.5 * isector) * np.linspace(1840, 2030, self.nb_years)
+                    for sector in self.sectors_parameters}}),
+        }
+
+    def get_reference_outputs(self, parameters, coupling_inputs, sector):
+        """
+        Year by year recurrence of the sector model, written independently of its vectorized computation
+        """
+        damage_fraction = coupling_inputs[GlossaryCore.DamageFractionDfValue][GlossaryCore.DamageFractionOutput].values
+        energy_production = coupling_inputs[GlossaryCore.EnergyProductionValue][GlossaryCore.TotalProductionValue].values
+        investment = coupling_inputs[GlossaryCore.InvestmentDfValue][GlossaryCore.InvestmentsValue].values
+        workforce = coupling_inputs[GlossaryCore.WorkforceDfValue][sector].values
+        alpha, gamma = parameters['output_alpha'], parameters['output_gamma']
+        frac_damage_prod = parameters[GlossaryCore.FractionDamageToProductivityValue]
+        climate_impact = parameters['assumptions_dict']['compute_climate_impact_on_gdp']
+        damage_to_productivity = parameters[GlossaryCore.DamageToProductivity] and climate_impact
+
+        outputs = {column: [] for column in [GlossaryCore.ProductivityWithDamage, GlossaryCore.ProductivityWithoutDamage,
+                                             GlossaryCore.Productivity, GlossaryCore.Capital,
+                                             GlossaryCore.UsableCapital, GlossaryCore.GrossOutput,
+                                             GlossaryCore.OutputNetOfDamage]}
+        for iyear, year in enumerate(self.years):
+            if iyear == 0:
+                productivity_w_damage = productivity_wo_damage = parameters['productivity_start']
+                capital = parameters['capital_start']
+            else:
+                productivity_gr = parameters['productivity_gr_start'] * \
+                    np.exp(- parameters['decline_rate_tfp'] * (year - 1 - self.years[0]))
+                productivity_w_damage = (1 - frac_damage_prod * damage_fraction[iyear]) * productivity_w_damage / \
+                    (1 - productivity_gr)
+                productivity_wo_damage = productivity_wo_damage / (1 - productivity_gr)
+                capital = capital * (1 - parameters['depreciation_capital']) + investment[iyear - 1]
+            productivity = productivity_w_damage if damage_to_productivity else productivity_wo_damage
+            energy_efficiency = parameters['energy_eff_cst'] + parameters['energy_eff_max'] / \
+                (1 + np.exp(- parameters['energy_eff_k'] * (year - parameters['energy_eff_xzero'])))
+            usable_capital = min(parameters['capital_utilisation_ratio'] * energy_production[iyear] *
+                                 parameters['scaling_factor_energy_production'] * energy_efficiency * 1e-3,
+                                 parameters['max_capital_utilisation_ratio'] * capital)
+            gross_output = productivity * (alpha * usable_capital ** gamma +
+                                           (1 - alpha) * workforce[iyear] ** gamma) ** (1 / gamma)
+            if not climate_impact:
+                output_net_of_damage = gross_output
+            elif damage_to_productivity:
+                output_net_of_damage = gross_output * (1 - damage_fraction[iyear]) / \
+                    (1 - frac_damage_prod * damage_fraction[iyear])
+            else:
+                output_net_of_damage = gross_output * (1 - damage_fraction[iyear])
+            for column, value in zip(outputs, [productivity_w_damage, productivity_wo_damage, productivity, capital,
+                                               usable_capital, gross_output, output_net_of_damage]):
+                outputs[column].append(value)
+        return {column: np.array(values) for column, values in outputs.items()}
+
+    def test_01_multi_sector_engine(self):
+        sector_models = []
+        sectors_parameters = []
+        sectors_coupling_inputs = []
+        for isector, (sector, sector_parameters) in enumerate(self.sectors_parameters.items()):
+            parameters = {**self.parameters, **sector_parameters}
+            sector_model = SectorModel()
+            sector_model.configure_parameters(parameters, sector)
+            sector_models.append(sector_model)
+            sectors_parameters.append(parameters)
+            sectors_coupling_inputs.append(self.get_coupling_inputs(isector))
+
+        # all sectors advanced in one engine call
+        engine = SectorsEngine(sector_models)
+        engine.compute_sector_models(sectors_coupling_inputs)
+
+        usable_capital_bounded = []
+        for isector, (sector, model) in enumerate(zip(self.sectors_parameters, sector_models)):
+            sector_dfs = {GlossaryCore.ProductivityWithDamage: model.productivity_df,
+                          GlossaryCore.ProductivityWithoutDamage: model.productivity_df,
+                          GlossaryCore.Productivity: model.productivity_df,
+                          GlossaryCore.Capital: model.capital_df,
+                          GlossaryCore.UsableCapital: model.capital_df,
+                          GlossaryCore.GrossOutput: model.production_df,
+                          GlossaryCore.OutputNetOfDamage: model.production_df}
+            reference_outputs = self.get_reference_outputs(sectors_parameters[isector],
+                                                           sectors_coupling_inputs[isector], sector)
+            for column, reference in reference_outputs.items():
+                np.testing.assert_allclose(sector_dfs[column][column].values, reference, rtol=1e-12,
+                                           err_msg=f'{sector} {column}')
+
+            output = model.production_df[GlossaryCore.OutputNetOfDamage].values
+            np.testing.assert_allclose(model.growth_rate_df['net_output_growth_rate'].values[:-1],
+                                       (output[1:] - output[:-1]) / output[:-1], rtol=1e-12, err_msg=sector)
+            self.assertEqual(model.growth_rate_df['net_output_growth_rate'].values[-1],
+                             model.growth_rate_df['net_output_growth_rate'].values[-2])
+            usable_capital_bounded.extend(model.capital_df[GlossaryCore.UsableCapital].values <
+                                          model.capital_df[GlossaryCore.UsableCapitalUnbounded].values)
+
+            # a sector model computed on its own is the view of a one sector engine
+            single_model = SectorModel()
+            single_model.configure_parameters(sectors_parameters[isector], sector)
+            single_model.compute(self.get_coupling_inputs(isector))
+            for column, values in model.sector_arrays.items():
+                np.testing.assert_array_equal(single_model.sector_arrays[column], values,
+                                              err_msg=f'{sector} {column}')
+
+        # the usable capital bound is active for some sectors and some years only
+        self.assertTrue(np.any(usable_capital_bounded))
+        self.assertFalse(np.all(usable_capital_bounded))
+
+    def test_02_gradients_complex_step(self):
+        step = 1e-30
+        for sector, sector_parameters in self.sectors_parameters.items():
+            parameters = {**self.parameters, **sector_parameters}
+            coupling_inputs = self.get_coupling_inputs(0)
+            model = SectorModel()
+            model.configure_parameters(parameters, sector)
+            model.compute(coupling_inputs)
+            d_productivity_d_damage = model.d_productivity_d_damage_frac_output()
+            d_gross_output_d_damage = model.doutput_ddamage(d_productivity_d_damage)
+            d_capital_d_invest, d_usable_capital_d_invest = model.dcapital_dinvest()
+            d_gross_output_d_invest = model.doutput_dinvest(d_usable_capital_d_invest)
+            gradients = {
+                (GlossaryCore.DamageFractionDfValue, GlossaryCore.DamageFractionOutput): {
+                    GlossaryCore.GrossOutput: d_gross_output_d_damage,
+                    GlossaryCore.OutputNetOfDamage: model.dnetoutput_ddamage(d_gross_output_d_damage)},
+                (GlossaryCore.InvestmentDfValue, GlossaryCore.InvestmentsValue): {
+                    GlossaryCore.Capital: d_capital_d_invest,
+                    GlossaryCore.UsableCapital: d_usable_capital_d_invest,
+                    GlossaryCore.GrossOutput: d_gross_output_d_invest},
+            }
+            # the gradient wrt workforce is written for the square root production function
+            if parameters['output_gamma'] == 0.5:
+                gradients[(GlossaryCore.WorkforceDfValue, sector)] = {
+                    GlossaryCore.GrossOutput: model.compute_doutput_dworkforce()}
+            for (input_name, column), output_gradients in gradients.items():
+                for iyear in [0, 1, 40, self.nb_years - 2]:
+                    complex_inputs = dict(coupling_inputs)
+                    input_df = complex_inputs[input_name].copy()
+                    input_df[column] = input_df[column].astype(complex)
+                    input_df.loc[input_df.index[iyear], column] += step * 1j
+                    complex_inputs[input_name] = input_df
+                    complex_model = SectorModel()
+                    complex_model.configure_parameters(parameters, sector)
+                    complex_model.compute(complex_inputs)
+                    for output_name, gradient in output_gradients.items():
+                        np.testing.assert_allclose(gradient[:, iyear],
+                                                   np.imag(complex_model.sector_arrays[output_name]) / step,
+                                                   rtol=1e-8, atol=1e-10 * np.abs(gradient).max(),
+                                                   err_msg=f'{sector} {output_name} wrt {column}')
+
+
+    def test_03_years_mismatch(self):
+        sector_models = []
+        for year_end in [GlossaryCore.YearEndDefault, GlossaryCore.YearEndDefault + 10]:
+            sector_model = SectorModel()
+            sector_model.configure_parameters({**self.parameters, GlossaryCore.YearEnd: year_end},
+                                              GlossaryCore.SectorIndustry)
+            sector_models.append(sector_model)
+        with self.assertRaises(ValueError):
+            SectorsEngine(sector_models)
+
+
+if '__main__' == __name__:
+    unittest.main()
@@ -0,0 +1,163 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from climateeconomics.glossarycore import GlossaryCore
+from climateeconomics.sos_wrapping.sos_wrapping_sectors.sectors_redistribution_energy.sectors_redistribution_energy_model import \
+    SectorRedistributionEnergyModel
+from climateeconomics.sos_wrapping.sos_wrapping_sectors.sectors_redistribution_invests.sectors_redistribution_invests_model import \
+    SectorRedistributionInvestsModel
+
+
+class SectorsRedistributionModelsTest(unittest.TestCase):
+    """
+    Check the share matrix products of the energy and investments redistribution models against the share of each
+    category, and their jacobians against complex step
+    """
+
+    def setUp(self):
+        self.years = np.arange(GlossaryCore.YearStartDefault, 2050 + 1)
+        self.nb_years = len(self.years)
+        self.sector_list = GlossaryCore.SectorsPossibleValues
+        self.deduced_sector = self.sector_list[-1]
+        self.energy_shares = {GlossaryCore.SectorServices: np.linspace(30, 35, self.nb_years),
+                              GlossaryCore.SectorAgriculture: np.linspace(5, 2, self.nb_years),
+                              GlossaryCore.ResidentialCategory: np.linspace(20, 25, self.nb_years),
+                              GlossaryCore.OtherEnergyCategory: np.linspace(10, 12, self.nb_years)}
+        self.invest_shares = {GlossaryCore.SectorServices: np.linspace(20, 15, self.nb_years),
+                              GlossaryCore.SectorAgriculture: np.linspace(1, 2, self.nb_years),
+                              GlossaryCore.SectorIndustry: np.linspace(8, 9, self.nb_years)}
+        self.total_energy_production = 10000 * 1.02 ** np.arange(self.nb_years)
+        self.net_output = 130. * 1.03 ** np.arange(self.nb_years)
+
+    def get_energy_inputs(self, total_energy_production, energy_shares):
+        def share_df(share):
+            return pd.DataFrame({GlossaryCore.Years: self.years, GlossaryCore.ShareSectorEnergy: share})
+
+        return {GlossaryCore.SectorListValue: self.sector_list,
+                GlossaryCore.MissingSectorNameValue: self.deduced_sector,
+                GlossaryCore.EnergyProductionValue: pd.DataFrame(
+                    {GlossaryCore.Years: self.years, GlossaryCore.TotalProductionValue: total_energy_production}),
+                **{f'{sector}.{GlossaryCore.ShareSectorEnergyDfValue}': share_df(energy_shares[sector])
+                   for sector in self.sector_list if sector != self.deduced_sector},
+                GlossaryCore.ShareResidentialEnergyDfValue: share_df(energy_shares[GlossaryCore.ResidentialCategory]),
+                GlossaryCore.ShareOtherEnergyDfValue: share_df(energy_shares[GlossaryCore.OtherEnergyCategory])}
+
+    def get_invest_inputs(self, net_output, invest_shares):
+        return {GlossaryCore.SectorListValue: self.sector_list,
+                GlossaryCore.EconomicsDfValue: pd.DataFrame(
+                    {GlossaryCore.Years: self.years, GlossaryCore.OutputNetOfDamage: net_output}),
+                **{f'{sector}.{GlossaryCore.ShareSectorInvestmentDfValue}': pd.DataFrame(
+                    {GlossaryCore.Years: self.years, GlossaryCore.ShareInvestment: invest_shares[sector]})
+                   for sector in self.sector_list}}
+
+    def test_01_energy_redistribution(self):
+        model = SectorRedistributionEnergyModel()
+        sectors_energy, all_sectors_energy_df, residential_energy_df = model.compute(
+            self.get_energy_inputs(self.total_energy_production, self.energy_shares))
+
+        self.assertListEqual(list(all_sectors_energy_df.columns),
+                             [GlossaryCore.Years] + list(self.energy_shares) + [self.deduced_sector])
+        for category, share in self.energy_shares.items():
+            np.testing.assert_allclose(all_sectors_energy_df[category].values,
+                                       share / 100. * self.total_energy_production, rtol=1e-14)
+        np.testing.assert_allclose(residential_energy_df[GlossaryCore.TotalProductionValue].values,
+                                   all_sectors_energy_df[GlossaryCore.ResidentialCategory].values, rtol=1e-14)
+        for sector in self.sector_list:
+            np.testing.assert_allclose(sectors_energy[sector][GlossaryCore.TotalProductionValue].values,
+                                       all_sectors_energy_df[sector].values, rtol=1e-14)
+        # the deduced sector gets the leftover energy
+        np.testing.assert_allclose(all_sectors_energy_df.drop(columns=GlossaryCore.Years).sum(axis=1).values,
+                                   self.total_energy_production, rtol=1e-12)
+
+    def test_02_invest_redistribution(self):
+        model = SectorRedistributionInvestsModel()
+        sectors_invests, all_sectors_invests_df = model.compute(self.get_invest_inputs(self.net_output,
+                                                                                       self.invest_shares))
+
+        self.assertListEqual(list(all_sectors_invests_df.columns),
+                             [GlossaryCore.Years] + list(self.sector_list) + [GlossaryCore.InvestmentsValue])
+        for sector, share in self.invest_shares.items():
+            np.testing.assert_allclose(sectors_invests[sector][GlossaryCore.InvestmentsValue].values,
+                                       share / 100. * self.net_output, rtol=1e-14)
+        np.testing.assert_allclose(all_sectors_invests_df[GlossaryCore.InvestmentsValue].values,
+                                   np.sum([share for share in self.invest_shares.values()], axis=0) / 100. *
+                                   self.net_output, rtol=1e-12)
+
+    def test_03_energy_gradients_complex_step(self):
+        step = 1e-30
+        model = SectorRedistributionEnergyModel()
+        model.compute(self.get_energy_inputs(self.total_energy_production, self.energy_shares))
+        d_energy_d_total_energy_production = model.d_energy_d_total_energy_production()
+        d_energy_d_share = np.diag(model.d_energy_d_share())
+        zeros = np.zeros((self.nb_years, self.nb_years))
+        outputs = model.categories + [self.deduced_sector]
+
+        for iyear in [0, 1, self.nb_years - 1]:
+            perturbation = np.zeros(self.nb_years, dtype=complex)
+            perturbation[iyear] = step * 1j
+            perturbed_inputs = {None: (self.total_energy_production + perturbation, self.energy_shares)}
+            perturbed_inputs.update({category: (self.total_energy_production,
+                                                {**self.energy_shares, category: share + perturbation})
+                                     for category, share in self.energy_shares.items()})
+            for perturbed_category, (total_energy_production, energy_shares) in perturbed_inputs.items():
+                all_sectors_energy_df = SectorRedistributionEnergyModel().compute(
+                    self.get_energy_inputs(total_energy_production, energy_shares))[1]
+                for ioutput, output in enumerate(outputs):
+                    if perturbed_category is None:
+                        gradient = np.diag(d_energy_d_total_energy_production[ioutput])
+                    elif output == self.deduced_sector:
+                        gradient = - d_energy_d_share
+                    else:
+                        gradient = d_energy_d_share if output == perturbed_category else zeros
+                    np.testing.assert_allclose(gradient[:, iyear],
+                                               np.imag(all_sectors_energy_df[output].values) / step,
+                                               rtol=1e-12, atol=1e-12,
+                                               err_msg=f'{output} wrt {perturbed_category}')
+
+    def test_04_invest_gradients_complex_step(self):
+        step = 1e-30
+        model = SectorRedistributionInvestsModel()
+        model.compute(self.get_invest_inputs(self.net_output, self.invest_shares))
+        d_invests_d_net_output = model.d_invests_d_net_output()
+        d_invests_d_share = np.diag(model.d_invests_d_share())
+        zeros = np.zeros((self.nb_years, self.nb_years))
+
+        for iyear in [0, 1, self.nb_years - 1]:
+            perturbation = np.zeros(self.nb_years, dtype=complex)
+            perturbation[iyear] = step * 1j
+            perturbed_inputs = {None: (self.net_output + perturbation, self.invest_shares)}
+            perturbed_inputs.update({sector: (self.net_output, {**self.invest_shares, sector: share + perturbation})
+                                     for sector, share in self.invest_shares.items()})
+            for perturbed_sector, (net_output, invest_shares) in perturbed_inputs.items():
+                sectors_invests = SectorRedistributionInvestsModel().compute(
+                    self.get_invest_inputs(net_output, invest_shares))[0]
+                for isector, sector in enumerate(self.sector_list):
+                    if perturbed_sector is None:
+                        gradient = np.diag(d_invests_d_net_output[isector])
+                    else:
+                        gradient = d_invests_d_share if sector == perturbed_sector else zeros
+                    np.testing.assert_allclose(gradient[:, iyear],
+                                               np.imag(sectors_invests[sector][GlossaryCore.InvestmentsValue].values)
+                                               / step, rtol=1e-12, atol=1e-12,
+                                               err_msg=f'{sector} wrt {perturbed_sector}')
+
+
+if '__main__' == __name__:
+    unittest.main()
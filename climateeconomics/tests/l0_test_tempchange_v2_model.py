@@ -0,0 +1,120 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from climateeconomics.core.core_witness.tempchange_model_v2 import TempChange
+from climateeconomics.database import DatabaseWitnessCore
+from climateeconomics.glossarycore import GlossaryCore
+
+
+class TempChangeV2ModelTest(unittest.TestCase):
+    """
+    Check the thermal modes engine of TempChange v2 : FAIR calibration, DICE bounds and analytic gradients
+    wrt concentrations against complex step
+    """
+
+    def setUp(self):
+        self.years = np.arange(GlossaryCore.YearStartDefault, GlossaryCore.YearEndDefault + 1)
+        self.nb_years = len(self.years)
+        self.ghg_cycle_df = pd.DataFrame({GlossaryCore.Years: self.years,
+                                          GlossaryCore.CO2Concentration: np.linspace(415., 600., self.nb_years),
+                                          GlossaryCore.CH4Concentration: np.linspace(1900., 2500., self.nb_years),
+                                          GlossaryCore.N2OConcentration: np.linspace(333., 360., self.nb_years)})
+        self.inputs = {
+            GlossaryCore.YearStart: GlossaryCore.YearStartDefault,
+            GlossaryCore.YearEnd: GlossaryCore.YearEndDefault,
+            GlossaryCore.TimeStep: 1,
+            'init_temp_ocean': 0.02794825,
+            'init_temp_atmo': DatabaseWitnessCore.TemperatureAnomalyPreIndustrialYearStart.value,
+            'eq_temp_impact': 3.1,
+            'climate_upper': 0.1005,
+            'transfer_upper': 0.088,
+            'transfer_lower': 0.025,
+            'forcing_eq_co2': 3.74,
+            'pre_indus_co2_concentration_ppm': DatabaseWitnessCore.CO2PreIndustrialConcentration.value,
+            'lo_tocean': -1.0,
+            'up_tatmo': 12.0,
+            'up_tocean': 20.0,
+            'alpha': 0.5,
+            'beta': 0.5,
+            'temperature_obj_option': TempChange.INTEGRAL_OBJECTIVE,
+            'temperature_change_ref': 0.2,
+            'temperature_end_constraint_limit': 1.5,
+            'temperature_end_constraint_ref': 3.,
+            'init_forcing_nonco': 0.83,
+            'hundred_forcing_nonco': 1.1422,
+            'pre_indus_ch4_concentration_ppm': 722.,
+            'pre_indus_n2o_concentration_ppm': 273.,
+            'transient_climate_response': 1.6,
+            'equilibrium_climate_sensitivity': 2.75,
+            'thermal_response_timescales': [239.0, 4.1],
+            GlossaryCore.GHGCycleDfValue: self.ghg_cycle_df,
+        }
+
+    def test_01_fair_climate_sensitivity(self):
+        inputs = {**self.inputs, 'temperature_model': 'FAIR', 'forcing_model': 'Meinshausen', 'init_temp_atmo': 0.}
+        model = TempChange(inputs)
+
+        # a doubling of CO2 maintained for millennia warms up to the equilibrium climate sensitivity
+        forcing = np.full(5000, inputs['forcing_eq_co2'])
+        temp_atmo = model.compute_temperature_arrays(forcing)[GlossaryCore.TempAtmo]
+        self.assertAlmostEqual(temp_atmo[-1], inputs['equilibrium_climate_sensitivity'], delta=1e-6)
+
+        # and the warming follows the two thermal boxes year by year
+        decays = np.exp(-1. / np.array(inputs['thermal_response_timescales']))
+        equilibrium_responses = model.compute_equilibrium_responses_fair()
+        boxes = np.zeros(2)
+        for year in range(1, 200):
+            boxes = decays * boxes + equilibrium_responses * (1 - decays) * forcing[year]
+            self.assertAlmostEqual(temp_atmo[year], boxes.sum(), delta=1e-12)
+
+    def test_02_dice_bounds(self):
+        inputs = {**self.inputs, 'temperature_model': 'DICE', 'forcing_model': 'DICE', 'up_tatmo': 3.}
+        model = TempChange(inputs)
+        # the strongest forcing trajectories reach the upper bound of atmosphere temperature
+        forcing = np.array([[1.], [2.], [4.], [8.]]) * np.linspace(2., 4., self.nb_years)
+        temperatures = model.compute_temperature_arrays(forcing)
+        temp_atmo, temp_ocean = model.compute_bounded_temperatures_dice(forcing)
+        self.assertTrue(np.any(temp_atmo == inputs['up_tatmo']))
+        np.testing.assert_allclose(temperatures[GlossaryCore.TempAtmo], temp_atmo, rtol=1e-12)
+        np.testing.assert_allclose(temperatures[GlossaryCore.TempOcean], temp_ocean, rtol=1e-12)
+
+    def test_03_gradients_complex_step(self):
+        step = 1e-30
+        for temperature_model in ['FUND', 'FAIR']:
+            for forcing_model in ['Myhre', 'Etminan', 'Meinshausen']:
+                inputs = {**self.inputs, 'temperature_model': temperature_model, 'forcing_model': forcing_model}
+                model = TempChange(inputs)
+                model.compute(inputs)
+                d_temp_d_concentrations = model.compute_d_temp_d_concentrations()
+                for concentration_name, d_temp_d_concentration in d_temp_d_concentrations.items():
+                    for iyear in [0, 1, 40, self.nb_years - 1]:
+                        ghg_cycle_df = self.ghg_cycle_df.copy()
+                        ghg_cycle_df[concentration_name] = ghg_cycle_df[concentration_name].astype(complex)
+                        ghg_cycle_df.loc[iyear, concentration_name] += step * 1j
+                        complex_inputs = {**inputs, GlossaryCore.GHGCycleDfValue: ghg_cycle_df}
+                        temperature_df = TempChange(complex_inputs).compute(complex_inputs)
+                        np.testing.assert_allclose(d_temp_d_concentration[:, iyear],
+                                                   np.imag(temperature_df[GlossaryCore.TempAtmo].values) / step,
+                                                   rtol=1e-8, atol=1e-12,
+                                                   err_msg=f'{temperature_model} {forcing_model} {concentration_name}')
+
+
+if '__main__' == __name__:
+    unittest.main()
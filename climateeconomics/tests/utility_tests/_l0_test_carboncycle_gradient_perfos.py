@@ -0,0 +1,58 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import timeit
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from climateeconomics.core.core_witness.carbon_cycle_model import CarbonCycle
+from climateeconomics.glossarycore import GlossaryCore
+
+
+class CarbonCycleGradientPerfos(unittest.TestCase):
+    """
+    Timings of the carbon cycle compute and of its gradients wrt emissions on the default horizon and on a long one
+    """
+
+    def get_inputs(self, nb_years):
+        years = np.arange(GlossaryCore.YearStartDefault, GlossaryCore.YearStartDefault + nb_years)
+        return {GlossaryCore.YearStart: years[0], GlossaryCore.YearEnd: years[-1], GlossaryCore.TimeStep: 1,
+                'conc_lower_strata': 1720, 'conc_upper_strata': 360, 'conc_atmo': 588, 'init_conc_atmo': 878.412,
+                'init_upper_strata': 460, 'init_lower_strata': 1740, 'b_twelve': 0.12, 'b_twentythree': 0.007,
+                'lo_mat': 10, 'lo_mu': 100, 'lo_ml': 1000, 'ppm_ref': 280, 'rockstrom_constraint_ref': 490,
+                'alpha': 0.5, 'beta': 0.5, 'scale_factor_atmo_conc': 0.01, 'minimum_ppm_limit': 250,
+                'minimum_ppm_constraint_ref': 10,
+                GlossaryCore.CO2EmissionsDfValue: pd.DataFrame(
+                    {GlossaryCore.Years: years, 'total_emissions': np.linspace(35., -20., nb_years),
+                     'cum_total_emissions': np.linspace(513., 680., nb_years)})}
+
+    def test_01_carboncycle_gradient_perfos(self):
+        for nb_years in [81, 300]:
+            inputs = self.get_inputs(nb_years)
+            model = CarbonCycle(inputs)
+            compute_time = min(timeit.repeat(lambda: model.compute(inputs), number=1, repeat=5))
+            gradient_time = min(timeit.repeat(model.compute_d_total_emissions, number=1, repeat=5))
+            cum_gradient_time = min(timeit.repeat(model.compute_d_cum_total_emissions, number=1, repeat=5))
+            print(f'{nb_years} years')
+            print('compute time : ', compute_time)
+            print('compute_d_total_emissions time : ', gradient_time)
+            print('compute_d_cum_total_emissions time : ', cum_gradient_time)
+
+
+if '__main__' == __name__:
+    cls = CarbonCycleGradientPerfos()
+    cls.test_01_carboncycle_gradient_perfos()
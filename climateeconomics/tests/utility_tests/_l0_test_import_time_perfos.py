@@ -0,0 +1,70 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import subprocess
+import sys
+import unittest
+
+# climateeconomics disciplines of the witness_coarse process (witness_wo_energy part)
+WITNESS_COARSE_DISCIPLINES_MODULES = [
+    'climateeconomics.sos_wrapping.sos_wrapping_witness.macroeconomics.macroeconomics_discipline',
+    'climateeconomics.sos_wrapping.sos_wrapping_witness.ghgcycle.ghgcycle_discipline',
+    'climateeconomics.sos_wrapping.sos_wrapping_witness.damagemodel.damagemodel_discipline',
+    'climateeconomics.sos_wrapping.sos_wrapping_witness.tempchange_v2.tempchange_discipline',
+    'climateeconomics.sos_wrapping.sos_wrapping_witness.utilitymodel.utilitymodel_discipline',
+    'climateeconomics.sos_wrapping.sos_wrapping_witness.policymodel.policy_discipline',
+    'climateeconomics.sos_wrapping.sos_wrapping_witness.population.population_discipline',
+    'climateeconomics.sos_wrapping.sos_wrapping_witness.consumption.consumption_discipline',
+    'climateeconomics.sos_wrapping.sos_wrapping_agriculture.crop.crop_disc',
+    'climateeconomics.sos_wrapping.sos_wrapping_emissions.ghgemissions.ghgemissions_discipline',
+    'climateeconomics.sos_wrapping.sos_wrapping_emissions.indus_emissions.indusemissions_discipline',
+    'climateeconomics.sos_wrapping.sos_wrapping_emissions.agriculture_emissions.agriculture_emissions_discipline',
+]
+
+# run in a new interpreter, so that the import is a cold start
+IMPORT_TIME_SCRIPT = f'''
+import time
+start = time.perf_counter()
+import climateeconomics.glossarycore
+glossary_time = time.perf_counter() - start
+start = time.perf_counter()
+for module in {WITNESS_COARSE_DISCIPLINES_MODULES}:
+    __import__(module)
+disciplines_time = time.perf_counter() - start
+from climateeconomics.database import DataRegistry
+parsing_times = DataRegistry.get_parsing_times()
+print('glossary import time : ', glossary_time)
+print('disciplines import time : ', disciplines_time)
+print(len(parsing_times), 'csv files loaded in', sum(parsing_times.values()))
+for path, parsing_time in sorted(parsing_times.items(), key=lambda item: - item[1]):
+    print('   ', parsing_time, path)
+'''
+
+
+class ImportTimePerfos(unittest.TestCase):
+    """
+    Cold start cost of the climateeconomics disciplines of witness_coarse, and of the default data they load (parsed
+    from csv files or read from the binary cache of DataRegistry)
+    """
+
+    def test_01_import_time_perfos(self):
+        result = subprocess.run([sys.executable, '-c', IMPORT_TIME_SCRIPT], capture_output=True, text=True,
+                                check=True)
+        print(result.stdout)
+
+
+if '__main__' == __name__:
+    cls = ImportTimePerfos()
+    cls.test_01_import_time_perfos()
@@ -0,0 +1,52 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import timeit
+import unittest
+
+import numpy as np
+from scipy import sparse
+
+
+class JacobianBlocksPerfos(unittest.TestCase):
+    """
+    Timings of the jacobian blocks built as dense numpy arrays and as scipy.sparse matrices
+    densified for the execution engine, on the default horizon and on a long one
+    """
+
+    def test_01_jacobian_blocks_perfos(self):
+        for nb_years in [81, 300]:
+            values = np.linspace(0.5, 2., nb_years)
+            other_values = np.linspace(1., 3., nb_years)
+            matrix = np.tril(np.outer(values, other_values))
+
+            def get_time(function):
+                return min(timeit.repeat(function, number=100, repeat=5)) / 100
+
+            print(f'{nb_years} years')
+            print('dense diagonal block : ', get_time(lambda: np.diag(values)))
+            print('sparse diagonal block densified : ',
+                  get_time(lambda: sparse.diags(values, format='csr').toarray()))
+            print('dense chain rule diagonal @ diagonal @ matrix : ',
+                  get_time(lambda: np.diag(values) @ np.diag(other_values) @ matrix))
+            print('sparse chain rule diagonal @ diagonal @ matrix : ',
+                  get_time(lambda: sparse.diags(values, format='csr') @ sparse.diags(other_values, format='csr')
+                           @ matrix))
+            print('chain rule as rows scaling : ', get_time(lambda: (values * other_values)[:, np.newaxis] * matrix))
+
+
+if '__main__' == __name__:
+    cls = JacobianBlocksPerfos()
+    cls.test_01_jacobian_blocks_perfos()
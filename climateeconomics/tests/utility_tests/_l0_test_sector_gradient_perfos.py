@@ -0,0 +1,96 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import timeit
+import unittest
+from os.path import join, dirname
+
+import numpy as np
+import pandas as pd
+
+from climateeconomics.core.core_sectorization.sector_model import SectorModel
+from climateeconomics.glossarycore import GlossaryCore
+
+
+class SectorGradientPerfos(unittest.TestCase):
+    """
+    Timings of the compute and of the gradients of each sector model, chained as in the sector discipline
+    """
+
+    def get_inputs(self, sector, nb_years):
+        years = np.arange(GlossaryCore.YearStartDefault, GlossaryCore.YearStartDefault + nb_years)
+        section_gdp = pd.read_csv(join(dirname(dirname(dirname(__file__))), 'data',
+                                       'weighted_average_percentage_per_sector.csv'))
+        section_gdp_df = pd.DataFrame({GlossaryCore.Years: years,
+                                       **dict(zip(section_gdp.columns[1:], section_gdp.values[0, 1:]))})
+        parameters = {'prod_function_fitting': False, GlossaryCore.YearStart: years[0], GlossaryCore.YearEnd: years[-1],
+                      GlossaryCore.TimeStep: 1, GlossaryCore.SectionGdpPercentageDfValue: section_gdp_df,
+                      'productivity_start': 1.31162, 'capital_start': 6.92448579, 'productivity_gr_start': 0.0027844,
+                      'decline_rate_tfp': 0.098585, 'depreciation_capital': 0.058,
+                      GlossaryCore.FractionDamageToProductivityValue: 0.3, GlossaryCore.DamageToProductivity: True,
+                      'init_output_growth': -0.046154, 'output_alpha': 0.99, 'output_gamma': 0.5,
+                      'energy_eff_k': 0.1, 'energy_eff_cst': 0.490463, 'energy_eff_xzero': 1993,
+                      'energy_eff_max': 2.35832, 'capital_utilisation_ratio': 0.8,
+                      'max_capital_utilisation_ratio': 0.95, 'scaling_factor_energy_production': 1e3,
+                      'ref_emax_enet_constraint': 60e3,
+                      'assumptions_dict': {'compute_gdp': True, 'compute_climate_impact_on_gdp': True,
+                                           'activate_climate_effect_population': True,
+                                           'invest_co2_tax_in_renewables': True}}
+        coupling_inputs = {
+            GlossaryCore.SectionGdpPercentageDfValue: section_gdp_df,
+            GlossaryCore.DamageFractionDfValue: pd.DataFrame(
+                {GlossaryCore.Years: years, GlossaryCore.DamageFractionOutput: np.linspace(0.02, 0.05, nb_years)}),
+            GlossaryCore.EnergyProductionValue: pd.DataFrame(
+                {GlossaryCore.Years: years, GlossaryCore.TotalProductionValue: np.linspace(43, 76, nb_years)}),
+            GlossaryCore.InvestmentDfValue: pd.DataFrame(
+                {GlossaryCore.Years: years, GlossaryCore.InvestmentsValue: 2.5 * 1.02 ** np.arange(nb_years)}),
+            GlossaryCore.WorkforceDfValue: pd.DataFrame(
+                {GlossaryCore.Years: years, sector: np.linspace(1840, 2030, nb_years)})}
+        return parameters, coupling_inputs
+
+    @staticmethod
+    def compute_gradients(model):
+        d_gross_output_d_workforce = model.compute_doutput_dworkforce()
+        model.d_damages_from_productivity_loss_d_user_input(d_gross_output_d_workforce)
+        model.dnetoutput(d_gross_output_d_workforce)
+
+        d_gross_output_d_damage = model.doutput_ddamage(model.d_productivity_d_damage_frac_output())
+        model.dnetoutput_ddamage(d_gross_output_d_damage)
+        model.d_damages_from_productivity_loss_d_damage_fraction_output(d_gross_output_d_damage)
+
+        d_capital_d_invest, d_usable_capital_d_invest = model.dcapital_dinvest()
+        model.dnetoutput(model.doutput_dinvest(d_usable_capital_d_invest))
+        model.d_enegy_wasted_obj_d_invest(d_capital_d_invest)
+        model.demaxconstraint(d_capital_d_invest)
+
+        d_gross_output_d_energy = model.d_Y_Ku_Ew_Constraint_d_energy()[0]
+        model.dnetoutput(d_gross_output_d_energy)
+
+    def test_01_sector_gradient_perfos(self):
+        for nb_years in [81, 300]:
+            for sector in GlossaryCore.SectorsPossibleValues:
+                parameters, coupling_inputs = self.get_inputs(sector, nb_years)
+                model = SectorModel()
+                model.configure_parameters(parameters, sector)
+                compute_time = min(timeit.repeat(lambda: model.compute(coupling_inputs), number=1, repeat=5))
+                gradient_time = min(timeit.repeat(lambda: self.compute_gradients(model), number=1, repeat=5))
+                print(f'{sector} {nb_years} years')
+                print('compute time : ', compute_time)
+                print('gradients time : ', gradient_time)
+
+
+if '__main__' == __name__:
+    cls = SectorGradientPerfos()
+    cls.test_01_sector_gradient_perfos()
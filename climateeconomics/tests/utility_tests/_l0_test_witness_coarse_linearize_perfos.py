@@ -0,0 +1,89 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import cProfile
+import pstats
+import unittest
+from io import StringIO
+
+from climateeconomics.sos_processes.iam.witness.witness_coarse.usecase_witness_coarse_new import Study as Studycoarse
+from sostrades_core.execution_engine.execution_engine import ExecutionEngine
+
+
+class WitnessCoarseLinearizePerfos(unittest.TestCase):
+    """
+    Linearize timings of witness coarse MDA
+    """
+
+    def setUp(self):
+        self.name = 'Test'
+
+    def run_witness_coarse_mda(self):
+        """
+        Run witness coarse with a newton MDA and return the cumulated time of linearize and of compute_sos_jacobian
+        """
+        self.ee = ExecutionEngine(self.name)
+        repo = 'climateeconomics.sos_processes.iam.witness'
+        builder = self.ee.factory.get_builder_from_process(
+            repo, 'witness_coarse')
+
+        self.ee.factory.set_builders_to_coupling_builder(builder)
+        self.ee.configure()
+        usecase = Studycoarse(execution_engine=self.ee)
+        usecase.study_name = self.name
+        values_dict = usecase.setup_usecase()
+
+        input_dict_to_load = {}
+        for uc_d in values_dict:
+            input_dict_to_load.update(uc_d)
+
+        input_dict_to_load[f'{self.name}.n_processes'] = 1
+        input_dict_to_load[f'{self.name}.max_mda_iter'] = 300
+        input_dict_to_load[f'{self.name}.sub_mda_class'] = 'GSPureNewtonMDA'
+        self.ee.load_study_from_input_dict(input_dict_to_load)
+
+        profil = cProfile.Profile()
+        profil.enable()
+        self.ee.execute()
+        profil.disable()
+
+        result = StringIO()
+        ps = pstats.Stats(profil, stream=result)
+        ps.sort_stats('cumulative')
+        ps.print_stats(1000)
+        result = result.getvalue()
+        # chop the string into a csv-like buffer
+        result = 'ncalls' + result.split('ncalls')[-1]
+        result = '\n'.join([','.join(line.rstrip().split(None, 5))
+                            for line in result.split('\n')])
+        lines = result.split('\n')
+
+        total_time = float(lines[1].split(',')[3])
+        linearize_time = float([line for line in lines if 'linearize' in line][0].split(',')[3])
+        compute_sos_jacobian_time = sum(float(line.split(',')[3])
+                                        for line in lines if 'compute_sos_jacobian' in line)
+        return total_time, linearize_time, compute_sos_jacobian_time
+
+    def test_01_witness_coarse_linearize_perfos(self):
+        total_time, linearize_time, compute_sos_jacobian_time = self.run_witness_coarse_mda()
+        print('total_time : ', total_time)
+        print('linearize_time : ', linearize_time)
+        print('compute_sos_jacobian_time : ', compute_sos_jacobian_time)
+
+
+if '__main__' == __name__:
+    cls = WitnessCoarseLinearizePerfos()
+    cls.setUp()
+    cls.test_01_witness_coarse_linearize_perfos()